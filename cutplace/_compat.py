@@ -25,6 +25,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import csv
+import os
 
 # TODO: Probably we can eventually replace ``six`` by ``future`` from
 #  and remove `_compat` all together.
@@ -59,6 +60,20 @@ def text_repr(text):
     return result
 
 
+def replace_file(source_path, target_path):
+    """
+    Rename ``source_path`` to ``target_path`` even if ``target_path`` already
+    exists. Under Python 3 this is atomic.
+    """
+    if six.PY2:  # pragma: no cover
+        # Python 2 lacks ``os.replace()`` and cannot rename to an existing file on Windows.
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        os.rename(source_path, target_path)
+    else:
+        os.replace(source_path, target_path)
+
+
 def token_io_readline(text):
     """
     A readline function that can be used by `tokenize.generate_tokens()`.
@@ -24,6 +24,7 @@ import errno
 import logging
 import os
 import io
+import re
 import token
 import tokenize
 
@@ -31,6 +32,9 @@ import six
 
 from cutplace import _compat
 
+# Python names that certainly are valid so they do not have to be tokenized.
+_SIMPLE_PYTHON_NAME_REGEX = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*\Z')
+
 
 #: Mapping for value of :option:`--log` to logging level.
 LOG_LEVEL_NAME_TO_LEVEL_MAP = {
@@ -69,33 +73,46 @@ def validated_python_name(name, value):
     assert name
     assert value is not None
 
-    readable = io.StringIO(value.strip())
-    toky = tokenize.generate_tokens(readable.readline)
-    next_token = next(toky)
-    next_type = next_token[0]
-    result = next_token[1]
-    if tokenize.ISEOF(next_type):
-        raise NameError("%s must not be empty but was: %r" % (name, value))
-    if next_type != token.NAME:
-        raise NameError("%s must contain only ASCII letters, digits and underscore (_) but is: %r"
-                        % (name, value))
-    second_token = next(toky)
-    second_token_type = second_token[0]
-    if not tokenize.ISEOF(second_token_type):
-        raise NameError("%s must be a single word, but after %r there also is %r" % (name, result, second_token[1]))
+    result = value.strip()
+    if _SIMPLE_PYTHON_NAME_REGEX.match(result) is None:
+        readable = io.StringIO(result)
+        toky = tokenize.generate_tokens(readable.readline)
+        next_token = next(toky)
+        next_type = next_token[0]
+        result = next_token[1]
+        if tokenize.ISEOF(next_type):
+            raise NameError("%s must not be empty but was: %r" % (name, value))
+        if next_type != token.NAME:
+            raise NameError("%s must contain only ASCII letters, digits and underscore (_) but is: %r"
+                            % (name, value))
+        second_token = next(toky)
+        second_token_type = second_token[0]
+        if not tokenize.ISEOF(second_token_type):
+            raise NameError("%s must be a single word, but after %r there also is %r" % (name, result, second_token[1]))
     return result
 
 
-def human_readable_list(items, final_separator='or'):
+def human_readable_list(items, final_separator='or', max_items=None):
     """
     All values in ``items`` in a human readable form. This is meant to be
     used in error messages, where dumping ``"%r"`` to the user does not cut
     it.
+
+    If ``max_items`` is specified and ``items`` has more than that, only the
+    first ``max_items`` are shown followed by the number of the remaining
+    ones, for example:
+
+    >>> human_readable_list(['a', 'b', 'c', 'd'], max_items=2)
+    "'a', 'b' or 2 more"
     """
     assert items is not None
     assert final_separator is not None
+    assert (max_items is None) or (max_items >= 1), 'max_items=%r' % max_items
     item_count = len(items)
-    if item_count == 0:
+    if (max_items is not None) and (item_count > max_items):
+        result = ', '.join(_compat.text_repr(items[item_index]) for item_index in range(max_items))
+        result += ' %s %d more' % (final_separator, item_count - max_items)
+    elif item_count == 0:
         result = ''
     elif item_count == 1:
         result = _compat.text_repr(items[0])
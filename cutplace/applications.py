@@ -24,15 +24,21 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import argparse
+import cProfile
 import logging
 import sys
 
 from cutplace import errors
 from cutplace import gui
 from cutplace import interface
+from cutplace import metrics
+from cutplace import results
 from cutplace import validio
 from cutplace import rowio
+from cutplace import server
+from cutplace import sinks
 from cutplace import sql
+from cutplace import stats
 from cutplace import _tools
 from cutplace import __version__
 
@@ -41,9 +47,24 @@ DEFAULT_LOG_LEVEL = 'info'
 assert DEFAULT_LOG_LEVEL in _tools.LOG_LEVEL_NAME_TO_LEVEL_MAP
 DEFAULT_VALIDATE_UNTIL = -1
 
+#: Suffix appended to the path specified with ``--profile`` for the report.
+PROFILE_REPORT_SUFFIX = '.txt'
+
 _log = logging.getLogger("cutplace")
 
 
+class _LogRecorder(logging.Handler):
+    """
+    Handler that remembers the level and message of all records logged.
+    """
+    def __init__(self):
+        super(_LogRecorder, self).__init__()
+        self.levels_and_messages = []
+
+    def emit(self, record):
+        self.levels_and_messages.append((record.levelno, record.getMessage()))
+
+
 class CutplaceApp(object):
     """
     Command line application to validate CID's and data.
@@ -62,6 +83,29 @@ class CutplaceApp(object):
         self.last_validation_was_ok = False
         self.all_validations_were_ok = True
         self.validate_until = None
+        self.value_cache_size = None
+        self.is_summary = False
+        self.errors_path = None
+        self.quarantine_path = None
+        self.max_errors = None
+        self.max_error_rate = None
+        self.sample_size = None
+        self.sample_every = None
+        self.is_checkpoint = False
+        self.previous_path = None
+        self.is_stats = False
+        self.is_progress = False
+        self.metrics_path = None
+        self.statsd_host_and_port = None
+        self.profile_path = None
+        self.serve_address = None
+        self.worker_count = server.DEFAULT_WORKER_COUNT
+        self.result_cache = None
+        self._error_sinks = None
+        self._metrics_sinks = None
+        self._reader_stats = None
+        self._profiler = None
+        self._profile_stats_lines = []
 
     def set_options(self, argv):
         """
@@ -73,6 +117,10 @@ class CutplaceApp(object):
         version = '%(prog)s ' + __version__
 
         parser = argparse.ArgumentParser(description=description)
+        parser.add_argument(
+            '--checkpoint', action='store_true', dest='is_checkpoint',
+            help='remember the progress of the validation in DATA-FILE%s and resume from there on the next '
+            'validation, which validates only rows appended since then' % validio.CHECKPOINT_SUFFIX)
         parser.add_argument(
             '--create', '-C', action='store_true', dest='is_create_sql',
             help='write SQL statement to create a table representing CID-FILE')
@@ -82,13 +130,75 @@ class CutplaceApp(object):
         parser.add_argument(
             '--log', metavar='LEVEL', choices=sorted(_tools.LOG_LEVEL_NAME_TO_LEVEL_MAP.keys()), dest='log_level',
             default=DEFAULT_LOG_LEVEL, help='set log level to LEVEL (default: %s)' % DEFAULT_LOG_LEVEL)
+        parser.add_argument(
+            '--max-errors', metavar='COUNT', dest='max_errors', type=int,
+            help='validate all data but stop once more than COUNT rows have been rejected')
+        parser.add_argument(
+            '--max-error-rate', metavar='PERCENT', dest='max_error_rate', type=float,
+            help='validate all data but stop once more than PERCENT of the rows read have been rejected; this takes '
+            'effect after %d rows' % validio.MIN_ROW_COUNT_FOR_ERROR_RATE)
+        parser.add_argument(
+            '--metrics-file', metavar='FILE', dest='metrics_path',
+            help='write metrics about the validation of each DATA-FILE to FILE in the Prometheus text format')
+        parser.add_argument(
+            '--no-result-cache', action='store_false', dest='is_result_cache',
+            help='validate all data again even if the same data have already been validated against the same CID '
+            'with the same options (default: reuse the previous result stored in %s)'
+            % results.default_result_cache_folder())
         parser.add_argument(
             '--plugins', '-P', metavar='FOLDER', dest='plugins_folder',
             help='folder to scan for plugins (default: no plugins)')
+        parser.add_argument(
+            '--cache', metavar='SIZE', dest='value_cache_size', type=int,
+            help='number of distinct values per field to remember validation results for; 0=none '
+            '(default: as specified by the data format property "value cache size" in CID-FILE)')
+        parser.add_argument(
+            '--errors', '-e', metavar='FILE', dest='errors_path',
+            help='validate all data and write details about each rejected row to FILE in JSON Lines format')
+        parser.add_argument(
+            '--previous', '-p', metavar='FILE', dest='previous_path',
+            help='validate only the fields of rows that are new or changed compared to FILE, which must be a '
+            'previous version of DATA-FILE that has already been accepted; checks still process all rows')
+        parser.add_argument(
+            '--profile', metavar='FILE', dest='profile_path',
+            help='validate under cProfile, write the profile to FILE and a report on the time spent in cutplace '
+            'functions, fields and checks to FILE%s; combine with --until to profile only the first rows'
+            % PROFILE_REPORT_SUFFIX)
+        parser.add_argument(
+            '--progress', action='store_true', dest='is_progress',
+            help='show the progress of reading DATA-FILE including the estimated time until it is done')
+        parser.add_argument(
+            '--quarantine', '-q', metavar='FILE', dest='quarantine_path',
+            help='validate all data and copy rejected rows to FILE in the data format of CID-FILE')
+        parser.add_argument(
+            '--sample', metavar='COUNT', dest='sample_size', type=int,
+            help='validate only a random sample of COUNT rows and estimate the error rate of all rows')
+        parser.add_argument(
+            '--sample-every', metavar='N', dest='sample_every', type=int,
+            help='validate only every N-th row and estimate the error rate of all rows')
+        parser.add_argument(
+            '--serve', metavar='ADDRESS', dest='serve_address',
+            help='instead of validating DATA-FILE, keep CID-FILE and all further files as CIDs in memory and '
+            'validate data sent using HTTP to ADDRESS, which can be [HOST:]PORT or %sPATH for a Unix domain socket'
+            % server.UNIX_SOCKET_PREFIX)
+        parser.add_argument(
+            '--stats', action='store_true', dest='is_stats',
+            help='log the time spent reading, validating each field and performing each check as well as the '
+            'number of rows and bytes processed per second')
+        parser.add_argument(
+            '--statsd', metavar='HOST[:PORT]', dest='statsd_host_and_port',
+            help='send metrics about the validation of each DATA-FILE to the StatsD daemon at HOST:PORT using UDP '
+            '(default port: %d)' % metrics.DEFAULT_STATSD_PORT)
+        parser.add_argument(
+            '--summary', '-s', action='store_true', dest='is_summary',
+            help='validate all data and summarize errors by field and kind instead of stopping at the first error')
         parser.add_argument(
             '--until', '-u', metavar='COUNT', dest='validate_until', default=DEFAULT_VALIDATE_UNTIL, type=int,
             help='maximum number of rows to validate; -1=all, 0=none (default: %d)' % DEFAULT_VALIDATE_UNTIL)
         parser.add_argument('--version', action='version', version=version)
+        parser.add_argument(
+            '--workers', metavar='COUNT', dest='worker_count', default=server.DEFAULT_WORKER_COUNT, type=int,
+            help='with --serve, number of requests to handle concurrently (default: %d)' % server.DEFAULT_WORKER_COUNT)
         parser.add_argument(
             'cid_path', metavar='CID-FILE', nargs='?', help='file containing a cutplace interface definition (CID)')
         parser.add_argument(
@@ -98,6 +208,33 @@ class CutplaceApp(object):
         self._log.setLevel(_tools.LOG_LEVEL_NAME_TO_LEVEL_MAP[args.log_level])
         self.is_create_sql = args.is_create_sql
         self.is_gui = args.is_gui
+        self.is_summary = args.is_summary
+        self.is_checkpoint = args.is_checkpoint
+        self.errors_path = args.errors_path
+        self.quarantine_path = args.quarantine_path
+        self.previous_path = args.previous_path
+        self.is_stats = args.is_stats
+        self.is_progress = args.is_progress
+        self.metrics_path = args.metrics_path
+        self.profile_path = args.profile_path
+        self.statsd_host_and_port = None
+        if args.statsd_host_and_port is not None:
+            try:
+                self.statsd_host_and_port = metrics.statsd_host_and_port(args.statsd_host_and_port)
+            except ValueError as error:
+                parser.error('option --statsd must be HOST or HOST:PORT: %s' % error)
+        self.result_cache = results.ResultCache() if args.is_result_cache else None
+        self.serve_address = None
+        if args.serve_address is not None:
+            try:
+                self.serve_address = server.server_address(args.serve_address)
+            except ValueError as error:
+                parser.error('option --serve must be [HOST:]PORT or %sPATH: %s' % (server.UNIX_SOCKET_PREFIX, error))
+            if args.is_gui or args.is_create_sql:
+                parser.error('option --serve cannot be combined with --gui or --create')
+        self.worker_count = args.worker_count
+        if self.worker_count < 1:
+            parser.error('option --workers is %d but must be at least 1' % self.worker_count)
 
         if args.validate_until is not None:
             if args.validate_until == -1:
@@ -106,6 +243,42 @@ class CutplaceApp(object):
                 self.validate_until = args.validate_until
             else:
                 parser.error('option --until is %d but must be at least -1' % args.validate_until)
+        if args.value_cache_size is not None:
+            if args.value_cache_size >= 0:
+                self.value_cache_size = args.value_cache_size
+            else:
+                parser.error('option --cache is %d but must be at least 0' % args.value_cache_size)
+        self.max_errors = args.max_errors
+        if (self.max_errors is not None) and (self.max_errors < 0):
+            parser.error('option --max-errors is %d but must be at least 0' % self.max_errors)
+        self.max_error_rate = None
+        if args.max_error_rate is not None:
+            if 0 <= args.max_error_rate <= 100:
+                self.max_error_rate = args.max_error_rate / 100
+            else:
+                parser.error('option --max-error-rate is %s but must be between 0 and 100' % args.max_error_rate)
+        self.sample_size = args.sample_size
+        if (self.sample_size is not None) and (self.sample_size < 1):
+            parser.error('option --sample is %d but must be at least 1' % self.sample_size)
+        self.sample_every = args.sample_every
+        if (self.sample_every is not None) and (self.sample_every < 1):
+            parser.error('option --sample-every is %d but must be at least 1' % self.sample_every)
+        if (self.sample_size is not None) or (self.sample_every is not None):
+            if (self.sample_size is not None) and (self.sample_every is not None):
+                parser.error('only one of the options --sample and --sample-every can be specified')
+            if self.validate_until is not None:
+                parser.error('option --until cannot be combined with --sample or --sample-every')
+            if self.is_checkpoint:
+                parser.error('option --checkpoint cannot be combined with --sample or --sample-every')
+        if self.is_checkpoint and (self.validate_until is not None):
+            parser.error('option --checkpoint cannot be combined with --until')
+        if self.previous_path is not None:
+            if (self.sample_size is not None) or (self.sample_every is not None):
+                parser.error('option --previous cannot be combined with --sample or --sample-every')
+            if self.validate_until is not None:
+                parser.error('option --previous cannot be combined with --until')
+            if self.is_checkpoint:
+                parser.error('option --previous cannot be combined with --checkpoint')
         if args.plugins_folder is not None:
             interface.import_plugins(args.plugins_folder)
         if args.data_paths is not None:
@@ -131,6 +304,8 @@ class CutplaceApp(object):
         _log.info('read CID from "%s"', cid_path)
         cid_rows = rowio.auto_rows(cid_path)
         new_cid.read(cid_path, cid_rows)
+        if self.value_cache_size is not None:
+            new_cid.set_validated_cache(self.value_cache_size)
         self.cid = new_cid
         self.cid_path = cid_path
 
@@ -145,14 +320,263 @@ class CutplaceApp(object):
 
         _log.info('validate "%s"', data_path)
 
+        were_all_validations_ok = self.all_validations_were_ok
+        self.all_validations_were_ok = True
+        try:
+            result_key = self._result_key(data_path)
+            cached_result = self.result_cache.get(result_key) if result_key is not None else None
+            if cached_result is not None:
+                _log.info('  reuse result of previous validation')
+                for level, message in cached_result['log']:
+                    _log.log(level, '%s', message)
+                self.all_validations_were_ok = cached_result['is_ok']
+            elif result_key is not None:
+                log_recorder = _LogRecorder()
+                _log.addHandler(log_recorder)
+                try:
+                    self._validate(data_path)
+                finally:
+                    _log.removeHandler(log_recorder)
+                self.result_cache.put(
+                    result_key, {'is_ok': self.all_validations_were_ok, 'log': log_recorder.levels_and_messages},
+                    data_path)
+            else:
+                self._validate(data_path)
+        finally:
+            self.last_validation_was_ok = self.all_validations_were_ok
+            self.all_validations_were_ok = were_all_validations_ok and self.last_validation_was_ok
+
+    def _result_key(self, data_path):
+        """
+        Key for the result of validating ``data_path`` in
+        :py:attr:`~.result_cache` or ``None`` if the result cannot be
+        cached because the validation has side effects or is random.
+        """
+        is_cacheable = (self.result_cache is not None) and not self.is_checkpoint \
+            and (self.errors_path is None) and (self.quarantine_path is None) \
+            and (self.sample_size is None) and (self.sample_every is None) and (self.previous_path is None) \
+            and not self.is_stats and (self.metrics_path is None) and (self.statsd_host_and_port is None) \
+            and (self.profile_path is None)
+        if is_cacheable:
+            result = self.result_cache.key(data_path, self.cid, {
+                'log_level': _log.getEffectiveLevel(),
+                'max_error_rate': self.max_error_rate,
+                'max_errors': self.max_errors,
+                'summary': self.is_summary,
+                'validate_until': self.validate_until,
+            })
+        else:
+            result = None
+        return result
+
+    def _validate(self, data_path):
+        error_summary = errors.ErrorSummary() if self.is_summary else None
+        error_sinks = self._opened_error_sinks()
+        profiler = self._opened_profiler()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                if (self.sample_size is not None) or (self.sample_every is not None):
+                    self._validate_sample(data_path, error_summary, error_sinks)
+                elif self.previous_path is not None:
+                    self._validate_changes(data_path, error_summary, error_sinks)
+                else:
+                    self._validate_rows(data_path, error_summary, error_sinks)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            if self._reader_stats is not None:
+                stats_lines = self._reader_stats.lines()
+                for stats_line in stats_lines:
+                    _log.info('  %s', stats_line)
+                if profiler is not None:
+                    self._profile_stats_lines.append(data_path)
+                    self._profile_stats_lines.extend('  ' + stats_line for stats_line in stats_lines)
+                self._reader_stats = None
+
+    def _prepare_reader(self, reader, error_sinks):
+        """
+        Attach ``error_sinks`` to ``reader`` and enable its stats if
+        requested by ``--stats`` or ``--profile``.
+        """
+        for error_sink in error_sinks:
+            reader.add_error_sink(error_sink)
+        if self.is_stats or (self.profile_path is not None):
+            self._reader_stats = reader.enable_stats()
+        if self.is_progress:
+            reader.set_progress_callback(self._show_progress)
+        for metrics_sink in self._opened_metrics_sinks():
+            reader.add_metrics_sink(metrics_sink)
+
+    def _show_progress(self, progress):
+        """
+        Show ``progress`` in a single line on ``sys.stderr`` that is
+        overwritten with each update.
+        """
+        sys.stderr.write('\r  %-70s' % progress)
+        if progress.is_done:
+            sys.stderr.write('\n')
+        sys.stderr.flush()
+
+    def _validate_rows(self, data_path, error_summary, error_sinks):
+        is_validating_all = (error_summary is not None) or bool(error_sinks) \
+            or (self.max_errors is not None) or (self.max_error_rate is not None)
+        on_error = 'yield' if is_validating_all else 'raise'
         try:
-            with validio.Reader(self.cid, data_path, validate_until=self.validate_until) as reader:
-                reader.validate_rows()
+            with validio.Reader(
+                    self.cid, data_path, on_error, self.validate_until, self.max_errors, self.max_error_rate) as reader:
+                self._prepare_reader(reader, error_sinks)
+                if self.is_checkpoint:
+                    reader.set_checkpoint()
+                if not is_validating_all:
+                    reader.validate_rows()
+                else:
+                    for row_or_error in reader.rows():
+                        if isinstance(row_or_error, errors.DataError):
+                            if error_summary is not None:
+                                error_summary.add(row_or_error)
+                            elif not error_sinks:
+                                _log.error('  %s', row_or_error)
+            if reader.resumed_rows_count > 0:
+                _log.info('  resumed after %d rows from checkpoint', reader.resumed_rows_count)
             _log.info('  accepted %d rows', reader.accepted_rows_count)
+            if is_validating_all and (reader.rejected_rows_count > 0):
+                _log.error('  rejected %d rows', reader.rejected_rows_count)
+                if error_summary is not None:
+                    self._log_error_summary(error_summary)
+                self.all_validations_were_ok = False
+        except errors.CutplaceError as error:
+            if error_summary is not None:
+                self._log_error_summary(error_summary)
+            _log.error('  %s', error)
+            self.all_validations_were_ok = False
+
+    def _validate_sample(self, data_path, error_summary, error_sinks):
+        try:
+            with validio.Reader(self.cid, data_path) as reader:
+                self._prepare_reader(reader, error_sinks)
+                sample_report = reader.sample(self.sample_size, self.sample_every)
+            _log.info('  %s', sample_report)
+            if sample_report.rejected_row_count > 0:
+                if error_summary is not None:
+                    for error in sample_report.errors:
+                        error_summary.add(error)
+                    self._log_error_summary(error_summary)
+                elif not error_sinks:
+                    for error in sample_report.errors:
+                        _log.error('  %s', error)
+                self.all_validations_were_ok = False
+        except errors.CutplaceError as error:
+            _log.error('  %s', error)
+            self.all_validations_were_ok = False
+
+    def _validate_changes(self, data_path, error_summary, error_sinks):
+        try:
+            with validio.Reader(
+                    self.cid, data_path, max_errors=self.max_errors, max_error_rate=self.max_error_rate) as reader:
+                self._prepare_reader(reader, error_sinks)
+                change_report = reader.validate_changes(self.previous_path)
+            _log.info('  %s', change_report)
+            if change_report.rejected_row_count > 0:
+                self._log_change_errors(change_report, error_summary, error_sinks)
+                self.all_validations_were_ok = False
+        except errors.ErrorBudgetError as error:
+            self._log_change_errors(error.change_report, error_summary, error_sinks)
+            _log.error('  %s', error)
+            self.all_validations_were_ok = False
         except errors.CutplaceError as error:
             _log.error('  %s', error)
             self.all_validations_were_ok = False
 
+    def _log_change_errors(self, change_report, error_summary, error_sinks):
+        if error_summary is not None:
+            for error in change_report.errors:
+                error_summary.add(error)
+            self._log_error_summary(error_summary)
+        elif not error_sinks:
+            for error in change_report.errors:
+                _log.error('  %s', error)
+
+    def _log_error_summary(self, error_summary):
+        for error_summary_line in error_summary.lines():
+            _log.error('  %s', error_summary_line)
+
+    def _opened_error_sinks(self):
+        """
+        The sinks requested by ``--errors`` and ``--quarantine``, which are
+        opened on first use and then shared by all data files validated
+        until :py:meth:`~.close()`.
+        """
+        if self._error_sinks is None:
+            self._error_sinks = []
+            if self.errors_path is not None:
+                self._error_sinks.append(sinks.JsonLinesErrorSink(self.errors_path))
+            if self.quarantine_path is not None:
+                self._error_sinks.append(sinks.QuarantineSink(self.quarantine_path, self.cid))
+        return self._error_sinks
+
+    def _opened_metrics_sinks(self):
+        """
+        The sinks requested by ``--metrics-file`` and ``--statsd``, which
+        are opened on first use and then shared by all data files validated
+        until :py:meth:`~.close()`.
+        """
+        if self._metrics_sinks is None:
+            self._metrics_sinks = []
+            if self.metrics_path is not None:
+                self._metrics_sinks.append(metrics.PrometheusTextfileSink(self.metrics_path))
+            if self.statsd_host_and_port is not None:
+                statsd_host, statsd_port = self.statsd_host_and_port
+                self._metrics_sinks.append(metrics.StatsdSink(statsd_host, statsd_port))
+        return self._metrics_sinks
+
+    def _opened_profiler(self):
+        """
+        The profiler requested by ``--profile``, which is created on first
+        use and then collects the profile of all data files validated until
+        :py:meth:`~.close()`; ``None`` if no profile was requested.
+        """
+        if (self._profiler is None) and (self.profile_path is not None):
+            self._profiler = cProfile.Profile()
+        return self._profiler
+
+    def _write_profile(self):
+        report_path = self.profile_path + PROFILE_REPORT_SUFFIX
+        _log.info('write profile to "%s" and report to "%s"', self.profile_path, report_path)
+        self._profiler.dump_stats(self.profile_path)
+        stats.write_profile_report(self.profile_path, report_path, self._profile_stats_lines)
+
+    def close(self):
+        """
+        Write all pending rejected rows, metrics and the profile and close
+        the files specified with ``--errors``, ``--quarantine``,
+        ``--metrics-file`` and ``--profile``.
+        """
+        try:
+            if self._error_sinks is not None:
+                try:
+                    for error_sink in self._error_sinks:
+                        error_sink.close()
+                finally:
+                    self._error_sinks = None
+        finally:
+            try:
+                if self._metrics_sinks is not None:
+                    try:
+                        for metrics_sink in self._metrics_sinks:
+                            metrics_sink.close()
+                    finally:
+                        self._metrics_sinks = None
+            finally:
+                if self._profiler is not None:
+                    try:
+                        self._write_profile()
+                    finally:
+                        self._profiler = None
+                        self._profile_stats_lines = []
+
 
 def process(argv=None):
     """
@@ -179,12 +603,18 @@ def process(argv=None):
     elif cutplace_app.is_create_sql:
         cid_reader = interface.Cid()
         sql.write_create(cutplace_app.cid_path, cid_reader)
+    elif cutplace_app.serve_address is not None:
+        server.serve(
+            [cutplace_app.cid_path] + cutplace_app.data_paths, cutplace_app.serve_address, cutplace_app.worker_count)
     elif cutplace_app.data_paths:
-        for data_path in cutplace_app.data_paths:
-            try:
-                cutplace_app.validate(data_path)
-            except (EnvironmentError, OSError) as error:
-                raise EnvironmentError("cannot read data file %r: %s" % (data_path, error))
+        try:
+            for data_path in cutplace_app.data_paths:
+                try:
+                    cutplace_app.validate(data_path)
+                except (EnvironmentError, OSError) as error:
+                    raise EnvironmentError("cannot read data file %r: %s" % (data_path, error))
+        finally:
+            cutplace_app.close()
         if not cutplace_app.all_validations_were_ok:
             result = 1
     return result
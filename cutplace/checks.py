@@ -31,6 +31,31 @@ from cutplace import _compat
 from cutplace import _tools
 from cutplace._compat import python_2_unicode_compatible
 
+#: :py:attr:`~cutplace.checks.AbstractCheck.cost` of checks that only need
+#: a few dictionary lookups per row.
+LOW_CHECK_COST = 1
+
+#: :py:attr:`~cutplace.checks.AbstractCheck.cost` of checks that do not
+#: declare a cost on their own.
+DEFAULT_CHECK_COST = 10
+
+
+def _location_state(location):
+    """
+    JSON compatible representation of ``location``.
+    """
+    return dict(location.__dict__)
+
+
+def _location_from_state(location_state):
+    """
+    The :py:class:`cutplace.errors.Location` represented by
+    ``location_state`` as obtained by :py:func:`_location_state`.
+    """
+    result = object.__new__(errors.Location)
+    result.__dict__.update(location_state)
+    return result
+
 
 @python_2_unicode_compatible
 class AbstractCheck(object):
@@ -75,10 +100,29 @@ class AbstractCheck(object):
 
         It is recommended that the :py:meth:`.__init__` of any child class calls this method.
 
-        This is called by :py:meth:`cutplace.validio.Reader.validate_rows` when starting to validate the data.
+        This is called by :py:meth:`~.new_run` and by :py:meth:`cutplace.validio.Reader.validate_rows` when
+        starting to validate the data.
         """
         pass
 
+    def new_run(self):
+        """
+        A check to perform a single validation, which shares everything
+        derived from the CID with this check but keeps track of the check
+        conditions on its own. This is what allows to use the same
+        :py:class:`cutplace.interface.Cid` for several validations at the
+        same time, for example in different threads.
+
+        By default this is a shallow copy of this check on which
+        :py:meth:`~.reset` has been called. Consequently :py:meth:`~.reset`
+        must assign new objects to keep track of the check conditions
+        instead of changing existing ones, for example
+        ``self._seen = set()`` instead of ``self._seen.clear()``.
+        """
+        result = copy.copy(self)
+        result.reset()
+        return result
+
     def check_row(self, field_name_to_value_map, location):
         r"""
         Check row and in case it is invalid raise :py:exc:`errors.CheckError`. By default do
@@ -105,6 +149,45 @@ class AbstractCheck(object):
         """
         pass
 
+    def get_state(self):
+        """
+        The internal resources that keep track of the check conditions for the rows checked so far, which
+        :py:meth:`cutplace.validio.Reader.rows` stores in a checkpoint in order to resume validation later.
+        The result must be possible to store as JSON, so it may only consist of ``dict``s with string keys,
+        ``list``s, strings, numbers, ``bool``s and ``None``. By default this is ``None``, which is fine for
+        checks that do not keep track of anything between rows.
+
+        Checks that remember information in :py:meth:`~.check_row` must override this method and
+        :py:meth:`~.set_state`.
+        """
+        return None
+
+    def set_state(self, state):
+        """
+        Continue checking with ``state`` previously obtained from :py:meth:`~.get_state`. By default do nothing.
+        """
+        pass
+
+    def get_state_changes(self):
+        """
+        The changes of the state since the last call to :py:meth:`~.get_state`, :py:meth:`~.set_state` or
+        this method, which :py:meth:`cutplace.validio.Reader.rows` appends to a checkpoint instead of storing
+        the whole state again each time. Like the state, the changes must be possible to store as JSON. By
+        default this is ``None``, meaning that the check cannot tell its changes and each checkpoint has to
+        store the whole state as obtained by :py:meth:`~.get_state`.
+
+        Checks whose state grows with the number of rows checked should override this method and
+        :py:meth:`~.add_state_changes`, otherwise storing checkpoints takes longer and longer.
+        """
+        return None
+
+    def add_state_changes(self, state_changes):
+        """
+        Apply ``state_changes`` previously obtained from :py:meth:`~.get_state_changes` to the current state.
+        By default do nothing.
+        """
+        pass
+
     def __str__(self):
         return "%s(%r, %r)" % (self.__class__.__name__, self.description, self.rule)
 
@@ -128,6 +211,34 @@ class AbstractCheck(object):
         """
         return self._rule
 
+    @property
+    def cost(self):
+        """
+        Estimated cost of :py:meth:`~.check_row` compared to other checks.
+        Among :py:attr:`~.is_stateless` checks, a
+        :py:class:`cutplace.plans.ValidationPlan` performs checks with a
+        lower cost per rejected row first. By default this is
+        :py:const:`~cutplace.checks.DEFAULT_CHECK_COST`; descendants that
+        are particularly cheap or expensive should override it.
+
+        :rtype: int
+        """
+        return DEFAULT_CHECK_COST
+
+    @property
+    def is_stateless(self):
+        """
+        ``True`` if :py:meth:`~.check_row` only depends on the current row
+        and does not remember anything about it, so a
+        :py:class:`cutplace.plans.ValidationPlan` can perform the check in
+        a different order than specified in the CID. By default this is
+        ``False``; descendants that only look at the current row should
+        override it to return ``True``.
+
+        :rtype: bool
+        """
+        return False
+
     @property
     def location(self):
         """
@@ -168,6 +279,7 @@ class IsUniqueCheck(AbstractCheck):
 
         self._field_names_to_check = []
         self._row_key_to_location_map = None
+        self._added_row_keys = None
         self.reset()
 
         # Extract field names to check from rule.
@@ -203,18 +315,59 @@ class IsUniqueCheck(AbstractCheck):
             raise errors.InterfaceError(
                 "rule must contain at least one field name to check for uniqueness", self.location_of_rule)
 
+    @property
+    def field_names_to_check(self):
+        """
+        Names of the fields whose combined values must be unique.
+        """
+        return self._field_names_to_check
+
+    @property
+    def cost(self):
+        return LOW_CHECK_COST
+
     def reset(self):
         self._row_key_to_location_map = {}
+        # Keys added since the state was obtained last, or ``None`` if nobody asked for it.
+        self._added_row_keys = None
+
+    def get_state(self):
+        self._added_row_keys = []
+        return [
+            [list(row_key), _location_state(location)]
+            for row_key, location in self._row_key_to_location_map.items()]
+
+    def set_state(self, state):
+        self._row_key_to_location_map = {}
+        self.add_state_changes(state)
+        self._added_row_keys = []
+
+    def get_state_changes(self):
+        if self._added_row_keys is None:
+            result = self.get_state()
+        else:
+            result = [
+                [list(row_key), _location_state(self._row_key_to_location_map[row_key])]
+                for row_key in self._added_row_keys]
+            self._added_row_keys = []
+        return result
+
+    def add_state_changes(self, state_changes):
+        self._row_key_to_location_map.update(
+            (tuple(row_key), _location_from_state(location_state)) for row_key, location_state in state_changes)
 
     def check_row(self, field_name_to_value_map, location):
         row_key = tuple(field_name_to_value_map[field_name] for field_name in self._field_names_to_check)
         see_also_location = self._row_key_to_location_map.get(row_key)
         if see_also_location is not None:
             raise errors.CheckError(
-                "values for %r must be unique: %s" % (self._field_names_to_check, row_key), location,
-                see_also_message="location of first occurrence", see_also_location=see_also_location)
+                lambda: "values for %r must be unique: %s" % (self._field_names_to_check, row_key), location,
+                see_also_message="location of first occurrence", see_also_location=see_also_location,
+                code=errors.CODE_UNIQUE, value=row_key)
         else:
             self._row_key_to_location_map[row_key] = copy.copy(location)
+            if self._added_row_keys is not None:
+                self._added_row_keys.append(row_key)
 
 
 class DistinctCountCheck(AbstractCheck):
@@ -243,11 +396,38 @@ class DistinctCountCheck(AbstractCheck):
         # Build and test Python expression for validation.
         self._expression = DistinctCountCheck._COUNT_NAME + rule[column_where_field_name_ends:]
         self._distinct_value_to_count_map = None
+        self._changed_values = None
         self.reset()
         self._eval()
 
+    @property
+    def cost(self):
+        return LOW_CHECK_COST
+
     def reset(self):
         self._distinct_value_to_count_map = {}
+        # Values counted since the state was obtained last, or ``None`` if nobody asked for it.
+        self._changed_values = None
+
+    def get_state(self):
+        self._changed_values = set()
+        return [[value, count] for value, count in self._distinct_value_to_count_map.items()]
+
+    def set_state(self, state):
+        self._distinct_value_to_count_map = {}
+        self.add_state_changes(state)
+        self._changed_values = set()
+
+    def get_state_changes(self):
+        if self._changed_values is None:
+            result = self.get_state()
+        else:
+            result = [[value, self._distinct_value_to_count_map[value]] for value in self._changed_values]
+            self._changed_values = set()
+        return result
+
+    def add_state_changes(self, state_changes):
+        self._distinct_value_to_count_map.update((value, count) for value, count in state_changes)
 
     def _distinct_count(self):
         return len(self._distinct_value_to_count_map)
@@ -274,8 +454,13 @@ class DistinctCountCheck(AbstractCheck):
             self._distinct_value_to_count_map[value] += 1
         except KeyError:
             self._distinct_value_to_count_map[value] = 1
+        if self._changed_values is not None:
+            self._changed_values.add(value)
 
     def check_at_end(self, location):
         if not self._eval():
+            distinct_count = self._distinct_count()
             raise errors.CheckError(
-                "distinct count is %d but check requires: %r" % (self._distinct_count(), self._expression), location)
+                lambda: "distinct count is %d but check requires: %r" % (distinct_count, self._expression), location,
+                code=errors.CODE_DISTINCT_COUNT, field_name=self._field_name_to_count, value=distinct_count,
+                limits=self._expression)
@@ -82,6 +82,7 @@ KEY_SHEET = "sheet"
 KEY_SKIP_INITIAL_SPACE = "skip_initial_space"
 KEY_DECIMAL_SEPARATOR = "decimal_separator"
 KEY_THOUSANDS_SEPARATOR = "thousands_separator"
+KEY_VALUE_CACHE_SIZE = "value_cache_size"
 
 _VALID_QUOTE_CHARACTERS = ["\"", "\'"]
 _VALID_ESCAPE_CHARACTERS = ["\"", "\\"]
@@ -117,6 +118,7 @@ class DataFormat(object):
         self._is_valid = False
         self._allowed_characters = None
         self._encoding = 'cp1252'
+        self._value_cache_size = 0
         if self.format == FORMAT_DELIMITED:
             self._escape_character = '"'
             self._item_delimiter = ','
@@ -257,7 +259,8 @@ class DataFormat(object):
 
     @property
     def decimal_separator(self):
-        return self._decimal_separator
+        # Spreadsheets do not have this property but decimal fields still need it.
+        return self._decimal_separator if self.format in (FORMAT_DELIMITED, FORMAT_FIXED) else '.'
 
     @decimal_separator.setter
     def decimal_separator(self, new_decimal_separator):
@@ -268,7 +271,8 @@ class DataFormat(object):
 
     @property
     def thousands_separator(self):
-        return self._thousands_separator
+        # Spreadsheets do not have this property but decimal fields still need it.
+        return self._thousands_separator if self.format in (FORMAT_DELIMITED, FORMAT_FIXED) else ''
 
     @thousands_separator.setter
     def thousands_separator(self, new_thousands_separator):
@@ -277,6 +281,23 @@ class DataFormat(object):
 
         self._thousands_separator = new_thousands_separator
 
+    @property
+    def value_cache_size(self):
+        """
+        Number of distinct values per field for which the result of the
+        validation is remembered; 0 means that values are validated every
+        time.
+
+        :rtype: int
+        """
+        return self._value_cache_size
+
+    @value_cache_size.setter
+    def value_cache_size(self, new_value_cache_size):
+        assert new_value_cache_size >= 0
+
+        self._value_cache_size = new_value_cache_size
+
     def set_property(self, name, value, location=None):
         r"""
         Set data format property ``name`` to ``value`` possibly translating ``value`` from
@@ -353,6 +374,8 @@ class DataFormat(object):
         elif name == KEY_THOUSANDS_SEPARATOR:
             self.thousands_separator = DataFormat._validated_choice(
                 KEY_THOUSANDS_SEPARATOR, value, _VALID_THOUSANDS_SEPARATORS, location)
+        elif name == KEY_VALUE_CACHE_SIZE:
+            self.value_cache_size = DataFormat._validated_int_at_least_0(KEY_VALUE_CACHE_SIZE, value, location)
         else:
             assert False, 'name=%r' % name
 
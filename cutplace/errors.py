@@ -22,12 +22,35 @@ from __future__ import unicode_literals
 
 import copy
 import os
+import random
 import traceback
 
 import six
 
+from cutplace import _compat
 from cutplace._compat import python_2_unicode_compatible
 
+#: Error codes available from :py:attr:`cutplace.errors.CutplaceError.code`
+#: to tell different kinds of errors apart without parsing the message.
+CODE_CHARACTER = 'character'
+CODE_CHOICE = 'choice'
+CODE_CONSTANT = 'constant'
+CODE_DATE_TIME = 'date_time'
+CODE_DECIMAL = 'decimal'
+CODE_DISTINCT_COUNT = 'distinct_count'
+CODE_EMPTY = 'empty'
+CODE_INTEGER = 'integer'
+CODE_ITEM_COUNT = 'item_count'
+CODE_LENGTH = 'length'
+CODE_PATTERN = 'pattern'
+CODE_RANGE = 'range'
+CODE_REGEX = 'regex'
+CODE_TYPE = 'type'
+CODE_UNIQUE = 'unique'
+
+#: Default number of example values an :py:class:`ErrorGroup` remembers.
+DEFAULT_EXAMPLE_COUNT = 5
+
 #: Symbolic names that can be used to improve the legibility of the CID.
 NAME_TO_ASCII_CODE_MAP = {
     'cr': 13,
@@ -102,7 +125,8 @@ class Location(object):
         self._has_sheet = has_sheet
 
     def __copy__(self):
-        result = type(self)(self.file_path)
+        # Bypass ``__init__()`` because errors copy their location a lot.
+        result = object.__new__(type(self))
         result.__dict__.update(self.__dict__)
         return result
 
@@ -165,22 +189,33 @@ class Location(object):
 
     sheet = property(_get_sheet, _set_sheet, doc="The current sheet in the input.")
 
-    def __str__(self):
+    def position_text(self):
         """
-        Human readable representation of the input location; see `__init__()` for some examples.
+        Human readable representation of the position in the input without
+        the file, for example ``'R3C1'``.
+
+        >>> location = Location("data.csv", has_cell=True)
+        >>> location.advance_line(2)
+        >>> location.position_text()
+        'R3C1'
         """
-        result = os.path.basename(self.file_path) + " ("
         if self._has_cell:
             if self._has_sheet:
-                result += "Sheet%d!" % (self.sheet + 1)
-            result += "R%dC%d" % (self.line + 1, self.cell + 1)
+                result = "Sheet%d!R%dC%d" % (self._sheet + 1, self._line + 1, self._cell + 1)
+            else:
+                result = "R%dC%d" % (self._line + 1, self._cell + 1)
         else:
-            result += "%d" % (self.line + 1)
+            result = "%d" % (self._line + 1)
         if self._has_column:
-            result += ";%d" % (self.column + 1)
-        result += ")"
+            result += ";%d" % (self._column + 1)
         return result
 
+    def __str__(self):
+        """
+        Human readable representation of the input location; see `__init__()` for some examples.
+        """
+        return os.path.basename(self.file_path) + " (" + self.position_text() + ")"
+
     def __repr__(self):
         return self.__str__()
 
@@ -253,9 +288,15 @@ class CutplaceError(Exception):
     Additionally :py:meth:`~cutplace.errors.CutplaceError.__str__()`
     summarizes all details about the error in a human readable way that can
     be presented to the end user.
+
+    To process errors without parsing the message, the following optional
+    properties provide structured details: :py:attr:`code` (one of the
+    ``CODE_*`` constants), :py:attr:`field_name`, :py:attr:`value` and
+    :py:attr:`limits`.
     """
 
-    def __init__(self, message, location=None, see_also_message=None, see_also_location=None, cause=None):
+    def __init__(self, message, location=None, see_also_message=None, see_also_location=None, cause=None,
+                 code=None, field_name=None, value=None, limits=None):
         """
         Create an :py:exc:`Exception` that provides a ``message`` describing
         the error and an optional ``Location`` in the input where the error
@@ -266,6 +307,14 @@ class CutplaceError(Exception):
         the exception is the result of another exception that happened
         earlier (for example a :py:exc:`UnicodeError`, ``cause`` should
         refer to this exception to simplify debugging.
+
+        Instead of a text, ``message`` can also be a function without
+        parameters that returns the text. It is called only once the message
+        is actually needed, which saves the time to build it for errors
+        that are only counted or discarded.
+
+        The optional ``code``, ``field_name``, ``value`` and ``limits``
+        provide structured details on the error.
         """
         assert message
         assert (see_also_location and see_also_message) or not see_also_location
@@ -274,12 +323,25 @@ class CutplaceError(Exception):
             Exception.__init__(self, message)
         else:
             super().__init__(self, message)
-        self._location = copy.copy(location)
+        self._location = copy.copy(location) if location is not None else None
         self._see_also_message = see_also_message
-        self._see_also_location = copy.copy(see_also_location)
+        self._see_also_location = copy.copy(see_also_location) if see_also_location is not None else None
         self._cause = cause
         # TODO #61: Replace self._message by calls to something like str(super()).
         self._message = message
+        # Prefixes added by ``prepend_message()``, most recent last. This is
+        # a tuple so copies of the error do not share it.
+        self._message_prefixes = ()
+        self._code = code
+        self._field_name = field_name
+        self._value = value
+        self._limits = limits
+
+    def __copy__(self):
+        result = type(self).__new__(type(self))
+        result.__dict__.update(self.__dict__)
+        result.args = self.args
+        return result
 
     @property
     def location(self):
@@ -295,7 +357,40 @@ class CutplaceError(Exception):
         Human readable description of the condition that caused the error and
         needs to be fixed.
         """
-        return self._message
+        if not isinstance(self._message, six.string_types):
+            self._message = self._message()
+        result = self._message
+        for prefix in self._message_prefixes:
+            if not isinstance(prefix, six.string_types):
+                prefix = prefix()
+            result = prefix + ': ' + result
+        return result
+
+    @property
+    def code(self):
+        """
+        Symbolic name for the kind of error, for example
+        :py:const:`cutplace.errors.CODE_RANGE`, or ``None``.
+        """
+        return self._code
+
+    @property
+    def field_name(self):
+        """Name of the field the error refers to or ``None``."""
+        return self._field_name
+
+    @property
+    def value(self):
+        """The value that caused the error or ``None``."""
+        return self._value
+
+    @property
+    def limits(self):
+        """
+        What the value should have conformed to, for example a
+        :py:class:`cutplace.ranges.Range`, or ``None``.
+        """
+        return self._limits
 
     @property
     def see_also_message(self):
@@ -326,14 +421,16 @@ class CutplaceError(Exception):
         Add ``prefix`` and ``': '`` at the beginning of :py:attr:`message`
         and change :py:attr:`location` to ``new_location``.
 
-        :param str prefix: the prefix to add at the beginning of \
-          :py:attr:`~cutplace.errors.Location.message`
+        :param prefix: the prefix to add at the beginning of \
+          :py:attr:`~cutplace.errors.Location.message`; like the \
+          ``message`` passed to the constructor this can also be a function \
+          returning the text
         :param cutplace.errors.Location new_location: the value for \
           :py:attr:`~cutplace.errors.Location.location`
         """
         assert prefix is not None
         assert new_location is not None
-        self._message = prefix + ': ' + self._message
+        self._message_prefixes += (prefix,)
         self._location = copy.copy(new_location)
 
     def __str__(self):
@@ -343,7 +440,7 @@ class CutplaceError(Exception):
         result = ''
         if self._location:
             result += six.text_type(self.location) + ': '
-        result += self._message
+        result += self.message
         if self.see_also_message is not None:
             result += ' (see also: '
             if self.see_also_location:
@@ -399,3 +496,130 @@ class CheckError(DataError):
     Error to be raised when a check fails.
     """
     pass
+
+
+class ErrorBudgetError(DataError):
+    """
+    Error raised by :py:class:`cutplace.validio.Reader` when more rows have
+    been rejected than allowed by ``max_errors`` or ``max_error_rate`` and
+    reading stopped early.
+    """
+    pass
+
+
+@python_2_unicode_compatible
+class ErrorGroup(object):
+    """
+    Summary of all errors of the same kind in the same field as collected
+    by :py:class:`ErrorSummary`. Besides the number of errors, it
+    remembers the first error, the location of the last error and a random
+    sample of at most ``example_count`` values that caused an error.
+    """
+    def __init__(self, field_name, kind, first_error, example_count=DEFAULT_EXAMPLE_COUNT, random_generator=None):
+        assert kind is not None
+        assert first_error is not None
+        assert example_count >= 0
+
+        self.field_name = field_name
+        self.kind = kind
+        self.first_error = first_error
+        self.last_location = None
+        self.count = 0
+        self.example_values = []
+        self._example_count = example_count
+        self._value_count = 0
+        self._random = random_generator if random_generator is not None else random.Random()
+
+    @property
+    def first_location(self):
+        """The :py:class:`Location` of the first error or ``None``."""
+        return self.first_error.location
+
+    def add(self, error):
+        """
+        Count ``error`` and possibly remember its value as example using
+        reservoir sampling, so all values have the same chance to end up as
+        example no matter how many errors there are.
+        """
+        assert error is not None
+
+        self.count += 1
+        self.last_location = error.location
+        value = error.value if isinstance(error, CutplaceError) else None
+        if value is not None:
+            self._value_count += 1
+            if len(self.example_values) < self._example_count:
+                self.example_values.append(value)
+            else:
+                example_index = self._random.randrange(self._value_count)
+                if example_index < self._example_count:
+                    self.example_values[example_index] = value
+
+    def __str__(self):
+        result = 'field %s' % _compat.text_repr(self.field_name) if self.field_name is not None else 'data'
+        result += ', %s: %d error%s' % (self.kind, self.count, '' if self.count == 1 else 's')
+        if self.first_location is not None:
+            result += ' from %s' % self.first_location.position_text()
+            if (self.count > 1) and (self.last_location is not None):
+                result += ' to %s' % self.last_location.position_text()
+        if self.example_values:
+            result += ', examples: %s' % ', '.join(_compat.text_repr(value) for value in self.example_values)
+        first_error_message = self.first_error.message \
+            if isinstance(self.first_error, CutplaceError) else six.text_type(self.first_error)
+        result += '; first: %s' % first_error_message
+        return result
+
+
+class ErrorSummary(object):
+    """
+    Errors grouped by field and kind (the error's
+    :py:attr:`~cutplace.errors.CutplaceError.code` or, if it has none, its
+    class name). Each group is an :py:class:`ErrorGroup` and only keeps
+    counts, locations and a few examples, so the memory needed does not
+    grow with the number of errors.
+
+    >>> summary = ErrorSummary()
+    >>> summary.add(FieldValueError('value must be a number', field_name='id', value='x', code=CODE_INTEGER))
+    >>> summary.add(FieldValueError('value must be a number', field_name='id', value='y', code=CODE_INTEGER))
+    >>> summary.error_count
+    2
+    >>> for line in summary.lines():
+    ...     print(line)
+    field 'id', integer: 2 errors, examples: 'x', 'y'; first: value must be a number
+    """
+    def __init__(self, example_count=DEFAULT_EXAMPLE_COUNT, seed=None):
+        assert example_count >= 0
+
+        self._example_count = example_count
+        self._random = random.Random(seed)
+        self._key_to_group_map = {}
+        self._groups = []
+        self.error_count = 0
+
+    @property
+    def groups(self):
+        """The :py:class:`ErrorGroup` objects in the order of their first error."""
+        return self._groups
+
+    def add(self, error):
+        """Add ``error`` to the :py:class:`ErrorGroup` it belongs to."""
+        assert error is not None
+
+        if isinstance(error, CutplaceError):
+            field_name = error.field_name
+            kind = error.code if error.code is not None else type(error).__name__
+        else:
+            field_name = None
+            kind = type(error).__name__
+        key = (field_name, kind)
+        group = self._key_to_group_map.get(key)
+        if group is None:
+            group = ErrorGroup(field_name, kind, error, self._example_count, self._random)
+            self._key_to_group_map[key] = group
+            self._groups.append(group)
+        group.add(error)
+        self.error_count += 1
+
+    def lines(self):
+        """Human readable description of each group."""
+        return [six.text_type(group) for group in self._groups]
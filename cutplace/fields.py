@@ -20,16 +20,25 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
+import copy
 import decimal
 import fnmatch
+import io
 import keyword
+import os
 import re
 import string
-import sys
 import time
 
 import six
 
+try:
+    import numpy
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
 from cutplace import data
 from cutplace import ranges
 from cutplace import errors
@@ -45,6 +54,133 @@ _FieldFormatClassSuffix = "FieldFormat"
 
 _ASCII_LETTERS = set(string.ascii_letters)
 _ASCII_LETTERS_DIGITS_AND_UNDERSCORE = set(string.ascii_letters + string.digits + '_')
+_VALID_FIELD_NAME_REGEX = re.compile(r'[a-zA-Z][a-zA-Z0-9_]*\Z')
+
+# Limits of integers that NumPy can handle as ``int64``.
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+#: Maximum number of choices to list in error messages of
+#: :py:class:`~cutplace.fields.ChoiceFieldFormat`.
+MAX_CHOICES_IN_ERROR = 20
+
+#: Prefix of a :py:class:`~cutplace.fields.ChoiceFieldFormat` rule to
+#: indicate that the choices should be read from the file following it.
+CHOICE_FILE_PREFIX = '@'
+
+#: Number of lookups after which an adaptive
+#: :py:class:`~cutplace.fields.ValidatedCache` decides whether it pays off.
+DEFAULT_CACHE_PROBE_COUNT = 1000
+
+#: Hit rate below which an adaptive :py:class:`~cutplace.fields.ValidatedCache`
+#: turns itself off.
+DEFAULT_CACHE_MIN_HIT_RATE = 0.5
+
+
+def _field_value_error_from(range_error, code, field_name, value):
+    """
+    :py:exc:`~cutplace.errors.FieldValueError` with the same message as
+    ``range_error`` without rendering it yet.
+    """
+    return errors.FieldValueError(
+        lambda: six.text_type(range_error), code=code, field_name=field_name, value=value,
+        limits=range_error.limits)
+
+
+class ValidatedCache(object):
+    """
+    Bounded least recently used cache mapping raw values to the result of
+    :py:meth:`cutplace.fields.AbstractFieldFormat.validated()` or the
+    :py:exc:`~cutplace.errors.FieldValueError` it raised.
+
+    This pays off for fields with only few distinct values such as status
+    codes, currencies or dates. If ``is_adaptive`` is ``True``, the cache
+    checks its hit rate after ``probe_count`` lookups and turns itself off
+    for good in case it is below ``min_hit_rate``, so fields with many
+    distinct values such as customer ids do not pay for useless bookkeeping.
+    """
+    def __init__(self, max_size, is_adaptive=True, probe_count=DEFAULT_CACHE_PROBE_COUNT,
+                 min_hit_rate=DEFAULT_CACHE_MIN_HIT_RATE):
+        assert max_size >= 1
+        assert is_adaptive in (False, True), 'is_adaptive=%r' % is_adaptive
+        assert probe_count >= 1
+        assert 0.0 <= min_hit_rate <= 1.0, 'min_hit_rate=%r' % min_hit_rate
+
+        self._max_size = max_size
+        self._is_adaptive = is_adaptive
+        self._probe_count = probe_count
+        self._min_hit_rate = min_hit_rate
+        self._is_enabled = True
+        self._value_to_result_map = collections.OrderedDict()
+        self.hit_count = 0
+        self.miss_count = 0
+
+    @property
+    def max_size(self):
+        """
+        The maximum number of values the cache remembers.
+        """
+        return self._max_size
+
+    @property
+    def is_enabled(self):
+        """
+        ``False`` after an adaptive cache found out that its hit rate is too
+        low to pay off.
+        """
+        return self._is_enabled
+
+    def __len__(self):
+        return len(self._value_to_result_map)
+
+    def clear(self):
+        """
+        Forget all cached values and statistics.
+        """
+        self._value_to_result_map.clear()
+        self._is_enabled = True
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def validated(self, value, validated_function):
+        """
+        Same as ``validated_function(value)`` but possibly without actually
+        calling it because the result for ``value`` is already known.
+
+        :raises cutplace.errors.FieldValueError: if ``value`` is invalid
+        """
+        if not self._is_enabled:
+            return validated_function(value)
+
+        cached = self._value_to_result_map.pop(value, None)
+        if cached is not None:
+            # Re-insert to mark the value as most recently used.
+            self._value_to_result_map[value] = cached
+            self.hit_count += 1
+        else:
+            try:
+                cached = (validated_function(value), None)
+            except errors.FieldValueError as error:
+                # Remember a copy because the error itself can still be
+                # changed by the caller, for example by ``prepend_message()``.
+                cached = (None, copy.copy(error))
+            self.miss_count += 1
+            self._value_to_result_map[value] = cached
+            if len(self._value_to_result_map) > self._max_size:
+                try:
+                    self._value_to_result_map.popitem(last=False)
+                except KeyError:
+                    # Another thread validating with the same CID already
+                    # removed the item.
+                    pass
+            if self._is_adaptive and ((self.hit_count + self.miss_count) == self._probe_count):
+                if self.hit_count < self._min_hit_rate * self._probe_count:
+                    self._is_enabled = False
+                    self._value_to_result_map.clear()
+        result, error = cached
+        if error is not None:
+            raise copy.copy(error)
+        return result
 
 
 @python_2_unicode_compatible
@@ -75,6 +211,7 @@ class AbstractFieldFormat(object):
         self._data_format = data_format
         self._empty_value = empty_value
         self._example = None
+        self._validated_cache = None
 
     @property
     def field_name(self):
@@ -142,6 +279,33 @@ class AbstractFieldFormat(object):
 
     example = property(_get__example, _set_example, doc="Example value or ``None`` if no example is provided.")
 
+    @property
+    def validated_cache(self):
+        """
+        The :py:class:`~cutplace.fields.ValidatedCache` used by
+        :py:meth:`~cutplace.fields.AbstractFieldFormat.validated()` or
+        ``None`` if values are validated every time.
+        """
+        return self._validated_cache
+
+    def set_validated_cache(self, max_size, is_adaptive=True):
+        """
+        Remember the results of
+        :py:meth:`~cutplace.fields.AbstractFieldFormat.validated()` for up to
+        ``max_size`` distinct values. If ``max_size`` is 0 or ``None``,
+        validate values every time (the default).
+
+        :param bool is_adaptive: if ``True``, the cache turns itself off in \
+          case the hit rate is too low to pay off; see \
+          :py:class:`~cutplace.fields.ValidatedCache` for details
+        """
+        assert (max_size is None) or (max_size >= 0), 'max_size=%r' % max_size
+
+        if max_size:
+            self._validated_cache = ValidatedCache(max_size, is_adaptive)
+        else:
+            self._validated_cache = None
+
     def sql_ansi_type(self):
         """
         A tuple describing the ANSI SQL type and it size, which has to be one
@@ -179,10 +343,12 @@ class AbstractFieldFormat(object):
                     valid_character_range.validate("character", character_code)
                 except errors.RangeValueError:
                     raise errors.FieldValueError(
-                        "character %s (code point U+%04x, decimal %d) in field '%s' at column %d must be an allowed "
-                        "character: %s" % (
+                        lambda: "character %s (code point U+%04x, decimal %d) in field '%s' at column %d must be an "
+                        "allowed character: %s" % (
                             _compat.text_repr(character), character_code, character_code, self.field_name,
-                            character_column, valid_character_range))
+                            character_column, valid_character_range),
+                        code=errors.CODE_CHARACTER, field_name=self.field_name, value=value,
+                        limits=valid_character_range)
 
     def validate_empty(self, value):
         """
@@ -195,7 +361,8 @@ class AbstractFieldFormat(object):
         """
         if not self.is_allowed_to_be_empty:
             if not value:
-                raise errors.FieldValueError("value must not be empty")
+                raise errors.FieldValueError(
+                    "value must not be empty", code=errors.CODE_EMPTY, field_name=self.field_name, value=value)
 
     def validate_length(self, value):
         """
@@ -215,14 +382,15 @@ class AbstractFieldFormat(object):
                     fixed_length = self.length.lower_limit
                     if value_length > fixed_length:
                         raise errors.FieldValueError(
-                            'fixed format field must have at most %d characters instead of %d: %s'
-                            % (fixed_length, value_length, _compat.text_repr(value))
-                        )
+                            lambda: 'fixed format field must have at most %d characters instead of %d: %s'
+                            % (fixed_length, value_length, _compat.text_repr(value)),
+                            code=errors.CODE_LENGTH, field_name=self.field_name, value=value, limits=self.length)
                 else:
                     self.length.validate(
-                        "length of '%s' with value %s" % (self.field_name, _compat.text_repr(value)), len(value))
+                        lambda: "length of '%s' with value %s" % (self.field_name, _compat.text_repr(value)),
+                        len(value))
             except errors.RangeValueError as error:
-                raise errors.FieldValueError(six.text_type(error))
+                raise _field_value_error_from(error, errors.CODE_LENGTH, self.field_name, value)
 
     def validated_value(self, value):
         """
@@ -249,6 +417,11 @@ class AbstractFieldFormat(object):
 
         :raises cutplace.errors.FieldValueError: if ``value`` is invalid
         """
+        if self._validated_cache is not None:
+            return self._validated_cache.validated(value, self._uncached_validated)
+        return self._uncached_validated(value)
+
+    def _uncached_validated(self, value):
         self.validate_characters(value)
         self.validate_empty(value)
         self.validate_length(value)
@@ -262,20 +435,145 @@ class AbstractFieldFormat(object):
             result = self.empty_value
         return result
 
+    def validated_column(self, values):
+        """
+        Validate all ``values`` of a column as if passed to
+        :py:meth:`~cutplace.fields.AbstractFieldFormat.validated()` one by
+        one.
+
+        The default implementation does exactly that. Descendants can
+        override it to validate many values at once, typically by finding
+        the values that might be invalid in a single pass and then only
+        validating those using
+        :py:meth:`~cutplace.fields.AbstractFieldFormat._validated_column_items()`.
+
+        :return: a tuple ``(results, error_indices)`` where ``results`` \
+          contains the validated value for each item in ``values`` or the \
+          :py:exc:`~cutplace.errors.FieldValueError` for items that are \
+          invalid, and ``error_indices`` the indices of these items in \
+          ascending order
+        """
+        assert values is not None
+        return self._validated_column_items(values, [None] * len(values), range(len(values)))
+
+    def _validated_column_items(self, values, results, indices_to_validate):
+        """
+        Same as :py:meth:`~cutplace.fields.AbstractFieldFormat.validated_column()`
+        but with ``results`` already containing the validated values except
+        for the items at ``indices_to_validate``, which are validated one by
+        one.
+        """
+        assert values is not None
+        assert results is not None
+        assert len(values) == len(results)
+        assert indices_to_validate is not None
+
+        error_indices = []
+        for value_index in sorted(set(indices_to_validate)):
+            try:
+                results[value_index] = self.validated(values[value_index])
+            except errors.FieldValueError as error:
+                results[value_index] = error
+                error_indices.append(value_index)
+        return results, error_indices
+
+    def _has_plain_column_values(self):
+        """
+        ``True`` if values can be validated without taking allowed
+        characters and fixed format into account, which is what enables
+        descendants to validate columns in a single pass.
+        """
+        return (self.data_format.allowed_characters is None) and (self.data_format.format != data.FORMAT_FIXED)
+
+    def _empty_or_misfit_length_indices(self, values):
+        """
+        Indices of all items in ``values`` that are empty or have a length
+        outside of :py:attr:`~cutplace.fields.AbstractFieldFormat.length`.
+        """
+        result = [value_index for value_index, value in enumerate(values) if not value]
+        if (self.length is not None) and (self.length.items is not None):
+            result.extend(self.length.out_of_range_indices([len(value) for value in values]))
+        return result
+
     def __str__(self):
         return "%s(%s, %s, %s, %s)" % (
             self.__class__.__name__, _compat.text_repr(self.field_name), self.is_allowed_to_be_empty,
             _compat.text_repr(self.length), _compat.text_repr(self.rule))
 
 
+def choice_file_rule_from(rule, folder):
+    """
+    Same as the :py:class:`ChoiceFieldFormat` ``rule`` but with a relative
+    path to a file containing the choices resolved from ``folder``. Other
+    rules remain unchanged.
+    """
+    assert rule is not None
+    assert folder is not None
+
+    result = rule
+    if rule.startswith(CHOICE_FILE_PREFIX):
+        choices_path = rule[len(CHOICE_FILE_PREFIX):].strip()
+        if choices_path and not os.path.isabs(choices_path):
+            result = CHOICE_FILE_PREFIX + os.path.join(folder, choices_path)
+    return result
+
+
 class ChoiceFieldFormat(AbstractFieldFormat):
     """
     Field format accepting only values from a pool of choices.
+
+    The choices are either specified in the rule as comma separated list,
+    for example ``'red, green, blue'``, or read from a UTF-8 text file with
+    one choice per line. To do the latter, use a rule starting with
+    :py:const:`CHOICE_FILE_PREFIX` followed by the path to the file, for
+    example ``'@iso_3166_2_codes.txt'``. Empty lines and white space
+    surrounding a choice are ignored. Relative paths are resolved from the
+    current folder; :py:class:`cutplace.interface.Cid` resolves them from
+    the folder of the CID file using :py:func:`choice_file_rule_from`.
     """
     def __init__(self, field_name, is_allowed_to_be_empty, length, rule, data_format):
         super(ChoiceFieldFormat, self).__init__(
             field_name, is_allowed_to_be_empty, length, rule, data_format, empty_value='')
-        self.choices = []
+        if rule.startswith(CHOICE_FILE_PREFIX):
+            self._choices_path = rule[len(CHOICE_FILE_PREFIX):].strip()
+            self.choices = ChoiceFieldFormat._choices_read_from(self._choices_path)
+        else:
+            self._choices_path = None
+            self.choices = ChoiceFieldFormat._choices_parsed_from(rule)
+        if not self.is_allowed_to_be_empty and not self.choices:
+            raise errors.InterfaceError("choice field without any choices must be allowed to be empty")
+        self._choice_set = frozenset(self.choices)
+
+    @property
+    def choices_path(self):
+        """
+        The path of the file the choices have been read from or ``None`` if
+        they are part of the rule.
+        """
+        return self._choices_path
+
+    @staticmethod
+    def _choices_read_from(choices_path):
+        if not choices_path:
+            raise errors.InterfaceError(
+                "path to file containing choices must follow %s" % _compat.text_repr(CHOICE_FILE_PREFIX))
+        result = []
+        choices_found = set()
+        try:
+            with io.open(choices_path, 'r', encoding='utf-8') as choices_file:
+                for line in choices_file:
+                    choice = line.strip()
+                    if choice and (choice not in choices_found):
+                        choices_found.add(choice)
+                        result.append(choice)
+        except (EnvironmentError, UnicodeError) as error:
+            raise errors.InterfaceError(
+                "cannot read choices from %s: %s" % (_compat.text_repr(choices_path), error))
+        return result
+
+    @staticmethod
+    def _choices_parsed_from(rule):
+        result = []
 
         # Split rule into tokens, ignoring white space.
         tokens = _tools.tokenize_without_space(rule)
@@ -296,7 +594,7 @@ class ChoiceFieldFormat(AbstractFieldFormat):
             if not choice:
                 raise errors.InterfaceError(
                     "choice field must be allowed to be empty instead of containing an empty choice")
-            self.choices.append(choice)
+            result.append(choice)
             toky = next(tokens)
             if not _tools.is_eof_token(toky):
                 if not _tools.is_comma_token(toky):
@@ -307,18 +605,27 @@ class ChoiceFieldFormat(AbstractFieldFormat):
                 toky = next(tokens)
                 if _tools.is_eof_token(toky):
                     raise errors.InterfaceError("trailing comma (,) must be removed")
-        if not self.is_allowed_to_be_empty and not self.choices:
-            raise errors.InterfaceError("choice field without any choices must be allowed to be empty")
+        return result
 
     def validated_value(self, value):
         assert value
 
-        if value not in self.choices:
+        if value not in self._choice_set:
             raise errors.FieldValueError(
-                "value is %s but must be one of: %s"
-                % (_compat.text_repr(value), _tools.human_readable_list(self.choices)))
+                lambda: "value is %s but must be one of: %s" % (
+                    _compat.text_repr(value), _tools.human_readable_list(self.choices, max_items=MAX_CHOICES_IN_ERROR)),
+                code=errors.CODE_CHOICE, field_name=self.field_name, value=value, limits=self.choices)
         return value
 
+    def validated_column(self, values):
+        if not self._has_plain_column_values():
+            return super(ChoiceFieldFormat, self).validated_column(values)
+        indices_to_validate = self._empty_or_misfit_length_indices(values)
+        choice_set = self._choice_set
+        indices_to_validate.extend(
+            value_index for value_index, value in enumerate(values) if value not in choice_set)
+        return self._validated_column_items(values, list(values), indices_to_validate)
+
 
 class ConstantFieldFormat(AbstractFieldFormat):
     """
@@ -356,13 +663,21 @@ class ConstantFieldFormat(AbstractFieldFormat):
                 'length is %s but must be %d to match constant %s'
                 % (self.length, len(self._constant), _compat.text_repr(self._constant)))
 
+    @property
+    def constant(self):
+        """
+        The only value the field accepts.
+        """
+        return self._constant
+
     def validated_value(self, value):
         assert value
 
         if value != self._constant:
             raise errors.FieldValueError(
-                "value is %s but must be constant: %s"
-                % (_compat.text_repr(value), _compat.text_repr(self._constant)))
+                lambda: "value is %s but must be constant: %s"
+                % (_compat.text_repr(value), _compat.text_repr(self._constant)),
+                code=errors.CODE_CONSTANT, field_name=self.field_name, value=value, limits=self._constant)
         return value
 
 
@@ -397,16 +712,18 @@ class DecimalFieldFormat(AbstractFieldFormat):
             if character_to_process == self.decimal_separator:
                 if found_decimal_separator:
                     raise errors.FieldValueError(
-                        "decimal field must contain only one decimal separator (%s): %s"
-                        % (_compat.text_repr(self.decimal_separator), _compat.text_repr(value)))
+                        lambda: "decimal field must contain only one decimal separator (%s): %s"
+                        % (_compat.text_repr(self.decimal_separator), _compat.text_repr(value)),
+                        code=errors.CODE_DECIMAL, field_name=self.field_name, value=value)
                 translated_value += "."
                 found_decimal_separator = True
             elif self.thousands_separator and (character_to_process == self.thousands_separator):
                 if found_decimal_separator:
                     raise errors.FieldValueError(
-                        "decimal field must contain thousands separator (%r) only before "
+                        lambda: "decimal field must contain thousands separator (%r) only before "
                         "decimal separator (%r): %r "
-                        % (self.thousands_separator, self.decimal_separator, value))
+                        % (self.thousands_separator, self.decimal_separator, value),
+                        code=errors.CODE_DECIMAL, field_name=self.field_name, value=value)
             else:
                 translated_value += character_to_process
 
@@ -414,16 +731,51 @@ class DecimalFieldFormat(AbstractFieldFormat):
             result = decimal.Decimal(translated_value)
         except Exception as error:
             # TODO: limit exception handler to decimal exception or whatever decimal.Decimal raises.
-            message = "value is %r but must be a decimal number: %s" % (value, error)
-            raise errors.FieldValueError(message)
+            decimal_error = error
+            raise errors.FieldValueError(
+                lambda: "value is %r but must be a decimal number: %s" % (value, decimal_error),
+                cause=decimal_error, code=errors.CODE_DECIMAL, field_name=self.field_name, value=value)
 
         try:
             self.valid_range.validate(self._field_name, result)
         except errors.RangeValueError as error:
-            raise errors.FieldValueError(str(error))
+            raise _field_value_error_from(error, errors.CODE_RANGE, self.field_name, value)
 
         return result
 
+    def _plain_decimal_or_none(self, value):
+        """
+        The :py:class:`decimal.Decimal` represented by ``value`` or ``None``
+        if ``value`` is empty or cannot be converted without further ado.
+        """
+        result = None
+        if value:
+            if self.thousands_separator:
+                integer_part, decimal_separator, fractional_part = value.partition(self.decimal_separator)
+                if self.thousands_separator in fractional_part:
+                    return None
+                value = integer_part.replace(self.thousands_separator, '') + decimal_separator + fractional_part
+            if self.decimal_separator != '.':
+                if value.count(self.decimal_separator) > 1:
+                    return None
+                value = value.replace(self.decimal_separator, '.')
+            try:
+                result = decimal.Decimal(value)
+            except decimal.DecimalException:
+                pass
+            if (result is not None) and not result.is_finite():
+                result = None
+        return result
+
+    def validated_column(self, values):
+        if not self._has_plain_column_values():
+            return super(DecimalFieldFormat, self).validated_column(values)
+        results = [self._plain_decimal_or_none(value) for value in values]
+        indices_to_validate = self._empty_or_misfit_length_indices(values)
+        indices_to_validate.extend(value_index for value_index, result in enumerate(results) if result is None)
+        indices_to_validate.extend(self.valid_range.out_of_range_indices(results))
+        return self._validated_column_items(values, results, indices_to_validate)
+
 
 class IntegerFieldFormat(AbstractFieldFormat):
     """
@@ -512,13 +864,54 @@ class IntegerFieldFormat(AbstractFieldFormat):
         try:
             value_as_int = int(value)
         except ValueError:
-            raise errors.FieldValueError("value must be an integer number: %s" % _compat.text_repr(value))
+            raise errors.FieldValueError(
+                lambda: "value must be an integer number: %s" % _compat.text_repr(value),
+                code=errors.CODE_INTEGER, field_name=self.field_name, value=value)
         try:
             self.valid_range.validate("value", value_as_int)
         except errors.RangeValueError as error:
-            raise errors.FieldValueError(six.text_type(error))
+            raise _field_value_error_from(error, errors.CODE_RANGE, self.field_name, value)
         return value_as_int
 
+    def _out_of_range_indices(self, values_as_int):
+        """
+        Indices of all items in ``values_as_int`` outside of
+        :py:attr:`valid_range`, using NumPy if available.
+        """
+        result = None
+        range_items = self.valid_range.items
+        if has_numpy and (range_items is not None) and (len(range_items) == 1) and (None not in values_as_int):
+            lower, upper = range_items[0]
+            is_int64_range = all(
+                (limit is None) or (_INT64_MIN <= limit <= _INT64_MAX) for limit in (lower, upper))
+            if is_int64_range:
+                try:
+                    values_as_array = numpy.fromiter(values_as_int, dtype=numpy.int64, count=len(values_as_int))
+                except OverflowError:
+                    values_as_array = None
+                if values_as_array is not None:
+                    is_out_of_range = numpy.zeros(len(values_as_int), dtype=bool)
+                    if lower is not None:
+                        is_out_of_range |= values_as_array < lower
+                    if upper is not None:
+                        is_out_of_range |= values_as_array > upper
+                    result = numpy.flatnonzero(is_out_of_range).tolist()
+        if result is None:
+            result = self.valid_range.out_of_range_indices(values_as_int)
+        return result
+
+    def validated_column(self, values):
+        if not self._has_plain_column_values():
+            return super(IntegerFieldFormat, self).validated_column(values)
+        try:
+            results = [int(value) if value else None for value in values]
+        except ValueError:
+            # Let the per value validation figure out which values are broken.
+            return super(IntegerFieldFormat, self).validated_column(values)
+        indices_to_validate = self._empty_or_misfit_length_indices(values)
+        indices_to_validate.extend(self._out_of_range_indices(results))
+        return self._validated_column_items(values, results, indices_to_validate)
+
 
 class DateTimeFieldFormat(AbstractFieldFormat):
     """
@@ -568,13 +961,38 @@ class DateTimeFieldFormat(AbstractFieldFormat):
 
         try:
             result = time.strptime(value_to_validate, self.strptime_format)
-        except ValueError:
+        except ValueError as error:
+            strptime_error = error
             raise errors.FieldValueError(
-                "date must match format %s (%s) but is: %s (%s)"
-                % (self.human_readable_format, self.strptime_format, _compat.text_repr(value_to_validate), sys.exc_info()[1]))
+                lambda: "date must match format %s (%s) but is: %s (%s)" % (
+                    self.human_readable_format, self.strptime_format, _compat.text_repr(value_to_validate),
+                    strptime_error),
+                code=errors.CODE_DATE_TIME, field_name=self.field_name, value=value, limits=self.human_readable_format)
         return result
 
 
+def _regex_validated_column(field_format, values):
+    """
+    Same as calling ``field_format.validated()`` for each value in
+    ``values`` but only calling ``match()`` of the regular expression of
+    ``field_format`` for each value, which skips the overhead of
+    ``validated()``. Only values that are empty, have the wrong length or
+    do not match go through the per value validation, mostly to obtain a
+    proper error message.
+    """
+    assert field_format is not None
+    assert values is not None
+
+    if field_format._has_plain_column_values():
+        indices_to_validate = field_format._empty_or_misfit_length_indices(values)
+        indices_to_validate.extend(
+            value_index for value_index, match in enumerate(map(field_format.regex.match, values)) if match is None)
+        result = field_format._validated_column_items(values, list(values), indices_to_validate)
+    else:
+        result = AbstractFieldFormat.validated_column(field_format, values)
+    return result
+
+
 class RegExFieldFormat(AbstractFieldFormat):
     """
     Field format accepting values that match a specified regular expression.
@@ -589,10 +1007,25 @@ class RegExFieldFormat(AbstractFieldFormat):
 
         if not self.regex.match(value):
             raise errors.FieldValueError(
-                "value %s must match regular expression: %s"
-                % (_compat.text_repr(value), _compat.text_repr(self.rule)))
+                lambda: "value %s must match regular expression: %s"
+                % (_compat.text_repr(value), _compat.text_repr(self.rule)),
+                code=errors.CODE_REGEX, field_name=self.field_name, value=value, limits=self.rule)
         return value
 
+    def validated_column(self, values):
+        """
+        Validate all ``values`` as if passed to
+        :py:meth:`~cutplace.fields.AbstractFieldFormat.validated()` but
+        skip its overhead by only matching the regular expression against
+        each value.
+
+        :return: a tuple ``(results, error_indices)`` where ``results`` \
+          contains the validated value for each item in ``values`` or the \
+          :py:exc:`~cutplace.errors.FieldValueError` for items that are \
+          invalid, and ``error_indices`` the indices of these items
+        """
+        return _regex_validated_column(self, values)
+
 
 class PatternFieldFormat(AbstractFieldFormat):
     """
@@ -609,10 +1042,17 @@ class PatternFieldFormat(AbstractFieldFormat):
 
         if not self.regex.match(value):
             raise errors.FieldValueError(
-                'value %s must match pattern: %s (regex %s)'
-                % (_compat.text_repr(value), _compat.text_repr(self.rule), _compat.text_repr(self.pattern)))
+                lambda: 'value %s must match pattern: %s (regex %s)'
+                % (_compat.text_repr(value), _compat.text_repr(self.rule), _compat.text_repr(self.pattern)),
+                code=errors.CODE_PATTERN, field_name=self.field_name, value=value, limits=self.rule)
         return value
 
+    def validated_column(self, values):
+        """
+        Same as :py:meth:`cutplace.fields.RegExFieldFormat.validated_column()`.
+        """
+        return _regex_validated_column(self, values)
+
 
 class TextFieldFormat(AbstractFieldFormat):
     """
@@ -627,11 +1067,44 @@ class TextFieldFormat(AbstractFieldFormat):
         # TODO: Validate Text with rules like: 32..., a...z and so on.
         return value
 
+    def validated_column(self, values):
+        if not self._has_plain_column_values():
+            return super(TextFieldFormat, self).validated_column(values)
+        return self._validated_column_items(values, list(values), self._empty_or_misfit_length_indices(values))
+
+
+class FieldNameList(list):
+    """
+    List of field names that looks up the index of a field name in constant
+    time, so :py:func:`field_name_index` remains fast for CIDs with
+    thousands of fields.
+    """
+    def __init__(self, field_names=()):
+        super(FieldNameList, self).__init__(field_names)
+        self._field_name_to_index_map = {}
+        self._indexed_field_count = 0
+
+    def index(self, field_name, *start_and_stop):
+        if start_and_stop:
+            return list.index(self, field_name, *start_and_stop)
+        if self._indexed_field_count != len(self):
+            self._field_name_to_index_map = {}
+            for field_index in range(len(self) - 1, -1, -1):
+                self._field_name_to_index_map[self[field_index]] = field_index
+            self._indexed_field_count = len(self)
+        result = self._field_name_to_index_map.get(field_name)
+        if (result is None) or (self[result] != field_name):
+            # The field name is unknown (raising ValueError) or items have been replaced.
+            result = list.index(self, field_name)
+            self._indexed_field_count = 0
+        return result
+
 
 def field_name_index(field_name_to_look_up, available_field_names, location):
     """
     The index of ``field_name_to_look_up`` (without leading or trailing
-    white space) in ``available_field_names``.
+    white space) in ``available_field_names``. This is particularly fast if
+    ``available_field_names`` is a :py:class:`FieldNameList`.
 
     :param cutplace.errors.Location location: location used in case of errors
     :raise cutplace.errors.InterfaceError: if ``field_name_to_look_up`` is \
@@ -667,16 +1140,18 @@ def validated_field_name(supposed_field_name, location=None):
         raise errors.InterfaceError(basic_requirements_text + 'but is empty', location)
     if keyword.iskeyword(field_name):
         raise errors.InterfaceError("field name must not be a Python keyword but is: '%s'" % field_name, location)
-    is_first_character = True
-    for character in field_name:
-        if is_first_character:
-            if character not in _ASCII_LETTERS:
-                raise errors.InterfaceError(
-                    "field name must begin with a lower-case letter but is: %s"
-                    % _compat.text_repr(field_name), location)
-            is_first_character = False
-        else:
-            if character not in _ASCII_LETTERS_DIGITS_AND_UNDERSCORE:
-                raise errors.InterfaceError(
-                    basic_requirements_text + 'but is: %s' % _compat.text_repr(field_name), location)
+    if _VALID_FIELD_NAME_REGEX.match(field_name) is None:
+        # Find the broken character to explain what is wrong.
+        is_first_character = True
+        for character in field_name:
+            if is_first_character:
+                if character not in _ASCII_LETTERS:
+                    raise errors.InterfaceError(
+                        "field name must begin with a lower-case letter but is: %s"
+                        % _compat.text_repr(field_name), location)
+                is_first_character = False
+            else:
+                if character not in _ASCII_LETTERS_DIGITS_AND_UNDERSCORE:
+                    raise errors.InterfaceError(
+                        basic_requirements_text + 'but is: %s' % _compat.text_repr(field_name), location)
     return field_name
@@ -0,0 +1,609 @@
+"""
+Generators for synthetic data conforming to a CID, for example to load
+test a data pipeline.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import datetime
+import decimal
+import functools
+import io
+import random
+import string
+
+import six
+
+from cutplace import checks
+from cutplace import data
+from cutplace import errors
+from cutplace import fields
+from cutplace import interface
+from cutplace import rowio
+from cutplace import _compat
+
+try:
+    from re import _parser as _sre_parse
+except ImportError:
+    # HACK: Before Python 3.11 the parser for regular expressions is a module of its own.
+    import sre_parse as _sre_parse
+
+#: Default number of distinct values generated for each field; rows
+#: are assembled from these values.
+DEFAULT_POOL_SIZE = 1024
+
+#: Default number of rows generated and written at once.
+DEFAULT_GENERATOR_BATCH_SIZE = 4096
+
+#: Number of rows rendered as text to pick from for
+#: :py:meth:`RowGenerator.text_batch()`.
+_LINE_POOL_SIZE = 16384
+
+#: Value written for unique fields when rendering the line pool, which is
+#: replaced by the actual value later.
+_PLACEHOLDER = '\x00'
+
+#: Ratio of empty values generated for fields that can be empty.
+_EMPTY_RATIO = 0.05
+
+#: Maximum number of candidates to try for each value in the pool before
+#: giving up on a field.
+_ATTEMPTS_PER_VALUE = 10
+
+#: Limit used for ranges without lower or upper limit.
+_OPEN_RANGE_LIMIT = 999999
+
+#: Maximum length of text fields without upper length limit.
+_DEFAULT_MAX_TEXT_LENGTH = 20
+
+#: Maximum number of repetitions in regular expressions using ``*`` or
+#: ``+``.
+_MAX_REGEX_REPEAT = 8
+
+_EARLIEST_DATETIME = datetime.datetime(1950, 1, 1)
+_DATETIME_SECONDS = int((datetime.datetime(2030, 12, 31, 23, 59, 59) - _EARLIEST_DATETIME).total_seconds())
+
+_LETTERS = string.ascii_letters
+_DIGITS = string.digits
+_WORD_CHARACTERS = string.ascii_letters + string.digits + '_'
+
+#: Values that are tried as broken value for every field; those that
+#: turn out to be actually valid are ignored.
+_BROKEN_VALUE_CANDIDATES = (
+    '', 'x', '?', '-1', '1.2.3', '9' * 20, '2015-13-45', '#' * 3, 'x' * 300)
+
+
+class _CannotGenerateError(Exception):
+    pass
+
+
+def _interface_error_for(field_format, message):
+    return errors.InterfaceError(
+        'cannot generate values for field %s: %s' % (_compat.text_repr(field_format.field_name), message))
+
+
+def _limits(range_item, default_lower, default_upper):
+    lower, upper = range_item
+    if lower is None:
+        lower = min(default_lower, upper) if upper is not None else default_lower
+    if upper is None:
+        upper = max(default_upper, lower)
+    return lower, upper
+
+
+def _random_range_item(valid_range, randomizer):
+    range_items = valid_range.items if (valid_range is not None) and valid_range.items else [(None, None)]
+    return randomizer.choice(range_items)
+
+
+def _text_length_limits(field_format):
+    length_items = field_format.length.items if field_format.length.items else [(None, None)]
+    lower, upper = _limits(length_items[0], 1, _DEFAULT_MAX_TEXT_LENGTH)
+    return max(1, lower), max(1, upper)
+
+
+def _integer_candidate(field_format, randomizer):
+    lower, upper = _limits(
+        _random_range_item(field_format.valid_range, randomizer), -_OPEN_RANGE_LIMIT, _OPEN_RANGE_LIMIT)
+    return six.text_type(randomizer.randint(lower, upper))
+
+
+def _decimal_candidate(field_format, randomizer):
+    valid_range = field_format.valid_range
+    if field_format.rule.strip():
+        lower, upper = _limits(_random_range_item(valid_range, randomizer), -_OPEN_RANGE_LIMIT, _OPEN_RANGE_LIMIT)
+    else:
+        # The default decimal range is huge, so stick to more common values.
+        lower, upper = 0, _OPEN_RANGE_LIMIT
+    precision = valid_range.precision
+    factor = 10 ** precision
+    scaled_value = randomizer.randint(int(decimal.Decimal(lower) * factor), int(decimal.Decimal(upper) * factor))
+    result = format(decimal.Decimal(scaled_value).scaleb(-precision), 'f')
+    if field_format.decimal_separator != '.':
+        result = result.replace('.', field_format.decimal_separator)
+    return result
+
+
+def _date_time_candidate(field_format, randomizer):
+    some_datetime = _EARLIEST_DATETIME + datetime.timedelta(seconds=randomizer.randint(0, _DATETIME_SECONDS))
+    return six.text_type(some_datetime.strftime(str(field_format.strptime_format)))
+
+
+def _text_candidate(field_format, randomizer):
+    lower, upper = _text_length_limits(field_format)
+    return ''.join(randomizer.choice(_LETTERS) for _ in range(randomizer.randint(lower, upper)))
+
+
+def _category_characters(category):
+    category_name = str(category).upper()
+    if category_name.endswith('_DIGIT'):
+        result = _DIGITS
+    elif category_name.endswith('_WORD'):
+        result = _WORD_CHARACTERS
+    elif category_name.endswith('_SPACE'):
+        result = ' '
+    else:
+        raise _CannotGenerateError('unsupported category: %s' % category)
+    if '_NOT_' in category_name:
+        result = ''.join(character for character in _WORD_CHARACTERS + ' ' if character not in result)
+    return result
+
+
+def _set_characters(set_items):
+    characters = []
+    is_negated = False
+    for opcode, argument in set_items:
+        opcode_name = str(opcode).upper()
+        if opcode_name == 'NEGATE':
+            is_negated = True
+        elif opcode_name == 'LITERAL':
+            characters.append(six.unichr(argument))
+        elif opcode_name == 'RANGE':
+            lower, upper = argument
+            characters.extend(six.unichr(code) for code in range(lower, min(upper, lower + 255) + 1))
+        elif opcode_name == 'CATEGORY':
+            characters.extend(_category_characters(argument))
+        else:
+            raise _CannotGenerateError('unsupported character set item: %s' % opcode_name)
+    if is_negated:
+        characters = [character for character in _WORD_CHARACTERS if character not in characters]
+    if not characters:
+        raise _CannotGenerateError('character set must not be empty')
+    return characters
+
+
+def _regex_text(parsed_items, randomizer):
+    """
+    Text matching the regular expression items parsed by
+    :py:func:`sre_parse.parse()`.
+    """
+    result = []
+    for opcode, argument in parsed_items:
+        opcode_name = str(opcode).upper()
+        if opcode_name == 'LITERAL':
+            result.append(six.unichr(argument))
+        elif opcode_name == 'NOT_LITERAL':
+            result.append(randomizer.choice([letter for letter in _LETTERS if ord(letter) != argument]))
+        elif opcode_name == 'ANY':
+            result.append(randomizer.choice(_LETTERS))
+        elif opcode_name == 'IN':
+            result.append(randomizer.choice(_set_characters(argument)))
+        elif opcode_name == 'BRANCH':
+            result.append(_regex_text(randomizer.choice(argument[1]), randomizer))
+        elif opcode_name in ('SUBPATTERN', 'ATOMIC_GROUP'):
+            # The pattern always is the last item, no matter the Python version.
+            sub_items = argument[-1] if opcode_name == 'SUBPATTERN' else argument
+            result.append(_regex_text(sub_items, randomizer))
+        elif opcode_name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            min_count, max_count, sub_items = argument
+            max_count = min(max_count, min_count + _MAX_REGEX_REPEAT)
+            for _ in range(randomizer.randint(min_count, max_count)):
+                result.append(_regex_text(sub_items, randomizer))
+        elif opcode_name != 'AT':
+            raise _CannotGenerateError('unsupported regular expression element: %s' % opcode_name)
+    return ''.join(result)
+
+
+def _regex_candidate_function(field_format):
+    try:
+        parsed_items = _sre_parse.parse(field_format.regex.pattern)
+        _regex_text(parsed_items, random.Random(0))
+    except _CannotGenerateError as error:
+        raise _interface_error_for(field_format, error)
+    return lambda randomizer: _regex_text(parsed_items, randomizer)
+
+
+def _candidate_function(field_format):
+    """
+    Function that takes a :py:class:`random.Random` and returns a text
+    that might be a valid value for ``field_format``.
+    """
+    if isinstance(field_format, fields.ChoiceFieldFormat):
+        choices = field_format.choices
+
+        def result(randomizer):
+            return randomizer.choice(choices)
+    elif isinstance(field_format, fields.ConstantFieldFormat):
+        def result(randomizer):
+            return field_format.constant
+    elif isinstance(field_format, fields.DateTimeFieldFormat):
+        result = functools.partial(_date_time_candidate, field_format)
+    elif isinstance(field_format, fields.DecimalFieldFormat):
+        result = functools.partial(_decimal_candidate, field_format)
+    elif isinstance(field_format, fields.IntegerFieldFormat):
+        result = functools.partial(_integer_candidate, field_format)
+    elif isinstance(field_format, (fields.PatternFieldFormat, fields.RegExFieldFormat)):
+        result = _regex_candidate_function(field_format)
+    else:
+        # Text and field formats from plugins.
+        result = functools.partial(_text_candidate, field_format)
+    return result
+
+
+def _is_valid(field_format, value):
+    try:
+        field_format.validated(value)
+        result = True
+    except errors.FieldValueError:
+        result = False
+    return result
+
+
+class _FieldValues(object):
+    """
+    Pools of valid and broken values for a field.
+    """
+    def __init__(self, field_format, fixed_length, randomizer, pool_size):
+        self.field_format = field_format
+        self.fixed_length = fixed_length
+        self.valid_values = self._created_valid_values(randomizer, pool_size)
+        self.broken_values = [
+            fitted_value for fitted_value in (self._fitted(value) for value in _BROKEN_VALUE_CANDIDATES)
+            if not _is_valid(field_format, fitted_value)]
+
+    def _fitted(self, value):
+        result = value
+        if self.fixed_length is not None:
+            result = value[:self.fixed_length].ljust(self.fixed_length)
+        return result
+
+    def _created_valid_values(self, randomizer, pool_size):
+        field_format = self.field_format
+        candidate_function = _candidate_function(field_format)
+        result = []
+        for _ in range(_ATTEMPTS_PER_VALUE * pool_size):
+            value = self._fitted(candidate_function(randomizer))
+            if _is_valid(field_format, value):
+                result.append(value)
+                if len(result) == pool_size:
+                    break
+        if not result:
+            example = field_format.example
+            if example is not None:
+                result.append(self._fitted(example))
+            else:
+                raise _interface_error_for(field_format, 'cannot find any valid value; specify an example')
+        empty_value = self._fitted('')
+        if field_format.is_allowed_to_be_empty and _is_valid(field_format, empty_value):
+            empty_count = int(len(result) * _EMPTY_RATIO)
+            result[:empty_count] = [empty_value] * empty_count
+        return result
+
+
+class RowGenerator(object):
+    """
+    Generator for rows with random values conforming to ``cid``.
+
+    For each field, a pool of ``pool_size`` distinct values is derived from
+    the field format, taking into account ranges, choices, patterns,
+    regular expressions, date formats and decimal precision as well as the
+    length and whether the field can be empty. Rows are assembled from
+    these pools, which makes generating them fast.
+
+    Integer fields that are the only field of an
+    :py:class:`~cutplace.checks.IsUniqueCheck` get ascending values so
+    that the check passes. Other checks are not taken into account.
+
+    :param float error_rate: the ratio of rows that contain a broken value \
+      in one random field, between 0.0 and 1.0
+    :param seed: seed for the random generator to create the same data \
+      every time
+    :raises cutplace.errors.InterfaceError: if no valid values can be \
+      generated for a field, for example because the field format is \
+      implemented in a plugin and has no example; or if ``error_rate`` is \
+      greater than 0 but no field can have broken values
+    """
+    def __init__(self, cid, error_rate=0.0, seed=None, pool_size=DEFAULT_POOL_SIZE):
+        assert cid is not None
+        assert 0.0 <= error_rate <= 1.0, 'error_rate=%r' % error_rate
+        assert pool_size >= 1
+
+        self._cid = cid
+        self._error_rate = error_rate
+        self._randomizer = random.Random(seed)
+        is_fixed = cid.data_format.format == data.FORMAT_FIXED
+        field_lengths = [length for _, length in interface.field_names_and_lengths(cid)] if is_fixed \
+            else [None] * len(cid.field_formats)
+        self._field_values_list = [
+            _FieldValues(field_format, field_length, self._randomizer, pool_size)
+            for field_format, field_length in zip(cid.field_formats, field_lengths)]
+        self._unique_field_index_to_next_value_map = {}
+        for check in cid.check_map.values():
+            if isinstance(check, checks.IsUniqueCheck) and (len(check.field_names_to_check) == 1):
+                field_index = cid.field_index(check.field_names_to_check[0])
+                field_format = cid.field_formats[field_index]
+                if isinstance(field_format, fields.IntegerFieldFormat):
+                    lower_limit = field_format.valid_range.lower_limit
+                    self._unique_field_index_to_next_value_map[field_index] = \
+                        lower_limit if lower_limit is not None else 1
+        self._unique_field_indices = sorted(self._unique_field_index_to_next_value_map.keys())
+        self._breakable_field_indices = [
+            field_index for field_index, field_values in enumerate(self._field_values_list)
+            if field_values.broken_values]
+        if (error_rate > 0.0) and not self._breakable_field_indices:
+            raise errors.InterfaceError('cannot generate broken values for any field of CID')
+        self.broken_row_count = 0
+        self._line_pool = None
+
+    @property
+    def cid(self):
+        return self._cid
+
+    @property
+    def error_rate(self):
+        return self._error_rate
+
+    def _random_choices(self, values, count):
+        choices = getattr(self._randomizer, 'choices', None)
+        if choices is not None:
+            result = choices(values, k=count)
+        else:  # pragma: no cover
+            # HACK: Python 2 has no ``random.choices()``.
+            choice = self._randomizer.choice
+            result = [choice(values) for _ in range(count)]
+        return result
+
+    def _unique_column(self, field_index, row_count):
+        next_value = self._unique_field_index_to_next_value_map[field_index]
+        self._unique_field_index_to_next_value_map[field_index] = next_value + row_count
+        field_length = self._field_values_list[field_index].fixed_length
+        result = [six.text_type(value) for value in range(next_value, next_value + row_count)]
+        if field_length is not None:
+            result = [value.ljust(field_length) for value in result]
+        return result
+
+    def _broken_row_indices(self, row_count):
+        result = []
+        if self._error_rate > 0.0:
+            random_ratio = self._randomizer.random
+            result = [row_index for row_index in range(row_count) if random_ratio() < self._error_rate]
+            self.broken_row_count += len(result)
+        return result
+
+    def _broken_field_index_and_value(self):
+        field_index = self._randomizer.choice(self._breakable_field_indices)
+        return field_index, self._randomizer.choice(self._field_values_list[field_index].broken_values)
+
+    def row_batch(self, row_count):
+        """
+        List of ``row_count`` rows, each being a list of values.
+        """
+        assert row_count >= 0
+
+        columns = []
+        for field_index, field_values in enumerate(self._field_values_list):
+            if field_index in self._unique_field_index_to_next_value_map:
+                columns.append(self._unique_column(field_index, row_count))
+            else:
+                columns.append(self._random_choices(field_values.valid_values, row_count))
+        for row_index in self._broken_row_indices(row_count):
+            field_index, broken_value = self._broken_field_index_and_value()
+            columns[field_index][row_index] = broken_value
+        return [list(row) for row in zip(*columns)]
+
+    def rows(self, row_count, batch_size=DEFAULT_GENERATOR_BATCH_SIZE):
+        """
+        ``row_count`` rows, generated ``batch_size`` rows at a time.
+        """
+        assert row_count >= 0
+        assert batch_size >= 1
+
+        remaining_row_count = row_count
+        while remaining_row_count > 0:
+            batch_row_count = min(batch_size, remaining_row_count)
+            for row in self.row_batch(batch_row_count):
+                yield row
+            remaining_row_count -= batch_row_count
+
+    def header_rows(self):
+        """
+        Rows for the header of the data as specified by
+        :py:attr:`cutplace.data.DataFormat.header`: the field names followed
+        by empty rows.
+        """
+        result = []
+        header_row_count = self._cid.data_format.header
+        if header_row_count >= 1:
+            heading_row = []
+            empty_row = []
+            for field_format, field_values in zip(self._cid.field_formats, self._field_values_list):
+                field_length = field_values.fixed_length
+                if field_length is None:
+                    heading_row.append(field_format.field_name)
+                    empty_row.append('')
+                else:
+                    heading_row.append(field_format.field_name[:field_length].ljust(field_length))
+                    empty_row.append(' ' * field_length)
+            result.append(heading_row)
+            result.extend(list(empty_row) for _ in range(header_row_count - 1))
+        return result
+
+    def text_batch(self, row_count, create_row_writer):
+        """
+        Text for ``row_count`` rows as written by the
+        :py:class:`cutplace.rowio.AbstractRowWriter` returned by
+        ``create_row_writer(target_stream)``.
+
+        Unlike :py:meth:`~.row_batch()`, rows are not assembled from values
+        but picked from a pool of rows already rendered as text, which is
+        a lot faster but results in rows repeating. Values for unique
+        fields and broken values are still distinct for each row.
+        """
+        assert row_count >= 0
+        assert create_row_writer is not None
+
+        line_pool = self._line_pool
+        if line_pool is None:
+            pool_rows = self._pool_row_batch(_LINE_POOL_SIZE)
+            if self._unique_field_indices:
+                for row in pool_rows:
+                    for field_index in self._unique_field_indices:
+                        row[field_index] = self._placeholder(field_index)
+                line_pool = [
+                    self._template(line) for line in _rendered_lines(pool_rows, create_row_writer)]
+            else:
+                line_pool = _rendered_lines(pool_rows, create_row_writer)
+            self._line_pool = line_pool
+        lines = self._random_choices(line_pool, row_count)
+        if self._unique_field_indices:
+            unique_rows = list(zip(*[
+                self._unique_column(field_index, row_count) for field_index in self._unique_field_indices]))
+            lines = [line % unique_row for line, unique_row in zip(lines, unique_rows)]
+        else:
+            unique_rows = None
+        broken_row_indices = self._broken_row_indices(row_count)
+        if broken_row_indices:
+            broken_rows = []
+            for row_index in broken_row_indices:
+                broken_row = [
+                    self._randomizer.choice(field_values.valid_values) for field_values in self._field_values_list]
+                if unique_rows is not None:
+                    for field_index, value in zip(self._unique_field_indices, unique_rows[row_index]):
+                        broken_row[field_index] = value
+                field_index, broken_value = self._broken_field_index_and_value()
+                broken_row[field_index] = broken_value
+                broken_rows.append(broken_row)
+            for row_index, broken_line in zip(broken_row_indices, _rendered_lines(broken_rows, create_row_writer)):
+                lines[row_index] = broken_line
+        return ''.join(lines)
+
+    def _pool_row_batch(self, row_count):
+        """
+        Same as :py:meth:`~.row_batch()` but without broken values and
+        without advancing the values of unique fields.
+        """
+        error_rate = self._error_rate
+        unique_field_index_to_next_value_map = dict(self._unique_field_index_to_next_value_map)
+        self._error_rate = 0.0
+        try:
+            result = self.row_batch(row_count)
+        finally:
+            self._error_rate = error_rate
+            self._unique_field_index_to_next_value_map = unique_field_index_to_next_value_map
+        return result
+
+    def _placeholder(self, field_index):
+        field_length = self._field_values_list[field_index].fixed_length
+        return _PLACEHOLDER if field_length is None else _PLACEHOLDER.ljust(field_length)
+
+    def _template(self, line):
+        result = line.replace('%', '%%')
+        for field_index in self._unique_field_indices:
+            result = result.replace(self._placeholder(field_index), '%s', 1)
+        return result
+
+
+def _rendered_lines(rows, create_row_writer):
+    """
+    Text of each row in ``rows`` as written by the row writer returned by
+    ``create_row_writer(target_stream)``.
+    """
+    with io.StringIO() as target_stream:
+        row_writer = create_row_writer(target_stream)
+        line_end_offsets = []
+        for row in rows:
+            row_writer.write_row(row)
+            line_end_offsets.append(target_stream.tell())
+        text = target_stream.getvalue()
+    result = []
+    line_start_offset = 0
+    for line_end_offset in line_end_offsets:
+        result.append(text[line_start_offset:line_end_offset])
+        line_start_offset = line_end_offset
+    return result
+
+
+def _create_row_writer_function(cid):
+    data_format = cid.data_format
+    if data_format.format == data.FORMAT_DELIMITED:
+        def result(target):
+            return rowio.DelimitedRowWriter(target, data_format)
+    elif data_format.format == data.FORMAT_FIXED:
+        field_names_and_lengths = interface.field_names_and_lengths(cid)
+
+        def result(target):
+            return rowio.FixedRowWriter(target, data_format, field_names_and_lengths)
+    else:
+        assert data_format.format == data.FORMAT_EXCEL, 'format=%r' % data_format.format
+        result = rowio.XlsxRowWriter
+    return result
+
+
+def write(cid, target, row_count, error_rate=0.0, seed=None, batch_size=DEFAULT_GENERATOR_BATCH_SIZE):
+    """
+    Write ``row_count`` rows of synthetic data conforming to ``cid`` to
+    ``target`` using a :py:class:`cutplace.generators.RowGenerator`. If
+    the data format has a header, write it first.
+
+    Delimited and fixed data are written using
+    :py:meth:`~cutplace.generators.RowGenerator.text_batch()` so rows can
+    repeat.
+
+    :param target: path or filelike object to write to; for Excel this \
+      must be a path, and the data are written as Excel 2007+ (xlsx)
+    :return: the number of rows with a broken value
+    :raises cutplace.errors.InterfaceError: if the data format is ODS or \
+      no values can be generated for a field
+    """
+    assert cid is not None
+    assert target is not None
+    assert row_count >= 0
+    assert batch_size >= 1
+
+    data_format = cid.data_format
+    if data_format.format == data.FORMAT_ODS:
+        raise errors.InterfaceError('cannot write synthetic data with format %s' % data_format.format)
+    row_generator = RowGenerator(cid, error_rate, seed)
+    create_row_writer = _create_row_writer_function(cid)
+    is_text = data_format.format in (data.FORMAT_DELIMITED, data.FORMAT_FIXED)
+    with create_row_writer(target) as row_writer:
+        row_writer.write_rows(row_generator.header_rows())
+        remaining_row_count = row_count
+        while remaining_row_count > 0:
+            batch_row_count = min(batch_size, remaining_row_count)
+            if is_text:
+                try:
+                    row_writer.target_stream.write(row_generator.text_batch(batch_row_count, create_row_writer))
+                except UnicodeEncodeError as error:
+                    raise errors.DataFormatError('cannot write data rows: %s' % error, row_writer.location)
+                row_writer.location.advance_line(batch_row_count)
+            else:
+                row_writer.write_rows(row_generator.row_batch(batch_row_count))
+            remaining_row_count -= batch_row_count
+    return row_generator.broken_row_count
@@ -33,7 +33,6 @@ from __future__ import unicode_literals
 import io
 import os
 import six
-import time
 
 try:
     if six.PY3:
@@ -59,6 +58,14 @@ from cutplace import __version__
 
 _PADDING = 4
 
+#: Number of data errors to show individually; further errors only show up
+#: in the error summary at the end of the validation report.
+_MAX_SHOWN_ERROR_COUNT = 100
+
+#: Minimum number of seconds between updates of the status line while
+#: validating data.
+_PROGRESS_INTERVAL = 3
+
 _CID_ROW = 0
 _DATA_ROW = 1
 _VALIDATE_BUTTON_ROW = 2
@@ -306,21 +313,26 @@ if has_tk:
                     data_name = os.path.basename(self.data_path)
                     add_log_line('%s: validating' % data_name)
                     validator = validio.Reader(cid, self.data_path, on_error='yield')
+                    validator.set_progress_callback(
+                        lambda progress: show_status_line('Validating: %s' % progress), _PROGRESS_INTERVAL)
+                    error_summary = errors.ErrorSummary()
                     show_status_line('Validation started')
-                    last_update_time = time.time()
                     for row_or_error in validator.rows():
-                        now = time.time()
-                        if (now - last_update_time) >= 3:
-                            last_update_time = now
-                            show_status_line(
-                                '%d rows validated' % (validator.accepted_rows_count + validator.rejected_rows_count))
                         if isinstance(row_or_error, errors.DataError):
-                            add_log_error_line(row_or_error)
+                            error_summary.add(row_or_error)
+                            if error_summary.error_count <= _MAX_SHOWN_ERROR_COUNT:
+                                add_log_error_line(row_or_error)
+                            elif error_summary.error_count == _MAX_SHOWN_ERROR_COUNT + 1:
+                                add_log_line('%s: further errors are only counted for the summary' % data_name)
                     show_status_line(
                         '%d rows validated - finished' % (validator.accepted_rows_count + validator.rejected_rows_count))
                     add_log_line(
                         '%s: %d rows accepted, %d rows rejected'
                         % (data_name, validator.accepted_rows_count, validator.rejected_rows_count))
+                    if error_summary.error_count > 0:
+                        add_log_line('%s: error summary' % data_name)
+                        for error_summary_line in error_summary.lines():
+                            add_log_line('  %s' % error_summary_line)
                 except Exception as error:
                     add_log_error_line('cannot validate data: %s' % error)
 
@@ -20,12 +20,16 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
 import glob
+import hashlib
 import imp  # TODO: deprecated; with Python 3, use importlib.
 import inspect
 import io
 import logging
 import os.path
+import sys
+import threading
 
 import six
 
@@ -40,6 +44,24 @@ from cutplace._compat import python_2_unicode_compatible
 
 _log = logging.getLogger("cutplace")
 
+#: Maximum number of :py:class:`FrozenCid`\ s rebuilt from their rows while
+#: unpickling that are kept for later unpickling of the same CID.
+MAX_FROZEN_CID_CACHE_SIZE = 16
+
+_frozen_cid_cache = collections.OrderedDict()
+_frozen_cid_cache_lock = threading.Lock()
+
+#: Name of the entry point group installed packages can use to provide
+#: plugins with field formats and checks; see
+#: :py:func:`import_entry_point_plugins()`.
+PLUGIN_ENTRY_POINT_GROUP = 'cutplace.plugins'
+
+# Process wide registry of field format and check classes, which is only rebuilt if their sub classes change.
+_base_class_to_subclasses_and_class_map = {}
+_plugin_path_to_modification_map = {}
+_has_imported_entry_point_plugins = False
+_plugin_lock = threading.Lock()
+
 
 @python_2_unicode_compatible
 class Cid(object):
@@ -63,7 +85,7 @@ class Cid(object):
         """
         self._cid_path = cid_path
         self._data_format = None
-        self._field_names = []
+        self._field_names = fields.FieldNameList()
         self._field_formats = []
         self._field_name_to_format_map = {}
         self._field_name_to_index_map = {}
@@ -71,8 +93,11 @@ class Cid(object):
         # TODO: Change to tuple(check_name, check).
         self._check_name_to_check_map = {}
         self._location = None
-        self._check_name_to_class_map = Cid._create_name_to_class_map(checks.AbstractCheck)
-        self._field_format_name_to_class_map = Cid._create_name_to_class_map(fields.AbstractFieldFormat)
+        self._source_rows = None
+        self._source_rows_fingerprint = None
+        self._is_reading = False
+        self._check_name_to_class_map = _name_to_class_map(checks.AbstractCheck)
+        self._field_format_name_to_class_map = _name_to_class_map(fields.AbstractFieldFormat)
         if cid_path is not None:
             self.read(cid_path, rowio.auto_rows(cid_path))
         else:
@@ -188,6 +213,9 @@ class Cid(object):
 
     def _create_field_format_class(self, field_type):
         assert field_type
+        field_format_class_name = field_type.split(".")[-1] + "FieldFormat"
+        if (field_format_class_name not in self._field_format_name_to_class_map) and import_entry_point_plugins():
+            self._field_format_name_to_class_map = _name_to_class_map(fields.AbstractFieldFormat)
         return self._create_class(self._field_format_name_to_class_map, field_type, "FieldFormat", "field")
 
     def _create_check_class(self, check_type):
@@ -252,7 +280,30 @@ class Cid(object):
         self._location = errors.Location(cid_path, has_cell=True)
         if self._cid_path is None:
             self._cid_path = cid_path
+        source_rows = []
+        self._is_reading = True
+        try:
+            self._read_rows(rows, source_rows)
+        finally:
+            self._is_reading = False
+        self._source_rows = tuple(source_rows)
+        self._source_rows_fingerprint = cid_fingerprint(self)
+
+    def _cid_folder(self):
+        """
+        The folder containing the file the CID has been read from, or
+        ``None`` if it has not been read from a file.
+        """
+        cid_path = self._cid_path
+        if isinstance(cid_path, six.string_types) and os.path.isfile(cid_path):
+            result = os.path.dirname(os.path.abspath(cid_path))
+        else:
+            result = None
+        return result
+
+    def _read_rows(self, rows, source_rows):
         for row in rows:
+            source_rows.append(tuple(row))
             if row:
                 row_type = row[0].lower().strip()
                 row_data = (row[1:] + [''] * 6)[:6]
@@ -291,12 +342,32 @@ class Cid(object):
         assert field_name is not None
         assert field_name not in self._field_name_to_format_map
 
+        self._forget_source_rows()
+        if self._data_format.value_cache_size and (field_format.validated_cache is None):
+            field_format.set_validated_cache(self._data_format.value_cache_size)
         self._field_name_to_format_map[field_name] = field_format
         self._field_name_to_index_map[field_name] = len(self._field_names)
         self._field_names.append(field_name)
         self._field_formats.append(field_format)
         # TODO: Remember location where field format was defined to later include it in error message
-        _log.debug("%s: defined field: %s", self._location, field_format)
+
+    def set_validated_cache(self, max_size, is_adaptive=True):
+        """
+        Remember the results of validating up to ``max_size`` distinct values
+        for each field format, overriding the data format property
+        :py:const:`cutplace.data.KEY_VALUE_CACHE_SIZE`. If ``max_size`` is 0,
+        validate values every time.
+
+        See also: :py:meth:`cutplace.fields.AbstractFieldFormat.set_validated_cache()`
+        """
+        self._forget_source_rows()
+        for field_format in self.field_formats:
+            field_format.set_validated_cache(max_size, is_adaptive)
+
+    def _forget_source_rows(self):
+        if not self._is_reading:
+            # The CID has been changed after reading it, so its rows do not describe it anymore.
+            self._source_rows = None
 
     def add_field_format_row(self, possibly_incomplete_items):
         """
@@ -377,7 +448,10 @@ class Cid(object):
         field_class = self._create_field_format_class(field_type)
         self._location.advance_cell()
         field_rule = items[5].strip()
-        _log.debug("create field: %s(%r, %r, %r)", field_class.__name__, field_name, field_type, field_rule)
+        if issubclass(field_class, fields.ChoiceFieldFormat):
+            cid_folder = self._cid_folder()
+            if cid_folder is not None:
+                field_rule = fields.choice_file_rule_from(field_rule, cid_folder)
         try:
             field_format = field_class.__new__(
                 field_class, field_name, field_is_allowed_to_be_empty, field_length, field_rule)
@@ -444,6 +518,7 @@ class Cid(object):
         """
         assert check_to_add.descrption not in self._check_name_to_check_map
 
+        self._forget_source_rows()
         self._check_name_to_check_map[check_to_add.description] = check_to_add
         self._check_names.append(check_to_add.description)
         assert len(self.check_names) == len(self._check_name_to_check_map)
@@ -477,13 +552,14 @@ class Cid(object):
                 'check description must be specified', self._location)
         self._location.advance_cell()
         check_class_name = check_type + "Check"
+        if (check_class_name not in self._check_name_to_class_map) and import_entry_point_plugins():
+            self._check_name_to_class_map = _name_to_class_map(checks.AbstractCheck)
         if check_class_name not in self._check_name_to_class_map:
             list_of_available_check_types = _tools.human_readable_list(sorted(self._check_name_to_class_map.keys()))
             raise errors.InterfaceError(
                 "check type is '%s' but must be one of: %s"
                 % (check_type, list_of_available_check_types),
                 self._location)
-        _log.debug("create check: %s(%r, %r)", check_type, check_description, check_rule)
         check_class = self._create_check_class(check_type)
         check = check_class.__new__(check_class, check_description, check_rule, self._field_names, self._location)
         check.__init__(check_description, check_rule, self._field_names, self._location)
@@ -546,6 +622,201 @@ class Cid(object):
         assert check_name is not None
         return self._check_name_to_check_map[check_name]
 
+    def freeze(self):
+        """
+        A :py:class:`FrozenCid` holding only what is needed to validate data
+        with this CID. Use it to send the CID to other processes, for
+        example the workers of a :py:class:`multiprocessing.Pool`.
+
+        The frozen CID shares the field formats and checks with this CID, so
+        this CID should not be changed afterwards.
+        """
+        assert self.data_format is not None, 'CID must be read before it can be frozen'
+
+        cid_path = self._cid_path if isinstance(self._cid_path, six.string_types) else '<io>'
+        source_rows = self._source_rows
+        if (source_rows is not None) \
+                and ((cid_fingerprint(self) != self._source_rows_fingerprint) or cid_dependency_paths(self)):
+            # The rows alone do not describe the CID, so the frozen CID has to pickle the prepared objects.
+            source_rows = None
+        return FrozenCid(
+            self.data_format, self.field_formats, [(check_name, self.check_map[check_name]) for check_name in self.check_names],
+            cid_path, source_rows)
+
+
+@python_2_unicode_compatible
+class FrozenCid(object):
+    """
+    Compact and immutable version of a :py:class:`Cid` as returned by
+    :py:meth:`Cid.freeze()` which can be used everywhere a :py:class:`Cid`
+    is used to validate data.
+
+    If the CID was read from rows, pickling it only stores these rows.
+    Unpickling the same rows again in the same process reuses the frozen
+    CID built from them the first time, so sending it along with each task
+    to a pool of worker processes adds hardly any overhead. Because the
+    rows are read again by the unpickling process, this requires that:
+
+    * the data format, field formats and checks have not been changed after
+      reading the CID, as far as :py:func:`cid_fingerprint()` can tell;
+    * no :py:class:`cutplace.fields.ChoiceFieldFormat` reads its choices
+      from a file, which the unpickling process might resolve differently
+      or not find at all;
+    * no field format or check is provided by a plugin, which the
+      unpickling process might not have imported.
+
+    Otherwise, pickling stores the data format, field formats and checks.
+    Plugin classes then still have to be importable by the unpickling
+    process under the name of their module.
+    """
+    __slots__ = (
+        '_data_format', '_field_names', '_field_formats', '_field_name_to_format_map', '_field_name_to_index_map',
+        '_check_names', '_check_name_to_check_map', '_cid_path', '_source_rows')
+
+    def __init__(self, data_format, field_formats, check_names_and_checks, cid_path='<io>', source_rows=None):
+        """
+        Initialize a frozen CID with validated ``data_format``,
+        ``field_formats`` and ``check_names_and_checks``, which is a sequence
+        of tuples ``(check_name, check)``. Typically you do not call this
+        directly but use :py:meth:`Cid.freeze()`.
+
+        :param str cid_path: the path the CID was read from
+        :param tuple source_rows: the rows the CID was read from as tuple \
+          of tuples; ``None`` if the CID was built or changed programmatically
+        """
+        assert data_format is not None
+        assert field_formats is not None
+        assert check_names_and_checks is not None
+
+        self._data_format = data_format
+        self._field_formats = tuple(field_formats)
+        self._field_names = tuple(field_format.field_name for field_format in self._field_formats)
+        self._field_name_to_format_map = dict(zip(self._field_names, self._field_formats))
+        self._field_name_to_index_map = dict((field_name, index) for index, field_name in enumerate(self._field_names))
+        self._check_names = tuple(check_name for check_name, _ in check_names_and_checks)
+        self._check_name_to_check_map = dict(check_names_and_checks)
+        self._cid_path = cid_path
+        self._source_rows = source_rows
+
+    def __reduce__(self):
+        if self._source_rows is not None:
+            result = (_frozen_cid_from_rows, (self._cid_path, self._source_rows))
+        else:
+            result = (FrozenCid, (
+                self._data_format, self._field_formats,
+                [(check_name, self._check_name_to_check_map[check_name]) for check_name in self._check_names],
+                self._cid_path))
+        return result
+
+    def __str__(self):
+        return 'FrozenCid(format=%s; fields=[%s])' % (self.data_format.format, ', '.join([
+            field_format.__class__.__name__ + '(' + field_format.field_name + ')'
+            for field_format in self.field_formats
+        ]))
+
+    @property
+    def data_format(self):
+        """
+        See :py:attr:`Cid.data_format`.
+        """
+        return self._data_format
+
+    @property
+    def field_names(self):
+        """
+        Tuple of field names in the order they have been defined.
+        """
+        return self._field_names
+
+    @property
+    def field_formats(self):
+        """
+        Tuple of field formats in the order they have been defined.
+        """
+        return self._field_formats
+
+    @property
+    def check_names(self):
+        """
+        Tuple of check names in the order they have been defined.
+        """
+        return self._check_names
+
+    @property
+    def check_map(self):
+        """
+        See :py:attr:`Cid.check_map`.
+        """
+        return self._check_name_to_check_map
+
+    def field_index(self, field_name):
+        """
+        See :py:meth:`Cid.field_index()`.
+        """
+        assert field_name in self._field_name_to_index_map, \
+            "unknown field name '%s' must be replaced by one of: %s" \
+            % (field_name, _tools.human_readable_list(sorted(self.field_names)))
+
+        return self._field_name_to_index_map[field_name]
+
+    def field_format_for(self, field_name):
+        """
+        See :py:meth:`Cid.field_format_for()`.
+        """
+        return self._field_name_to_format_map[field_name]
+
+    def check_for(self, check_name):
+        """
+        See :py:meth:`Cid.check_for()`.
+        """
+        assert check_name is not None
+        return self._check_name_to_check_map[check_name]
+
+    def freeze(self):
+        """
+        This CID because it already is frozen.
+        """
+        return self
+
+
+def _frozen_cid_from_rows(cid_path, source_rows):
+    """
+    A :py:class:`FrozenCid` read from ``source_rows``, reusing a previous
+    result for the same rows.
+    """
+    key = (cid_path, source_rows)
+    with _frozen_cid_cache_lock:
+        result = _frozen_cid_cache.get(key)
+    if result is None:
+        cid = Cid()
+        cid.read(cid_path, [list(row) for row in source_rows])
+        result = cid.freeze()
+        with _frozen_cid_cache_lock:
+            _frozen_cid_cache[key] = result
+            while len(_frozen_cid_cache) > MAX_FROZEN_CID_CACHE_SIZE:
+                _frozen_cid_cache.popitem(last=False)
+    return result
+
+
+def _name_to_class_map(base_class):
+    """
+    Map of class names to the direct sub classes of ``base_class``,
+    reusing the previous result unless sub classes have been added or
+    removed since, for example by importing plugins.
+    """
+    assert base_class is not None
+
+    subclasses = tuple(base_class.__subclasses__())
+    with _plugin_lock:
+        subclasses_and_class_map = _base_class_to_subclasses_and_class_map.get(base_class)
+    if (subclasses_and_class_map is not None) and (subclasses_and_class_map[0] == subclasses):
+        result = subclasses_and_class_map[1]
+    else:
+        result = Cid._create_name_to_class_map(base_class)
+        with _plugin_lock:
+            _base_class_to_subclasses_and_class_map[base_class] = (subclasses, result)
+    return result
+
 
 def create_cid_from_string(cid_text):
     """
@@ -575,11 +846,63 @@ def field_names_and_lengths(fixed_cid):
         lower, upper = field_length_range
         assert lower is not None
         assert lower == upper
-        field_length = lower
+        # HACK: Decimal fields describe their length using a DecimalRange.
+        field_length = int(lower)
         result.append((field_name, field_length))
     return result
 
 
+def cid_fingerprint(cid):
+    """
+    Hex digest of everything in ``cid`` that influences the validation,
+    namely the data format, field formats and checks. Two CIDs with the same
+    fingerprint validate data in the same way unless the code of a field
+    format or check or a file referred to by a rule changed, see
+    :py:func:`cid_dependency_paths()`.
+    """
+    assert cid is not None
+
+    cid_text_parts = [six.text_type(cid.data_format)]
+    cid_text_parts.extend(six.text_type(field_format) for field_format in cid.field_formats)
+    cid_text_parts.extend(six.text_type(cid.check_map[check_name]) for check_name in cid.check_names)
+    return hashlib.sha1('\n'.join(cid_text_parts).encode('utf-8')).hexdigest()
+
+
+def _is_plugin_class(some_class):
+    """
+    ``True`` if ``some_class`` is not part of cutplace itself, for example
+    a field format or check defined by a plugin.
+    """
+    module_name = some_class.__module__
+    return (module_name != 'cutplace') and not module_name.startswith('cutplace.')
+
+
+def cid_dependency_paths(cid):
+    """
+    Sorted absolute paths of the files ``cid`` depends on in addition to
+    the ones :py:func:`cid_fingerprint()` considers, namely the files
+    containing the choices of :py:class:`cutplace.fields.ChoiceFieldFormat`
+    fields and the modules of field formats and checks provided by plugins.
+    """
+    assert cid is not None
+
+    result = set()
+    plugin_classes = set()
+    for field_format in cid.field_formats:
+        choices_path = getattr(field_format, 'choices_path', None)
+        if choices_path is not None:
+            result.add(os.path.abspath(choices_path))
+        plugin_classes.add(type(field_format))
+    plugin_classes.update(type(cid.check_map[check_name]) for check_name in cid.check_names)
+    for plugin_class in plugin_classes:
+        if _is_plugin_class(plugin_class):
+            plugin_module = sys.modules.get(plugin_class.__module__)
+            plugin_path = getattr(plugin_module, '__file__', None)
+            if plugin_path is not None:
+                result.add(os.path.abspath(plugin_path))
+    return sorted(result)
+
+
 def import_plugins(folder_to_scan_for_plugins):
     """
     Import all Python modules found in folder
@@ -599,9 +922,75 @@ def import_plugins(folder_to_scan_for_plugins):
         module_name = os.path.splitext(os.path.basename(module_to_import_path))[0]
         modules_to_import.add((module_name, module_to_import_path))
     for module_name_to_import, modulePathToImport in modules_to_import:
-        _log.info('  import %s from \'%s\'', module_name_to_import, modulePathToImport)
-        imp.load_source(module_name_to_import, modulePathToImport)
+        plugin_path = os.path.abspath(modulePathToImport)
+        plugin_stat = os.stat(plugin_path)
+        plugin_modification = (plugin_stat.st_mtime, plugin_stat.st_size)
+        with _plugin_lock:
+            is_unchanged = _plugin_path_to_modification_map.get(plugin_path) == plugin_modification
+        if is_unchanged:
+            _log.info('  skip unchanged %s from \'%s\'', module_name_to_import, modulePathToImport)
+        else:
+            _log.info('  import %s from \'%s\'', module_name_to_import, modulePathToImport)
+            imp.load_source(module_name_to_import, modulePathToImport)
+            with _plugin_lock:
+                _plugin_path_to_modification_map[plugin_path] = plugin_modification
     current_checks = set(checks.AbstractCheck.__subclasses__())  # @UndefinedVariable
     current_field_formats = set(fields.AbstractFieldFormat.__subclasses__())  # @UndefinedVariable
     log_imported_items('fields', base_field_formats, current_field_formats)
     log_imported_items('checks', base_checks, current_checks)
+
+
+def _plugin_entry_points():
+    """
+    The entry points in :py:const:`PLUGIN_ENTRY_POINT_GROUP` of all
+    installed packages.
+    """
+    try:
+        from importlib import metadata
+    except ImportError:  # pragma: no cover
+        # HACK: Python 2 and Python before 3.8 have no importlib.metadata.
+        metadata = None
+    if metadata is not None:
+        all_entry_points = metadata.entry_points()
+        if hasattr(all_entry_points, 'select'):
+            result = list(all_entry_points.select(group=PLUGIN_ENTRY_POINT_GROUP))
+        else:  # pragma: no cover
+            result = list(all_entry_points.get(PLUGIN_ENTRY_POINT_GROUP, []))
+    else:  # pragma: no cover
+        try:
+            import pkg_resources
+            result = list(pkg_resources.iter_entry_points(PLUGIN_ENTRY_POINT_GROUP))
+        except ImportError:
+            result = []
+    return result
+
+
+def import_entry_point_plugins():
+    """
+    Import the plugins that installed packages provide as entry points in
+    the group :py:const:`PLUGIN_ENTRY_POINT_GROUP`, for example using the
+    following ``setup.py`` option::
+
+        entry_points={'cutplace.plugins': ['myplugins = mypackage.myplugins']}
+
+    This happens at most once per process. A :py:class:`Cid` calls it on its
+    own the first time it refers to a field format or check that is not
+    known yet, so plugins are only imported if they are actually needed.
+
+    :return: ``True`` if this call imported at least one plugin
+    """
+    global _has_imported_entry_point_plugins
+
+    with _plugin_lock:
+        has_to_import = not _has_imported_entry_point_plugins
+        _has_imported_entry_point_plugins = True
+    result = False
+    if has_to_import:
+        for entry_point in _plugin_entry_points():
+            _log.info('import plugins from entry point %s', entry_point.name)
+            try:
+                entry_point.load()
+                result = True
+            except Exception as error:
+                _log.warning('cannot import plugins from entry point %s: %s', entry_point.name, error)
+    return result
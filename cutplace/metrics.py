@@ -0,0 +1,303 @@
+"""
+Sinks to export metrics about validation runs to monitoring systems such
+as `Prometheus <https://prometheus.io/>`_ or
+`StatsD <https://github.com/etsy/statsd>`_.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import logging
+import os
+import re
+import socket
+
+from cutplace import _compat
+
+#: Default number of validation runs a sink collects before actually
+#: exporting them.
+DEFAULT_METRICS_BATCH_SIZE = 100
+
+#: Default port a StatsD daemon listens on.
+DEFAULT_STATSD_PORT = 8125
+
+#: Default maximum size of a UDP packet sent to StatsD, which is small
+#: enough to not be fragmented on common networks.
+DEFAULT_STATSD_PACKET_SIZE = 512
+
+_log = logging.getLogger("cutplace.metrics")
+
+_INVALID_STATSD_NAME_CHARACTERS_REGEX = re.compile(r'[^A-Za-z0-9_\-]')
+
+
+class ValidationMetrics(object):
+    """
+    Metrics about the validation of a single data file as passed to
+    :py:meth:`AbstractMetricsSink.record()`.
+
+    :param str data_name: the name of the data, typically the name of the \
+      file without folder
+    :param int data_byte_count: the size of the data in bytes or ``None`` \
+      if unknown
+    :param dict field_error_counts: the number of rejected rows for each \
+      field name
+    :param float timestamp: the time the validation ended in seconds since \
+      the epoch
+    """
+    def __init__(
+            self, data_name, accepted_row_count, rejected_row_count, data_byte_count, duration_seconds,
+            field_error_counts, is_ok, timestamp):
+        assert data_name is not None
+        assert accepted_row_count >= 0
+        assert rejected_row_count >= 0
+        assert (data_byte_count is None) or (data_byte_count >= 0)
+        assert duration_seconds >= 0
+        assert field_error_counts is not None
+
+        self.data_name = data_name
+        self.accepted_row_count = accepted_row_count
+        self.rejected_row_count = rejected_row_count
+        self.data_byte_count = data_byte_count
+        self.duration_seconds = duration_seconds
+        self.field_error_counts = field_error_counts
+        self.is_ok = is_ok
+        self.timestamp = timestamp
+
+    @property
+    def error_rate(self):
+        """Ratio of rejected rows, between 0.0 and 1.0."""
+        row_count = self.accepted_row_count + self.rejected_row_count
+        return self.rejected_row_count / row_count if row_count > 0 else 0.0
+
+
+class AbstractMetricsSink(object):
+    """
+    Base class for sinks that export
+    :py:class:`~cutplace.metrics.ValidationMetrics`, for example from
+    :py:meth:`cutplace.validio.Reader.add_metrics_sink()`.
+
+    Metrics are collected in a buffer that is exported in one go once it
+    holds ``batch_size`` items, on :py:meth:`~.flush()` and on
+    :py:meth:`~.close()`, which is also called at the end of a ``with``
+    statement. Because metrics must not break the validation, problems
+    exporting them are only logged as warning.
+    """
+    def __init__(self, batch_size=DEFAULT_METRICS_BATCH_SIZE):
+        assert batch_size >= 1
+
+        self._batch_size = batch_size
+        self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def record(self, metrics):
+        """
+        Remember ``metrics`` and export all buffered metrics if the buffer
+        is full.
+
+        :param cutplace.metrics.ValidationMetrics metrics: the metrics to \
+          export
+        """
+        assert metrics is not None
+
+        self._buffer.append(metrics)
+        if len(self._buffer) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Export all buffered metrics.
+        """
+        if self._buffer:
+            try:
+                self._export(self._buffer)
+            except (EnvironmentError, OSError) as error:
+                _log.warning('cannot export metrics: %s', error)
+            self._buffer = []
+
+    def close(self):
+        """
+        Export all buffered metrics and release all resources.
+        """
+        self.flush()
+
+    def _export(self, metrics_list):
+        raise NotImplementedError
+
+
+def _prometheus_label_value(text):
+    return text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class PrometheusTextfileSink(AbstractMetricsSink):
+    """
+    Sink that writes the latest metrics of each data name to
+    ``target_path`` in the Prometheus text format, for example to be
+    picked up by the textfile collector of the
+    `node exporter <https://github.com/prometheus/node_exporter>`_. The
+    file is replaced atomically so the collector never reads a partially
+    written file.
+    """
+    def __init__(self, target_path, batch_size=DEFAULT_METRICS_BATCH_SIZE):
+        assert target_path is not None
+
+        super(PrometheusTextfileSink, self).__init__(batch_size)
+        self._target_path = target_path
+        self._data_name_to_metrics_map = {}
+
+    def _export(self, metrics_list):
+        for metrics in metrics_list:
+            self._data_name_to_metrics_map[metrics.data_name] = metrics
+        metric_name_help_and_value_getter_tuples = [
+            ('cutplace_rows_accepted', 'Number of rows accepted.', lambda metrics: metrics.accepted_row_count),
+            ('cutplace_rows_rejected', 'Number of rows rejected.', lambda metrics: metrics.rejected_row_count),
+            ('cutplace_error_rate', 'Ratio of rejected rows.', lambda metrics: metrics.error_rate),
+            ('cutplace_data_bytes', 'Size of the data in bytes.', lambda metrics: metrics.data_byte_count),
+            ('cutplace_validation_duration_seconds', 'Time spent on the validation.',
+             lambda metrics: metrics.duration_seconds),
+            ('cutplace_validation_ok', '1 if the data were accepted, otherwise 0.',
+             lambda metrics: 1 if metrics.is_ok else 0),
+            ('cutplace_validation_timestamp_seconds', 'Time the validation ended.',
+             lambda metrics: metrics.timestamp),
+        ]
+        lines = []
+        sorted_data_names = sorted(self._data_name_to_metrics_map.keys())
+        for metric_name, metric_help, value_getter in metric_name_help_and_value_getter_tuples:
+            lines.append('# HELP %s %s' % (metric_name, metric_help))
+            lines.append('# TYPE %s gauge' % metric_name)
+            for data_name in sorted_data_names:
+                value = value_getter(self._data_name_to_metrics_map[data_name])
+                if value is not None:
+                    lines.append('%s{data="%s"} %r' % (metric_name, _prometheus_label_value(data_name), value))
+        lines.append('# HELP cutplace_field_errors Number of rows rejected because of a field.')
+        lines.append('# TYPE cutplace_field_errors gauge')
+        for data_name in sorted_data_names:
+            field_error_counts = self._data_name_to_metrics_map[data_name].field_error_counts
+            for field_name in sorted(field_error_counts.keys()):
+                lines.append('cutplace_field_errors{data="%s",field="%s"} %d' % (
+                    _prometheus_label_value(data_name), _prometheus_label_value(field_name),
+                    field_error_counts[field_name]))
+        temp_target_path = self._target_path + '.%d.tmp' % os.getpid()
+        with io.open(temp_target_path, 'w', encoding='utf-8', newline='\n') as target_file:
+            target_file.write('\n'.join(lines) + '\n')
+        _compat.replace_file(temp_target_path, self._target_path)
+
+
+def _statsd_name(text):
+    return _INVALID_STATSD_NAME_CHARACTERS_REGEX.sub('_', text)
+
+
+class StatsdSink(AbstractMetricsSink):
+    """
+    Sink that sends metrics to a StatsD daemon at ``host`` and ``port``
+    using UDP, combining as many metrics as fit into a packet of up to
+    ``packet_size`` bytes. Sending does not block and packets that cannot
+    be sent are dropped.
+
+    Counters are named ``prefix.data.metric`` where ``data`` is the data
+    name with characters StatsD cannot handle replaced by ``_``, for
+    example ``cutplace.customers_csv.rows_accepted``. Durations are sent
+    as timers in milliseconds.
+    """
+    def __init__(
+            self, host='localhost', port=DEFAULT_STATSD_PORT, prefix='cutplace', packet_size=DEFAULT_STATSD_PACKET_SIZE,
+            batch_size=DEFAULT_METRICS_BATCH_SIZE):
+        assert host is not None
+        assert port >= 1
+        assert packet_size >= 1
+
+        super(StatsdSink, self).__init__(batch_size)
+        self._address = (host, port)
+        self._prefix = prefix
+        self._packet_size = packet_size
+        self._socket = None
+
+    def _metric_lines(self, metrics):
+        data_prefix = '%s.%s.' % (self._prefix, _statsd_name(metrics.data_name))
+        result = [
+            data_prefix + 'validations:1|c',
+            data_prefix + 'rows_accepted:%d|c' % metrics.accepted_row_count,
+            data_prefix + 'rows_rejected:%d|c' % metrics.rejected_row_count,
+            data_prefix + 'duration:%d|ms' % round(1000 * metrics.duration_seconds),
+        ]
+        if not metrics.is_ok:
+            result.append(data_prefix + 'validations_failed:1|c')
+        if metrics.data_byte_count is not None:
+            result.append(data_prefix + 'data_bytes:%d|c' % metrics.data_byte_count)
+        for field_name in sorted(metrics.field_error_counts.keys()):
+            result.append(
+                data_prefix + 'field_errors.%s:%d|c' % (_statsd_name(field_name), metrics.field_error_counts[field_name]))
+        return result
+
+    def _packets(self, metrics_list):
+        packet = b''
+        for metrics in metrics_list:
+            for line in self._metric_lines(metrics):
+                encoded_line = line.encode('utf-8')
+                if packet and (len(packet) + 1 + len(encoded_line) > self._packet_size):
+                    yield packet
+                    packet = b''
+                packet = packet + b'\n' + encoded_line if packet else encoded_line
+        if packet:
+            yield packet
+
+    def _export(self, metrics_list):
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._socket.setblocking(False)
+        for packet in self._packets(metrics_list):
+            try:
+                self._socket.sendto(packet, self._address)
+            except (EnvironmentError, OSError, socket.error) as error:
+                _log.warning('cannot send metrics to %s:%d: %s', self._address[0], self._address[1], error)
+
+    def close(self):
+        try:
+            super(StatsdSink, self).close()
+        finally:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+
+def statsd_host_and_port(host_and_port_text):
+    """
+    Tuple ``(host, port)`` from a text of the form ``host:port`` or
+    ``host``, in which case the port is
+    :py:const:`~cutplace.metrics.DEFAULT_STATSD_PORT`.
+
+    :raises ValueError: if the port is not a number between 1 and 65535
+    """
+    assert host_and_port_text is not None
+
+    host, separator, port_text = host_and_port_text.rpartition(':')
+    if not separator:
+        host = port_text
+        port = DEFAULT_STATSD_PORT
+    else:
+        port = int(port_text)
+        if not (1 <= port <= 65535):
+            raise ValueError('port must be between 1 and 65535 but is %d' % port)
+    if not host:
+        raise ValueError('host must be specified: %s' % _compat.text_repr(host_and_port_text))
+    return host, port
@@ -0,0 +1,178 @@
+"""
+Plans to decide in which order to perform the row checks of a validation.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+
+from cutplace import errors
+from cutplace import stats
+
+#: Default number of rows for which a
+#: :py:class:`~cutplace.plans.ValidationPlan` measures the checks.
+DEFAULT_PROBE_ROW_COUNT = 100
+
+#: Default number of rows after which a
+#: :py:class:`~cutplace.plans.ValidationPlan` measures the checks again.
+DEFAULT_REPLAN_ROW_COUNT = 10000
+
+# Rejection rate assumed for checks that did not reject any row so far, which orders them by cost only.
+_MIN_REJECTION_RATE = 0.001
+
+_log = logging.getLogger('cutplace')
+
+
+class _PlannedCheck(object):
+    """
+    A check as part of a :py:class:`ValidationPlan` and what has been
+    measured about it.
+    """
+    def __init__(self, check_name, check, declared_index):
+        self.check_name = check_name
+        self.check = check
+        self.declared_index = declared_index
+        self.checked_count = 0
+        self.rejected_count = 0
+
+    def order_key(self):
+        """
+        Key to sort planned checks by, which puts checks with a low cost
+        per rejected row first. Checks that have not rejected any row yet
+        are ordered by their declared cost.
+        """
+        rejection_rate = self.rejected_count / self.checked_count if self.checked_count != 0 else 0.0
+        return (self.check.cost / max(rejection_rate, _MIN_REJECTION_RATE), self.declared_index)
+
+
+def _reordered(planned_checks):
+    """
+    ``planned_checks`` in declared order but with each run of consecutive
+    stateless checks sorted by :py:meth:`_PlannedCheck.order_key`.
+    """
+    result = []
+    stateless_checks = []
+    for planned_check in sorted(planned_checks, key=lambda planned_check: planned_check.declared_index):
+        if planned_check.check.is_stateless:
+            stateless_checks.append(planned_check)
+        else:
+            result.extend(sorted(stateless_checks, key=_PlannedCheck.order_key))
+            stateless_checks = []
+            result.append(planned_check)
+    result.extend(sorted(stateless_checks, key=_PlannedCheck.order_key))
+    return result
+
+
+class ValidationPlan(object):
+    """
+    Plan to perform row checks in an order that rejects broken rows as
+    early and cheaply as possible, so expensive checks are skipped for rows
+    that a cheap check already rejected.
+
+    Only checks that declare themselves as
+    :py:attr:`~cutplace.checks.AbstractCheck.is_stateless` are reordered,
+    and only among the stateless checks next to them in the CID. Checks
+    such as :py:class:`cutplace.checks.IsUniqueCheck` that remember the
+    rows they have seen stay in their place. Consequently they see the
+    same rows as with the order of the CID, and the plan rejects the same
+    rows. Only a row that violates several stateless checks can be
+    rejected by a different one of them.
+
+    Initially, the stateless checks are ordered by their declared
+    :py:attr:`cutplace.checks.AbstractCheck.cost`. For the first
+    ``probe_row_count`` rows and again after each ``replan_row_count``
+    rows, the plan counts how many of the rows it checks each check
+    rejects. The checks are then ordered by their cost divided by the rate
+    of rejected rows. Because this does not depend on the time the checks
+    happen to take, the same data always result in the same order.
+    """
+    def __init__(
+            self, check_names, check_map, probe_row_count=DEFAULT_PROBE_ROW_COUNT,
+            replan_row_count=DEFAULT_REPLAN_ROW_COUNT):
+        """
+        Plan to perform the checks in ``check_map`` listed in
+        ``check_names``.
+
+        :param int probe_row_count: number of rows to measure the checks \
+          with before ordering them again
+        :param int replan_row_count: number of rows after which to measure \
+          the checks again
+        """
+        assert check_names is not None
+        assert check_map is not None
+        assert probe_row_count >= 1
+        assert replan_row_count >= probe_row_count
+
+        self._planned_checks = _reordered([
+            _PlannedCheck(check_name, check_map[check_name], declared_index)
+            for declared_index, check_name in enumerate(check_names)])
+        self._checks = [planned_check.check for planned_check in self._planned_checks]
+        self._probe_row_count = probe_row_count
+        self._replan_row_count = replan_row_count
+        self._row_count = 0
+
+    @property
+    def check_names(self):
+        """
+        The names of the checks in the order they are currently performed.
+        """
+        return tuple(planned_check.check_name for planned_check in self._planned_checks)
+
+    def check_row(self, field_map, location, validation_stats=None):
+        """
+        Check ``field_map`` at ``location`` using all checks in the planned
+        order until one of them fails.
+
+        :param cutplace.stats.ValidationStats validation_stats: statistics \
+          to add the time spent by each check to, or ``None``
+        :raises cutplace.errors.CheckError: if any check fails
+        """
+        row_index_in_plan = self._row_count % self._replan_row_count
+        self._row_count += 1
+        is_probe = row_index_in_plan < self._probe_row_count
+        if is_probe or (validation_stats is not None):
+            try:
+                self._measured_check_row(field_map, location, validation_stats, is_probe)
+            finally:
+                if row_index_in_plan == self._probe_row_count - 1:
+                    self._replan()
+        else:
+            for check in self._checks:
+                check.check_row(field_map, location)
+
+    def _measured_check_row(self, field_map, location, validation_stats, is_probe):
+        for planned_check in self._planned_checks:
+            start_time = stats.timer() if validation_stats is not None else None
+            try:
+                planned_check.check.check_row(field_map, location)
+            except errors.CheckError:
+                if is_probe:
+                    planned_check.rejected_count += 1
+                raise
+            finally:
+                if is_probe:
+                    planned_check.checked_count += 1
+                if validation_stats is not None:
+                    validation_stats.add_time(
+                        stats.STAGE_CHECKS, stats.timer() - start_time, name=planned_check.check_name)
+
+    def _replan(self):
+        self._planned_checks = _reordered(self._planned_checks)
+        self._checks = [planned_check.check for planned_check in self._planned_checks]
+        _log.debug('planned order of checks: %s', self.check_names)
@@ -22,8 +22,10 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import token
 import decimal
+import re
+import token
+import tokenize
 
 import six
 
@@ -58,6 +60,18 @@ DEFAULT_PRECISION = len(MAX_DECIMAL_TEXT.split('.')[1])
 #: specified.
 DEFAULT_SCALE = len(MAX_DECIMAL_TEXT) - 1
 
+#: Maximum number of parsed range descriptions to remember so ranges with
+#: the same description do not have to be parsed again.
+MAX_PARSED_RANGE_CACHE_SIZE = 1000
+
+# Use the same syntax for numbers as Python's tokenizer.
+_NUMBER_REGEX = re.compile(tokenize.Number)
+_NAME_REGEX = re.compile(r'\w+', re.UNICODE)
+_STRING_REGEX = re.compile(r"'[^\n'\\]*(?:\\.[^\n'\\]*)*'|\"[^\n\"\\]*(?:\\.[^\n\"\\]*)*\"")
+_OPERATOR_CHARACTERS = '!%&()*+,-./:;<=>@[]^{|}~'
+
+_type_and_description_to_parsed_range_map = {}
+
 
 def code_for_number_token(name, value, location):
     """
@@ -126,6 +140,72 @@ def code_for_string_token(name, value, location):
     return ord(value_without_quotes)
 
 
+def _range_tokens(description):
+    """
+    Iterator over the tokens in ``description`` as tuples ``(type, text)``
+    with ``type`` being the :py:mod:`token` type
+    :py:const:`token.NUMBER`, :py:const:`token.NAME`,
+    :py:const:`token.STRING`, :py:const:`token.OP` or
+    :py:const:`token.ERRORTOKEN` and a final :py:const:`token.ENDMARKER`.
+    White space is skipped.
+
+    For range descriptions, the result is the same as with
+    :py:func:`cutplace._tools.tokenize_without_space()` but a lot faster
+    because there is no need to process the whole Python syntax.
+    """
+    assert description is not None
+
+    description_length = len(description)
+    index = 0
+    while index < description_length:
+        character = description[index]
+        if character.isspace():
+            index += 1
+            continue
+        token_match = None
+        if character.isdigit() or ((character == '.') and description[index + 1:index + 2].isdigit()):
+            token_match = _NUMBER_REGEX.match(description, index)
+            token_type = token.NUMBER
+        elif character in '\'"':
+            token_match = _STRING_REGEX.match(description, index)
+            token_type = token.STRING
+        elif character.isalpha() or (character == '_'):
+            token_match = _NAME_REGEX.match(description, index)
+            token_type = token.NAME
+        if token_match is not None:
+            token_end = token_match.end()
+        else:
+            token_end = index + 1
+            token_type = token.OP if character in _OPERATOR_CHARACTERS else token.ERRORTOKEN
+        yield token_type, description[index:token_end]
+        index = token_end
+    yield token.ENDMARKER, ''
+
+
+def _cached_parsed_range(range_to_parse, description, location=None):
+    """
+    The result of ``range_to_parse._parsed(description, location)``,
+    reusing the result of a previous call for the same type of range and
+    ``description``.
+    """
+    key = (type(range_to_parse), description)
+    result = _type_and_description_to_parsed_range_map.get(key)
+    if result is None:
+        result = range_to_parse._parsed(description, location)
+        if len(_type_and_description_to_parsed_range_map) >= MAX_PARSED_RANGE_CACHE_SIZE:
+            _type_and_description_to_parsed_range_map.clear()
+        _type_and_description_to_parsed_range_map[key] = result
+    return result
+
+
+def _name_text(name):
+    """
+    The ``name`` passed to :py:meth:`~cutplace.ranges.Range.validate()` as
+    text.
+    """
+    return name if isinstance(name, six.string_types) else name()
+
+
 def create_range_from_length(length_range):
     """
     Create a range from length.
@@ -208,107 +288,7 @@ class Range(object):
             self._upper_limit = None
         else:
             self._description = description.replace('...', ELLIPSIS)
-            self._items = []
-
-            name_for_code = 'range'
-            location = None  # TODO: Add location where range is declared.
-            tokens = _tools.tokenize_without_space(self._description)
-            end_reached = False
-            while not end_reached:
-                lower = None
-                upper = None
-                ellipsis_found = False
-                after_hyphen = False
-                next_token = next(tokens)
-                while not _tools.is_eof_token(next_token) and not _tools.is_comma_token(next_token):
-                    next_type = next_token[0]
-                    next_value = next_token[1]
-                    if next_type in (token.NAME, token.NUMBER, token.STRING):
-                        if next_type == token.NAME:
-                            # Symbolic names, e.g. ``tab``.
-                            value_as_int = code_for_symbolic_token(name_for_code, next_value, location)
-                        elif next_type == token.NUMBER:
-                            # Numbers, e.g. ``123``.
-                            value_as_int = code_for_number_token(name_for_code, next_value, location)
-                            if after_hyphen:
-                                value_as_int *= - 1
-                                after_hyphen = False
-                        elif next_type == token.STRING:
-                            # Python strings, e.g. ``'abc'`` or ``"""abc"""``.
-                            value_as_int = code_for_string_token(name_for_code, next_value, location)
-                        elif (len(next_value) == 1) and not _tools.is_eof_token(next_token):
-                            # Other single characters, e.g. ``,``; this is particular useful with delimiter properties.
-                            value_as_int = ord(next_value)
-                        else:
-                            raise errors.InterfaceError(
-                                'value for %s must a number, a single character or a symbolic name but is: %s'
-                                % (name_for_code, _compat.text_repr(next_value)), location)
-                        if ellipsis_found:
-                            if upper is None:
-                                upper = value_as_int
-                            else:
-                                raise errors.InterfaceError(
-                                    "range must have at most lower and upper limit but found another number: %s"
-                                    % _compat.text_repr(next_value), location)
-                        elif lower is None:
-                            lower = value_as_int
-                        else:
-                            raise errors.InterfaceError(
-                                "number must be followed by ellipsis (...) but found: %s"
-                                % _compat.text_repr(next_value), location)
-                    elif after_hyphen:
-                        raise errors.InterfaceError(
-                            "hyphen (-) must be followed by number but found: %s" % _compat.text_repr(next_value),
-                            location)
-                    elif (next_type == token.OP) and (next_value == "-"):
-                        after_hyphen = True
-                    elif next_value in (ELLIPSIS, ':'):
-                        ellipsis_found = True
-                    else:
-                        raise errors.InterfaceError(
-                            "range must be specified using integer numbers, text, "
-                            "symbols and ellipsis (...) but found: %s [token type: %d]"
-                            % (_compat.text_repr(next_value), next_type), location)
-                    next_token = next(tokens)
-
-                if after_hyphen:
-                    raise errors.InterfaceError("hyphen (-) at end must be followed by number", location)
-
-                # Decide upon the result.
-                if lower is None:
-                    if upper is None:
-                        if ellipsis_found:
-                            # Handle "...".
-                            raise errors.InterfaceError(
-                                'ellipsis (...) must be preceded and/or succeeded by number', location)
-                        else:
-                            # Handle "".
-                            result = None
-                    else:
-                        assert ellipsis_found
-                        # Handle "...y".
-                        result = (None, upper)
-                elif ellipsis_found:
-                    # Handle "x..." and "x...y".
-                    if (upper is not None) and (lower > upper):
-                        raise errors.InterfaceError(
-                            "lower range %d must be greater or equal than upper range %d" % (lower, upper),
-                            location)
-                    result = (lower, upper)
-                else:
-                    # Handle "x".
-                    result = (lower, lower)
-                if result is not None:
-                    for item in self._items:
-                        if self._items_overlap(item, result):
-                            item_text = _compat.text_repr(self._repr_item(item))
-                            result_text = _compat.text_repr(self._repr_item(result))
-                            raise errors.InterfaceError(
-                                "overlapping parts in range must be cleaned up: %s and %s"
-                                % (item_text, result_text), location)
-                    self._items.append(result)
-                if _tools.is_eof_token(next_token):
-                    end_reached = True
+            self._items = list(_cached_parsed_range(self, self._description))
 
             self._lower_limit = None
             self._upper_limit = None
@@ -329,6 +309,113 @@ class Range(object):
                 elif (self._upper_limit is not None) and (upper_item > self._upper_limit):
                     self._upper_limit = upper_item
 
+    def _parsed(self, description, location=None):
+        """
+        The items described by ``description`` as tuple; see
+        :py:attr:`~cutplace.ranges.Range.items`.
+        """
+        items = []
+
+        name_for_code = 'range'
+        tokens = _range_tokens(description)
+        end_reached = False
+        while not end_reached:
+            lower = None
+            upper = None
+            ellipsis_found = False
+            after_hyphen = False
+            next_token = next(tokens)
+            while not _tools.is_eof_token(next_token) and not _tools.is_comma_token(next_token):
+                next_type = next_token[0]
+                next_value = next_token[1]
+                if next_type in (token.NAME, token.NUMBER, token.STRING):
+                    if next_type == token.NAME:
+                        # Symbolic names, e.g. ``tab``.
+                        value_as_int = code_for_symbolic_token(name_for_code, next_value, location)
+                    elif next_type == token.NUMBER:
+                        # Numbers, e.g. ``123``.
+                        value_as_int = code_for_number_token(name_for_code, next_value, location)
+                        if after_hyphen:
+                            value_as_int *= - 1
+                            after_hyphen = False
+                    elif next_type == token.STRING:
+                        # Python strings, e.g. ``'abc'`` or ``"""abc"""``.
+                        value_as_int = code_for_string_token(name_for_code, next_value, location)
+                    elif (len(next_value) == 1) and not _tools.is_eof_token(next_token):
+                        # Other single characters, e.g. ``,``; this is particular useful with delimiter properties.
+                        value_as_int = ord(next_value)
+                    else:
+                        raise errors.InterfaceError(
+                            'value for %s must a number, a single character or a symbolic name but is: %s'
+                            % (name_for_code, _compat.text_repr(next_value)), location)
+                    if ellipsis_found:
+                        if upper is None:
+                            upper = value_as_int
+                        else:
+                            raise errors.InterfaceError(
+                                "range must have at most lower and upper limit but found another number: %s"
+                                % _compat.text_repr(next_value), location)
+                    elif lower is None:
+                        lower = value_as_int
+                    else:
+                        raise errors.InterfaceError(
+                            "number must be followed by ellipsis (...) but found: %s"
+                            % _compat.text_repr(next_value), location)
+                elif after_hyphen:
+                    raise errors.InterfaceError(
+                        "hyphen (-) must be followed by number but found: %s" % _compat.text_repr(next_value),
+                        location)
+                elif (next_type == token.OP) and (next_value == "-"):
+                    after_hyphen = True
+                elif next_value in (ELLIPSIS, ':'):
+                    ellipsis_found = True
+                else:
+                    raise errors.InterfaceError(
+                        "range must be specified using integer numbers, text, "
+                        "symbols and ellipsis (...) but found: %s [token type: %d]"
+                        % (_compat.text_repr(next_value), next_type), location)
+                next_token = next(tokens)
+
+            if after_hyphen:
+                raise errors.InterfaceError("hyphen (-) at end must be followed by number", location)
+
+            # Decide upon the result.
+            if lower is None:
+                if upper is None:
+                    if ellipsis_found:
+                        # Handle "...".
+                        raise errors.InterfaceError(
+                            'ellipsis (...) must be preceded and/or succeeded by number', location)
+                    else:
+                        # Handle "".
+                        result = None
+                else:
+                    assert ellipsis_found
+                    # Handle "...y".
+                    result = (None, upper)
+            elif ellipsis_found:
+                # Handle "x..." and "x...y".
+                if (upper is not None) and (lower > upper):
+                    raise errors.InterfaceError(
+                        "lower range %d must be greater or equal than upper range %d" % (lower, upper),
+                        location)
+                result = (lower, upper)
+            else:
+                # Handle "x".
+                result = (lower, lower)
+            if result is not None:
+                for item in items:
+                    if self._items_overlap(item, result):
+                        item_text = _compat.text_repr(self._repr_item(item))
+                        result_text = _compat.text_repr(self._repr_item(result))
+                        raise errors.InterfaceError(
+                            "overlapping parts in range must be cleaned up: %s and %s"
+                            % (item_text, result_text), location)
+                items.append(result)
+            if _tools.is_eof_token(next_token):
+                end_reached = True
+        return tuple(items)
+
     @property
     def description(self):
         """
@@ -444,12 +531,45 @@ class Range(object):
                 result = (value >= lower) and (value <= upper)
         return result
 
+    def out_of_range_indices(self, values):
+        """
+        Indices of all items in ``values`` that are outside of this range.
+        Items that are ``None`` are ignored. This is the same as calling
+        :py:meth:`~cutplace.ranges.Range.validate()` for each item but a lot
+        faster for many values.
+
+        :param list values: the values to check
+        :rtype: list
+        """
+        assert values is not None
+
+        result = []
+        if self._items is not None:
+            if len(self._items) == 1:
+                lower, upper = self._items[0]
+                if lower is None:
+                    result = [value_index for value_index, value in enumerate(values)
+                              if (value is not None) and (value > upper)]
+                elif upper is None:
+                    result = [value_index for value_index, value in enumerate(values)
+                              if (value is not None) and (value < lower)]
+                else:
+                    result = [value_index for value_index, value in enumerate(values)
+                              if (value is not None) and not (lower <= value <= upper)]
+            else:
+                result = [
+                    value_index for value_index, value in enumerate(values)
+                    if (value is not None) and not any(self._item_contains(item, value) for item in self._items)
+                ]
+        return result
+
     def validate(self, name, value, location=None):
         """
         Validate that ``value`` is within the specified range.
 
-        :param str name: the name of ``value`` known to the end user for \
-          usage in possible error messages
+        :param name: the name of ``value`` known to the end user for \
+          usage in possible error messages; this can also be a function \
+          returning the name, which is only called in case of an error
         :param int value: the value to validate
         :param cutplace.errors.Location location: the location to refer to \
           in possible error messages
@@ -476,7 +596,8 @@ class Range(object):
                 item_index += 1
             if not is_valid:
                 raise errors.RangeValueError(
-                    "%s is %r but must be within range: %s" % (name, value, self), location)
+                    lambda: "%s is %r but must be within range: %s" % (_name_text(name), value, self), location,
+                    code=errors.CODE_RANGE, value=value, limits=self)
 
 
 @python_2_unicode_compatible
@@ -535,107 +656,8 @@ class DecimalRange(Range):
             self._upper_limit = None
         else:
             self._description = description.replace('...', ELLIPSIS)
-            self._items = []
-            tokens = _tools.tokenize_without_space(self._description)
-            end_reached = False
-            max_digits_after_dot = 0
-            max_digits_before_dot = 0
-            while not end_reached:
-                lower = None
-                upper = None
-                ellipsis_found = False
-                after_hyphen = False
-                next_token = next(tokens)
-                while not _tools.is_eof_token(next_token) and not _tools.is_comma_token(next_token):
-                    next_type = next_token[0]
-                    next_value = next_token[1]
-                    if next_type == token.NUMBER:
-                        if next_type == token.NUMBER:
-                            try:
-                                decimal_value = decimal.Decimal(next_value)
-                                _, digits, exponent = decimal_value.as_tuple()
-                                digits_after_dot = max(0, -exponent)
-                                if digits_after_dot > max_digits_after_dot:
-                                    max_digits_after_dot = digits_after_dot
-                                digits_before_dot = len(digits) + exponent
-                                if digits_before_dot > max_digits_before_dot:
-                                    max_digits_before_dot = digits_before_dot
-                            except decimal.DecimalException:
-                                raise errors.InterfaceError(
-                                    "number must be an decimal or integer but is: %s"
-                                    % _compat.text_repr(next_value), location)
-                            if after_hyphen:
-                                decimal_value = decimal_value.copy_negate()
-                                after_hyphen = False
-
-                        if ellipsis_found:
-                            if upper is None:
-                                upper = decimal_value
-                            else:
-                                raise errors.InterfaceError(
-                                    "range must have at most lower and upper limit but found another number: %s"
-                                    % _compat.text_repr(next_value), location)
-                        elif lower is None:
-                            lower = decimal_value
-                        else:
-                            raise errors.InterfaceError(
-                                "number must be followed by ellipsis (...) but found: %s"
-                                % _compat.text_repr(next_value))
-                    elif after_hyphen:
-                        raise errors.InterfaceError(
-                            "hyphen (-) must be followed by number but found: %s" % _compat.text_repr(next_value))
-                    elif (next_type == token.OP) and (next_value == "-"):
-                        after_hyphen = True
-                    elif next_value in (ELLIPSIS, ':'):
-                        ellipsis_found = True
-                    else:
-                        message = "range must be specified using decimal or integer numbers" \
-                                  " and ellipsis (...) but found: %s [token type: %d]" \
-                                  % (_compat.text_repr(next_value), next_type)
-                        raise errors.InterfaceError(message)
-                    next_token = next(tokens)
-
-                if after_hyphen:
-                    raise errors.InterfaceError("hyphen (-) at end must be followed by number")
-
-                # Decide upon the result.
-                if lower is None:
-                    if upper is None:
-                        if ellipsis_found:
-                            # Handle "...".
-                            # TODO: Handle "..." same as ""?
-                            raise errors.InterfaceError("ellipsis (...) must be preceded and/or succeeded by number")
-
-                    else:
-                        assert ellipsis_found
-                        # Handle "...y".
-                        range_item = (None, upper)
-                elif ellipsis_found:
-                    # Handle "x..." and "x...y".
-                    if (upper is not None) and (lower > upper):
-                        raise errors.InterfaceError(
-                            "lower limit %s must be less or equal than upper limit %s"
-                            % (_decimal_as_text(lower, self.precision), _decimal_as_text(upper, self.precision)))
-                    range_item = (lower, upper)
-                else:
-                    # Handle "x".
-                    range_item = (lower, lower)
-                if range_item is not None:
-                    self._precision = max_digits_after_dot
-                    self._scale = max_digits_before_dot + max_digits_after_dot
-                    for item in self._items:
-                        if self._items_overlap(item, range_item):
-                            item_text = _compat.text_repr(self._repr_item(item))
-                            result_text = _compat.text_repr(self._repr_item(range_item))
-                            raise errors.InterfaceError(
-                                "overlapping parts in decimal range must be cleaned up: %s and %s"
-                                % (item_text, result_text), location)
-                    self._items.append(range_item)
-                if _tools.is_eof_token(next_token):
-                    end_reached = True
-
-            assert self.precision >= 0
-            assert self.scale >= self.precision
+            parsed_items, self._precision, self._scale = _cached_parsed_range(self, self._description, location)
+            self._items = list(parsed_items)
 
             self._lower_limit = None
             self._upper_limit = None
@@ -656,6 +678,114 @@ class DecimalRange(Range):
                 elif (self._upper_limit is not None) and (upper_item > self._upper_limit):
                     self._upper_limit = upper_item
 
+    def _parsed(self, description, location=None):
+        """
+        Tuple ``(items, precision, scale)`` for the decimal range described
+        by ``description``.
+        """
+        items = []
+        tokens = _range_tokens(description)
+        end_reached = False
+        max_digits_after_dot = 0
+        max_digits_before_dot = 0
+        while not end_reached:
+            lower = None
+            upper = None
+            ellipsis_found = False
+            after_hyphen = False
+            next_token = next(tokens)
+            while not _tools.is_eof_token(next_token) and not _tools.is_comma_token(next_token):
+                next_type = next_token[0]
+                next_value = next_token[1]
+                if next_type == token.NUMBER:
+                    if next_type == token.NUMBER:
+                        try:
+                            decimal_value = decimal.Decimal(next_value)
+                            _, digits, exponent = decimal_value.as_tuple()
+                            digits_after_dot = max(0, -exponent)
+                            if digits_after_dot > max_digits_after_dot:
+                                max_digits_after_dot = digits_after_dot
+                            digits_before_dot = len(digits) + exponent
+                            if digits_before_dot > max_digits_before_dot:
+                                max_digits_before_dot = digits_before_dot
+                        except decimal.DecimalException:
+                            raise errors.InterfaceError(
+                                "number must be an decimal or integer but is: %s"
+                                % _compat.text_repr(next_value), location)
+                        if after_hyphen:
+                            decimal_value = decimal_value.copy_negate()
+                            after_hyphen = False
+
+                    if ellipsis_found:
+                        if upper is None:
+                            upper = decimal_value
+                        else:
+                            raise errors.InterfaceError(
+                                "range must have at most lower and upper limit but found another number: %s"
+                                % _compat.text_repr(next_value), location)
+                    elif lower is None:
+                        lower = decimal_value
+                    else:
+                        raise errors.InterfaceError(
+                            "number must be followed by ellipsis (...) but found: %s"
+                            % _compat.text_repr(next_value))
+                elif after_hyphen:
+                    raise errors.InterfaceError(
+                        "hyphen (-) must be followed by number but found: %s" % _compat.text_repr(next_value))
+                elif (next_type == token.OP) and (next_value == "-"):
+                    after_hyphen = True
+                elif next_value in (ELLIPSIS, ':'):
+                    ellipsis_found = True
+                else:
+                    message = "range must be specified using decimal or integer numbers" \
+                              " and ellipsis (...) but found: %s [token type: %d]" \
+                              % (_compat.text_repr(next_value), next_type)
+                    raise errors.InterfaceError(message)
+                next_token = next(tokens)
+
+            if after_hyphen:
+                raise errors.InterfaceError("hyphen (-) at end must be followed by number")
+
+            # Decide upon the result.
+            if lower is None:
+                if upper is None:
+                    if ellipsis_found:
+                        # Handle "...".
+                        # TODO: Handle "..." same as ""?
+                        raise errors.InterfaceError("ellipsis (...) must be preceded and/or succeeded by number")
+
+                else:
+                    assert ellipsis_found
+                    # Handle "...y".
+                    range_item = (None, upper)
+            elif ellipsis_found:
+                # Handle "x..." and "x...y".
+                if (upper is not None) and (lower > upper):
+                    raise errors.InterfaceError(
+                        "lower limit %s must be less or equal than upper limit %s"
+                        % (_decimal_as_text(lower, self.precision), _decimal_as_text(upper, self.precision)))
+                range_item = (lower, upper)
+            else:
+                # Handle "x".
+                range_item = (lower, lower)
+            if range_item is not None:
+                self._precision = max_digits_after_dot
+                self._scale = max_digits_before_dot + max_digits_after_dot
+                for item in items:
+                    if self._items_overlap(item, range_item):
+                        item_text = _compat.text_repr(self._repr_item(item))
+                        result_text = _compat.text_repr(self._repr_item(range_item))
+                        raise errors.InterfaceError(
+                            "overlapping parts in decimal range must be cleaned up: %s and %s"
+                            % (item_text, result_text), location)
+                items.append(range_item)
+            if _tools.is_eof_token(next_token):
+                end_reached = True
+
+        assert self.precision >= 0
+        assert self.scale >= self.precision
+        return tuple(items), self._precision, self._scale
+
     @property
     def precision(self):
         return self._precision
@@ -713,8 +843,9 @@ class DecimalRange(Range):
         """
         Validate that ``value`` is within the specified range.
 
-        :param str name: the name of ``value`` known to the end user for \
-          usage in possible error messages
+        :param name: the name of ``value`` known to the end user for \
+          usage in possible error messages; this can also be a function \
+          returning the name, which is only called in case of an error
         :param int value: the value to validate
         :param cutplace.errors.Location location: the location to refer to \
           in possible error messages
@@ -729,7 +860,8 @@ class DecimalRange(Range):
                 value_as_decimal = decimal.Decimal(value)
             except decimal.DecimalException:
                 raise errors.RangeValueError(
-                    "value must be decimal but is %s" % _compat.text_repr(value), location)
+                    lambda: "value must be decimal but is %s" % _compat.text_repr(value), location,
+                    code=errors.CODE_DECIMAL, value=value)
         else:
             value_as_decimal = value
 
@@ -750,4 +882,5 @@ class DecimalRange(Range):
                 item_index += 1
             if not is_valid:
                 raise errors.RangeValueError(
-                    "%s is %r but must be within range: %r" % (name, value_as_decimal, self), location)
+                    lambda: "%s is %r but must be within range: %r" % (_name_text(name), value_as_decimal, self),
+                    location, code=errors.CODE_RANGE, value=value, limits=self)
@@ -0,0 +1,328 @@
+"""
+Cache for validation results so that validating the same data against the
+same CID again returns the previous result without reading the data.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+
+import six
+
+from cutplace import errors
+from cutplace import interface
+from cutplace import _compat
+
+#: Default maximum size in bytes of all results stored in a
+#: :py:class:`ResultCache`.
+DEFAULT_RESULT_CACHE_SIZE = 10 * 1024 * 1024
+
+#: Suffix of the files in the cache folder that store a single result
+#: or the digest of a data file.
+RESULT_FILE_SUFFIX = '.json'
+
+_RESULT_CACHE_VERSION = 2
+_DIGEST_BLOCK_SIZE = 1024 * 1024
+_RESULTS_FOLDER_NAME = 'results'
+_DIGESTS_FOLDER_NAME = 'digests'
+
+_log = logging.getLogger("cutplace.results")
+
+
+def default_result_cache_folder():
+    """
+    Folder where the command line application stores its
+    :py:class:`ResultCache`, which is :file:`cutplace` in
+    ``$XDG_CACHE_HOME`` or, if this is not set, in :file:`~/.cache`.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'cutplace')
+
+
+def content_digest(data_path):
+    """
+    Hex digest of the content of the file ``data_path``.
+    """
+    assert data_path is not None
+
+    result = hashlib.sha256()
+    with io.open(data_path, 'rb') as data_file:
+        block = data_file.read(_DIGEST_BLOCK_SIZE)
+        while block:
+            result.update(block)
+            block = data_file.read(_DIGEST_BLOCK_SIZE)
+    return result.hexdigest()
+
+
+def data_error_details(error):
+    """
+    JSON compatible details on ``error`` from which
+    :py:func:`data_error_from_details` can create a similar error.
+    """
+    assert isinstance(error, errors.DataError), 'error=%r' % error
+
+    return {
+        'type': type(error).__name__,
+        'text': six.text_type(error),
+        'code': error.code,
+        'field_name': error.field_name,
+        'value': error.value if (error.value is None) or isinstance(error.value, six.text_type)
+        else six.text_type(error.value),
+    }
+
+
+def data_error_from_details(details):
+    """
+    A :py:exc:`cutplace.errors.DataError` with the same type and message
+    as the one ``details`` have been obtained from using
+    :py:func:`data_error_details`. Because the original location is not
+    available anymore, it is part of the message.
+    """
+    assert details is not None
+
+    error_class = getattr(errors, details['type'], None)
+    if not (isinstance(error_class, type) and issubclass(error_class, errors.DataError)):
+        error_class = errors.DataError
+    return error_class(
+        details['text'], code=details['code'], field_name=details['field_name'], value=details['value'])
+
+
+class ResultCache(object):
+    """
+    Validation results stored in ``folder`` using keys obtained by
+    :py:meth:`~.key()`, which only change if the content of the data, the
+    CID, the files the CID depends on as listed by
+    :py:func:`cutplace.interface.cid_dependency_paths()`, the cutplace
+    version or the options of the validation change.
+
+    Each result is stored in a file of its own, which is written to a
+    temporary file first and then renamed. Consequently several processes
+    can use the same cache at the same time without locking: they never
+    see a partially written result and a result written by one process
+    cannot be overwritten by another process storing a different result.
+    Looking up a result only changes the modification time of its file,
+    which tells which results have been used least recently.
+
+    Once all results take up more than ``max_size`` bytes, the least
+    recently used ones are removed.
+
+    :param str folder: the folder to store the results in; ``None`` \
+      means :py:func:`default_result_cache_folder`
+    :param int max_size: the maximum size of all results in bytes
+    """
+    def __init__(self, folder=None, max_size=DEFAULT_RESULT_CACHE_SIZE):
+        assert max_size >= 0
+
+        self._folder = folder if folder is not None else default_result_cache_folder()
+        self._results_folder = os.path.join(self._folder, _RESULTS_FOLDER_NAME)
+        self._digests_folder = os.path.join(self._folder, _DIGESTS_FOLDER_NAME)
+        self._max_size = max_size
+
+    @property
+    def folder(self):
+        return self._folder
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def key(self, data_path, cid, options=None):
+        """
+        Key to store the result of validating ``data_path`` against ``cid``
+        with ``options`` under.
+
+        To avoid reading the data again if it has not changed, the digest of
+        its content is remembered together with the size and modification
+        time of the file. The same applies to the files ``cid`` depends on.
+
+        :param cutplace.interface.Cid cid: the CID the data are validated \
+          against
+        :param dict options: JSON compatible options that influence the \
+          result, for example the number of rows to validate
+        """
+        assert data_path is not None
+        assert cid is not None
+
+        key_parts = {
+            'content': self._content_digest(data_path),
+            'cid': interface.cid_fingerprint(cid),
+            'cid_dependencies': dict(
+                (dependency_path, self._content_digest(dependency_path))
+                for dependency_path in interface.cid_dependency_paths(cid)),
+            'cutplace_version': self._cutplace_version(),
+            'options': options if options is not None else {},
+        }
+        key_text = json.dumps(key_parts, sort_keys=True)
+        return hashlib.sha256(key_text.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        The result stored under ``key`` or ``None`` if there is none.
+        """
+        assert key is not None
+
+        result_path = self._result_path(key)
+        result_entry = self._read_json(result_path)
+        if result_entry is not None:
+            self._touch(result_path)
+            result = result_entry['result']
+        else:
+            result = None
+        return result
+
+    def put(self, key, result, data_path=None):
+        """
+        Store ``result`` under ``key`` and remove the least recently used
+        results if the cache has become too big.
+
+        :param result: a JSON compatible value, for example a :py:class:`dict`
+        :param str data_path: the path of the data ``key`` was obtained \
+          from so that its content digest is kept as long as the result
+        """
+        assert key is not None
+        assert result is not None
+
+        self._write_json(self._result_path(key), {'version': _RESULT_CACHE_VERSION, 'result': result})
+        if data_path is not None:
+            self._touch(self._digest_path(data_path))
+        self._evict()
+
+    def clear(self):
+        """
+        Remove all results.
+        """
+        for entry_path in self._entry_paths():
+            self._remove(entry_path)
+
+    def _cutplace_version(self):
+        # HACK: Import ``__version__`` locally because ``cutplace/__init__.py`` imports this module before
+        # defining it.
+        from cutplace import __version__
+        return __version__
+
+    def _result_path(self, key):
+        return os.path.join(self._results_folder, key + RESULT_FILE_SUFFIX)
+
+    def _digest_path(self, data_path):
+        path_digest = hashlib.sha1(os.path.abspath(data_path).encode('utf-8')).hexdigest()
+        return os.path.join(self._digests_folder, path_digest + RESULT_FILE_SUFFIX)
+
+    def _content_digest(self, data_path):
+        absolute_data_path = os.path.abspath(data_path)
+        data_stat = os.stat(absolute_data_path)
+        digest_path = self._digest_path(absolute_data_path)
+        cached_stat = self._read_json(digest_path)
+        if (cached_stat is not None) and (cached_stat['path'] == absolute_data_path) \
+                and (cached_stat['size'] == data_stat.st_size) and (cached_stat['mtime'] == data_stat.st_mtime):
+            result = cached_stat['digest']
+        else:
+            result = content_digest(absolute_data_path)
+            self._write_json(digest_path, {
+                'version': _RESULT_CACHE_VERSION,
+                'path': absolute_data_path,
+                'size': data_stat.st_size,
+                'mtime': data_stat.st_mtime,
+                'digest': result,
+            })
+        return result
+
+    def _entry_paths(self):
+        result = []
+        for entry_folder in (self._results_folder, self._digests_folder):
+            if os.path.isdir(entry_folder):
+                result.extend(
+                    os.path.join(entry_folder, entry_name) for entry_name in os.listdir(entry_folder)
+                    if entry_name.endswith(RESULT_FILE_SUFFIX))
+        return result
+
+    def _evict(self):
+        used_time_size_and_path_tuples = []
+        for entry_path in self._entry_paths():
+            try:
+                entry_stat = os.stat(entry_path)
+            except EnvironmentError:
+                # Another process has removed the entry in the meantime.
+                continue
+            used_time_size_and_path_tuples.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+        size = sum(entry_size for _, entry_size, _ in used_time_size_and_path_tuples)
+        for _, entry_size, entry_path in sorted(used_time_size_and_path_tuples):
+            if size <= self._max_size:
+                break
+            _log.debug('remove %s from cache', entry_path)
+            self._remove(entry_path)
+            size -= entry_size
+
+    def _read_json(self, path):
+        """
+        The JSON stored in ``path`` or ``None`` if there is no such file or
+        it is broken.
+        """
+        result = None
+        try:
+            with io.open(path, 'r', encoding='utf-8') as json_file:
+                result = json.load(json_file)
+            if not isinstance(result, dict) or (result.get('version') != _RESULT_CACHE_VERSION):
+                result = None
+        except (EnvironmentError, ValueError) as error:
+            if os.path.exists(path):
+                _log.warning('ignoring broken cache entry "%s": %s', path, error)
+        return result
+
+    def _write_json(self, path, value):
+        folder = os.path.dirname(path)
+        if not os.path.exists(folder):
+            try:
+                os.makedirs(folder)
+            except EnvironmentError:
+                # Another process might have created the folder in the meantime.
+                if not os.path.isdir(folder):
+                    raise
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=folder)
+        try:
+            with io.open(temp_fd, 'w', encoding='utf-8') as temp_file:
+                temp_file.write(six.text_type(json.dumps(value, default=six.text_type, sort_keys=True)))
+            _compat.replace_file(temp_path, path)
+        except Exception:
+            self._remove(temp_path)
+            raise
+        self._touch(path)
+
+    def _touch(self, path):
+        """
+        Mark the entry stored in ``path`` as recently used.
+        """
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except EnvironmentError:
+            # Another process has removed the entry in the meantime.
+            pass
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except EnvironmentError:
+            # Another process has removed the entry in the meantime.
+            pass
@@ -21,6 +21,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import codecs
 import csv
 import datetime
 import io
@@ -448,6 +449,186 @@ def fixed_rows(fixed_source, encoding, field_name_and_lengths, line_delimiter='a
             fixed_file.close()
 
 
+def _is_single_byte_encoding(encoding):
+    """
+    ``True`` if ``encoding`` decodes each byte on its own to exactly one
+    character, for example ISO-8859-15 but not UTF-8.
+    """
+    assert encoding is not None
+
+    decoder_class = codecs.getincrementaldecoder(encoding)
+    for byte in range(256):
+        if len(decoder_class('replace').decode(six.int2byte(byte))) != 1:
+            return False
+    return True
+
+
+def fixed_record_size(encoding, field_name_and_lengths, line_delimiter):
+    """
+    Number of bytes each row of fixed data takes including the line
+    delimiter, or ``None`` if the size of rows can vary because
+    ``encoding`` can use more than one byte per character or
+    ``line_delimiter`` is ``'any'``.
+    """
+    assert encoding is not None
+    assert field_name_and_lengths
+    assert line_delimiter in _VALID_FIXED_LINE_DELIMITERS
+
+    if (line_delimiter == data.ANY) or not _is_single_byte_encoding(encoding):
+        result = None
+    else:
+        line_delimiter_size = len(line_delimiter) if line_delimiter is not None else 0
+        result = sum(length for _, length in field_name_and_lengths) + line_delimiter_size
+    return result
+
+
+def fixed_row_count(fixed_path, encoding, field_name_and_lengths, line_delimiter):
+    """
+    Number of rows in fixed data stored in file ``fixed_path`` computed from
+    the size of the file without reading it, or ``None`` if this is not
+    possible, see :py:func:`fixed_record_size()`. The last row may omit the
+    line delimiter.
+
+    :raises cutplace.errors.DataFormatError: if the size of the file does \
+      not fit the record size
+    """
+    assert fixed_path is not None
+
+    record_size = fixed_record_size(encoding, field_name_and_lengths, line_delimiter)
+    if record_size is not None:
+        file_size = os.path.getsize(fixed_path)
+        if (file_size % record_size) == 0:
+            result = file_size // record_size
+        elif (line_delimiter is not None) and ((file_size + len(line_delimiter)) % record_size) == 0:
+            result = (file_size + len(line_delimiter)) // record_size
+        else:
+            raise errors.DataFormatError(
+                'file size is %d bytes but must be a multiple of the record size of %d bytes'
+                % (file_size, record_size), errors.Location(fixed_path))
+    else:
+        result = None
+    return result
+
+
+def fixed_rows_at(fixed_path, encoding, field_name_and_lengths, line_delimiter, row_indices):
+    """
+    Similar to :py:func:`fixed_rows()` but only read the rows at
+    ``row_indices`` by seeking to their position in file ``fixed_path``.
+    This requires :py:func:`fixed_record_size()` to be known.
+
+    :param list row_indices: ascending indices of the rows to read, \
+      starting with 0
+    :return: a tuple ``(row_index, row)`` for each item in ``row_indices``
+    """
+    assert fixed_path is not None
+    assert row_indices is not None
+
+    record_size = fixed_record_size(encoding, field_name_and_lengths, line_delimiter)
+    assert record_size is not None, 'record size must be known to seek rows: encoding=%r, line_delimiter=%r' \
+        % (encoding, line_delimiter)
+    location = errors.Location(fixed_path, has_column=True)
+    with io.open(fixed_path, 'rb') as fixed_file:
+        previous_row_index = 0
+        for row_index in row_indices:
+            assert row_index >= previous_row_index, 'row_indices must be ascending: %r' % row_indices
+            location.advance_line(row_index - previous_row_index)
+            previous_row_index = row_index
+            fixed_file.seek(row_index * record_size)
+            record = fixed_file.read(record_size).decode(encoding)
+            row = []
+            start = 0
+            for field_name, field_length in field_name_and_lengths:
+                item = record[start:start + field_length]
+                if len(item) != field_length:
+                    raise errors.DataFormatError(
+                        "cannot read field '%s': need %d characters but found only %d: %s"
+                        % (field_name, field_length, len(item), _compat.text_repr(item)), location)
+                row.append(item)
+                start += field_length
+            actual_line_delimiter = record[start:]
+            if (line_delimiter is not None) and (actual_line_delimiter not in ('', line_delimiter)):
+                raise errors.DataFormatError(
+                    'line delimiter is %s but must be %s'
+                    % (_compat.text_repr(actual_line_delimiter), _compat.text_repr(line_delimiter)), location)
+            yield row_index, row
+
+
+def fixed_rows_and_offsets(fixed_path, encoding, field_name_and_lengths, line_delimiter, start_offset=0):
+    """
+    Similar to :py:func:`fixed_rows()` but start reading file
+    ``fixed_path`` at byte ``start_offset`` and produce tuples
+    ``(row, end_offset)`` where ``end_offset`` is the byte offset where
+    the next row starts. This requires :py:func:`fixed_record_size()` to
+    be known.
+    """
+    assert fixed_path is not None
+    assert start_offset >= 0
+
+    record_size = fixed_record_size(encoding, field_name_and_lengths, line_delimiter)
+    assert record_size is not None, 'record size must be known to compute offsets: encoding=%r, line_delimiter=%r' \
+        % (encoding, line_delimiter)
+    with io.open(fixed_path, 'rb') as fixed_binary_file:
+        fixed_binary_file.seek(start_offset)
+        # Keep line delimiters as they are so they match the record size.
+        fixed_file = io.TextIOWrapper(fixed_binary_file, encoding=encoding, newline='')
+        for row_count, row in enumerate(fixed_rows(fixed_file, encoding, field_name_and_lengths, line_delimiter), 1):
+            yield row, start_offset + row_count * record_size
+
+
+def has_byte_offsets(data_format):
+    """
+    ``True`` if :py:func:`delimited_rows_and_offsets()` can read data
+    described by ``data_format``. This requires the line delimiter to be
+    a line feed or carriage return and line feed, and the encoding to encode
+    a line feed as a single byte with the value 10, for example with ASCII
+    or UTF-8 but not UTF-16.
+
+    Data with other line delimiters, including ``any``, have to be read
+    using :py:func:`delimited_rows()`.
+    """
+    assert data_format is not None
+    assert data_format.encoding is not None
+    return (data_format.line_delimiter in ('\n', '\r\n')) \
+        and '\n\n'.encode(data_format.encoding).endswith(b'\n\n')
+
+
+def delimited_rows_and_offsets(delimited_path, data_format, start_offset=0):
+    """
+    Similar to :py:func:`delimited_rows()` but start reading file
+    ``delimited_path`` at byte ``start_offset`` and produce tuples
+    ``(row, end_offset)`` where ``end_offset`` is the byte offset where
+    the next row starts. This requires :py:func:`has_byte_offsets()` for
+    ``data_format``.
+
+    :raises cutplace.errors.DataFormatError: if ``delimited_path`` is not \
+      a valid delimited file
+    """
+    assert delimited_path is not None
+    assert start_offset >= 0
+    assert has_byte_offsets(data_format), \
+        'encoding=%r, line_delimiter=%r' % (data_format.encoding, data_format.line_delimiter)
+
+    keywords = _as_delimited_keywords(data_format)
+    decoder = codecs.getincrementaldecoder(data_format.encoding)()
+    # HACK: list with the current offset so `decoded_lines` can modify it.
+    offset = [start_offset]
+
+    def decoded_lines():
+        # Reading lines from a binary file splits them after each line feed.
+        for line in delimited_file:
+            offset[0] += len(line)
+            yield decoder.decode(line)
+
+    with io.open(delimited_path, 'rb') as delimited_file:
+        delimited_file.seek(start_offset)
+        delimited_reader = _compat.csv_reader(decoded_lines(), **keywords)
+        try:
+            for row in delimited_reader:
+                yield row, offset[0]
+        except (csv.Error, UnicodeDecodeError) as error:
+            _raise_delimited_data_format_error(delimited_path, delimited_reader, error)
+
+
 def auto_rows(source):
     """
     Determine basic data format of `source` based on heuristics and return its contents.
@@ -572,6 +753,26 @@ class DelimitedRowWriter(AbstractRowWriter):
             raise errors.DataFormatError('cannot write data row: %s; row=%s' % (error, row_to_write), self.location)
         self._location.advance_line()
 
+    def write_rows(self, rows_to_write):
+        """
+        Same as calling :py:meth:`~.write_row` for each row in
+        ``rows_to_write`` but faster because the rows are passed to the
+        CSV writer in one go.
+        """
+        assert self.target_stream is not None
+        assert rows_to_write is not None
+
+        if not isinstance(rows_to_write, (list, tuple)):
+            rows_to_write = list(rows_to_write)
+        if rows_to_write:
+            try:
+                self._delimited_writer.writerows(rows_to_write)
+            except UnicodeEncodeError:
+                # Write the rows one by one to find the broken row for the error message.
+                for row_to_write in rows_to_write:
+                    self.write_row(row_to_write)
+            self._location.advance_line(len(rows_to_write))
+
 
 class FixedRowWriter(AbstractRowWriter):
     def __init__(self, target, data_format, field_names_and_lengths):
@@ -637,6 +838,28 @@ class FixedRowWriter(AbstractRowWriter):
             self._target_stream.write(self._line_separator)
         self.location.advance_line()
 
+    def write_rows(self, rows_to_write):
+        """
+        Same as calling :py:meth:`~.write_row` for each row in
+        ``rows_to_write`` but faster because all rows are written at once.
+        Unless Python runs with ``-O``, the rows are still checked row by
+        row.
+        """
+        assert self.target_stream is not None
+        assert rows_to_write is not None
+
+        if __debug__:
+            super(FixedRowWriter, self).write_rows(rows_to_write)
+        else:
+            line_separator = self._line_separator if self._line_separator is not None else ''
+            rows_to_write = [''.join(row_to_write) + line_separator for row_to_write in rows_to_write]
+            if rows_to_write:
+                try:
+                    self._target_stream.write(''.join(rows_to_write))
+                except UnicodeEncodeError as error:
+                    raise errors.DataFormatError('cannot write data rows: %s' % error, self.location)
+                self.location.advance_line(len(rows_to_write))
+
 
 class XlsxRowWriter(AbstractRowWriter):
     """
@@ -708,6 +931,12 @@ class XlsxRowWriter(AbstractRowWriter):
             self.location.advance_cell()
         self.location.advance_line()
 
+    def write_rows(self, rows_to_write):
+        assert rows_to_write is not None
+
+        for row_to_write in rows_to_write:
+            self.write_row(row_to_write)
+
     def close(self):
         """
         Close :py:attr:`~.workbook` and physically write it to
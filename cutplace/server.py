@@ -0,0 +1,508 @@
+"""
+Server that keeps CIDs in memory and validates data sent to it using HTTP,
+which avoids the cost of starting a process, importing modules and reading
+the CID for each validation.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+
+import six
+from six.moves import BaseHTTPServer
+from six.moves import queue
+from six.moves import socketserver
+from six.moves.urllib.parse import unquote
+
+from cutplace import data
+from cutplace import errors
+from cutplace import interface
+from cutplace import sinks
+from cutplace import validio
+from cutplace import _compat
+
+#: Default port the server listens on.
+DEFAULT_SERVER_PORT = 8778
+
+#: Default number of requests the server handles concurrently.
+DEFAULT_WORKER_COUNT = 4
+
+#: Default maximum number of errors described in a response.
+DEFAULT_MAX_REPORTED_ERRORS = 100
+
+#: Prefix of a server address that refers to a Unix domain socket.
+UNIX_SOCKET_PREFIX = 'unix:'
+
+#: Path of requests to validate data; the name of the CID follows.
+VALIDATE_PATH_PREFIX = '/validate/'
+
+#: Path of requests to list the names of all CIDs.
+CIDS_PATH = '/cids'
+
+#: ``True`` if the platform supports Unix domain sockets and consequently
+#: :py:class:`~cutplace.server.UnixServer` is available.
+has_unix_sockets = hasattr(socketserver, 'UnixStreamServer')
+
+_log = logging.getLogger("cutplace.server")
+
+_STREAM_CHUNK_SIZE = 65536
+
+_DATA_FORMAT_TO_SUFFIX_MAP = {
+    data.FORMAT_EXCEL: '.xlsx',
+    data.FORMAT_ODS: '.ods',
+}
+
+
+class _CidEntry(object):
+    """
+    A CID in a :py:class:`~cutplace.server.CidRegistry` together with what
+    is needed to notice that its file has changed.
+    """
+    def __init__(self, cid_path):
+        assert cid_path is not None
+
+        self.cid_path = cid_path
+        self.modified_time = os.path.getmtime(cid_path)
+        self.cid = interface.Cid(cid_path)
+        # Modification time of the last version of the file that could not be read.
+        self.broken_modified_time = None
+
+
+class CidRegistry(object):
+    """
+    Compiled CIDs by name, which by default is the name of the CID file
+    without folder and suffix. Once the file of a CID changes, it is read
+    again the next time the CID is used. If reading fails, the previous
+    version remains in use until the file changes again.
+    """
+    def __init__(self):
+        self._name_to_entry_map = {}
+        self._lock = threading.Lock()
+
+    def add(self, cid_path, name=None):
+        """
+        Read the CID in ``cid_path`` and register it as ``name``.
+
+        :raises cutplace.errors.InterfaceError: if the CID is broken
+        :raises ValueError: if a CID named ``name`` is already registered
+        """
+        assert cid_path is not None
+
+        if name is None:
+            name = os.path.splitext(os.path.basename(cid_path))[0]
+        entry = _CidEntry(cid_path)
+        with self._lock:
+            if name in self._name_to_entry_map:
+                raise ValueError('CID %s must be registered only once' % _compat.text_repr(name))
+            self._name_to_entry_map[name] = entry
+        _log.info('registered CID %s from "%s"', _compat.text_repr(name), cid_path)
+
+    @property
+    def names(self):
+        """
+        Sorted names of all CIDs registered.
+        """
+        with self._lock:
+            return sorted(self._name_to_entry_map.keys())
+
+    def _entry(self, name):
+        """
+        The :py:class:`_CidEntry` registered as ``name``, read again if its
+        file has changed. Reading happens without holding the lock so
+        requests for other CIDs do not have to wait for it. A changed
+        version of the file that cannot be read is not read again until the
+        file changes once more.
+
+        :raises KeyError: if no CID is registered as ``name``
+        """
+        with self._lock:
+            entry = self._name_to_entry_map[name]
+        try:
+            modified_time = os.path.getmtime(entry.cid_path)
+            if modified_time not in (entry.modified_time, entry.broken_modified_time):
+                _log.info('reload changed CID %s from "%s"', _compat.text_repr(name), entry.cid_path)
+                try:
+                    changed_entry = _CidEntry(entry.cid_path)
+                except errors.CutplaceError:
+                    entry.broken_modified_time = modified_time
+                    raise
+                with self._lock:
+                    if self._name_to_entry_map[name] is entry:
+                        self._name_to_entry_map[name] = changed_entry
+                    entry = self._name_to_entry_map[name]
+        except (EnvironmentError, OSError, errors.CutplaceError) as error:
+            _log.error('cannot reload CID %s, continuing with previous version: %s', _compat.text_repr(name), error)
+        return entry
+
+    def cid(self, name):
+        """
+        The :py:class:`cutplace.interface.Cid` registered as ``name``.
+
+        :raises KeyError: if no CID is registered as ``name``
+        """
+        return self._entry(name).cid
+
+
+class _ContentStream(io.RawIOBase):
+    """
+    Binary stream reading the ``content_length`` bytes of a request body
+    from ``source_stream`` without reading past them.
+    """
+    def __init__(self, source_stream, content_length):
+        assert source_stream is not None
+        assert content_length >= 0
+
+        super(_ContentStream, self).__init__()
+        self._source_stream = source_stream
+        self._remaining_length = content_length
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer_to_fill):
+        length_to_read = min(len(buffer_to_fill), self._remaining_length)
+        if length_to_read > 0:
+            data_read = self._source_stream.read(length_to_read)
+            length_read = len(data_read)
+            buffer_to_fill[:length_read] = data_read
+            self._remaining_length -= length_read
+        else:
+            length_read = 0
+        return length_read
+
+    def skip_rest(self):
+        """
+        Read and ignore the part of the body not read yet so the connection
+        can be reused.
+        """
+        while self._remaining_length > 0:
+            data_read = self._source_stream.read(min(_STREAM_CHUNK_SIZE, self._remaining_length))
+            if not data_read:
+                break
+            self._remaining_length -= len(data_read)
+
+
+def validation_result(cid, data_stream_or_path, max_reported_errors=DEFAULT_MAX_REPORTED_ERRORS):
+    """
+    Validate ``data_stream_or_path`` against ``cid`` and describe the
+    result in a :py:class:`dict` with:
+
+    * ``"accepted"``: the number of rows accepted
+    * ``"rejected"``: the number of rows rejected
+    * ``"is_ok"``: ``true`` if all rows have been accepted
+    * ``"errors"``: up to ``max_reported_errors`` errors as described by
+      :py:func:`cutplace.sinks.error_record()`
+
+    If the data cannot be read at all, for example because a delimited
+    file has an unterminated quote, ``"errors"`` ends with this error.
+    """
+    assert cid is not None
+    assert data_stream_or_path is not None
+    assert max_reported_errors >= 0
+
+    error_records = []
+    accepted_row_count = 0
+    rejected_row_count = 0
+    try:
+        with validio.Reader(cid, data_stream_or_path, on_error='yield') as reader:
+            for column_batch in reader.column_batches():
+                accepted_row_count += column_batch.row_count
+                rejected_row_count += len(column_batch.errors)
+                for error in column_batch.errors[:max(0, max_reported_errors - len(error_records))]:
+                    error_records.append(sinks.error_record(error))
+    except errors.DataError as error:
+        rejected_row_count += 1
+        if len(error_records) < max_reported_errors:
+            error_records.append(sinks.error_record(error))
+    return {
+        'accepted': accepted_row_count,
+        'rejected': rejected_row_count,
+        'is_ok': rejected_row_count == 0,
+        'errors': error_records,
+    }
+
+
+class _ValidationRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Handler for requests to a :py:class:`~cutplace.server.HttpServer` or
+    :py:class:`~cutplace.server.UnixServer`.
+    """
+    # Keep connections open so clients sending many small uploads do not
+    # have to connect each time.
+    protocol_version = 'HTTP/1.1'
+
+    def _send_json(self, status, result):
+        body = json.dumps(result, default=six.text_type, sort_keys=True).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', '%d' % len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_failure(self, status, message):
+        self._send_json(status, {'error': message})
+
+    def do_GET(self):
+        if self.path == CIDS_PATH:
+            self._send_json(200, {'cids': self.server.cid_registry.names})
+        else:
+            self._send_failure(404, 'path must be %s but is: %s' % (CIDS_PATH, self.path))
+
+    def do_POST(self):
+        if not self.path.startswith(VALIDATE_PATH_PREFIX):
+            self._send_failure(404, 'path must start with %s but is: %s' % (VALIDATE_PATH_PREFIX, self.path))
+            self.close_connection = True
+            return
+        cid_name = unquote(self.path[len(VALIDATE_PATH_PREFIX):])
+        content_length_text = self.headers.get('Content-Length')
+        if content_length_text is None:
+            self._send_failure(411, 'header Content-Length must be specified')
+            self.close_connection = True
+            return
+        try:
+            content_length = int(content_length_text)
+            if content_length < 0:
+                raise ValueError('Content-Length must be at least 0')
+        except ValueError:
+            self._send_failure(400, 'header Content-Length must be a number but is: %s' % content_length_text)
+            self.close_connection = True
+            return
+        content_stream = _ContentStream(self.rfile, content_length)
+        try:
+            try:
+                cid = self.server.cid_registry.cid(cid_name)
+            except KeyError:
+                self._send_failure(404, 'CID must be one of %s but is: %s' % (self.server.cid_registry.names, cid_name))
+                return
+            result = self._validation_result(cid, content_stream)
+            result['cid'] = cid_name
+            self._send_json(200, result)
+        finally:
+            content_stream.skip_rest()
+
+    def _validation_result(self, cid, content_stream):
+        """
+        Same as :py:func:`~cutplace.server.validation_result()` with the
+        data read from ``content_stream``. Delimited and fixed data are
+        streamed straight into the validation while spreadsheets are stored
+        in a temporary file first because they can only be read from a
+        file.
+        """
+        data_format = cid.data_format
+        max_reported_errors = self.server.max_reported_errors
+        spreadsheet_suffix = _DATA_FORMAT_TO_SUFFIX_MAP.get(data_format.format)
+        if spreadsheet_suffix is None:
+            with io.TextIOWrapper(
+                    io.BufferedReader(content_stream, _STREAM_CHUNK_SIZE), encoding=data_format.encoding,
+                    newline='') as data_stream:
+                result = validation_result(cid, data_stream, max_reported_errors)
+        else:
+            data_file_descriptor, data_path = tempfile.mkstemp(suffix=spreadsheet_suffix, prefix='cutplace_')
+            try:
+                with io.open(data_file_descriptor, 'wb') as data_file:
+                    while True:
+                        chunk = content_stream.read(_STREAM_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        data_file.write(chunk)
+                result = validation_result(cid, data_path, max_reported_errors)
+            finally:
+                os.remove(data_path)
+        return result
+
+    def log_message(self, message_format, *args):
+        _log.debug(message_format, *args)
+
+
+class _WorkerPoolMixIn(object):
+    """
+    Mix-in for :py:class:`socketserver.BaseServer` that handles requests
+    using a fixed number of worker threads instead of one new thread per
+    request, which limits the number of concurrent validations and the
+    memory they use.
+    """
+    def start_workers(self, worker_count):
+        assert worker_count >= 1
+
+        self._request_queue = queue.Queue()
+        self._workers = []
+        for worker_number in range(1, worker_count + 1):
+            worker = threading.Thread(target=self._process_queued_requests, name='cutplace-worker-%d' % worker_number)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def _process_queued_requests(self):
+        while True:
+            request_and_client_address = self._request_queue.get()
+            if request_and_client_address is None:
+                break
+            request, client_address = request_and_client_address
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def process_request(self, request, client_address):
+        self._request_queue.put((request, client_address))
+
+    def server_close(self):
+        try:
+            super(_WorkerPoolMixIn, self).server_close()
+        finally:
+            for _ in self._workers:
+                self._request_queue.put(None)
+            for worker in self._workers:
+                worker.join()
+            self._workers = []
+
+
+class _ValidationServerMixIn(_WorkerPoolMixIn):
+    def setup_validation(self, cid_registry, worker_count, max_reported_errors):
+        assert cid_registry is not None
+        assert max_reported_errors >= 0
+
+        self.cid_registry = cid_registry
+        self.max_reported_errors = max_reported_errors
+        self.start_workers(worker_count)
+
+
+class HttpServer(_ValidationServerMixIn, BaseHTTPServer.HTTPServer):
+    """
+    Server that validates data sent using HTTP to ``host`` and ``port``
+    against the CIDs in ``cid_registry``, handling up to ``worker_count``
+    requests concurrently.
+
+    To validate data, ``POST`` them to ``/validate/`` followed by the name
+    of the CID with the header ``Content-Length`` set to the size of the
+    data. The response is a JSON object as described in
+    :py:func:`~cutplace.server.validation_result()` with an additional
+    ``"cid"`` holding the name of the CID. To obtain the names of all CIDs,
+    ``GET /cids``.
+
+    Validations run concurrently even if they use the same CID.
+    """
+    allow_reuse_address = True
+
+    def __init__(
+            self, cid_registry, host='localhost', port=DEFAULT_SERVER_PORT, worker_count=DEFAULT_WORKER_COUNT,
+            max_reported_errors=DEFAULT_MAX_REPORTED_ERRORS):
+        assert host is not None
+        assert port >= 0
+
+        BaseHTTPServer.HTTPServer.__init__(self, (host, port), _ValidationRequestHandler)
+        self.setup_validation(cid_registry, worker_count, max_reported_errors)
+
+
+if has_unix_sockets:
+    class UnixServer(_ValidationServerMixIn, socketserver.UnixStreamServer):
+        """
+        Same as :py:class:`~cutplace.server.HttpServer` but listening on the
+        Unix domain socket ``socket_path``, which is removed first if it
+        already exists.
+        """
+        def __init__(
+                self, cid_registry, socket_path, worker_count=DEFAULT_WORKER_COUNT,
+                max_reported_errors=DEFAULT_MAX_REPORTED_ERRORS):
+            assert socket_path is not None
+
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            socketserver.UnixStreamServer.__init__(self, socket_path, _ValidationRequestHandler)
+            self.setup_validation(cid_registry, worker_count, max_reported_errors)
+
+
+def server_address(address_text):
+    """
+    The address a server should listen on as specified by
+    ``address_text``, which can be ``unix:PATH`` for a Unix domain socket,
+    resulting in the ``PATH``, or ``HOST:PORT`` or just ``PORT``, resulting
+    in a tuple ``(host, port)`` with the host defaulting to
+    ``localhost``.
+
+    :raises ValueError: if the port is not a number between 0 and 65535, \
+      the path of the socket is empty or the platform does not support \
+      Unix domain sockets
+    """
+    assert address_text is not None
+
+    if address_text.startswith(UNIX_SOCKET_PREFIX):
+        if not has_unix_sockets:
+            raise ValueError('Unix domain sockets are not supported on this platform')
+        result = address_text[len(UNIX_SOCKET_PREFIX):]
+        if not result:
+            raise ValueError('path of Unix domain socket must be specified: %s' % _compat.text_repr(address_text))
+    else:
+        host, _, port_text = address_text.rpartition(':')
+        port = int(port_text)
+        if not (0 <= port <= 65535):
+            raise ValueError('port must be between 0 and 65535 but is %d' % port)
+        result = (host or 'localhost', port)
+    return result
+
+
+def create_server(
+        cid_registry, address=('localhost', DEFAULT_SERVER_PORT), worker_count=DEFAULT_WORKER_COUNT,
+        max_reported_errors=DEFAULT_MAX_REPORTED_ERRORS):
+    """
+    A :py:class:`~cutplace.server.HttpServer` for ``address`` being a tuple
+    ``(host, port)``, or a :py:class:`~cutplace.server.UnixServer` for
+    ``address`` being the path of a socket, as returned by
+    :py:func:`~cutplace.server.server_address()`.
+    """
+    assert cid_registry is not None
+    assert address is not None
+
+    if isinstance(address, six.string_types):
+        result = UnixServer(cid_registry, address, worker_count, max_reported_errors)
+    else:
+        host, port = address
+        result = HttpServer(cid_registry, host, port, worker_count, max_reported_errors)
+    return result
+
+
+def serve(cid_paths, address=('localhost', DEFAULT_SERVER_PORT), worker_count=DEFAULT_WORKER_COUNT):
+    """
+    Register the CIDs in ``cid_paths`` and validate data sent to
+    ``address`` until interrupted, for example by pressing Control-C.
+    """
+    assert cid_paths is not None
+
+    cid_registry = CidRegistry()
+    for cid_path in cid_paths:
+        cid_registry.add(cid_path)
+    validation_server = create_server(cid_registry, address, worker_count)
+    try:
+        _log.info('validate data sent to %s using %d workers', _address_text(address), worker_count)
+        validation_server.serve_forever()
+    except KeyboardInterrupt:
+        _log.info('stop serving')
+    finally:
+        validation_server.server_close()
+
+
+def _address_text(address):
+    return UNIX_SOCKET_PREFIX + address if isinstance(address, six.string_types) else 'http://%s:%d' % address
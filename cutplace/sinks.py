@@ -0,0 +1,217 @@
+"""
+Sinks to stream rejected rows and details about why they were rejected to
+files while validation proceeds.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+
+import six
+
+from cutplace import data
+from cutplace import interface
+from cutplace import rowio
+
+#: Default number of rejected rows a sink collects before actually writing
+#: them.
+DEFAULT_SINK_BUFFER_SIZE = 1000
+
+
+class AbstractErrorSink(object):
+    """
+    Base class for sinks that receive rejected rows together with the
+    :py:exc:`cutplace.errors.DataError` explaining the rejection, for
+    example from :py:meth:`cutplace.validio.Reader.add_error_sink()`.
+
+    Rejected rows are collected in a buffer that is written in one go once
+    it holds ``buffer_size`` items, on :py:meth:`~.flush()` and on
+    :py:meth:`~.close()`, which is also called at the end of a ``with``
+    statement.
+    """
+    def __init__(self, buffer_size=DEFAULT_SINK_BUFFER_SIZE):
+        assert buffer_size >= 1
+
+        self._buffer_size = buffer_size
+        self._buffer = []
+        self.written_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, error, row):
+        """
+        Remember that ``row`` was rejected because of ``error`` and write
+        all buffered items if the buffer is full.
+
+        :param cutplace.errors.DataError error: the reason why ``row`` was \
+          rejected
+        :param list row: the raw row as read from the data
+        """
+        assert error is not None
+        assert row is not None
+
+        self._buffer.append(self._buffered_item(error, row))
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered items.
+        """
+        if self._buffer:
+            self._write_buffer(self._buffer)
+            self.written_count += len(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        """
+        Write all buffered items and release the target.
+        """
+        self.flush()
+
+    def _buffered_item(self, error, row):
+        raise NotImplementedError
+
+    def _write_buffer(self, items):
+        raise NotImplementedError
+
+
+def error_record(error):
+    """
+    A :py:class:`dict` describing ``error`` in the same way as a line
+    written by :py:class:`~cutplace.sinks.JsonLinesErrorSink`.
+
+    :param cutplace.errors.DataError error: the error to describe
+    """
+    assert error is not None
+
+    location = error.location
+    return {
+        'file': location.file_path if location is not None else None,
+        'row': location.line + 1 if location is not None else None,
+        'cell': location.position_text() if location is not None else None,
+        'field': error.field_name,
+        'value': error.value,
+        'code': error.code,
+        'reason': error.message,
+    }
+
+
+class JsonLinesErrorSink(AbstractErrorSink):
+    """
+    Sink that describes each rejected row as JSON object in a separate line
+    of ``target`` (`JSON Lines <http://jsonlines.org/>`_). Each object
+    contains:
+
+    * ``"file"``: path of the data that contained the row
+    * ``"row"``: the number of the row starting with 1
+    * ``"cell"``: the position in the data, for example ``"R3C1"``
+    * ``"field"``: the name of the field the error refers to or ``null``
+    * ``"value"``: the value that caused the error or ``null``
+    * ``"code"``: the kind of error, for example ``"range"``, or ``null``
+    * ``"reason"``: a human readable description of the error
+
+    :param target: :py:class:`str` or filelike object to write to; a \
+      :py:class:`str` is assumed to be a path to a file which is opened \
+      here and closed with :py:meth:`~.close()`
+    """
+    def __init__(self, target, buffer_size=DEFAULT_SINK_BUFFER_SIZE):
+        assert target is not None
+
+        super(JsonLinesErrorSink, self).__init__(buffer_size)
+        self._has_opened_target_stream = isinstance(target, six.string_types)
+        if self._has_opened_target_stream:
+            self._target_stream = io.open(target, 'w', encoding='utf-8', newline='')
+        else:
+            self._target_stream = target
+
+    def _buffered_item(self, error, row):
+        return six.text_type(json.dumps(error_record(error), default=six.text_type, sort_keys=True)) + '\n'
+
+    def _write_buffer(self, items):
+        self._target_stream.write(''.join(items))
+
+    def close(self):
+        try:
+            super(JsonLinesErrorSink, self).close()
+        finally:
+            if self._has_opened_target_stream:
+                self._target_stream.close()
+                self._has_opened_target_stream = False
+
+
+class QuarantineSink(AbstractErrorSink):
+    """
+    Sink that copies rejected rows to ``target`` in the data format of
+    ``cid`` so they can be fixed and validated again. Delimited and fixed
+    data are written using their respective data format; because Excel and
+    ODS cannot be written, rows from such data end up in a delimited file
+    with a comma as delimiter and UTF-8 encoding.
+
+    Header rows are not copied.
+
+    :param target: :py:class:`str` or filelike object to write to; a \
+      :py:class:`str` is assumed to be a path to a file which is opened \
+      here and closed with :py:meth:`~.close()`
+    :param cutplace.interface.Cid cid: the CID describing the data the \
+      rejected rows come from
+    """
+    def __init__(self, target, cid, buffer_size=DEFAULT_SINK_BUFFER_SIZE):
+        assert target is not None
+        assert cid is not None
+
+        super(QuarantineSink, self).__init__(buffer_size)
+        data_format = cid.data_format
+        self._field_lengths = None
+        if data_format.format == data.FORMAT_DELIMITED:
+            self._row_writer = rowio.DelimitedRowWriter(target, data_format)
+        elif data_format.format == data.FORMAT_FIXED:
+            field_names_and_lengths = interface.field_names_and_lengths(cid)
+            self._field_lengths = [field_length for _, field_length in field_names_and_lengths]
+            self._row_writer = rowio.FixedRowWriter(target, data_format, field_names_and_lengths)
+        else:
+            delimited_data_format = data.DataFormat(data.FORMAT_DELIMITED)
+            delimited_data_format.set_property(data.KEY_ENCODING, 'utf-8')
+            delimited_data_format.validate()
+            self._row_writer = rowio.DelimitedRowWriter(target, delimited_data_format)
+
+    def _buffered_item(self, error, row):
+        if self._field_lengths is not None:
+            # Pad values in the same way as :py:class:`cutplace.validio.Writer`.
+            result = [
+                value + ' ' * (field_length - len(value)) if len(value) < field_length else value
+                for value, field_length in zip(row, self._field_lengths)]
+        else:
+            result = list(row)
+        return result
+
+    def _write_buffer(self, items):
+        self._row_writer.write_rows(items)
+
+    def close(self):
+        try:
+            super(QuarantineSink, self).close()
+        finally:
+            if self._row_writer.target_stream is not None:
+                self._row_writer.close()
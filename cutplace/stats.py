@@ -0,0 +1,227 @@
+"""
+Statistics on where validation spends its time.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import os
+import pstats
+import re
+import timeit
+
+import six
+
+from cutplace import _compat
+
+#: Stage for reading and decoding rows from the data.
+STAGE_READ = 'read'
+#: Stage for validating fields using their field format.
+STAGE_FIELDS = 'fields'
+#: Stage for checking rows and the end of the data.
+STAGE_CHECKS = 'checks'
+#: Stage for writing rows to the target.
+STAGE_WRITE = 'write'
+
+#: All stages in the order they take place.
+STAGES = (STAGE_READ, STAGE_FIELDS, STAGE_CHECKS, STAGE_WRITE)
+
+#: Timer used to measure time; this is the most precise timer available.
+timer = timeit.default_timer
+
+#: Default number of functions listed by
+#: :py:func:`~cutplace.stats.write_profile_report()`.
+DEFAULT_PROFILE_REPORT_LIMIT = 40
+
+
+@_compat.python_2_unicode_compatible
+class Timing(object):
+    """
+    Cumulative time in seconds spent on something and how often this
+    happened.
+    """
+    def __init__(self):
+        self.seconds = 0.0
+        self.count = 0
+
+    def add(self, seconds, count=1):
+        assert seconds >= 0
+        assert count >= 0
+
+        self.seconds += seconds
+        self.count += count
+
+    def __str__(self):
+        return '%.3fs for %d' % (self.seconds, self.count)
+
+
+@_compat.python_2_unicode_compatible
+class ValidationStats(object):
+    """
+    Time spent by a :py:class:`cutplace.validio.Reader` or
+    :py:class:`cutplace.validio.Writer` in each of the
+    :py:const:`~cutplace.stats.STAGES` as well as for each field format
+    and check, as obtained by
+    :py:meth:`cutplace.validio.BaseValidator.enable_stats()`.
+
+    For :py:const:`~cutplace.stats.STAGE_FIELDS` the count is the number
+    of values validated, otherwise it is the number of rows read or written
+    respectively the number of calls to a check.
+
+    :param int byte_count: the number of bytes of the data, if known
+    """
+    def __init__(self, byte_count=None):
+        assert (byte_count is None) or (byte_count >= 0)
+
+        self.stage_timings = dict((stage, Timing()) for stage in STAGES)
+        self.field_timings = {}
+        self.check_timings = {}
+        self.row_count = 0
+        self.byte_count = byte_count
+        self._start_time = timer()
+        self._end_time = None
+
+    def add_time(self, stage, seconds, count=1, name=None):
+        """
+        Add ``seconds`` spent to process ``count`` items in ``stage``. For
+        :py:const:`~cutplace.stats.STAGE_FIELDS` and
+        :py:const:`~cutplace.stats.STAGE_CHECKS`, ``name`` is the name of
+        the field respectively check.
+        """
+        assert stage in STAGES, 'stage=%r' % stage
+        assert (name is None) or (stage in (STAGE_FIELDS, STAGE_CHECKS))
+
+        self.stage_timings[stage].add(seconds, count)
+        if name is not None:
+            name_to_timing_map = self.field_timings if stage == STAGE_FIELDS else self.check_timings
+            timing = name_to_timing_map.get(name)
+            if timing is None:
+                timing = Timing()
+                name_to_timing_map[name] = timing
+            timing.add(seconds, count)
+
+    def timed_rows(self, rows):
+        """
+        Same as ``rows`` but with the time to obtain each row added to
+        :py:const:`~cutplace.stats.STAGE_READ`.
+        """
+        row_iterator = iter(rows)
+        while True:
+            start_time = timer()
+            try:
+                row = next(row_iterator)
+            except StopIteration:
+                self.add_time(STAGE_READ, timer() - start_time, 0)
+                return
+            self.add_time(STAGE_READ, timer() - start_time)
+            self.row_count += 1
+            yield row
+
+    def stop(self):
+        """
+        Stop measuring :py:attr:`~.elapsed_seconds`. When called a second
+        time, do nothing.
+        """
+        if self._end_time is None:
+            self._end_time = timer()
+
+    @property
+    def elapsed_seconds(self):
+        """
+        Seconds passed between creating the stats and :py:meth:`~.stop()`
+        or now if they are not stopped yet.
+        """
+        end_time = self._end_time if self._end_time is not None else timer()
+        return end_time - self._start_time
+
+    @property
+    def rows_per_second(self):
+        elapsed_seconds = self.elapsed_seconds
+        return self.row_count / elapsed_seconds if elapsed_seconds > 0 else 0.0
+
+    @property
+    def bytes_per_second(self):
+        """
+        Number of bytes processed per second or ``None`` if the size of the
+        data is unknown, for example because they have been read from a
+        stream.
+        """
+        elapsed_seconds = self.elapsed_seconds
+        if self.byte_count is None:
+            result = None
+        else:
+            result = self.byte_count / elapsed_seconds if elapsed_seconds > 0 else 0.0
+        return result
+
+    def lines(self):
+        """
+        Human readable lines describing the stats, with fields and checks
+        ordered by the time spent on them, slowest first.
+        """
+        result = []
+        throughput = '%d rows in %.3fs (%.0f rows/s' % (self.row_count, self.elapsed_seconds, self.rows_per_second)
+        bytes_per_second = self.bytes_per_second
+        if bytes_per_second is not None:
+            throughput += ', %.0f bytes/s' % bytes_per_second
+        throughput += ')'
+        result.append(throughput)
+        for stage in STAGES:
+            stage_timing = self.stage_timings[stage]
+            if stage_timing.count > 0:
+                result.append('%s: %s' % (stage, stage_timing))
+                if stage == STAGE_FIELDS:
+                    name_to_timing_map = self.field_timings
+                elif stage == STAGE_CHECKS:
+                    name_to_timing_map = self.check_timings
+                else:
+                    name_to_timing_map = {}
+                for name, timing in sorted(
+                        name_to_timing_map.items(), key=lambda name_and_timing: -name_and_timing[1].seconds):
+                    result.append('  %s: %s' % (_compat.text_repr(name), timing))
+        return result
+
+    def __str__(self):
+        return '; '.join(self.lines())
+
+
+def write_profile_report(profile_path, report_path, stats_lines=None, limit=DEFAULT_PROFILE_REPORT_LIMIT):
+    """
+    Write a human readable report about the profile stored in
+    ``profile_path`` by :py:mod:`cProfile` to ``report_path``. The report
+    lists the ``limit`` functions of cutplace itself with the most
+    cumulative time, slowest first, preceded by ``stats_lines``, for
+    example the :py:meth:`ValidationStats.lines()` describing the time
+    spent for each field and check.
+    """
+    assert profile_path is not None
+    assert report_path is not None
+    assert limit >= 1
+
+    cutplace_folder_regex = re.escape(os.path.dirname(os.path.abspath(__file__)))
+    if six.PY2:
+        # HACK: With Python 2, pstats writes str and fails with a TypeError on unicode streams.
+        report_file = open(report_path, 'w')
+    else:
+        report_file = io.open(report_path, 'w', encoding='utf-8')
+    with report_file:
+        if stats_lines:
+            stats_text = '\n'.join(stats_lines) + '\n\n'
+            report_file.write(stats_text.encode('utf-8') if six.PY2 else stats_text)
+        profile_stats = pstats.Stats(profile_path, stream=report_file)
+        profile_stats.sort_stats('cumulative').print_stats(cutplace_folder_regex, limit)
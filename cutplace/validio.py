@@ -20,19 +20,87 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import array
+import copy
+import decimal
+import hashlib
+import io
 import itertools
+import json
+import math
+import os
+import random
+import time
 
 import six
 
 from cutplace import data
 from cutplace import errors
+from cutplace import fields
 from cutplace import interface
+from cutplace import metrics
+from cutplace import plans
+from cutplace import results
+from cutplace import stats
 from cutplace import rowio
 from cutplace import _compat
 
+if fields.has_numpy:
+    import numpy
+
 # Valid choices for ``on_error`` parameter.
 _VALID_ON_ERROR_CHOICES = ('continue', 'raise', 'yield')
 
+# Type codes for :py:class:`array.array`; ``str()`` is needed for Python 2,
+# which also lacks 64 bit integer arrays.
+_CODE_TYPECODE = str('i')
+_INT64_TYPECODE = str('q')
+try:
+    array.array(_INT64_TYPECODE)
+    _has_int64_array = True
+except ValueError:
+    _has_int64_array = False
+
+#: Default number of rows in each batch produced by
+#: :py:meth:`cutplace.validio.Reader.column_batches()`.
+DEFAULT_COLUMN_BATCH_SIZE = 10000
+
+#: Number of rows that have to be read before ``max_error_rate`` of
+#: :py:class:`cutplace.validio.Reader` takes effect so that a few broken
+#: rows at the beginning of the data do not stop reading.
+MIN_ROW_COUNT_FOR_ERROR_RATE = 100
+
+#: Default number of rows after which
+#: :py:meth:`cutplace.validio.Reader.rows()` writes a checkpoint, see
+#: :py:meth:`cutplace.validio.Reader.set_checkpoint()`.
+DEFAULT_CHECKPOINT_ROW_COUNT = 100000
+
+#: Suffix appended to the path of the data to obtain the default path of
+#: the checkpoint file.
+CHECKPOINT_SUFFIX = '.cutplace-checkpoint'
+
+# Version of the checkpoint file format, to be incremented on incompatible changes.
+_CHECKPOINT_VERSION = 3
+# Suffix appended to the path of the checkpoint and a generation to obtain the path of the log the
+# states of the checks are appended to.
+_STATE_LOG_SUFFIX = '.state'
+# Factor by which the state log may grow beyond its size after the last compaction before it is
+# compacted again. This keeps the total size written for the check states linear to the number of rows.
+_STATE_LOG_COMPACTION_FACTOR = 2
+# Number of bytes to remember a digest of so data changed since the checkpoint can be detected.
+_CHECKPOINT_DIGEST_SIZE = 4096
+
+#: Factor for :py:meth:`cutplace.validio.SampleReport.error_rate_interval()`
+#: to compute a 95% confidence interval.
+Z_FOR_95_PERCENT_CONFIDENCE = 1.959963984540054
+
+#: Default minimum number of seconds between two calls to the callback set
+#: with :py:meth:`cutplace.validio.Reader.set_progress_callback()`.
+DEFAULT_PROGRESS_INTERVAL = 1.0
+
+# Number of rows after which to look at the clock to find out if progress should be reported.
+_PROGRESS_ROW_STEP = 256
+
 
 def _create_field_map(field_names, field_values):
     assert field_names
@@ -42,6 +110,435 @@ def _create_field_map(field_names, field_values):
     return dict(zip(field_names, field_values))
 
 
+class ScaledDecimalColumn(object):
+    """
+    Column of :py:class:`decimal.Decimal` values stored as integers scaled
+    by ``10 ** precision``, for example 17.23 with a precision of 2 is
+    stored as 1723.
+    """
+    def __init__(self, scaled_values, precision):
+        assert scaled_values is not None
+        assert precision >= 0
+
+        self.scaled_values = scaled_values
+        self.precision = precision
+
+    def __len__(self):
+        return len(self.scaled_values)
+
+    def __getitem__(self, index):
+        return decimal.Decimal(int(self.scaled_values[index])).scaleb(-self.precision)
+
+    def __iter__(self):
+        for scaled_value in self.scaled_values:
+            yield decimal.Decimal(int(scaled_value)).scaleb(-self.precision)
+
+
+class DictionaryEncodedColumn(object):
+    """
+    Column of values stored as integer ``codes`` pointing into a
+    ``dictionary`` of distinct values, which is compact for values that
+    repeat a lot, for example the values of a
+    :py:class:`~cutplace.fields.ChoiceFieldFormat`.
+    """
+    def __init__(self, codes, dictionary):
+        assert codes is not None
+        assert dictionary is not None
+
+        self.codes = codes
+        self.dictionary = dictionary
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.dictionary[self.codes[index]]
+
+    def __iter__(self):
+        dictionary = self.dictionary
+        for code in self.codes:
+            yield dictionary[code]
+
+
+def _compact_column(field_format, values, use_numpy=False):
+    """
+    The validated ``values`` of ``field_format`` in a compact container if
+    possible, otherwise just ``values``:
+
+    * integers without empty values: :py:class:`array.array` of type
+      ``'q'``
+    * decimals without empty values: :py:class:`ScaledDecimalColumn`
+    * texts with less than half of the values being distinct:
+      :py:class:`DictionaryEncodedColumn`
+
+    With ``use_numpy``, arrays are :py:class:`numpy.ndarray` instead.
+    """
+    assert field_format is not None
+    assert values is not None
+
+    result = values
+    if values and (None not in values):
+        try:
+            if _has_int64_array and isinstance(field_format, fields.IntegerFieldFormat):
+                result = array.array(_INT64_TYPECODE, values)
+                if use_numpy:
+                    result = numpy.frombuffer(result, dtype=numpy.int64)
+            elif _has_int64_array and isinstance(field_format, fields.DecimalFieldFormat):
+                precision = field_format.valid_range.precision
+                if all(value.as_tuple().exponent >= -precision for value in values):
+                    scaled_values = array.array(_INT64_TYPECODE, [int(value.scaleb(precision)) for value in values])
+                    if use_numpy:
+                        scaled_values = numpy.frombuffer(scaled_values, dtype=numpy.int64)
+                    result = ScaledDecimalColumn(scaled_values, precision)
+            elif all(isinstance(value, six.text_type) for value in values):
+                value_to_code_map = {}
+                codes = [value_to_code_map.setdefault(value, len(value_to_code_map)) for value in values]
+                if 2 * len(value_to_code_map) <= len(values):
+                    dictionary = sorted(value_to_code_map, key=value_to_code_map.get)
+                    codes = array.array(_CODE_TYPECODE, codes)
+                    if use_numpy:
+                        codes = numpy.frombuffer(codes, dtype=numpy.intc)
+                    result = DictionaryEncodedColumn(codes, dictionary)
+        except (OverflowError, TypeError):
+            # Values do not fit into 64 bit integers or are of an unexpected
+            # type (for example from a plugin), so keep them as they are.
+            result = values
+    return result
+
+
+class ColumnBatch(object):
+    """
+    A batch of validated rows stored column wise as produced by
+    :py:meth:`cutplace.validio.Reader.column_batches()`.
+    """
+    def __init__(self, field_names, columns, row_count, errors=None):
+        assert field_names is not None
+        assert columns is not None
+        assert len(field_names) == len(columns)
+        assert row_count >= 0
+
+        self._field_names = field_names
+        self._field_name_to_index_map = dict((field_name, index) for index, field_name in enumerate(field_names))
+        self._columns = columns
+        self._row_count = row_count
+        self._errors = errors if errors is not None else []
+
+    @property
+    def field_names(self):
+        """Names of the fields in the same order as :py:attr:`~.columns`."""
+        return self._field_names
+
+    @property
+    def columns(self):
+        """
+        The validated values for each field, either as :py:class:`list`,
+        :py:class:`array.array`, :py:class:`numpy.ndarray`,
+        :py:class:`~cutplace.validio.ScaledDecimalColumn` or
+        :py:class:`~cutplace.validio.DictionaryEncodedColumn`. All of them
+        support ``len()``, iteration and access by index.
+        """
+        return self._columns
+
+    @property
+    def row_count(self):
+        """Number of accepted rows in the batch."""
+        return self._row_count
+
+    @property
+    def errors(self):
+        """
+        The :py:exc:`cutplace.errors.DataError` for each rejected row in
+        case the :py:class:`~cutplace.validio.Reader` uses
+        ``on_error='yield'``, otherwise an empty list.
+        """
+        return self._errors
+
+    def column(self, field_name):
+        """The validated values of the field named ``field_name``."""
+        return self._columns[self._field_name_to_index_map[field_name]]
+
+    def __len__(self):
+        return self._row_count
+
+
+class SampleReport(object):
+    """
+    Result of :py:meth:`cutplace.validio.Reader.sample()` describing how
+    many rows have been validated and how many of them were broken, which
+    allows to estimate the error rate of all rows.
+    """
+    def __init__(self, row_count, sampled_row_count, errors):
+        assert row_count >= 0
+        assert 0 <= sampled_row_count <= row_count
+        assert len(errors) <= sampled_row_count
+
+        self._row_count = row_count
+        self._sampled_row_count = sampled_row_count
+        self._errors = errors
+
+    @property
+    def row_count(self):
+        """Number of data rows excluding header rows."""
+        return self._row_count
+
+    @property
+    def sampled_row_count(self):
+        """Number of data rows that have been validated."""
+        return self._sampled_row_count
+
+    @property
+    def errors(self):
+        """The :py:exc:`cutplace.errors.DataError` for each rejected row."""
+        return self._errors
+
+    @property
+    def rejected_row_count(self):
+        return len(self._errors)
+
+    @property
+    def coverage(self):
+        """Ratio of validated rows, between 0.0 and 1.0."""
+        return self._sampled_row_count / self._row_count if self._row_count > 0 else 1.0
+
+    @property
+    def error_rate(self):
+        """Ratio of rejected rows in the sample, between 0.0 and 1.0."""
+        return self.rejected_row_count / self._sampled_row_count if self._sampled_row_count > 0 else 0.0
+
+    def error_rate_interval(self, z=Z_FOR_95_PERCENT_CONFIDENCE):
+        """
+        Tuple ``(lower, upper)`` describing the range the error rate of all
+        rows is in with a confidence specified by ``z``, which is 1.96 for
+        95%. This uses the Wilson score interval, which also works for
+        small samples and error rates close to 0 or 1. If all rows have
+        been validated, the interval only contains the actual error rate.
+        """
+        assert z > 0
+
+        error_rate = self.error_rate
+        if self._sampled_row_count == self._row_count:
+            result = (error_rate, error_rate)
+        elif self._sampled_row_count == 0:
+            result = (0.0, 1.0)
+        else:
+            n = self._sampled_row_count
+            z_squared = z * z
+            denominator = 1 + z_squared / n
+            center = (error_rate + z_squared / (2 * n)) / denominator
+            spread = z * math.sqrt(error_rate * (1 - error_rate) / n + z_squared / (4 * n * n)) / denominator
+            result = (max(0.0, center - spread), min(1.0, center + spread))
+        return result
+
+    def __str__(self):
+        lower_error_rate, upper_error_rate = self.error_rate_interval()
+        return 'validated %d of %d rows (%.1f%%) and rejected %d; ' \
+            'estimated error rate: %.1f%% (95%% confidence interval: %.1f%% to %.1f%%)' % (
+                self._sampled_row_count, self._row_count, 100 * self.coverage, self.rejected_row_count,
+                100 * self.error_rate, 100 * lower_error_rate, 100 * upper_error_rate)
+
+
+class ChangeReport(object):
+    """
+    Result of :py:meth:`cutplace.validio.Reader.validate_changes()`
+    describing how many rows are new or changed compared to the previous
+    version of the data and which rows were rejected.
+    """
+    def __init__(self, row_count, changed_row_count, errors):
+        assert row_count >= 0
+        assert 0 <= changed_row_count <= row_count
+        assert len(errors) <= row_count
+
+        self._row_count = row_count
+        self._changed_row_count = changed_row_count
+        self._errors = errors
+
+    @property
+    def row_count(self):
+        """Number of data rows excluding header rows."""
+        return self._row_count
+
+    @property
+    def changed_row_count(self):
+        """Number of data rows that are new or changed and consequently had their fields validated."""
+        return self._changed_row_count
+
+    @property
+    def unchanged_row_count(self):
+        """Number of data rows that are also part of the previous data."""
+        return self._row_count - self._changed_row_count
+
+    @property
+    def errors(self):
+        """The :py:exc:`cutplace.errors.DataError` for each rejected row."""
+        return self._errors
+
+    @property
+    def rejected_row_count(self):
+        return len(self._errors)
+
+    def __str__(self):
+        changed_percentage = 100 * self._changed_row_count / self._row_count if self._row_count > 0 else 0.0
+        return 'validated fields of %d new or changed rows of %d rows (%.1f%%) and rejected %d' % (
+            self._changed_row_count, self._row_count, changed_percentage, self.rejected_row_count)
+
+
+@_compat.python_2_unicode_compatible
+class Progress(object):
+    """
+    Progress of reading data as passed to the callback set with
+    :py:meth:`cutplace.validio.Reader.set_progress_callback()`.
+    """
+    def __init__(self, row_count, byte_count, total_byte_count, elapsed_seconds, is_done):
+        assert row_count >= 0
+        assert (byte_count is None) or (byte_count >= 0)
+        assert (total_byte_count is None) or (total_byte_count >= 0)
+        assert elapsed_seconds >= 0
+
+        self._row_count = row_count
+        self._byte_count = byte_count
+        self._total_byte_count = total_byte_count
+        self._elapsed_seconds = elapsed_seconds
+        self._is_done = is_done
+
+    @property
+    def row_count(self):
+        """Number of rows read so far including header rows."""
+        return self._row_count
+
+    @property
+    def byte_count(self):
+        """Number of bytes read so far or ``None`` if unknown."""
+        return self._byte_count
+
+    @property
+    def total_byte_count(self):
+        """Size of the data in bytes or ``None`` if unknown."""
+        return self._total_byte_count
+
+    @property
+    def elapsed_seconds(self):
+        """Seconds passed since reading started."""
+        return self._elapsed_seconds
+
+    @property
+    def is_done(self):
+        """``True`` if all rows have been read."""
+        return self._is_done
+
+    @property
+    def fraction(self):
+        """
+        Ratio of the data read so far, between 0.0 and 1.0, or ``None`` if
+        unknown.
+        """
+        if self._is_done:
+            result = 1.0
+        elif (self._byte_count is not None) and self._total_byte_count:
+            result = min(1.0, self._byte_count / self._total_byte_count)
+        else:
+            result = None
+        return result
+
+    @property
+    def rows_per_second(self):
+        return self._row_count / self._elapsed_seconds if self._elapsed_seconds > 0 else 0.0
+
+    @property
+    def bytes_per_second(self):
+        """Number of bytes read per second or ``None`` if unknown."""
+        if self._byte_count is None:
+            result = None
+        else:
+            result = self._byte_count / self._elapsed_seconds if self._elapsed_seconds > 0 else 0.0
+        return result
+
+    @property
+    def eta_seconds(self):
+        """
+        Estimated number of seconds until all data are read or ``None`` if
+        this cannot be estimated yet.
+        """
+        fraction = self.fraction
+        if self._is_done:
+            result = 0.0
+        elif (fraction is None) or (fraction == 0):
+            result = None
+        else:
+            result = self._elapsed_seconds * (1 - fraction) / fraction
+        return result
+
+    def __str__(self):
+        parts = []
+        fraction = self.fraction
+        if fraction is not None:
+            parts.append('%.1f%%' % (100 * fraction))
+        parts.append('%d rows' % self._row_count)
+        parts.append('%.0f rows/s' % self.rows_per_second)
+        bytes_per_second = self.bytes_per_second
+        if bytes_per_second is not None:
+            parts.append('%.1f MB/s' % (bytes_per_second / 1000000))
+        eta_seconds = self.eta_seconds
+        if self._is_done:
+            parts.append('done in %s' % _duration_text(self._elapsed_seconds))
+        elif eta_seconds is not None:
+            parts.append('ETA %s' % _duration_text(eta_seconds))
+        return ', '.join(parts)
+
+
+def _duration_text(seconds):
+    """
+    Text representation of ``seconds`` in the form "h:mm:ss".
+    """
+    assert seconds >= 0
+    whole_seconds = int(round(seconds))
+    return '%d:%02d:%02d' % (whole_seconds // 3600, (whole_seconds // 60) % 60, whole_seconds % 60)
+
+
+def _digest_of_bytes(path, start, end):
+    """
+    Digest of the bytes between ``start`` and ``end`` in file ``path``.
+    """
+    assert 0 <= start <= end
+    with io.open(path, 'rb') as file_to_digest:
+        file_to_digest.seek(start)
+        return hashlib.sha1(file_to_digest.read(end - start)).hexdigest()
+
+
+def _row_digest(row):
+    """
+    Short digest of the values in ``row`` to find unchanged rows.
+    """
+    row_text = '\x1f'.join(six.text_type(value) for value in row)
+    return hashlib.sha1(row_text.encode('utf-8')).digest()[:12]
+
+
+def _type_error(field_name, field_value):
+    return errors.FieldValueError(
+        lambda: 'type must be %s instead of %s: %s'
+        % (six.text_type.__name__, type(field_value).__name__, _compat.text_repr(field_value)),
+        code=errors.CODE_TYPE, field_name=field_name, value=field_value)
+
+
+def _cannot_accept_field_prefix(field_name):
+    return lambda: 'cannot accept field %s' % _compat.text_repr(field_name)
+
+
+def _item_count_error(expected_item_count, row, location):
+    actual_item_count = len(row)
+    assert actual_item_count != expected_item_count
+
+    def message():
+        if actual_item_count < expected_item_count:
+            result = 'row must contain %d fields but only has %d: %s' % (expected_item_count, actual_item_count, row)
+        else:
+            result = 'row must contain %d fields but has %d, additional values are: %s' % (
+                expected_item_count, actual_item_count, row[expected_item_count:])
+        return result
+
+    return errors.DataError(
+        message, location, code=errors.CODE_ITEM_COUNT, value=actual_item_count, limits=expected_item_count)
+
+
 class BaseValidator(object):
     """
     A general validator to validate a single row (by validating its fields
@@ -64,8 +561,14 @@ class BaseValidator(object):
             assert self._cid.data_format.is_valid, \
                 'DataFormat.validate() must be called before using a CID for validation'
         self._expected_item_count = len(self._cid.field_formats)
+        # Check with copies of the CID's checks so the CID itself remains
+        # unchanged and can be used by several validations at the same time.
+        self._check_map = dict(
+            (check_name, check.new_run()) for check_name, check in self._cid.check_map.items())
+        self._validation_plan = plans.ValidationPlan(self._cid.check_names, self._check_map)
         self._location = None
         self._is_closed = False
+        self._stats = None
 
     def __enter__(self):
         return self
@@ -84,6 +587,24 @@ class BaseValidator(object):
         """
         return self._cid
 
+    @property
+    def check_map(self):
+        """
+        The checks performed by this validator by their description. Unlike
+        the checks in :py:attr:`cutplace.interface.Cid.check_map`, they keep
+        track of the rows validated so far, see
+        :py:meth:`cutplace.checks.AbstractCheck.new_run()`.
+        """
+        return self._check_map
+
+    @property
+    def validation_plan(self):
+        """
+        The :py:class:`cutplace.plans.ValidationPlan` deciding in which order
+        the checks in :py:attr:`~.check_map` are performed for each row.
+        """
+        return self._validation_plan
+
     @property
     def location(self):
         """
@@ -92,7 +613,43 @@ class BaseValidator(object):
         """
         return self._location
 
-    def validate_row(self, row, error_list=[]):
+    @property
+    def stats(self):
+        """
+        The :py:class:`cutplace.stats.ValidationStats` collected since
+        :py:meth:`~.enable_stats()` or ``None`` if they are not enabled.
+        """
+        return self._stats
+
+    def enable_stats(self):
+        """
+        Measure the time spent reading, validating fields, checking and
+        writing as well as for each field format and check until
+        :py:meth:`~.close()`. Without calling this, no time is measured and
+        consequently validation is not slowed down by it.
+
+        :rtype: cutplace.stats.ValidationStats
+        """
+        self._stats = stats.ValidationStats(self._data_size())
+        return self._stats
+
+    def _data_size(self):
+        """
+        Size of the data in bytes or ``None`` if unknown.
+        """
+        return None
+
+    def _timed_rows(self, rows):
+        return self._stats.timed_rows(rows) if self._stats is not None else rows
+
+    def _check_row(self, field_map, location):
+        """
+        Check ``field_map`` at ``location`` using all row checks in the order
+        of :py:attr:`~.validation_plan`.
+        """
+        self._validation_plan.check_row(field_map, location, self._stats)
+
+    def validate_row(self, row):
         """
         Validate a single ``row``:
         1. Check if the number of items in ``row`` matches the number of
@@ -105,51 +662,163 @@ class BaseValidator(object):
         The caller is responsible for :py:attr:`~.location` pointing to the
         correct row in the data while ``validate_row`` takes care of calling
         :py:meth:`cutplace.errors.Location.set_cell` appropriately.
+
+        These are the same rules all modes of
+        :py:class:`~cutplace.validio.Reader` use to reject a row, including
+        :py:meth:`~cutplace.validio.Reader.sample()`,
+        :py:meth:`~cutplace.validio.Reader.validate_changes()` and
+        :py:meth:`~cutplace.validio.Reader.column_batches()`.
+
+        :raises cutplace.errors.DataError: if ``row`` has to be rejected
         """
         assert row is not None
         assert self.location is not None
 
-        # Validate that number of fields.
-        actual_item_count = len(row)
-        if actual_item_count < self._expected_item_count:
-            error_list.append({'type': 'error',
-                    'col_idx': 0,
-                    'row_idx': 0,
-                    'cell': "",
-                    'value': "",
-                    'reason': "It seems like you have added/removed some columns. Re-upload without making changes to the column structure"})
-        
-            # raise errors.DataError(
-            #     'row must contain %d fields but only has %d: %s'
-            #     % (self._expected_item_count, actual_item_count, row),
-            #     self.location)
-        # if actual_item_count > self._expected_item_count:
-        #     raise errors.DataError(
-        #         'row must contain %d fields but has %d, additional values are: %s'
-        #         % (self._expected_item_count, actual_item_count, row[self._expected_item_count:]),
-        #         self.location)
-
-        # Validate each field according to its format.
-        # for field_index, field_value in enumerate(row):
-        #     self.location.set_cell(field_index)
-        #     field_to_validate = self.cid.field_formats[field_index]
-        #     try:
-        #         if not isinstance(field_value, six.text_type):
-        #             raise errors.FieldValueError(
-        #                 'type must be %s instead of %s: %s'
-        #                 % (six.text_type.__name__, type(field_value).__name__, _compat.text_repr(field_value)))
-        #         field_to_validate.validated(field_value)
-        #     except errors.FieldValueError as error:
-        #         #error.prepend_message('cannot accept field %s' % _compat.text_repr(field_to_validate.field_name), self.location)
-        #         error_list.append({'type': 'error',
-        #                             'cell': get_formatted_cell_location(self.location),
-        #                             'value': str(field_value) or 'NA',
-        #                             'reason': str(error.message)})
-        # Validate the whole row according to row checks.
-        self.location.set_cell(0)
-        field_map = _create_field_map(self.cid.field_names, row)
-        for check_name in self.cid.check_names:
-            self.cid.check_map[check_name].check_row(field_map, self.location)
+        error = self._rejection_error(row, self._field_error(row, self.location), self.location)
+        if error is not None:
+            raise error
+
+    def _field_error(self, row, location):
+        """
+        The :py:exc:`cutplace.errors.FieldValueError` for the first field in
+        ``row`` at ``location`` that does not conform to its field format,
+        or ``None`` if all fields are valid. Rows with fewer items than
+        fields in the CID are not validated because
+        :py:meth:`~._rejection_error()` rejects them anyway.
+        """
+        result = None
+        if len(row) >= self._expected_item_count:
+            for field_index, field_format in enumerate(self.cid.field_formats):
+                field_value = row[field_index]
+                try:
+                    if not isinstance(field_value, six.text_type):
+                        raise _type_error(field_format.field_name, field_value)
+                    if self._stats is None:
+                        field_format.validated(field_value)
+                    else:
+                        start_time = stats.timer()
+                        try:
+                            field_format.validated(field_value)
+                        finally:
+                            self._stats.add_time(
+                                stats.STAGE_FIELDS, stats.timer() - start_time, name=field_format.field_name)
+                except errors.FieldValueError as error:
+                    error_location = copy.copy(location)
+                    error_location.set_cell(field_index)
+                    error.prepend_message(_cannot_accept_field_prefix(field_format.field_name), error_location)
+                    result = error
+                    break
+        return result
+
+    def _rejection_error(self, row, field_error, location):
+        """
+        The :py:exc:`cutplace.errors.DataError` because of which ``row`` at
+        ``location`` has to be rejected, or ``None`` if it can be accepted.
+        This checks the number of items and the row checks; ``field_error``
+        is the first error found when validating the fields of ``row``.
+        """
+        location.set_cell(0)
+        error = field_error
+        if len(row) != self._expected_item_count:
+            error = _item_count_error(self._expected_item_count, row, location)
+        if error is None:
+            try:
+                field_map = _create_field_map(self.cid.field_names, row)
+                self._check_row(field_map, location)
+            except errors.CheckError as check_error:
+                error = check_error
+        return error
+
+    def validated_field_columns(self, rows):
+        """
+        Validate the fields of a batch of ``rows`` column by column using
+        :py:meth:`cutplace.fields.AbstractFieldFormat.validated_column()`,
+        which for many rows is a lot faster than validating each field of
+        each row on its own.
+
+        The first row of ``rows`` is considered to be at the current
+        :py:attr:`~.location`, the others are assumed to follow it. Rows
+        with fewer items than fields in the CID are skipped because
+        :py:meth:`~.validate_row()` takes care of them.
+
+        :return: the :py:exc:`cutplace.errors.FieldValueError` for each \
+          broken field with a location pointing to the respective cell, \
+          ordered by row and column
+        :rtype: list
+        """
+        assert rows is not None
+        assert self.location is not None
+
+        _, row_index_and_error_pairs = self._validated_columns(rows, self.location)
+        return [error for _, error in row_index_and_error_pairs]
+
+    def _validated_columns(self, rows, location, row_locations=None):
+        """
+        Same as :py:meth:`~.validated_field_columns()` but with ``location``
+        pointing to the first row. If the rows do not follow each other,
+        ``row_locations`` holds the location of each row instead.
+
+        :return: a tuple ``(columns, row_index_and_error_pairs)`` where \
+          ``columns`` holds a list of validated values for each field with \
+          ``None`` or the :py:exc:`cutplace.errors.FieldValueError` for \
+          values that could not be validated, and \
+          ``row_index_and_error_pairs`` a tuple ``(row_index, error)`` for \
+          each broken field ordered by row and column
+        """
+        assert rows is not None
+        assert location is not None
+
+        row_indices = [
+            row_index for row_index, row in enumerate(rows) if len(row) >= self._expected_item_count]
+        columns = []
+        row_index_field_index_and_error_tuples = []
+        for field_index, field_format in enumerate(self.cid.field_formats):
+            column = [None] * len(rows)
+            column_values = [rows[row_index][field_index] for row_index in row_indices]
+            column_row_indices = row_indices
+            non_text_indices = [
+                value_index for value_index, value in enumerate(column_values)
+                if not isinstance(value, six.text_type)]
+            if non_text_indices:
+                for value_index in non_text_indices:
+                    error = _type_error(field_format.field_name, column_values[value_index])
+                    row_index_field_index_and_error_tuples.append((row_indices[value_index], field_index, error))
+                non_text_index_set = set(non_text_indices)
+                column_row_indices = [
+                    row_index for value_index, row_index in enumerate(row_indices)
+                    if value_index not in non_text_index_set]
+                column_values = [rows[row_index][field_index] for row_index in column_row_indices]
+            if self._stats is None:
+                results, error_indices = field_format.validated_column(column_values)
+            else:
+                start_time = stats.timer()
+                results, error_indices = field_format.validated_column(column_values)
+                self._stats.add_time(
+                    stats.STAGE_FIELDS, stats.timer() - start_time, len(column_values), field_format.field_name)
+            for error_index in error_indices:
+                row_index_field_index_and_error_tuples.append(
+                    (column_row_indices[error_index], field_index, results[error_index]))
+            if len(column_row_indices) == len(rows):
+                column = results
+            else:
+                for value_index, row_index in enumerate(column_row_indices):
+                    column[row_index] = results[value_index]
+            columns.append(column)
+
+        row_index_and_error_pairs = []
+        for row_index, field_index, error in sorted(
+                row_index_field_index_and_error_tuples, key=lambda item: (item[0], item[1])):
+            if row_locations is not None:
+                error_location = copy.copy(row_locations[row_index])
+            else:
+                error_location = copy.copy(location)
+                if row_index > 0:
+                    error_location.advance_line(row_index)
+            error_location.set_cell(field_index)
+            error.prepend_message(
+                _cannot_accept_field_prefix(self.cid.field_formats[field_index].field_name), error_location)
+            row_index_and_error_pairs.append((row_index, error))
+        return columns, row_index_and_error_pairs
 
     def close(self):
         """
@@ -161,15 +830,24 @@ class BaseValidator(object):
         if not self._is_closed:
             try:
                 for check_name in self.cid.check_names:
-                    self.cid.check_map[check_name].check_at_end(self.location)
+                    start_time = stats.timer() if self._stats is not None else None
+                    try:
+                        self._check_map[check_name].check_at_end(self.location)
+                    finally:
+                        if self._stats is not None:
+                            self._stats.add_time(stats.STAGE_CHECKS, stats.timer() - start_time, name=check_name)
             finally:
-                for check in self.cid.check_map.values():
+                self._is_closed = True
+                for check in self._check_map.values():
                     check.cleanup()
-            self._is_closed = True
+                if self._stats is not None:
+                    self._stats.stop()
 
 
 class Reader(BaseValidator):
-    def __init__(self, cid_or_path, source_data_stream_or_path, on_error='raise', validate_until=None):
+    def __init__(
+            self, cid_or_path, source_data_stream_or_path, on_error='raise', validate_until=None, max_errors=None,
+            max_error_rate=None):
         """
         An iterator that produces possibly validated rows from
         ``source_data_stream_or_path`` conforming to ``cid_or_path``.
@@ -183,11 +861,25 @@ class Reader(BaseValidator):
           ``None`` all rows should be validated (the default); 0 means no \
           rows should be validated
         :type: int or None
+        :param max_errors: number of rows that can be rejected with \
+          ``on_error`` being ``'continue'`` or ``'yield'``; once more rows \
+          are rejected, reading stops with a \
+          :py:exc:`cutplace.errors.ErrorBudgetError`; ``None`` means that \
+          any number of rows can be rejected (the default)
+        :type: int or None
+        :param max_error_rate: similar to ``max_errors`` but as ratio \
+          between rejected and read rows, for example 0.05 for 5%; this \
+          takes effect only after \
+          :py:const:`~cutplace.validio.MIN_ROW_COUNT_FOR_ERROR_RATE` rows \
+          have been read
+        :type: float or None
         """
         assert cid_or_path is not None
         assert source_data_stream_or_path is not None
         assert on_error in _VALID_ON_ERROR_CHOICES, 'on_error=%r' % on_error
         assert (validate_until is None) or (validate_until >= 0)
+        assert (max_errors is None) or (max_errors >= 0)
+        assert (max_error_rate is None) or (0 <= max_error_rate <= 1)
 
         super(Reader, self).__init__(cid_or_path)
         # TODO: Consolidate obtaining source path with other code segments that do similar things.
@@ -202,28 +894,512 @@ class Reader(BaseValidator):
         self._source_data_stream_or_path = source_data_stream_or_path
         self._on_error = on_error
         self._validate_until = validate_until
+        self._max_errors = max_errors
+        self._max_error_rate = max_error_rate
         self.accepted_rows_count = None
         self.rejected_rows_count = None
+        self._error_sinks = []
+        self._checkpoint_path = None
+        self._checkpoint_row_count = None
+        self._rows_digest = None
+        self._state_log_generation = 0
+        self._state_log_path = None
+        self._state_log_size = 0
+        self._compacted_state_log_size = 0
+        self._previous_state_log_path = None
+        self.resumed_rows_count = 0
+        self._progress_callback = None
+        self._progress_interval = None
+        self._progress_start_time = None
+        self._next_progress_time = None
+        self._progress_row_countdown = None
+        self._metrics_sinks = []
+        self._recorded_rejection_count = 0
+        self._field_error_counts = {}
+        self._start_time = stats.timer()
 
     @property
     def on_error(self):
         return self._on_error
 
-    def _raw_rows(self):
+    def _data_size(self):
+        source_data_stream_or_path = self._source_data_stream_or_path
+        return os.path.getsize(source_data_stream_or_path) \
+            if isinstance(source_data_stream_or_path, six.string_types) else None
+
+    def add_error_sink(self, error_sink):
+        """
+        Pass each rejected row together with the
+        :py:exc:`cutplace.errors.DataError` explaining the rejection to
+        ``error_sink``, for example a
+        :py:class:`cutplace.sinks.JsonLinesErrorSink`. This happens
+        independent of ``on_error``, so with ``on_error='raise'`` the sink
+        only receives the row that caused the error. The caller remains
+        responsible to close ``error_sink``.
+        """
+        assert error_sink is not None
+        self._error_sinks.append(error_sink)
+
+    def set_progress_callback(self, callback, interval=DEFAULT_PROGRESS_INTERVAL):
+        """
+        Make :py:meth:`~.rows()` and :py:meth:`~.column_batches()` call
+        ``callback`` with a :py:class:`~cutplace.validio.Progress` at most
+        every ``interval`` seconds and once more after the last row has been
+        read.
+
+        For delimited data with an encoding such as ASCII or UTF-8 and the
+        line delimiter ``lf`` or ``crlf`` and fixed data with a known record
+        size read from a path, the progress knows how many bytes have been
+        read and consequently can estimate when reading will be done. For
+        other data only the number of rows read is known.
+
+        To keep the cost per row negligible, the clock is only looked at
+        every couple of hundred rows.
+
+        :param callable callback: function taking a \
+          :py:class:`~cutplace.validio.Progress` as only parameter; \
+          ``None`` stops reporting progress
+        """
+        assert interval >= 0
+
+        self._progress_callback = callback
+        self._progress_interval = interval
+
+    def _start_progress(self):
+        if self._progress_callback is not None:
+            self._progress_start_time = stats.timer()
+            self._next_progress_time = self._progress_start_time + self._progress_interval
+            self._progress_row_countdown = _PROGRESS_ROW_STEP
+
+    def _report_progress(self, row_count, offset, is_done=False):
+        """
+        Call the progress callback with ``row_count`` rows read up to byte
+        ``offset`` if it is time to do so.
+        """
+        assert self._progress_callback is not None
+
+        self._progress_row_countdown -= 1
+        if is_done or (self._progress_row_countdown <= 0):
+            self._progress_row_countdown = _PROGRESS_ROW_STEP
+            now = stats.timer()
+            if is_done or (now >= self._next_progress_time):
+                self._next_progress_time = now + self._progress_interval
+                self._progress_callback(Progress(
+                    row_count, offset, self._data_size(), now - self._progress_start_time, is_done))
+
+    def set_checkpoint(self, checkpoint_path=None, row_count=DEFAULT_CHECKPOINT_ROW_COUNT):
+        """
+        Make :py:meth:`~.rows()` write a checkpoint to ``checkpoint_path``
+        after each ``row_count`` rows and at the end of the data. It
+        contains the number of rows read and their position in the data.
+
+        The state of all checks is kept in a log next to the checkpoint
+        file. Each checkpoint appends only the changes since the previous
+        one as obtained by
+        :py:meth:`cutplace.checks.AbstractCheck.get_state_changes()`. Once
+        the log has grown to twice its size after the last compaction, it
+        is replaced by a log holding only the whole state as obtained by
+        :py:meth:`cutplace.checks.AbstractCheck.get_state()`. So even for
+        checks that remember each row, such as
+        :py:class:`cutplace.checks.IsUniqueCheck`, the time spent on
+        checkpoints grows linearly with the number of rows. Checks that
+        cannot tell their changes store their whole state in each
+        checkpoint.
+
+        If the checkpoint file already exists, :py:meth:`~.rows()` resumes
+        reading after the rows stored in it. This continues a validation
+        that was interrupted and, for data that only grow by appending rows
+        such as log files, validates only the rows appended since the last
+        validation. If the CID, cutplace or the data read so far have
+        changed, the checkpoint is ignored and reading starts from the
+        beginning. Rows that have already been read before are not produced
+        again.
+
+        For delimited data with an encoding such as ASCII or UTF-8 and the
+        line delimiter ``lf`` or ``crlf`` and fixed data with a known record
+        size, resuming seeks directly to the
+        stored position. For other data the rows already read have to be
+        read again but are not validated.
+
+        :param str checkpoint_path: path of the checkpoint file; ``None`` \
+          means the path of the data with \
+          :py:const:`~cutplace.validio.CHECKPOINT_SUFFIX` appended
+        """
+        assert isinstance(self._source_data_stream_or_path, six.string_types), \
+            'to use checkpoints, data must be read from a path'
+        assert row_count >= 1
+        assert self._validate_until is None, 'checkpoints must not be combined with validate_until'
+
+        self._checkpoint_path = checkpoint_path if checkpoint_path is not None \
+            else self._source_data_stream_or_path + CHECKPOINT_SUFFIX
+        self._checkpoint_row_count = row_count
+
+    def _checkpoint_identity(self):
+        # Import locally to prevent a circular import.
+        from cutplace import __version__
+
+        return {
+            'checkpoint_version': _CHECKPOINT_VERSION,
+            'cid': interface.cid_fingerprint(self.cid),
+            'cutplace_version': __version__,
+            'data_path': os.path.abspath(self._source_data_stream_or_path),
+        }
+
+    def _state_log_path_for(self, generation):
+        return '%s.%d%s' % (self._checkpoint_path, generation, _STATE_LOG_SUFFIX)
+
+    def _append_check_states(self):
+        """
+        Append the state of all checks to the state log, and compact the
+        log if it has grown too much. The result are the paths of logs a
+        compacted log replaces, which must be kept until the checkpoint
+        refers to the compacted log.
+        """
+        is_compaction = (self._state_log_path is None) \
+            or (self._state_log_size > _STATE_LOG_COMPACTION_FACTOR * self._compacted_state_log_size)
+        check_states = {}
+        check_state_changes = {}
+        for check_name in self.cid.check_names:
+            check = self._check_map[check_name]
+            state_changes = check.get_state_changes() if not is_compaction else None
+            if state_changes is None:
+                check_states[check_name] = check.get_state()
+            else:
+                check_state_changes[check_name] = state_changes
+        state_log_entry = six.text_type(json.dumps(
+            {'check_states': check_states, 'check_state_changes': check_state_changes}, sort_keys=True)) + '\n'
+        state_log_entry = state_log_entry.encode('utf-8')
+        if is_compaction:
+            obsolete_state_log_paths = [self._state_log_path, self._previous_state_log_path]
+            self._state_log_generation += 1
+            self._state_log_path = self._state_log_path_for(self._state_log_generation)
+            self._previous_state_log_path = None
+            with io.open(self._state_log_path, 'wb') as state_log_file:
+                state_log_file.write(state_log_entry)
+            self._state_log_size = len(state_log_entry)
+            self._compacted_state_log_size = self._state_log_size
+        else:
+            obsolete_state_log_paths = []
+            with io.open(self._state_log_path, 'ab') as state_log_file:
+                state_log_file.write(state_log_entry)
+            self._state_log_size += len(state_log_entry)
+        return obsolete_state_log_paths
+
+    def _write_checkpoint(self, row_count, offset):
+        assert self._checkpoint_path is not None
+        assert row_count >= 0
+
+        obsolete_state_log_paths = self._append_check_states()
+        data_path = self._source_data_stream_or_path
+        data_size = os.path.getsize(data_path)
+        checkpoint = {
+            'identity': self._checkpoint_identity(),
+            'row_count': row_count,
+            'offset': offset,
+            'accepted_rows_count': self.accepted_rows_count,
+            'rejected_rows_count': self.rejected_rows_count,
+            'state_log_generation': self._state_log_generation,
+            'state_log_size': self._state_log_size,
+            'data_size': data_size,
+            'head_digest': _digest_of_bytes(data_path, 0, min(data_size, _CHECKPOINT_DIGEST_SIZE)),
+            'tail_digest':
+                _digest_of_bytes(data_path, max(0, offset - _CHECKPOINT_DIGEST_SIZE), offset)
+                if offset is not None else None,
+            'rows_digest': self._rows_digest.hexdigest() if self._rows_digest is not None else None,
+        }
+        # Write to a temporary file first so an interrupted write does not break an existing checkpoint.
+        temp_checkpoint_path = self._checkpoint_path + '.tmp'
+        with io.open(temp_checkpoint_path, 'w', encoding='utf-8') as checkpoint_file:
+            checkpoint_file.write(six.text_type(json.dumps(checkpoint, sort_keys=True)))
+        _compat.replace_file(temp_checkpoint_path, self._checkpoint_path)
+        # Remove logs replaced by a compacted one only now that no checkpoint refers to them anymore.
+        for obsolete_state_log_path in obsolete_state_log_paths:
+            if (obsolete_state_log_path is not None) and os.path.exists(obsolete_state_log_path):
+                os.remove(obsolete_state_log_path)
+
+    def _checked_checkpoint(self, checkpoint):
+        """
+        ``checkpoint`` as read from the checkpoint file after making sure it
+        has the expected format.
+
+        :raises cutplace.errors.DataError: if ``checkpoint`` does not have \
+          the expected format
+        """
+        def is_count(value):
+            return isinstance(value, six.integer_types) and not isinstance(value, bool) and (value >= 0)
+
+        def is_digest(value):
+            return isinstance(value, six.string_types)
+
+        def is_optional(is_valid, value):
+            return (value is None) or is_valid(value)
+
+        if not isinstance(checkpoint, dict):
+            broken_part = 'checkpoint'
+        elif not isinstance(checkpoint.get('identity'), dict):
+            broken_part = 'identity'
+        elif checkpoint['identity'].get('checkpoint_version') != _CHECKPOINT_VERSION:
+            broken_part = 'checkpoint_version'
+        else:
+            expected_keys_and_validators = (
+                ('row_count', is_count),
+                ('offset', lambda value: is_optional(is_count, value)),
+                ('accepted_rows_count', is_count),
+                ('rejected_rows_count', is_count),
+                ('state_log_generation', lambda value: is_count(value) and (value >= 1)),
+                ('state_log_size', is_count),
+                ('data_size', is_count),
+                ('head_digest', is_digest),
+                ('tail_digest', lambda value: is_optional(is_digest, value)),
+                ('rows_digest', lambda value: is_optional(is_digest, value)),
+            )
+            broken_part = None
+            for key, is_valid in expected_keys_and_validators:
+                if (key not in checkpoint) or not is_valid(checkpoint[key]):
+                    broken_part = key
+                    break
+        if broken_part is not None:
+            raise errors.DataError(
+                'checkpoint must match the expected format but %s is missing or broken; '
+                'remove the checkpoint to read the data from the beginning' % broken_part,
+                errors.Location(self._checkpoint_path))
+        return checkpoint
+
+    def _read_checkpoint(self):
+        """
+        The checkpoint stored in the checkpoint file or ``None`` if there is
+        no such file or it does not match the CID or data.
+
+        :raises cutplace.errors.DataError: if the checkpoint file does not \
+          have the expected format
+        """
+        assert self._checkpoint_path is not None
+
+        result = None
+        if os.path.exists(self._checkpoint_path):
+            try:
+                with io.open(self._checkpoint_path, 'r', encoding='utf-8') as checkpoint_file:
+                    checkpoint = json.load(checkpoint_file)
+            except ValueError as error:
+                raise errors.DataError(
+                    'checkpoint must be stored as JSON; remove the checkpoint to read the data from the beginning',
+                    errors.Location(self._checkpoint_path), cause=error)
+            checkpoint = self._checked_checkpoint(checkpoint)
+            # Continue with the next generation of the state log even if the checkpoint does not match.
+            self._state_log_generation = checkpoint['state_log_generation']
+            self._previous_state_log_path = self._state_log_path_for(self._state_log_generation)
+            data_path = self._source_data_stream_or_path
+            data_size = os.path.getsize(data_path)
+            offset = checkpoint['offset']
+            is_matching_checkpoint = (checkpoint['identity'] == self._checkpoint_identity()) \
+                and (data_size >= checkpoint['data_size']) \
+                and (checkpoint['head_digest'] == _digest_of_bytes(
+                    data_path, 0, min(checkpoint['data_size'], _CHECKPOINT_DIGEST_SIZE))) \
+                and ((offset is None) or (checkpoint['tail_digest'] == _digest_of_bytes(
+                    data_path, max(0, offset - _CHECKPOINT_DIGEST_SIZE), offset)))
+            if is_matching_checkpoint:
+                result = checkpoint
+        return result
+
+    def _restore_check_states(self, checkpoint):
+        """
+        Restore the state of all checks from the state log of
+        ``checkpoint``. Changes appended to the log after the checkpoint
+        was written, for example by an interrupted validation, are removed.
+
+        :raises cutplace.errors.DataError: if the state log is missing or \
+          does not have the expected format
+        """
+        def is_check_state_map(value):
+            return isinstance(value, dict) and all(check_name in self._check_map for check_name in value)
+
+        state_log_path = self._previous_state_log_path
+        state_log_size = checkpoint['state_log_size']
+        state_log_entries = None
+        try:
+            with io.open(state_log_path, 'r+b') as state_log_file:
+                state_log_bytes = state_log_file.read(state_log_size)
+                state_log_file.truncate(state_log_size)
+            if len(state_log_bytes) == state_log_size:
+                state_log_entries = [json.loads(line.decode('utf-8')) for line in state_log_bytes.splitlines()]
+        except (EnvironmentError, ValueError):
+            pass
+        is_valid_state_log = bool(state_log_entries) and all(
+            isinstance(entry, dict)
+            and is_check_state_map(entry.get('check_states'))
+            and is_check_state_map(entry.get('check_state_changes'))
+            for entry in state_log_entries) \
+            and (sorted(state_log_entries[0]['check_states']) == sorted(self._check_map))
+        if not is_valid_state_log:
+            raise errors.DataError(
+                'state of checks must be stored as JSON in %r; remove the checkpoint to read the data from the '
+                'beginning' % os.path.basename(state_log_path),
+                errors.Location(self._checkpoint_path))
+        for state_log_entry in state_log_entries:
+            for check_name, check_state in state_log_entry['check_states'].items():
+                self._check_map[check_name].set_state(check_state)
+            for check_name, check_state_changes in state_log_entry['check_state_changes'].items():
+                self._check_map[check_name].add_state_changes(check_state_changes)
+        self._state_log_path = state_log_path
+        self._state_log_size = state_log_size
+        self._compacted_state_log_size = len(state_log_bytes.splitlines(True)[0])
+        self._previous_state_log_path = None
+
+    def _resumed_raw_rows_and_offsets(self):
+        """
+        Tuple ``(row_count, offset, raw_rows_and_offsets)`` with the number
+        of rows read and their end offset before resuming from a checkpoint,
+        and the remaining rows as tuples ``(row, end_offset)``. Offsets are
+        ``None`` if the data do not allow to seek to a certain row.
+
+        Without offsets, the rows already read are read again to compare
+        them with the digest of the rows stored in the checkpoint.
+        """
+        row_count = 0
+        offset = None
+        result = None
+        self._rows_digest = None
+        self._state_log_generation = 0
+        self._state_log_path = None
+        self._previous_state_log_path = None
+        if self._checkpoint_path is not None:
+            checkpoint = self._read_checkpoint()
+            if (checkpoint is not None) and (checkpoint['offset'] is not None):
+                result = self._raw_rows_and_offsets(checkpoint['offset'])
+            else:
+                result = self._raw_rows_and_offsets()
+            if result is None:
+                self._rows_digest = hashlib.sha1()
+                raw_rows = self._raw_rows()
+                if checkpoint is not None:
+                    for row in itertools.islice(raw_rows, checkpoint['row_count']):
+                        self._rows_digest.update(_row_digest(row))
+                    if self._rows_digest.hexdigest() != checkpoint['rows_digest']:
+                        # The rows read so far have changed, so start from the beginning.
+                        raw_rows.close()
+                        checkpoint = None
+                        self._rows_digest = hashlib.sha1()
+                        raw_rows = self._raw_rows()
+                result = ((row, None) for row in raw_rows)
+            if checkpoint is not None:
+                row_count = checkpoint['row_count']
+                offset = checkpoint['offset']
+                self.accepted_rows_count = checkpoint['accepted_rows_count']
+                self.rejected_rows_count = checkpoint['rejected_rows_count']
+                self._restore_check_states(checkpoint)
+                if row_count >= 1:
+                    self._location.advance_line(row_count)
+        elif self._progress_callback is not None:
+            result = self._raw_rows_and_offsets()
+        if result is None:
+            result = ((row, None) for row in self._raw_rows())
+        return row_count, offset, result
+
+    def _raw_rows_and_offsets(self, start_offset=0):
+        """
+        The rows starting at byte ``start_offset`` as tuples
+        ``(row, end_offset)``, or ``None`` if the data do not allow to
+        compute offsets.
+        """
+        result = None
+        data_format = self.cid.data_format
+        if isinstance(self._source_data_stream_or_path, six.string_types):
+            if data_format.format == data.FORMAT_FIXED:
+                field_names_and_lengths = interface.field_names_and_lengths(self.cid)
+                if rowio.fixed_record_size(
+                        data_format.encoding, field_names_and_lengths, data_format.line_delimiter) is not None:
+                    result = rowio.fixed_rows_and_offsets(
+                        self._source_data_stream_or_path, data_format.encoding, field_names_and_lengths,
+                        data_format.line_delimiter, start_offset)
+            elif (data_format.format == data.FORMAT_DELIMITED) and rowio.has_byte_offsets(data_format):
+                result = rowio.delimited_rows_and_offsets(self._source_data_stream_or_path, data_format, start_offset)
+        if result is not None:
+            result = self._timed_rows(result)
+        return result
+
+    def _record_rejection(self, error, row):
+        """
+        Pass the rejected ``row`` and ``error`` to the error sinks and count
+        it for the metrics.
+        """
+        for error_sink in self._error_sinks:
+            error_sink.write(error, row)
+        self._recorded_rejection_count += 1
+        if error.field_name is not None:
+            self._field_error_counts[error.field_name] = self._field_error_counts.get(error.field_name, 0) + 1
+
+    def add_metrics_sink(self, metrics_sink):
+        """
+        Pass :py:class:`cutplace.metrics.ValidationMetrics` describing the
+        validation to ``metrics_sink``, for example a
+        :py:class:`cutplace.metrics.StatsdSink`, once the reader is closed.
+        This does not affect reading rows, so it does not slow down the
+        validation. The caller remains responsible to close
+        ``metrics_sink``.
+        """
+        assert metrics_sink is not None
+        self._metrics_sinks.append(metrics_sink)
+
+    def close(self):
+        """
+        Same as :py:meth:`cutplace.validio.BaseValidator.close()` but
+        also pass the metrics to the sinks added with
+        :py:meth:`~.add_metrics_sink()`.
+        """
+        if self._is_closed or not self._metrics_sinks:
+            super(Reader, self).close()
+        else:
+            has_passed_checks_at_end = False
+            try:
+                super(Reader, self).close()
+                has_passed_checks_at_end = True
+            finally:
+                validation_metrics = metrics.ValidationMetrics(
+                    os.path.basename(self._location.file_path),
+                    self.accepted_rows_count or 0,
+                    self._recorded_rejection_count,
+                    self._data_size(),
+                    max(0.0, stats.timer() - self._start_time),
+                    dict(self._field_error_counts),
+                    has_passed_checks_at_end and (self._recorded_rejection_count == 0),
+                    time.time())
+                for metrics_sink in self._metrics_sinks:
+                    metrics_sink.record(validation_metrics)
+
+    def _check_error_budget(self, read_rows_count, location):
+        """
+        Raise :py:exc:`cutplace.errors.ErrorBudgetError` if the rows
+        rejected so far exceed ``max_errors`` or ``max_error_rate``.
+        """
+        rejected_rows_count = self.rejected_rows_count
+        if (self._max_errors is not None) and (rejected_rows_count > self._max_errors):
+            raise errors.ErrorBudgetError(
+                'stopped reading after %d rows because %d of them were rejected but at most %d are allowed'
+                % (read_rows_count, rejected_rows_count, self._max_errors), copy.copy(location))
+        if (self._max_error_rate is not None) and (read_rows_count >= MIN_ROW_COUNT_FOR_ERROR_RATE) \
+                and (rejected_rows_count > self._max_error_rate * read_rows_count):
+            raise errors.ErrorBudgetError(
+                'stopped reading after %d rows because %d of them were rejected but the error rate must be at most %g%%'
+                % (read_rows_count, rejected_rows_count, 100 * self._max_error_rate), copy.copy(location))
+
+    def _raw_rows(self, source_data_stream_or_path=None):
         data_format = self.cid.data_format
         format = data_format.format
+        if source_data_stream_or_path is None:
+            source_data_stream_or_path = self._source_data_stream_or_path
         if format == data.FORMAT_EXCEL:
-            return rowio.excel_rows(self._source_data_stream_or_path, data_format.sheet)
+            result = rowio.excel_rows(source_data_stream_or_path, data_format.sheet)
         elif format == data.FORMAT_DELIMITED:
-            return rowio.delimited_rows(self._source_data_stream_or_path, data_format)
+            result = rowio.delimited_rows(source_data_stream_or_path, data_format)
         elif format == data.FORMAT_FIXED:
-            return rowio.fixed_rows(
-                self._source_data_stream_or_path, data_format.encoding, interface.field_names_and_lengths(self.cid),
+            result = rowio.fixed_rows(
+                source_data_stream_or_path, data_format.encoding, interface.field_names_and_lengths(self.cid),
                 data_format.line_delimiter)
         elif format == data.FORMAT_ODS:
-            return rowio.ods_rows(self._source_data_stream_or_path, data_format.sheet)
+            result = rowio.ods_rows(source_data_stream_or_path, data_format.sheet)
         else:
             assert False, 'format=%r' % format
+        return self._timed_rows(result)
 
     def rows(self):
         """
@@ -237,31 +1413,382 @@ class Reader(BaseValidator):
         """
         self.accepted_rows_count = 0
         self.rejected_rows_count = 0
-        for check in self.cid.check_map.values():
+        for check in self._check_map.values():
             check.reset()
         header_row_count = self._cid.data_format.header
-        for row_count, row in enumerate(self._raw_rows(), 1):
+        self._start_progress()
+        row_count, offset, raw_rows_and_offsets = self._resumed_raw_rows_and_offsets()
+        self.resumed_rows_count = row_count
+        for row_count, (row, offset) in enumerate(raw_rows_and_offsets, row_count + 1):
+            if self._rows_digest is not None:
+                self._rows_digest.update(_row_digest(row))
+            is_rejected = False
             try:
                 is_after_header_row = (row_count > header_row_count)
                 is_before_validate_until = (self._validate_until is None) or (row_count <= self._validate_until)
                 if is_after_header_row:
                     if is_before_validate_until:
-                        error_list = []
-                        self.validate_row(row, error_list)
+                        self.validate_row(row)
                     self.accepted_rows_count += 1
-                    if error_list:
-                        yield error_list
-                    else:
-                        yield []
+                    yield row
             except errors.DataError as error:
+                self._record_rejection(error, row)
                 if self.on_error == 'raise':
                     raise
                 self.rejected_rows_count += 1
+                is_rejected = True
                 if self.on_error == 'yield':
                     yield error
                 else:
                     assert self.on_error == 'continue'
+            if is_rejected:
+                self._check_error_budget(self.accepted_rows_count + self.rejected_rows_count, self._location)
+            self._location.advance_line()
+            if (self._checkpoint_path is not None) and (row_count % self._checkpoint_row_count == 0):
+                self._write_checkpoint(row_count, offset)
+            if self._progress_callback is not None:
+                self._report_progress(row_count, offset)
+        if self._checkpoint_path is not None:
+            self._write_checkpoint(row_count, offset)
+        if self._progress_callback is not None:
+            self._report_progress(row_count, offset, True)
+
+    def column_batches(self, batch_size=DEFAULT_COLUMN_BATCH_SIZE, use_numpy=False):
+        """
+        Similar to :py:meth:`~.rows()` but produce
+        :py:class:`~cutplace.validio.ColumnBatch` objects holding the
+        native values obtained by
+        :py:meth:`cutplace.fields.AbstractFieldFormat.validated_column()`
+        for up to ``batch_size`` rows at a time. Rejected rows are not part
+        of the batch; depending on ``on_error``, they raise an error,
+        are skipped quietly or are available from
+        :py:attr:`cutplace.validio.ColumnBatch.errors`. If more rows are
+        rejected than allowed by ``max_errors`` or ``max_error_rate``, a
+        last batch with the rows read until then is produced before raising
+        :py:exc:`cutplace.errors.ErrorBudgetError`.
+
+        :param bool use_numpy: if ``True``, use :py:class:`numpy.ndarray` \
+          for columns that can be stored as 64 bit integers; this requires \
+          NumPy to be installed
+        :raises cutplace.errors.DataError: on broken data
+        """
+        assert batch_size >= 1
+        assert not use_numpy or fields.has_numpy, 'to use_numpy, NumPy must be installed'
+        assert self._validate_until is None, 'column batches always need to validate all rows'
+        assert self._checkpoint_path is None, 'column batches do not support checkpoints'
+
+        self.accepted_rows_count = 0
+        self.rejected_rows_count = 0
+        for check in self._check_map.values():
+            check.reset()
+        header_row_count = self._cid.data_format.header
+        rows_to_validate = []
+        batch_location = None
+        self._start_progress()
+        raw_rows_and_offsets = self._raw_rows_and_offsets() if self._progress_callback is not None else None
+        if raw_rows_and_offsets is None:
+            raw_rows_and_offsets = ((row, None) for row in self._raw_rows())
+        row_count = 0
+        offset = None
+        for row_count, (row, offset) in enumerate(raw_rows_and_offsets, 1):
+            if row_count > header_row_count:
+                if not rows_to_validate:
+                    batch_location = copy.copy(self._location)
+                rows_to_validate.append(row)
+                if len(rows_to_validate) == batch_size:
+                    column_batch, budget_error = self._column_batch(rows_to_validate, batch_location, use_numpy)
+                    yield column_batch
+                    if budget_error is not None:
+                        raise budget_error
+                    rows_to_validate = []
+            self._location.advance_line()
+            if self._progress_callback is not None:
+                self._report_progress(row_count, offset)
+        if rows_to_validate:
+            column_batch, budget_error = self._column_batch(rows_to_validate, batch_location, use_numpy)
+            yield column_batch
+            if budget_error is not None:
+                raise budget_error
+        if self._progress_callback is not None:
+            self._report_progress(row_count, offset, True)
+
+    def _column_batch(self, rows, location, use_numpy):
+        """
+        Tuple ``(column_batch, budget_error)`` with the
+        :py:class:`~cutplace.validio.ColumnBatch` for ``rows`` and the
+        :py:exc:`cutplace.errors.ErrorBudgetError` to raise after it, or
+        ``None``. If the error budget is exceeded, the batch only contains
+        the rows up to the one exceeding it.
+        """
+        assert rows
+        assert location is not None
+
+        columns, row_index_and_error_pairs = self._validated_columns(rows, location)
+        row_index_to_error_map = {}
+        for row_index, error in row_index_and_error_pairs:
+            row_index_to_error_map.setdefault(row_index, error)
+        accepted_row_indices = []
+        batch_errors = []
+        budget_error = None
+        row_location = copy.copy(location)
+        for row_index, row in enumerate(rows):
+            if row_index > 0:
+                row_location.advance_line()
+            row_location.set_cell(0)
+            error = self._rejection_error(row, row_index_to_error_map.get(row_index), row_location)
+            if error is None:
+                accepted_row_indices.append(row_index)
+            else:
+                self._record_rejection(error, row)
+                if self.on_error == 'raise':
+                    raise error
+                self.rejected_rows_count += 1
+                if self.on_error == 'yield':
+                    batch_errors.append(error)
+                else:
+                    assert self.on_error == 'continue'
+                read_rows_count = self.accepted_rows_count + len(accepted_row_indices) + self.rejected_rows_count
+                try:
+                    self._check_error_budget(read_rows_count, row_location)
+                except errors.ErrorBudgetError as error:
+                    budget_error = error
+                    break
+        self.accepted_rows_count += len(accepted_row_indices)
+        if len(accepted_row_indices) != len(rows):
+            columns = [[column[row_index] for row_index in accepted_row_indices] for column in columns]
+        compact_columns = [
+            _compact_column(field_format, column, use_numpy)
+            for field_format, column in zip(self.cid.field_formats, columns)]
+        column_batch = ColumnBatch(self.cid.field_names, compact_columns, len(accepted_row_indices), batch_errors)
+        return column_batch, budget_error
+
+    def sample(self, sample_size=None, every=None, seed=None):
+        """
+        Validate only a sample of the data rows in order to quickly estimate
+        how broken the data are. Either validate a random sample of
+        ``sample_size`` rows or every ``every``-th row starting with the
+        first one. Rows that are not part of the sample are still read but
+        not validated, except for fixed data stored in a file using a single
+        byte encoding and a specific line delimiter, in which case only the
+        sampled rows are read by seeking to them directly.
+
+        Contrary to :py:meth:`~.rows()`, rejected rows do not raise an error
+        but are available from :py:attr:`~.SampleReport.errors`. Checks only
+        consider the sampled rows.
+
+        :param int seed: seed for the random number generator to obtain \
+          the same random sample with each call; ``None`` uses a different \
+          sample each time
+        :rtype: cutplace.validio.SampleReport
+        """
+        assert (sample_size is None) != (every is None), 'either sample_size or every must be specified'
+        assert (sample_size is None) or (sample_size >= 1)
+        assert (every is None) or (every >= 1)
+        assert self._validate_until is None, 'sample() must not be combined with validate_until'
+        assert self._checkpoint_path is None, 'sample() does not support checkpoints'
+
+        self.accepted_rows_count = 0
+        self.rejected_rows_count = 0
+        for check in self._check_map.values():
+            check.reset()
+        random_generator = random.Random(seed)
+        header_row_count = self._cid.data_format.header
+        row_count, location_and_row_pairs = self._seeked_sample(sample_size, every, random_generator)
+        if location_and_row_pairs is None:
+            row_count, location_and_row_pairs = self._read_sample(sample_size, every, random_generator)
+        sample_errors = []
+        for location, row in location_and_row_pairs:
+            if header_row_count >= 1:
+                location.advance_line(header_row_count)
+            _, row_index_and_error_pairs = self._validated_columns([row], location)
+            field_error = row_index_and_error_pairs[0][1] if row_index_and_error_pairs else None
+            error = self._rejection_error(row, field_error, location)
+            if error is None:
+                self.accepted_rows_count += 1
+            else:
+                self._record_rejection(error, row)
+                self.rejected_rows_count += 1
+                sample_errors.append(error)
+        return SampleReport(row_count, len(location_and_row_pairs), sample_errors)
+
+    def _location_and_row_pairs(self, row_index_and_row_pairs):
+        """
+        Same as ``row_index_and_row_pairs`` but with the row index replaced
+        by the :py:class:`cutplace.errors.Location` of the row.
+        """
+        result = []
+        for row_index, row in row_index_and_row_pairs:
+            location = errors.Location(self._location.file_path, has_cell=True)
+            if row_index >= 1:
+                location.advance_line(row_index)
+            result.append((location, row))
+        return result
+
+    def _seeked_sample(self, sample_size, every, random_generator):
+        """
+        Tuple ``(row_count, location_and_row_pairs)`` for the sample read by
+        seeking to the sampled rows, or ``(None, None)`` if the data do not
+        allow this.
+        """
+        data_format = self.cid.data_format
+        row_count = None
+        location_and_row_pairs = None
+        if (data_format.format == data.FORMAT_FIXED) and isinstance(self._source_data_stream_or_path, six.string_types):
+            field_names_and_lengths = interface.field_names_and_lengths(self.cid)
+            record_count = rowio.fixed_row_count(
+                self._source_data_stream_or_path, data_format.encoding, field_names_and_lengths,
+                data_format.line_delimiter)
+            if record_count is not None:
+                header_row_count = data_format.header
+                row_count = max(0, record_count - header_row_count)
+                if every is not None:
+                    row_indices = range(0, row_count, every)
+                else:
+                    row_indices = sorted(random_generator.sample(range(row_count), min(sample_size, row_count)))
+                seeked_record_index_and_row_pairs = rowio.fixed_rows_at(
+                    self._source_data_stream_or_path, data_format.encoding, field_names_and_lengths,
+                    data_format.line_delimiter, [header_row_count + row_index for row_index in row_indices])
+                location_and_row_pairs = self._location_and_row_pairs(
+                    (record_index - header_row_count, row) for record_index, row in seeked_record_index_and_row_pairs)
+        return row_count, location_and_row_pairs
+
+    def _read_sample(self, sample_size, every, random_generator):
+        """
+        Tuple ``(row_count, location_and_row_pairs)`` for the sample read by
+        reading all rows and keeping only the sampled ones; random samples
+        use reservoir sampling so only ``sample_size`` rows have to be kept
+        in memory.
+        """
+        header_row_count = self._cid.data_format.header
+        row_index_and_row_pairs = []
+        row_count = 0
+        for record_count, row in enumerate(self._raw_rows(), 1):
+            if record_count > header_row_count:
+                row_index = row_count
+                row_count += 1
+                if every is not None:
+                    if (row_index % every) == 0:
+                        row_index_and_row_pairs.append((row_index, row))
+                elif row_index < sample_size:
+                    row_index_and_row_pairs.append((row_index, row))
+                else:
+                    index_to_replace = random_generator.randint(0, row_index)
+                    if index_to_replace < sample_size:
+                        row_index_and_row_pairs[index_to_replace] = (row_index, row)
+        row_index_and_row_pairs.sort(key=lambda row_index_and_row: row_index_and_row[0])
+        return row_count, self._location_and_row_pairs(row_index_and_row_pairs)
+
+    def validate_changes(self, previous_data_stream_or_path, batch_size=DEFAULT_COLUMN_BATCH_SIZE):
+        """
+        Validate the data under the assumption that
+        ``previous_data_stream_or_path`` is a previous version of them that
+        has already been accepted using the same CID, for example yesterday's
+        snapshot of master data that only change a little each day. The
+        fields of rows that are also part of the previous data are not
+        validated again, only the fields of new or changed rows are, using
+        :py:meth:`cutplace.fields.AbstractFieldFormat.validated_column()`
+        on batches of up to ``batch_size`` rows.
+
+        Rows are compared using a digest of all their values, so the
+        previous data do not need to be sorted and the memory needed is
+        about 100 bytes per previous row. Checks still process all rows in
+        their original order so they find for example duplicate keys
+        between changed and unchanged rows.
+
+        Contrary to :py:meth:`~.rows()`, rejected rows do not raise an error
+        but are available from :py:attr:`~.ChangeReport.errors` unless there
+        are more than allowed by ``max_errors`` or ``max_error_rate``.
+
+        :rtype: cutplace.validio.ChangeReport
+        :raises cutplace.errors.ErrorBudgetError: if more rows have been \
+          rejected than allowed; its attribute ``change_report`` holds the \
+          :py:class:`~cutplace.validio.ChangeReport` for the rows read \
+          until then
+        """
+        assert previous_data_stream_or_path is not None
+        assert batch_size >= 1
+        assert self._validate_until is None, 'validate_changes() must not be combined with validate_until'
+        assert self._checkpoint_path is None, 'validate_changes() does not support checkpoints'
+
+        header_row_count = self._cid.data_format.header
+        previous_row_digests = set(
+            _row_digest(row) for row_count, row in enumerate(self._raw_rows(previous_data_stream_or_path), 1)
+            if row_count > header_row_count)
+
+        self.accepted_rows_count = 0
+        self.rejected_rows_count = 0
+        for check in self._check_map.values():
+            check.reset()
+        change_errors = []
+        changed_row_count = 0
+        location_and_row_pairs = []
+        changed_row_indices = []
+        budget_error = None
+        for row_count, row in enumerate(self._raw_rows(), 1):
+            if row_count > header_row_count:
+                if _row_digest(row) not in previous_row_digests:
+                    changed_row_indices.append(len(location_and_row_pairs))
+                location_and_row_pairs.append((copy.copy(self._location), row))
+                if len(location_and_row_pairs) == batch_size:
+                    batch_changed_row_count, budget_error = self._validate_changes_batch(
+                        location_and_row_pairs, changed_row_indices, change_errors)
+                    changed_row_count += batch_changed_row_count
+                    location_and_row_pairs = []
+                    changed_row_indices = []
+                    if budget_error is not None:
+                        break
             self._location.advance_line()
+        if location_and_row_pairs and (budget_error is None):
+            batch_changed_row_count, budget_error = self._validate_changes_batch(
+                location_and_row_pairs, changed_row_indices, change_errors)
+            changed_row_count += batch_changed_row_count
+        result = ChangeReport(self.accepted_rows_count + self.rejected_rows_count, changed_row_count, change_errors)
+        if budget_error is not None:
+            budget_error.change_report = result
+            raise budget_error
+        return result
+
+    def _validate_changes_batch(self, location_and_row_pairs, changed_row_indices, change_errors):
+        """
+        Validate the rows in ``location_and_row_pairs`` where only the rows
+        at ``changed_row_indices`` have their fields validated, and append
+        the :py:exc:`cutplace.errors.DataError` for each rejected row to
+        ``change_errors``.
+
+        :return: tuple ``(changed_row_count, budget_error)`` with the \
+          number of changed rows validated and the \
+          :py:exc:`cutplace.errors.ErrorBudgetError` to raise, or ``None``; \
+          if the error budget is exceeded, the rows after the one exceeding \
+          it are not validated
+        """
+        row_index_to_field_error_map = {}
+        if changed_row_indices:
+            changed_locations = [location_and_row_pairs[row_index][0] for row_index in changed_row_indices]
+            changed_rows = [location_and_row_pairs[row_index][1] for row_index in changed_row_indices]
+            _, changed_row_index_and_error_pairs = self._validated_columns(
+                changed_rows, changed_locations[0], changed_locations)
+            for changed_row_index, field_error in changed_row_index_and_error_pairs:
+                row_index_to_field_error_map.setdefault(changed_row_indices[changed_row_index], field_error)
+        changed_row_index_set = set(changed_row_indices)
+        changed_row_count = 0
+        budget_error = None
+        for row_index, (location, row) in enumerate(location_and_row_pairs):
+            if row_index in changed_row_index_set:
+                changed_row_count += 1
+            location.set_cell(0)
+            error = self._rejection_error(row, row_index_to_field_error_map.get(row_index), location)
+            if error is None:
+                self.accepted_rows_count += 1
+            else:
+                self._record_rejection(error, row)
+                self.rejected_rows_count += 1
+                change_errors.append(error)
+                try:
+                    self._check_error_budget(self.accepted_rows_count + self.rejected_rows_count, location)
+                except errors.ErrorBudgetError as error:
+                    budget_error = error
+                    break
+        return changed_row_count, budget_error
 
     def validate_rows(self):
         """
@@ -328,7 +1855,13 @@ class Writer(BaseValidator):
             actual_row_to_write = self._padded_fixed_row(row_to_write)
         else:
             actual_row_to_write = row_to_write
-        self._delegated_writer.write_row(actual_row_to_write)
+        if self._stats is None:
+            self._delegated_writer.write_row(actual_row_to_write)
+        else:
+            start_time = stats.timer()
+            self._delegated_writer.write_row(actual_row_to_write)
+            self._stats.add_time(stats.STAGE_WRITE, stats.timer() - start_time)
+            self._stats.row_count += 1
 
     def write_rows(self, rows_to_write):
         assert rows_to_write is not None
@@ -369,13 +1902,42 @@ def rows(cid_or_path, data_stream_or_path, on_error='raise', validate_until=None
             yield row
 
 
-def validate(cid_or_path, data_stream_or_path, validate_until=None):
+def column_batches(cid_or_path, data_stream_or_path, on_error='raise', batch_size=DEFAULT_COLUMN_BATCH_SIZE):
+    """
+    :py:class:`cutplace.validio.ColumnBatch` objects with the validated
+    values read from ``data`` and validated against ``cid_or_path``.
+
+    :param cid_or_path: :py:class:`cutplace.Cid` or :py:class:`str` \
+      describing a path pointing to a CID
+    :param data_stream_or_path: filelike object or :py:class:`str` \
+      describing a path pointing to the data to be read
+    :param str on_error: same as ``on_error`` for :py:class:`cutplace.Reader`
+    :param int batch_size: the maximum number of rows in each batch
+    :raises cutplace.errors.DataError: on broken data but only in case \
+      ``on_error='raise'`` (the default)
+    :raises cutplace.errors.InterfaceError: on a broken CID
+    """
+    assert cid_or_path is not None
+    assert data_stream_or_path is not None
+    assert on_error in _VALID_ON_ERROR_CHOICES, 'on_error=%r' % on_error
+    assert batch_size >= 1
+
+    with Reader(cid_or_path, data_stream_or_path, on_error) as reader:
+        for column_batch in reader.column_batches(batch_size):
+            yield column_batch
+
+
+def validate(cid_or_path, data_stream_or_path, validate_until=None, result_cache=None):
     """
     Validate that ``data_or_path`` conform to ``cid_or_path``.
     :param cid_or_path: :py:class:`cutplace.Cid` or :py:class:`str` \
       describing a path pointing to a CID
     :param data_stream_or_path: filelike object or :py:class:`str` \
       describing a path pointing to the data to be read
+    :param cutplace.results.ResultCache result_cache: cache to look up \
+      the result of a previous validation of the same data in; if there \
+      is none, the result of this validation is stored in it; this only \
+      applies to data specified by a path
     :raises cutplace.errors.DataError: on broken data
     :raises cutplace.errors.InterfaceError: on a broken CID
     """
@@ -384,19 +1946,30 @@ def validate(cid_or_path, data_stream_or_path, validate_until=None):
     assert (validate_until is None) or (validate_until >= 0)
 
     with Reader(cid_or_path, data_stream_or_path, validate_until=validate_until) as reader:
-        rows_to_validate = reader.rows()
-        if validate_until is not None:
-            rows_to_validate = itertools.islice(rows_to_validate, validate_until)
-        for _ in rows_to_validate:
-            pass
+        result_key = None
+        if (result_cache is not None) and isinstance(data_stream_or_path, six.string_types):
+            result_key = result_cache.key(data_stream_or_path, reader.cid, {'validate_until': validate_until})
+            cached_result = result_cache.get(result_key)
+            if cached_result is not None:
+                if cached_result['error'] is not None:
+                    raise results.data_error_from_details(cached_result['error'])
+                return
+        try:
+            rows_to_validate = reader.rows()
+            if validate_until is not None:
+                rows_to_validate = itertools.islice(rows_to_validate, validate_until)
+            for _ in rows_to_validate:
+                pass
+            # Close explicitly so a failing check at the end is part of the result.
+            reader.close()
+        except errors.DataError as error:
+            if result_key is not None:
+                result_cache.put(result_key, {'error': results.data_error_details(error)}, data_stream_or_path)
+            raise
+        if result_key is not None:
+            result_cache.put(result_key, {'error': None}, data_stream_or_path)
+
 
 def get_formatted_cell_location(location):
-    formatted_location_str = ""
-    try:
-        formatted_location_str = str(location).split()[1]
-        formatted_location_str = formatted_location_str.replace('(', '')
-        formatted_location_str = formatted_location_str.replace(')', '')
-    except Exception:
-        pass
-    return formatted_location_str
+    return location.position_text() if location is not None else ""
 
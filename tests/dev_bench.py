@@ -0,0 +1,568 @@
+"""
+Benchmark cutplace for various data formats, sizes and CIDs.
+
+Use ``run`` to validate synthetic data and store throughput, peak memory
+and startup time in a JSON file, and ``compare`` to find regressions of
+such a result compared to a previously saved baseline. Use ``load`` to
+measure how long it takes to read a CID with thousands of fields.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import datetime
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+import zipfile
+from contextlib import closing
+from xml.sax import saxutils
+
+import six
+
+from cutplace import data
+from cutplace import errors
+from cutplace import generators
+from cutplace import interface
+from cutplace import ranges
+from cutplace import validio
+from cutplace import _compat
+from cutplace import _tools
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    # HACK: Python 2 has no tracemalloc, so peak memory remains unknown.
+    tracemalloc = None
+
+_log = logging.getLogger('cutplace.dev_bench')
+
+#: Named sizes of the data to benchmark; other sizes can be specified as
+#: number of rows.
+SIZE_NAME_TO_ROW_COUNT_MAP = {
+    '10k': 10000,
+    '1m': 1000000,
+    '10m': 10000000,
+}
+
+#: Data formats that can be benchmarked.
+FORMATS = (data.FORMAT_DELIMITED, data.FORMAT_FIXED, data.FORMAT_ODS, data.FORMAT_EXCEL)
+
+#: Names of the CIDs that can be benchmarked.
+CID_NAMES = ('narrow', 'wide')
+
+#: Default number of fields of the synthetic CID to measure how long it
+#: takes to read it.
+DEFAULT_LOAD_FIELD_COUNT = 5000
+
+#: Add an IsUnique check for every n-th field of the synthetic CID to
+#: measure reading CIDs.
+_LOAD_CHECK_EVERY = 10
+
+#: Relative difference from the baseline up to which results still are
+#: considered to be equal.
+DEFAULT_TOLERANCE = 0.1
+
+#: Default folder to store CIDs and data for benchmarks in.
+DEFAULT_BENCHMARK_FOLDER = os.path.join('build', 'benchmark')
+
+#: Maximum number of rows in a sheet of ODS and Excel documents.
+_SPREADSHEET_MAX_ROW_COUNT = 1048576
+
+_CID_NAME_TO_FIELD_COUNT_MAP = {
+    'narrow': 5,
+    'wide': 100,
+}
+
+_FORMAT_TO_SUFFIX_MAP = {
+    data.FORMAT_DELIMITED: '.csv',
+    data.FORMAT_EXCEL: '.xlsx',
+    data.FORMAT_FIXED: '.txt',
+    data.FORMAT_ODS: '.ods',
+}
+
+# Kinds of fields as tuple (kind, length, type, rule); the length is only
+# used for fixed data.
+_FIELD_KINDS = (
+    ('integer', 6, 'Integer', '100000...999999'),
+    ('text', 12, 'Text', ''),
+    ('date', 10, 'DateTime', 'YYYY-MM-DD'),
+    ('choice', 1, 'Choice', '"N, E, S, W"'),
+    ('decimal', 8, 'Decimal', ''),
+)
+
+#: Result values where a higher value is better; for all other values
+#: lower is better.
+_HIGHER_IS_BETTER_KEYS = ('rows_per_second', 'bytes_per_second')
+
+#: Result values compared with the baseline.
+_COMPARED_KEYS = ('rows_per_second', 'peak_memory_bytes', 'startup_seconds')
+
+_ODS_CONTENT_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<office:document-content'
+    ' xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"'
+    ' xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"'
+    ' xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"'
+    ' office:version="1.2">'
+    '<office:body><office:spreadsheet><table:table table:name="Sheet1">\n')
+_ODS_CONTENT_FOOTER = '</table:table></office:spreadsheet></office:body></office:document-content>\n'
+_ODS_MANIFEST = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="1.2">'
+    '<manifest:file-entry manifest:full-path="/" manifest:media-type="application/vnd.oasis.opendocument.spreadsheet"/>'
+    '<manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>'
+    '</manifest:manifest>\n')
+
+
+def row_count_for(size):
+    """
+    The number of rows for ``size``, which is either a key of
+    :py:data:`SIZE_NAME_TO_ROW_COUNT_MAP` or a number.
+
+    :raises ValueError: if ``size`` is neither
+    """
+    assert size is not None
+
+    result = SIZE_NAME_TO_ROW_COUNT_MAP.get(size.lower())
+    if result is None:
+        result = int(size)
+        if result < 1:
+            raise ValueError('number of rows must be at least 1 but is %d' % result)
+    return result
+
+
+def _field_kinds(cid_name):
+    return _field_kinds_for(_CID_NAME_TO_FIELD_COUNT_MAP[cid_name])
+
+
+def _field_kinds_for(field_count):
+    return [_FIELD_KINDS[field_index % len(_FIELD_KINDS)] for field_index in range(field_count)]
+
+
+def cid_text(cid_name, data_format):
+    """
+    Text of a CID in CSV format for ``cid_name`` and ``data_format``.
+    """
+    assert cid_name in CID_NAMES, 'cid_name=%r' % cid_name
+    assert data_format in FORMATS, 'data_format=%r' % data_format
+
+    lines = ['d,format,%s' % data_format]
+    if data_format in (data.FORMAT_DELIMITED, data.FORMAT_FIXED):
+        lines.append('d,encoding,utf-8')
+    if data_format == data.FORMAT_FIXED:
+        lines.append('d,line delimiter,lf')
+    is_fixed = data_format == data.FORMAT_FIXED
+    for field_index, (kind, length, field_type, rule) in enumerate(_field_kinds(cid_name)):
+        length_text = '%d' % length if is_fixed else ''
+        lines.append('f,%s_%d,,,%s,%s,%s' % (kind, field_index + 1, length_text, field_type, rule))
+    return '\n'.join(lines) + '\n'
+
+
+def load_cid_text(field_count=DEFAULT_LOAD_FIELD_COUNT):
+    """
+    Text of a CID in CSV format with ``field_count`` fields of all kinds,
+    each with a length, and an IsUnique check for every 10th field.
+    """
+    assert field_count >= 1
+
+    lines = ['d,format,delimited', 'd,encoding,utf-8']
+    for field_index, (kind, length, field_type, rule) in enumerate(_field_kinds_for(field_count)):
+        lines.append('f,%s_%d,,,1...%d,%s,%s' % (kind, field_index + 1, length, field_type, rule))
+    for field_index in range(0, field_count, _LOAD_CHECK_EVERY):
+        kind = _FIELD_KINDS[field_index % len(_FIELD_KINDS)][0]
+        lines.append('c,unique_%d,IsUnique,%s_%d' % (field_index + 1, kind, field_index + 1))
+    return '\n'.join(lines) + '\n'
+
+
+def cid_loading_seconds(field_count=DEFAULT_LOAD_FIELD_COUNT, repeat=3):
+    """
+    The time in seconds it takes to read the CID described by
+    :py:func:`load_cid_text`, taking the best of ``repeat`` attempts.
+    """
+    assert field_count >= 1
+    assert repeat >= 1
+
+    cid_text_to_load = load_cid_text(field_count)
+    result = None
+    for _ in range(repeat):
+        # HACK: Forget previously parsed ranges to measure reading the CID for the first time.
+        ranges._type_and_description_to_parsed_range_map.clear()
+        start_time = timeit.default_timer()
+        interface.create_cid_from_string(cid_text_to_load)
+        duration = timeit.default_timer() - start_time
+        if (result is None) or (duration < result):
+            result = duration
+    return result
+
+
+def _write_ods(target_path, rows):
+    with tempfile.NamedTemporaryFile(suffix='.xml', delete=False) as content_file:
+        content_path = content_file.name
+    try:
+        with io.open(content_path, 'w', encoding='utf-8') as content_file:
+            content_file.write(_ODS_CONTENT_HEADER)
+            for row in rows:
+                content_file.write('<table:table-row>')
+                for item in row:
+                    content_file.write(
+                        '<table:table-cell office:value-type="string"><text:p>%s</text:p></table:table-cell>'
+                        % saxutils.escape(item))
+                content_file.write('</table:table-row>\n')
+            content_file.write(_ODS_CONTENT_FOOTER)
+        with closing(zipfile.ZipFile(target_path, 'w', zipfile.ZIP_DEFLATED)) as ods_zip:
+            ods_zip.writestr(zipfile.ZipInfo('mimetype'), b'application/vnd.oasis.opendocument.spreadsheet')
+            ods_zip.writestr('META-INF/manifest.xml', _ODS_MANIFEST.encode('utf-8'))
+            ods_zip.write(content_path, 'content.xml')
+    finally:
+        os.remove(content_path)
+
+
+def write_synthetic_data(target_path, cid, row_count):
+    """
+    Write ``row_count`` rows of synthetic data conforming to ``cid`` to
+    ``target_path``.
+    """
+    assert target_path is not None
+    assert cid is not None
+
+    _log.info('write %d rows to "%s"', row_count, target_path)
+    if cid.data_format.format == data.FORMAT_ODS:
+        # HACK: rowio has no writer for ODS, so write the rows ourselves.
+        _write_ods(target_path, generators.RowGenerator(cid, seed=0).rows(row_count))
+    else:
+        generators.write(cid, target_path, row_count, seed=0)
+
+
+def _prepared_cid_and_data_path(folder, cid_name, data_format, row_count):
+    """
+    Tuple ``(cid_path, data_path)`` for the benchmark, reusing data from
+    previous runs because creating large data takes a lot of time.
+    """
+    _tools.mkdirs(folder)
+    base_name = '%s_%s' % (cid_name, data_format)
+    cid_path = os.path.join(folder, 'cid_%s.csv' % base_name)
+    with io.open(cid_path, 'w', encoding='utf-8') as cid_file:
+        cid_file.write(cid_text(cid_name, data_format))
+    data_path = os.path.join(folder, '%s_%d%s' % (base_name, row_count, _FORMAT_TO_SUFFIX_MAP[data_format]))
+    if not os.path.exists(data_path):
+        temp_data_path = data_path + '.tmp'
+        write_synthetic_data(temp_data_path, interface.Cid(cid_path), row_count)
+        _compat.replace_file(temp_data_path, data_path)
+    return cid_path, data_path
+
+
+def _validate(cid, data_path):
+    with validio.Reader(cid, data_path) as reader:
+        for _ in reader.column_batches():
+            pass
+
+
+def _peak_memory_bytes(cid, data_path):
+    if tracemalloc is None:  # pragma: no cover
+        result = None
+    else:
+        tracemalloc.start()
+        try:
+            _validate(cid, data_path)
+            result = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def startup_seconds(cid_path, repeat=3):
+    """
+    The time in seconds it takes a new Python process to import cutplace
+    and read the CID in ``cid_path``, taking the best of ``repeat``
+    attempts.
+    """
+    assert cid_path is not None
+    assert repeat >= 1
+
+    command = [sys.executable, '-c', 'import sys; from cutplace import interface; interface.Cid(sys.argv[1])', cid_path]
+    result = None
+    for _ in range(repeat):
+        start_time = timeit.default_timer()
+        subprocess.check_call(command)
+        duration = timeit.default_timer() - start_time
+        if (result is None) or (duration < result):
+            result = duration
+    return result
+
+
+def benchmark_name(cid_name, data_format, row_count):
+    return '%s-%s-%d' % (cid_name, data_format, row_count)
+
+
+def run_benchmark(folder, cid_name, data_format, row_count, measure_memory=True, repeat=1):
+    """
+    Dictionary describing the result of validating ``row_count`` rows
+    of synthetic data in ``data_format`` using the CID ``cid_name``. The
+    time is the best of ``repeat`` validations.
+    """
+    assert folder is not None
+    assert cid_name in CID_NAMES, 'cid_name=%r' % cid_name
+    assert data_format in FORMATS, 'data_format=%r' % data_format
+    assert row_count >= 1
+    assert repeat >= 1
+
+    cid_path, data_path = _prepared_cid_and_data_path(folder, cid_name, data_format, row_count)
+    cid = interface.Cid(cid_path)
+    data_byte_count = os.path.getsize(data_path)
+    name = benchmark_name(cid_name, data_format, row_count)
+    _log.info('benchmark %s', name)
+    seconds = None
+    for _ in range(repeat):
+        start_time = timeit.default_timer()
+        _validate(cid, data_path)
+        duration = timeit.default_timer() - start_time
+        if (seconds is None) or (duration < seconds):
+            seconds = duration
+    return {
+        'name': name,
+        'cid': cid_name,
+        'format': data_format,
+        'row_count': row_count,
+        'field_count': len(cid.field_names),
+        'data_bytes': data_byte_count,
+        'seconds': seconds,
+        'rows_per_second': row_count / seconds if seconds > 0 else None,
+        'bytes_per_second': data_byte_count / seconds if seconds > 0 else None,
+        'peak_memory_bytes': _peak_memory_bytes(cid, data_path) if measure_memory else None,
+    }
+
+
+def run_benchmarks(
+        folder=DEFAULT_BENCHMARK_FOLDER, sizes=('10k',), data_formats=FORMATS, cid_names=CID_NAMES,
+        measure_memory=True, repeat=1):
+    """
+    Dictionary with information about the environment and the results of
+    :py:func:`run_benchmark` for all combinations of ``sizes``,
+    ``data_formats`` and ``cid_names``. Spreadsheet formats are skipped for
+    sizes exceeding the number of rows a sheet can hold.
+    """
+    assert folder is not None
+    assert sizes
+    assert data_formats
+    assert cid_names
+
+    # Import locally to avoid circular import.
+    from cutplace import __version__
+
+    benchmark_results = []
+    cid_name_to_startup_seconds_map = {}
+    for size in sizes:
+        row_count = row_count_for(size)
+        for cid_name in cid_names:
+            for data_format in data_formats:
+                is_spreadsheet = data_format in (data.FORMAT_EXCEL, data.FORMAT_ODS)
+                if is_spreadsheet and (row_count > _SPREADSHEET_MAX_ROW_COUNT):
+                    _log.info(
+                        'skip %s because a sheet can hold at most %d rows',
+                        benchmark_name(cid_name, data_format, row_count), _SPREADSHEET_MAX_ROW_COUNT)
+                    continue
+                try:
+                    benchmark_result = run_benchmark(
+                        folder, cid_name, data_format, row_count, measure_memory, repeat)
+                except errors.DataFormatError as error:
+                    # For example, newer versions of xlrd cannot read Excel 2007+ documents.
+                    _log.warning('cannot benchmark %s: %s', benchmark_name(cid_name, data_format, row_count), error)
+                    continue
+                if cid_name not in cid_name_to_startup_seconds_map:
+                    cid_path = _prepared_cid_and_data_path(folder, cid_name, data_format, row_count)[0]
+                    cid_name_to_startup_seconds_map[cid_name] = startup_seconds(cid_path)
+                benchmark_result['startup_seconds'] = cid_name_to_startup_seconds_map[cid_name]
+                benchmark_results.append(benchmark_result)
+    return {
+        'cutplace_version': __version__,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'results': benchmark_results,
+    }
+
+
+def write_results(target_path, benchmark_results):
+    with io.open(target_path, 'w', encoding='utf-8') as target_file:
+        target_file.write(six.text_type(json.dumps(benchmark_results, indent=2, sort_keys=True)))
+        target_file.write('\n')
+
+
+def read_results(source_path):
+    with io.open(source_path, encoding='utf-8') as source_file:
+        return json.load(source_file)
+
+
+def regressions(baseline_results, current_results, tolerance=DEFAULT_TOLERANCE):
+    """
+    List of human readable texts describing values in ``current_results``
+    that are more than ``tolerance`` worse than in ``baseline_results``.
+    Benchmarks that are missing in either of them are ignored.
+    """
+    assert baseline_results is not None
+    assert current_results is not None
+    assert tolerance >= 0
+
+    result = []
+    name_to_baseline_map = dict((item['name'], item) for item in baseline_results['results'])
+    for current in current_results['results']:
+        baseline = name_to_baseline_map.get(current['name'])
+        if baseline is None:
+            continue
+        for key in _COMPARED_KEYS:
+            baseline_value = baseline.get(key)
+            current_value = current.get(key)
+            if not baseline_value or (current_value is None):
+                continue
+            change = (current_value - baseline_value) / baseline_value
+            if key in _HIGHER_IS_BETTER_KEYS:
+                change = -change
+            if change > tolerance:
+                result.append('%s: %s is %.0f%% worse (%s instead of %s)' % (
+                    current['name'], key, 100 * change, _value_text(current_value), _value_text(baseline_value)))
+    return result
+
+
+def _value_text(value):
+    return '%d' % value if value >= 100 else '%.3f' % value
+
+
+def _results_lines(benchmark_results):
+    result = []
+    for item in benchmark_results['results']:
+        peak_memory_bytes = item.get('peak_memory_bytes')
+        peak_memory_text = '%.1f MB' % (peak_memory_bytes / 1000000) if peak_memory_bytes is not None else 'unknown'
+        result.append('%s: %.0f rows/s, %.1f MB/s, peak memory %s, startup %.3fs' % (
+            item['name'], item['rows_per_second'] or 0, (item['bytes_per_second'] or 0) / 1000000,
+            peak_memory_text, item['startup_seconds']))
+    return result
+
+
+def _comma_separated(text, valid_values=None):
+    result = [item.strip() for item in text.split(',') if item.strip()]
+    if valid_values is not None:
+        for item in result:
+            if item not in valid_values:
+                raise argparse.ArgumentTypeError(
+                    'value is %s but must be one of: %s' % (
+                        _compat.text_repr(item), _tools.human_readable_list(valid_values)))
+    return result
+
+
+def _sizes(text):
+    result = _comma_separated(text)
+    for size in result:
+        try:
+            row_count_for(size)
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                'size is %s but must be a number of rows or one of: %s' % (
+                    _compat.text_repr(size), _tools.human_readable_list(sorted(SIZE_NAME_TO_ROW_COUNT_MAP.keys()))))
+    return result
+
+
+def main(arguments):
+    assert arguments is not None
+
+    parser = argparse.ArgumentParser(description='benchmark cutplace and compare the results with a baseline')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser('run', help='run benchmarks and store the results in a JSON file')
+    run_parser.add_argument(
+        '--sizes', metavar='SIZES', type=_sizes, default=['10k'],
+        help='comma separated sizes of the data: %s or a number of rows (default: %%(default)s)'
+        % _tools.human_readable_list(sorted(SIZE_NAME_TO_ROW_COUNT_MAP.keys())))
+    run_parser.add_argument(
+        '--formats', metavar='FORMATS', type=lambda text: _comma_separated(text, FORMATS), default=list(FORMATS),
+        help='comma separated data formats to benchmark (default: %(default)s)')
+    run_parser.add_argument(
+        '--cids', metavar='CIDS', type=lambda text: _comma_separated(text, CID_NAMES), default=list(CID_NAMES),
+        help='comma separated CIDs to benchmark (default: %(default)s)')
+    run_parser.add_argument(
+        '--folder', metavar='FOLDER', default=DEFAULT_BENCHMARK_FOLDER,
+        help='folder to store synthetic data in (default: %(default)s)')
+    run_parser.add_argument(
+        '--repeat', metavar='COUNT', type=int, default=1,
+        help='number of times to validate each data file and keep the best time (default: %(default)s)')
+    run_parser.add_argument(
+        '--no-memory', action='store_false', dest='measure_memory',
+        help='do not measure peak memory, which takes another validation using tracemalloc')
+    run_parser.add_argument('results_path', metavar='RESULTS-FILE', help='JSON file to store the results in')
+
+    load_parser = subparsers.add_parser('load', help='measure the time it takes to read a synthetic CID with many fields')
+    load_parser.add_argument(
+        '--fields', metavar='COUNT', type=int, default=DEFAULT_LOAD_FIELD_COUNT, dest='field_count',
+        help='number of fields in the CID (default: %(default)s)')
+    load_parser.add_argument(
+        '--repeat', metavar='COUNT', type=int, default=3,
+        help='number of times to read the CID and keep the best time (default: %(default)s)')
+
+    compare_parser = subparsers.add_parser('compare', help='compare results with a baseline and report regressions')
+    compare_parser.add_argument(
+        '--tolerance', metavar='RATIO', type=float, default=DEFAULT_TOLERANCE,
+        help='relative difference that is still acceptable (default: %(default)s)')
+    compare_parser.add_argument('baseline_path', metavar='BASELINE-FILE', help='JSON file with the baseline results')
+    compare_parser.add_argument('results_path', metavar='RESULTS-FILE', help='JSON file with the results to check')
+
+    args = parser.parse_args(arguments)
+    if (args.command in ('load', 'run')) and (args.repeat < 1):
+        parser.error('option --repeat is %d but must be at least 1' % args.repeat)
+    if (args.command == 'load') and (args.field_count < 1):
+        parser.error('option --fields is %d but must be at least 1' % args.field_count)
+
+    exit_code = 1
+    try:
+        if args.command == 'run':
+            benchmark_results = run_benchmarks(
+                args.folder, args.sizes, args.formats, args.cids, args.measure_memory, args.repeat)
+            write_results(args.results_path, benchmark_results)
+            for line in _results_lines(benchmark_results):
+                _log.info(line)
+            exit_code = 0
+        elif args.command == 'load':
+            seconds = cid_loading_seconds(args.field_count, args.repeat)
+            _log.info('read CID with %d fields in %.3fs', args.field_count, seconds)
+            exit_code = 0
+        else:
+            assert args.command == 'compare', 'args.command=%r' % args.command
+            regression_texts = regressions(
+                read_results(args.baseline_path), read_results(args.results_path), args.tolerance)
+            for regression_text in regression_texts:
+                _log.warning('regression: %s', regression_text)
+            if regression_texts:
+                _log.error('found %d regression(s)', len(regression_texts))
+            else:
+                _log.info('found no regressions')
+                exit_code = 0
+    except (EnvironmentError, OSError, ValueError) as error:
+        _log.error('cannot %s benchmarks: %s', args.command, error)
+    return exit_code
+
+
+if __name__ == '__main__':  # pragma: no cover
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv[1:]))
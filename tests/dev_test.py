@@ -24,6 +24,8 @@ import fnmatch
 import logging
 import os
 import random
+import shutil
+import tempfile
 from datetime import timedelta, datetime
 from random import randrange
 
@@ -31,6 +33,11 @@ import six
 
 _log = logging.getLogger("cutplace.tests")
 
+_CACHE_HOME_VARIABLE = 'XDG_CACHE_HOME'
+
+# Tuple ``(temp_cache_home, previous_cache_home)`` while ``use_temp_cache_home()`` is in effect.
+_temp_and_previous_cache_home = None
+
 # Most popular names in the USA according to U.S. Census Bureau, Population Division,
 # Population Analysis & Evaluation Staff from 2005-11-20.
 _MALE_NAMES = [
@@ -307,3 +314,33 @@ def unified_newlines(text):
     """
     assert text is not None
     return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def use_temp_cache_home():
+    """
+    Point ``$XDG_CACHE_HOME`` to a new temporary folder so that tests using
+    the command line application do not use the result cache of the current
+    user. Use :py:func:`restore_cache_home` to undo this.
+    """
+    global _temp_and_previous_cache_home
+    assert _temp_and_previous_cache_home is None
+
+    _temp_and_previous_cache_home = (tempfile.mkdtemp(prefix='cutplace_test_cache_'), os.environ.get(_CACHE_HOME_VARIABLE))
+    os.environ[_CACHE_HOME_VARIABLE] = _temp_and_previous_cache_home[0]
+
+
+def restore_cache_home():
+    """
+    Restore ``$XDG_CACHE_HOME`` as it was before
+    :py:func:`use_temp_cache_home` and remove the temporary folder.
+    """
+    global _temp_and_previous_cache_home
+    assert _temp_and_previous_cache_home is not None
+
+    temp_cache_home, previous_cache_home = _temp_and_previous_cache_home
+    if previous_cache_home is None:
+        del os.environ[_CACHE_HOME_VARIABLE]
+    else:
+        os.environ[_CACHE_HOME_VARIABLE] = previous_cache_home
+    shutil.rmtree(temp_cache_home, ignore_errors=True)
+    _temp_and_previous_cache_home = None
@@ -20,6 +20,8 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import io
+import json
 import logging
 import os
 import unittest
@@ -27,6 +29,7 @@ import unittest
 import six
 
 from cutplace import applications
+from cutplace import results
 from tests import dev_test
 from tests import _ods
 
@@ -35,6 +38,34 @@ _log = logging.getLogger("cutplace.test_applications")
 
 _customers_cid_path = dev_test.path_to_example('cid_customers.ods')
 _valid_customers_csv_path = dev_test.path_to_example('customers.csv')
+_broken_customers_csv_path = dev_test.path_to_test_data('broken_customers.csv')
+
+
+class _ErrorCollectingHandler(logging.Handler):
+    """
+    Logging handler that collects the messages of all errors logged.
+    """
+    def __init__(self):
+        super(_ErrorCollectingHandler, self).__init__(logging.ERROR)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage().strip())
+
+
+def _logged_errors(cutplace_app, data_path):
+    """
+    Messages of the errors logged when ``cutplace_app`` validates
+    ``data_path``.
+    """
+    handler = _ErrorCollectingHandler()
+    cutplace_log = logging.getLogger('cutplace')
+    cutplace_log.addHandler(handler)
+    try:
+        cutplace_app.validate(data_path)
+    finally:
+        cutplace_log.removeHandler(handler)
+    return handler.messages
 
 
 def _assert_valid_customers_has_no_barret():
@@ -44,6 +75,14 @@ def _assert_valid_customers_has_no_barret():
     assert 'Barret' not in customers_content
 
 
+def setUpModule():
+    dev_test.use_temp_cache_home()
+
+
+def tearDownModule():
+    dev_test.restore_cache_home()
+
+
 class CutplaceAppTest(unittest.TestCase):
     def setUp(self):
         self._cutplace_app = applications.CutplaceApp()
@@ -64,6 +103,201 @@ class CutplaceAppTest(unittest.TestCase):
         self._cutplace_app.validate(self._broken_customers_non_csv_path)
         self.assertFalse(self._cutplace_app.all_validations_were_ok)
 
+    def test_can_summarize_errors(self):
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--summary', dev_test.CID_CUSTOMERS_XLS_PATH])
+        self.assertTrue(cutplace_app.is_summary)
+        cutplace_app.validate(dev_test.path_to_test_data('broken_customers_with_duplicates.csv'))
+        self.assertFalse(cutplace_app.all_validations_were_ok)
+
+    def test_can_write_rejected_rows_to_sinks(self):
+        errors_path = dev_test.path_to_test_result('test_can_write_rejected_rows_to_sinks.jsonl')
+        quarantine_path = dev_test.path_to_test_result('test_can_write_rejected_rows_to_sinks.csv')
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options([
+            'test', '--errors', errors_path, '--quarantine', quarantine_path, dev_test.CID_CUSTOMERS_XLS_PATH])
+        try:
+            cutplace_app.validate(dev_test.path_to_test_data('broken_customers_with_duplicates.csv'))
+        finally:
+            cutplace_app.close()
+        self.assertFalse(cutplace_app.all_validations_were_ok)
+        with io.open(errors_path, encoding='utf-8') as errors_file:
+            self.assertEqual(len(errors_file.readlines()), 1)
+        with io.open(quarantine_path, encoding='cp1252') as quarantine_file:
+            self.assertEqual(quarantine_file.read().splitlines(), ['3798,Jane,Doe,2003-06-29,female'])
+
+    def test_can_stop_after_max_errors(self):
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--max-errors', '0', '--max-error-rate', '5', dev_test.CID_CUSTOMERS_XLS_PATH])
+        self.assertEqual(cutplace_app.max_errors, 0)
+        self.assertEqual(cutplace_app.max_error_rate, 0.05)
+        cutplace_app.validate(dev_test.path_to_test_data('broken_customers_with_duplicates.csv'))
+        self.assertFalse(cutplace_app.all_validations_were_ok)
+
+    def test_can_summarize_broken_fields(self):
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--summary', '--no-result-cache', dev_test.CID_CUSTOMERS_XLS_PATH])
+        logged_errors = _logged_errors(cutplace_app, _broken_customers_csv_path)
+        self.assertFalse(cutplace_app.all_validations_were_ok)
+        self.assertEqual(logged_errors[0], 'rejected 3 rows')
+        self.assertEqual(len(logged_errors), 4)
+        dev_test.assert_fnmatches(self, logged_errors[1], "field 'customer_id', integer: 1 error from R3C1, *")
+        dev_test.assert_fnmatches(self, logged_errors[2], "field 'gender', choice: 1 error from R4C5, *")
+        dev_test.assert_fnmatches(self, logged_errors[3], "field 'date_of_birth', date_time: 1 error from R5C4, *")
+
+    def test_can_write_broken_fields_to_sinks(self):
+        errors_path = dev_test.path_to_test_result('test_can_write_broken_fields_to_sinks.jsonl')
+        quarantine_path = dev_test.path_to_test_result('test_can_write_broken_fields_to_sinks.csv')
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options([
+            'test', '--errors', errors_path, '--quarantine', quarantine_path, '--no-result-cache',
+            dev_test.CID_CUSTOMERS_XLS_PATH])
+        try:
+            cutplace_app.validate(_broken_customers_csv_path)
+        finally:
+            cutplace_app.close()
+        self.assertFalse(cutplace_app.all_validations_were_ok)
+        with io.open(errors_path, encoding='utf-8') as errors_file:
+            error_lines = errors_file.readlines()
+        self.assertEqual(
+            [json.loads(error_line)['field'] for error_line in error_lines], ['customer_id', 'gender', 'date_of_birth'])
+        with io.open(quarantine_path, encoding='cp1252') as quarantine_file:
+            self.assertEqual(
+                [quarantined_row.split(',')[0] for quarantined_row in quarantine_file.read().splitlines()],
+                ['abcd', '46418', '72619'])
+
+    def test_can_stop_after_max_errors_in_broken_fields(self):
+        for options in ([], ['--previous', dev_test.path_to_test_data('broken_customers_with_duplicates.csv')]):
+            cutplace_app = applications.CutplaceApp()
+            cutplace_app.set_options(
+                ['test', '--max-errors', '1', '--no-result-cache'] + options + [dev_test.CID_CUSTOMERS_XLS_PATH])
+            logged_errors = _logged_errors(cutplace_app, _broken_customers_csv_path)
+            self.assertFalse(cutplace_app.all_validations_were_ok)
+            self.assertEqual(len(logged_errors), 3)
+            dev_test.assert_fnmatches(self, logged_errors[0], "* (R3C1): cannot accept field 'customer_id': *")
+            dev_test.assert_fnmatches(self, logged_errors[1], "* (R4C5): cannot accept field 'gender': *")
+            dev_test.assert_fnmatches(
+                self, logged_errors[2], '* (R4C1): stopped reading after 3 rows because 2 of them were rejected *')
+
+    def test_can_validate_sample(self):
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--sample', '10', dev_test.CID_CUSTOMERS_XLS_PATH])
+        self.assertEqual(cutplace_app.sample_size, 10)
+        cutplace_app.validate(dev_test.path_to_test_data('broken_customers_with_duplicates.csv'))
+        self.assertFalse(cutplace_app.all_validations_were_ok)
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--sample-every', '2', dev_test.CID_CUSTOMERS_XLS_PATH])
+        self.assertEqual(cutplace_app.sample_every, 2)
+        cutplace_app.validate(_valid_customers_csv_path)
+        self.assertTrue(cutplace_app.all_validations_were_ok)
+
+    def test_can_validate_changes(self):
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options([
+            'test', '--previous', _valid_customers_csv_path, '--no-result-cache', dev_test.CID_CUSTOMERS_XLS_PATH])
+        self.assertEqual(cutplace_app.previous_path, _valid_customers_csv_path)
+        cutplace_app.validate(_valid_customers_csv_path)
+        self.assertTrue(cutplace_app.all_validations_were_ok)
+        cutplace_app.validate(dev_test.path_to_test_data('broken_customers_with_duplicates.csv'))
+        self.assertFalse(cutplace_app.all_validations_were_ok)
+
+    def test_can_log_stats(self):
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--stats', dev_test.CID_CUSTOMERS_XLS_PATH])
+        self.assertTrue(cutplace_app.is_stats)
+        cutplace_app.validate(_valid_customers_csv_path)
+        self.assertTrue(cutplace_app.all_validations_were_ok)
+
+    def test_can_show_progress(self):
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--progress', '--no-result-cache', dev_test.CID_CUSTOMERS_XLS_PATH])
+        self.assertTrue(cutplace_app.is_progress)
+        cutplace_app.validate(_valid_customers_csv_path)
+        self.assertTrue(cutplace_app.all_validations_were_ok)
+
+    def test_can_write_metrics(self):
+        metrics_path = dev_test.path_to_test_result('test_can_write_metrics.prom')
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--metrics-file', metrics_path, dev_test.CID_CUSTOMERS_XLS_PATH])
+        try:
+            cutplace_app.validate(_valid_customers_csv_path)
+        finally:
+            cutplace_app.close()
+        with io.open(metrics_path, encoding='utf-8') as metrics_file:
+            metrics_text = metrics_file.read()
+        self.assertIn('cutplace_validation_ok{data="%s"} 1' % os.path.basename(_valid_customers_csv_path), metrics_text)
+
+    def test_can_write_metrics_of_broken_fields(self):
+        metrics_path = dev_test.path_to_test_result('test_can_write_metrics_of_broken_fields.prom')
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options([
+            'test', '--summary', '--metrics-file', metrics_path, '--no-result-cache', dev_test.CID_CUSTOMERS_XLS_PATH])
+        try:
+            cutplace_app.validate(_broken_customers_csv_path)
+        finally:
+            cutplace_app.close()
+        with io.open(metrics_path, encoding='utf-8') as metrics_file:
+            metrics_text = metrics_file.read()
+        self.assertIn('cutplace_rows_rejected{data="broken_customers.csv"} 3', metrics_text)
+        for field_name in ('customer_id', 'date_of_birth', 'gender'):
+            self.assertIn('cutplace_field_errors{data="broken_customers.csv",field="%s"} 1' % field_name, metrics_text)
+
+    def test_can_write_profile(self):
+        profile_path = dev_test.path_to_test_result('test_can_write_profile.prof')
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--profile', profile_path, '--until', '5', dev_test.CID_CUSTOMERS_XLS_PATH])
+        self.assertEqual(cutplace_app.profile_path, profile_path)
+        try:
+            cutplace_app.validate(_valid_customers_csv_path)
+        finally:
+            cutplace_app.close()
+        self.assertTrue(cutplace_app.all_validations_were_ok)
+        self.assertTrue(os.path.getsize(profile_path) > 0)
+        with io.open(profile_path + applications.PROFILE_REPORT_SUFFIX, encoding='utf-8') as report_file:
+            report_text = report_file.read()
+        self.assertIn(_valid_customers_csv_path, report_text)
+        self.assertIn("'customer must be unique': ", report_text)
+        self.assertIn('validio.py', report_text)
+        self.assertNotIn('csv.py', report_text)
+
+    def test_can_resume_from_checkpoint(self):
+        data_path = dev_test.path_to_test_result('test_can_resume_from_checkpoint.csv')
+        with io.open(_valid_customers_csv_path, 'rb') as source_file:
+            with io.open(data_path, 'wb') as data_file:
+                data_file.write(source_file.read())
+        checkpoint_path = data_path + '.cutplace-checkpoint'
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--checkpoint', _customers_cid_path])
+        self.assertTrue(cutplace_app.is_checkpoint)
+        cutplace_app.validate(data_path)
+        self.assertTrue(os.path.exists(checkpoint_path))
+        cutplace_app.validate(data_path)
+        self.assertTrue(cutplace_app.all_validations_were_ok)
+
+    def test_can_reuse_cached_result(self):
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--summary', dev_test.CID_CUSTOMERS_XLS_PATH])
+        self.assertIsNotNone(cutplace_app.result_cache)
+        cutplace_app.result_cache = results.ResultCache(dev_test.path_to_test_result('test_can_reuse_cached_result'))
+        cutplace_app.result_cache.clear()
+        broken_data_path = dev_test.path_to_test_data('broken_customers_with_duplicates.csv')
+        cutplace_app.validate(broken_data_path)
+        self.assertFalse(cutplace_app.last_validation_was_ok)
+        cutplace_app.validate(_valid_customers_csv_path)
+        self.assertTrue(cutplace_app.last_validation_was_ok)
+        cutplace_app.validate(broken_data_path)
+        self.assertFalse(cutplace_app.last_validation_was_ok)
+        cutplace_app.validate(_valid_customers_csv_path)
+        self.assertTrue(cutplace_app.last_validation_was_ok)
+        self.assertFalse(cutplace_app.all_validations_were_ok)
+
+    def test_can_disable_result_cache(self):
+        cutplace_app = applications.CutplaceApp()
+        cutplace_app.set_options(['test', '--no-result-cache', dev_test.CID_CUSTOMERS_XLS_PATH])
+        self.assertIsNone(cutplace_app.result_cache)
+
     def test_can_validate_after_error(self):
         self.test_can_detect_unmatched_data_format()
         self._cutplace_app.validate(_valid_customers_csv_path)
@@ -152,6 +386,26 @@ class CutplaceProcessTest(unittest.TestCase):
     def test_fails_on_unknown_command_line_argument(self):
         self._test_process_exits_with(['--no-such-option'], 2)
 
+    def test_fails_on_broken_error_budget(self):
+        self._test_process_exits_with(['--max-errors', '-1', dev_test.CID_CUSTOMERS_XLS_PATH], 2)
+        self._test_process_exits_with(['--max-error-rate', '101', dev_test.CID_CUSTOMERS_XLS_PATH], 2)
+
+    def test_fails_on_broken_sample(self):
+        self._test_process_exits_with(['--sample', '0', dev_test.CID_CUSTOMERS_XLS_PATH], 2)
+        self._test_process_exits_with(['--sample', '1', '--sample-every', '2', dev_test.CID_CUSTOMERS_XLS_PATH], 2)
+        self._test_process_exits_with(['--sample', '1', '--until', '2', dev_test.CID_CUSTOMERS_XLS_PATH], 2)
+
+    def test_fails_on_broken_previous(self):
+        self._test_process_exits_with(['--previous', 'x.csv', '--sample', '1', dev_test.CID_CUSTOMERS_XLS_PATH], 2)
+        self._test_process_exits_with(['--previous', 'x.csv', '--checkpoint', dev_test.CID_CUSTOMERS_XLS_PATH], 2)
+
+    def test_fails_on_broken_statsd(self):
+        self._test_process_exits_with(['--statsd', 'localhost:x', dev_test.CID_CUSTOMERS_XLS_PATH], 2)
+
+    def test_fails_on_broken_serve(self):
+        self._test_process_exits_with(['--serve', 'localhost:x', dev_test.CID_CUSTOMERS_XLS_PATH], 2)
+        self._test_process_exits_with(['--serve', '8778', '--workers', '0', dev_test.CID_CUSTOMERS_XLS_PATH], 2)
+
     def test_fails_without_any_command_line_argument(self):
         self._test_process_exits_with([], 2)
 
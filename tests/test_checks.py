@@ -20,6 +20,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import json
 import logging
 import unittest
 
@@ -87,6 +88,54 @@ class IsUniqueCheckTest(_AbstractCheckTest):
         check.check_at_end(location)
         check.cleanup()
 
+    def test_can_continue_with_state(self):
+        field_names = ['customer_id']
+        check = checks.IsUniqueCheck('test check', 'customer_id', field_names)
+        location = errors.Location(self.test_can_continue_with_state, has_cell=True)
+        check.check_row(_create_field_map(field_names, [1]), location)
+        state = json.loads(json.dumps(check.get_state()))
+        check.reset()
+        check.set_state(state)
+        location.advance_line()
+        try:
+            check.check_row(_create_field_map(field_names, [1]), location)
+            self.fail('duplicate row must cause CheckError')
+        except errors.CheckError as error:
+            self.assertEqual(error.see_also_location.line, 0)
+
+    def test_can_continue_with_state_changes(self):
+        field_names = ['customer_id']
+        check = checks.IsUniqueCheck('test check', 'customer_id', field_names)
+        location = errors.Location(self.test_can_continue_with_state_changes, has_cell=True)
+        check.check_row(_create_field_map(field_names, [1]), location)
+        state = json.loads(json.dumps(check.get_state()))
+        location.advance_line()
+        check.check_row(_create_field_map(field_names, [2]), location)
+        state_changes = json.loads(json.dumps(check.get_state_changes()))
+        self.assertEqual([row_key for row_key, _ in state_changes], [[2]])
+        self.assertEqual(check.get_state_changes(), [])
+
+        check.reset()
+        check.set_state(state)
+        check.add_state_changes(state_changes)
+        location.advance_line()
+        self.assertRaises(
+            errors.CheckError, check.check_row, _create_field_map(field_names, [2]), location)
+
+    def test_can_check_runs_independently(self):
+        field_names = ['customer_id']
+        check = checks.IsUniqueCheck('test check', 'customer_id', field_names)
+        location = errors.Location(self.test_can_check_runs_independently, has_cell=True)
+        run = check.new_run()
+        other_run = check.new_run()
+        self.assertIsNot(run, check)
+        self.assertEqual(run.field_names_to_check, check.field_names_to_check)
+        run.check_row(_create_field_map(field_names, [1]), location)
+        location.advance_line()
+        other_run.check_row(_create_field_map(field_names, [1]), location)
+        check.check_row(_create_field_map(field_names, [1]), location)
+        self.assertRaises(errors.CheckError, run.check_row, _create_field_map(field_names, [1]), location)
+
     def test_fails_on_duplicate_with_multiple_fields(self):
         field_names = _TEST_FIELD_NAMES
         check = checks.IsUniqueCheck("test check", "branch_id, customer_id", field_names)
@@ -155,6 +204,35 @@ class DistinctCountCheckTest(unittest.TestCase):
         check.check_row(_create_field_map(field_names, [38003, 59, "Jane", "Miller", "female", "04.10.1946"]), location)
         self.assertRaises(errors.CheckError, check.check_at_end, location)
 
+    def test_can_continue_with_state(self):
+        field_names = _TEST_FIELD_NAMES
+        check = checks.DistinctCountCheck("test check", "branch_id < 2", field_names)
+        location = errors.Location(self.test_can_continue_with_state, has_cell=True)
+        check.check_row(_create_field_map(field_names, [38000, 23, "John", "Doe", "male", "08.03.1957"]), location)
+        state = json.loads(json.dumps(check.get_state()))
+        check.reset()
+        check.set_state(state)
+        location.advance_line()
+        check.check_row(_create_field_map(field_names, [38001, 59, "Jane", "Miller", "female", "04.10.1946"]), location)
+        self.assertRaises(errors.CheckError, check.check_at_end, location)
+
+    def test_can_continue_with_state_changes(self):
+        field_names = _TEST_FIELD_NAMES
+        check = checks.DistinctCountCheck("test check", "branch_id < 2", field_names)
+        location = errors.Location(self.test_can_continue_with_state_changes, has_cell=True)
+        check.check_row(_create_field_map(field_names, [38000, 23, "John", "Doe", "male", "08.03.1957"]), location)
+        check.check_row(_create_field_map(field_names, [38001, 59, "Jane", "Miller", "female", "04.10.1946"]), location)
+        state = json.loads(json.dumps(check.get_state()))
+        check.check_row(_create_field_map(field_names, [38001, 44, "Mary", "Smith", "female", "11.02.1967"]), location)
+        state_changes = json.loads(json.dumps(check.get_state_changes()))
+        self.assertEqual(state_changes, [[38001, 2]])
+        self.assertEqual(check.get_state_changes(), [])
+
+        check.reset()
+        check.set_state(state)
+        check.add_state_changes(state_changes)
+        self.assertEqual(sorted(check.get_state()), [[38000, 1], [38001, 2]])
+
     def test_fails_on_broken_check_rule(self):
         field_names = _TEST_FIELD_NAMES
         self.assertRaises(errors.InterfaceError, checks.DistinctCountCheck, "broken", "", field_names)
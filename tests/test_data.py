@@ -93,6 +93,12 @@ class DataFormatTest(unittest.TestCase):
         ods_format.set_property(data.KEY_SHEET, 1)
         ods_format.validate()
 
+    def test_can_use_default_decimal_separators_for_spreadsheets(self):
+        for format_name in (data.FORMAT_EXCEL, data.FORMAT_ODS):
+            spreadsheet_format = data.DataFormat(format_name)
+            self.assertEqual(spreadsheet_format.decimal_separator, '.')
+            self.assertEqual(spreadsheet_format.thousands_separator, '')
+
     def test_fails_on_unsupported_delimited_property(self):
         delimited_format = data.DataFormat(data.FORMAT_DELIMITED)
         self.assertRaises(errors.InterfaceError, delimited_format.set_property, data.KEY_SHEET, '2')
@@ -130,6 +136,16 @@ class DataFormatTest(unittest.TestCase):
         fixed_format = data.DataFormat(data.FORMAT_FIXED)
         self.assertRaises(errors.InterfaceError, fixed_format.set_property, data.KEY_HEADER, 'xxx')
 
+    def test_can_set_value_cache_size(self):
+        delimited_format = data.DataFormat(data.FORMAT_DELIMITED)
+        self.assertEqual(0, delimited_format.value_cache_size)
+        delimited_format.set_property(data.KEY_VALUE_CACHE_SIZE, '1000')
+        self.assertEqual(1000, delimited_format.value_cache_size)
+
+    def test_fails_on_value_cache_size_less_than_0(self):
+        delimited_format = data.DataFormat(data.FORMAT_DELIMITED)
+        self.assertRaises(errors.InterfaceError, delimited_format.set_property, data.KEY_VALUE_CACHE_SIZE, '-1')
+
     def test_fails_on_header_less_than_0(self):
         fixed_format = data.DataFormat(data.FORMAT_FIXED)
         self.assertRaises(errors.InterfaceError, fixed_format.set_property, data.KEY_HEADER, '-1')
@@ -20,6 +20,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import copy
 import io
 import unittest
 
@@ -66,6 +67,13 @@ class LocationTest(unittest.TestCase):
         location = errors.Location(input_stream)
         self.assertEqual(str(location), "<io> (1)")
 
+    def test_can_get_position_text(self):
+        location = errors.Location("eggs.ods", has_cell=True, has_sheet=True)
+        location.advance_line(2)
+        location.advance_cell(1)
+        self.assertEqual(location.position_text(), "Sheet1!R3C2")
+        self.assertEqual(errors.Location("eggs.txt", has_column=True).position_text(), "1;1")
+
     def test_can_compare_two_locations(self):
         location = errors.Location("eggs.ods", has_cell=True, has_sheet=True)
         location_other = errors.Location("eggs.ods", has_cell=True, has_sheet=True)
@@ -99,6 +107,65 @@ class CutplaceErrorTest(unittest.TestCase):
             'eggs.ods (Sheet1!R4C3): cannot do something '
             + '(see also: spam.ods (Sheet1!R1C1): something must be something else)')
 
+    def test_can_defer_message(self):
+        rendered_messages = []
+
+        def message():
+            rendered_messages.append('x')
+            return 'value must be something else'
+
+        error = errors.CutplaceError(message, code=errors.CODE_RANGE, field_name='eggs', value=3, limits='1...2')
+        error.prepend_message('cannot accept field', errors.Location('eggs.csv', has_cell=True))
+        error.prepend_message(lambda: 'cannot process row', errors.Location('eggs.csv', has_cell=True))
+        self.assertEqual(rendered_messages, [])
+        self.assertEqual(error.code, errors.CODE_RANGE)
+        self.assertEqual(error.field_name, 'eggs')
+        self.assertEqual(error.value, 3)
+        self.assertEqual(error.limits, '1...2')
+        self.assertEqual(
+            error.__str__(), 'eggs.csv (R1C1): cannot process row: cannot accept field: value must be something else')
+        self.assertEqual(error.message, 'cannot process row: cannot accept field: value must be something else')
+        self.assertEqual(rendered_messages, ['x'])
+
+    def test_can_copy_error_without_sharing_prefixes(self):
+        error = errors.FieldValueError(lambda: 'value must be something else')
+        error_copy = copy.copy(error)
+        error.prepend_message('cannot accept field', errors.Location('eggs.csv', has_cell=True))
+        self.assertTrue(isinstance(error_copy, errors.FieldValueError))
+        self.assertEqual(error_copy.message, 'value must be something else')
+        self.assertIsNone(error_copy.location)
+
+
+class ErrorSummaryTest(unittest.TestCase):
+    def _field_value_error(self, field_name, value, code, row):
+        location = errors.Location('eggs.csv', has_cell=True)
+        if row > 0:
+            location.advance_line(row)
+        return errors.FieldValueError(
+            'value must be valid: %s' % value, location, code=code, field_name=field_name, value=value)
+
+    def test_can_group_errors_by_field_and_kind(self):
+        error_summary = errors.ErrorSummary(example_count=3, seed=1)
+        for row in range(1000):
+            error_summary.add(self._field_value_error('born', 'x%d' % row, errors.CODE_DATE_TIME, row))
+        error_summary.add(self._field_value_error('id', 'y', errors.CODE_INTEGER, 1000))
+        error_summary.add(errors.CheckError('values must be unique'))
+        self.assertEqual(error_summary.error_count, 1002)
+        self.assertEqual(
+            [(group.field_name, group.kind, group.count) for group in error_summary.groups],
+            [('born', errors.CODE_DATE_TIME, 1000), ('id', errors.CODE_INTEGER, 1), (None, 'CheckError', 1)])
+        born_group = error_summary.groups[0]
+        self.assertEqual(born_group.first_location.position_text(), 'R1C1')
+        self.assertEqual(born_group.last_location.position_text(), 'R1000C1')
+        self.assertEqual(len(born_group.example_values), 3)
+        self.assertEqual(born_group.first_error.value, 'x0')
+        lines = error_summary.lines()
+        self.assertEqual(len(lines), 3)
+        dev_test.assert_fnmatches(
+            self, lines[0], "field 'born', date_time: 1000 errors from R1C1 to R1000C1, examples: 'x*', 'x*', 'x*'; "
+            "first: value must be valid: x0")
+        self.assertEqual(lines[2], 'data, CheckError: 1 error; first: values must be unique')
+
 
 if __name__ == '__main__':
     unittest.main()
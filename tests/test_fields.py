@@ -22,6 +22,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import decimal
+import io
 import logging
 import unittest
 
@@ -339,6 +340,22 @@ class RegExFieldFormatTest(unittest.TestCase):
             # such a case.
             pass
 
+    def test_can_validate_column(self):
+        field_format = fields.RegExFieldFormat("x", True, None, r"a.*", _ANY_FORMAT)
+        results, error_indices = field_format.validated_column(["abc", "xyz", "", "a"])
+        self.assertEqual(error_indices, [1])
+        self.assertEqual(results[0], "abc")
+        self.assertTrue(isinstance(results[1], errors.FieldValueError))
+        self.assertEqual(results[2], "")
+        self.assertEqual(results[3], "a")
+
+    def test_can_validate_column_with_length(self):
+        field_format = fields.RegExFieldFormat("x", False, "2:", r"a.*", _ANY_FORMAT)
+        results, error_indices = field_format.validated_column(["abc", "a", "", "ab"])
+        self.assertEqual(error_indices, [1, 2])
+        self.assertEqual(results[0], "abc")
+        self.assertEqual(results[3], "ab")
+
 
 class ChoiceFieldFormatTest(unittest.TestCase):
     """
@@ -386,6 +403,28 @@ class ChoiceFieldFormatTest(unittest.TestCase):
         self.assertRaises(errors.InterfaceError, fields.ChoiceFieldFormat, "color", False, None, "", _ANY_FORMAT)
         self.assertRaises(errors.InterfaceError, fields.ChoiceFieldFormat, "color", False, None, " ", _ANY_FORMAT)
 
+    def test_can_read_choices_from_file(self):
+        choices_path = dev_test.path_to_test_result('test_can_read_choices_from_file.txt')
+        with io.open(choices_path, 'w', encoding='utf-8') as choices_file:
+            choices_file.write('AT-1\n  AT-2 \n\nAT-3\n')
+        field_format = fields.ChoiceFieldFormat("region", False, None, "@" + choices_path, _ANY_FORMAT)
+        self.assertEqual(['AT-1', 'AT-2', 'AT-3'], field_format.choices)
+        self.assertEqual(field_format.validated("AT-2"), "AT-2")
+        self.assertRaises(errors.FieldValueError, field_format.validated, "AT-4")
+
+    def test_fails_on_missing_choices_file(self):
+        choices_path = dev_test.path_to_test_result('no_such_choices.txt')
+        self.assertRaises(
+            errors.InterfaceError, fields.ChoiceFieldFormat, "region", False, None, "@" + choices_path, _ANY_FORMAT)
+        self.assertRaises(errors.InterfaceError, fields.ChoiceFieldFormat, "region", False, None, "@", _ANY_FORMAT)
+
+    def test_can_truncate_many_choices_in_error_message(self):
+        rule = ', '.join('"c%d"' % choice_index for choice_index in range(100))
+        field_format = fields.ChoiceFieldFormat("code", False, None, rule, _ANY_FORMAT)
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.FieldValueError, "value is 'x' but must be one of: 'c0', 'c1', *, 'c19' or 80 more",
+            field_format.validated, "x")
+
     def test_fails_on_broken_rule(self):
         self.assertRaises(errors.InterfaceError, fields.ChoiceFieldFormat, "color", False, None, "red,", _ANY_FORMAT)
         self.assertRaises(errors.InterfaceError, fields.ChoiceFieldFormat, "color", False, None, ",red", _ANY_FORMAT)
@@ -468,6 +507,145 @@ class PatternFieldFormatTest(unittest.TestCase):
         self.assertRaises(errors.FieldValueError, field_format.validated, "")
         self.assertRaises(errors.FieldValueError, field_format.validated, "hang")
 
+    def test_can_validate_column(self):
+        field_format = fields.PatternFieldFormat("x", False, None, "h*g?", _ANY_FORMAT)
+        values = ["hgo", "", "hang", "hugo"]
+        results, error_indices = field_format.validated_column(values)
+        self.assertEqual(error_indices, [1, 2])
+        self.assertEqual(results[0], "hgo")
+        self.assertEqual(results[3], "hugo")
+
+
+class ValidatedCacheTest(unittest.TestCase):
+    """
+    Test for `ValidatedCache` and its use by `AbstractFieldFormat.validated()`.
+    """
+    def test_can_remember_validated_values(self):
+        field_format = fields.IntegerFieldFormat("x", False, None, "1...10", _ANY_FORMAT)
+        field_format.set_validated_cache(10)
+        cache = field_format.validated_cache
+        self.assertEqual(3, field_format.validated("3"))
+        self.assertEqual(3, field_format.validated("3"))
+        self.assertEqual(1, cache.hit_count)
+        self.assertEqual(1, cache.miss_count)
+
+    def test_can_remember_errors(self):
+        field_format = fields.IntegerFieldFormat("x", False, None, "1...10", _ANY_FORMAT)
+        field_format.set_validated_cache(10)
+        for _ in range(2):
+            dev_test.assert_raises_and_fnmatches(
+                self, errors.FieldValueError, "value is 11 but must be within range: 1...10",
+                field_format.validated, "11")
+        self.assertEqual(1, field_format.validated_cache.hit_count)
+
+    def test_can_evict_least_recently_used_value(self):
+        field_format = fields.TextFieldFormat("x", False, None, "", _ANY_FORMAT)
+        field_format.set_validated_cache(2, is_adaptive=False)
+        cache = field_format.validated_cache
+        for value in ["a", "b", "a", "c", "a"]:
+            field_format.validated(value)
+        self.assertEqual(2, len(cache))
+        self.assertEqual(2, cache.hit_count)
+
+    def test_can_disable_itself_on_low_hit_rate(self):
+        cache = fields.ValidatedCache(100, probe_count=10, min_hit_rate=0.5)
+        for value in range(10):
+            cache.validated(value, six.text_type)
+        self.assertFalse(cache.is_enabled)
+        self.assertEqual(0, len(cache))
+        self.assertEqual('11', cache.validated(11, six.text_type))
+
+    def test_can_stay_enabled_on_high_hit_rate(self):
+        cache = fields.ValidatedCache(100, probe_count=10, min_hit_rate=0.5)
+        for _ in range(10):
+            cache.validated(1, six.text_type)
+        self.assertTrue(cache.is_enabled)
+
+    def test_can_remove_cache(self):
+        field_format = fields.TextFieldFormat("x", False, None, "", _ANY_FORMAT)
+        field_format.set_validated_cache(10)
+        field_format.set_validated_cache(0)
+        self.assertIsNone(field_format.validated_cache)
+
+
+class ValidatedColumnTest(unittest.TestCase):
+    """
+    Tests for :py:meth:`cutplace.fields.AbstractFieldFormat.validated_column()`.
+    """
+    def _assert_column_is_validated_like_values(self, field_format, values):
+        results, error_indices = field_format.validated_column(values)
+        self.assertEqual(len(results), len(values))
+        expected_error_indices = []
+        for value_index, value in enumerate(values):
+            try:
+                expected_result = field_format.validated(value)
+                self.assertEqual(results[value_index], expected_result)
+            except errors.FieldValueError as error:
+                expected_error_indices.append(value_index)
+                self.assertEqual(six.text_type(results[value_index]), six.text_type(error))
+        self.assertEqual(error_indices, expected_error_indices)
+
+    def test_can_validate_choice_column(self):
+        field_format = fields.ChoiceFieldFormat("color", True, None, "red, green, blue", _ANY_FORMAT)
+        self._assert_column_is_validated_like_values(field_format, ["red", "", "yellow", "blue"])
+
+    def test_can_validate_decimal_column(self):
+        field_format = fields.DecimalFieldFormat("x", True, None, "-10.5...100", _ANY_FORMAT)
+        self._assert_column_is_validated_like_values(
+            field_format, ["1.5", "", "abc", "100.1", "-10.5", "3..3", " 7 ", "1e2"])
+
+    def test_can_validate_german_decimal_column(self):
+        field_format = _create_german_decimal_format()
+        self._assert_column_is_validated_like_values(
+            field_format, ["17,23", "12.345.678", "171.234.567,89", "1,2,3", "3000,300.234", "1.5", ""])
+
+    def test_can_validate_integer_column(self):
+        field_format = fields.IntegerFieldFormat("x", True, "1:3", "0...500", _ANY_FORMAT)
+        self._assert_column_is_validated_like_values(field_format, ["1", "", "500", "501", "-1", "0012"])
+        self._assert_column_is_validated_like_values(field_format, ["1", "2", "x", "3"])
+
+    def test_can_provide_error_details(self):
+        field_format = fields.IntegerFieldFormat("x", False, None, "0...500", _ANY_FORMAT)
+        results, error_indices = field_format.validated_column(["1", "abc", "501"])
+        self.assertEqual(error_indices, [1, 2])
+        self.assertEqual(results[1].code, errors.CODE_INTEGER)
+        self.assertEqual(results[1].field_name, "x")
+        self.assertEqual(results[1].value, "abc")
+        self.assertEqual(results[2].code, errors.CODE_RANGE)
+        self.assertEqual(results[2].value, "501")
+        self.assertEqual(six.text_type(results[2].limits), "0...500")
+
+    def test_can_validate_integer_column_without_numpy(self):
+        field_format = fields.IntegerFieldFormat("x", False, None, "0...500", _ANY_FORMAT)
+        old_has_numpy = fields.has_numpy
+        fields.has_numpy = False
+        try:
+            self._assert_column_is_validated_like_values(field_format, ["1", "500", "501", "-1"])
+        finally:
+            fields.has_numpy = old_has_numpy
+
+    def test_can_validate_huge_integer_column(self):
+        field_format = fields.IntegerFieldFormat("x", False, None, "0...", _ANY_FORMAT)
+        self._assert_column_is_validated_like_values(field_format, ["1", "-1", "1" + 30 * "0"])
+
+    def test_can_validate_text_column(self):
+        field_format = fields.TextFieldFormat("x", False, "2:3", "", _ANY_FORMAT)
+        self._assert_column_is_validated_like_values(field_format, ["ab", "", "a", "abcd", "abc"])
+
+    def test_can_validate_text_column_with_allowed_characters(self):
+        data_format = data.DataFormat(data.FORMAT_DELIMITED)
+        data_format.set_property(data.KEY_ALLOWED_CHARACTERS, "'a'...'c'")
+        field_format = fields.TextFieldFormat("x", False, None, "", data_format)
+        self._assert_column_is_validated_like_values(field_format, ["ab", "ax", "c"])
+
+    def test_can_validate_fixed_column(self):
+        field_format = fields.IntegerFieldFormat("x", True, "3", "", _FIXED_FORMAT)
+        self._assert_column_is_validated_like_values(field_format, ["1  ", "   ", "12x", "1234"])
+
+    def test_can_validate_column_with_default_implementation(self):
+        field_format = fields.DateTimeFieldFormat("x", True, None, "YYYY-MM-DD", _ANY_FORMAT)
+        self._assert_column_is_validated_like_values(field_format, ["2015-12-31", "", "2015-13-01"])
+
 
 class PublicFieldFunctionTest(unittest.TestCase):
     """
@@ -476,6 +654,25 @@ class PublicFieldFunctionTest(unittest.TestCase):
     def test_fails_on_non_ascii_character(self):
         self.assertRaises(errors.InterfaceError, fields.validated_field_name, "a")
 
+    def test_can_validate_field_name(self):
+        self.assertEqual(fields.validated_field_name(" customer_id_2 "), "customer_id_2")
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.InterfaceError, "field name must begin with a lower-case letter but is: '2x'",
+            fields.validated_field_name, "2x")
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.InterfaceError, "field name must be a valid Python name *but is: 'a-b'",
+            fields.validated_field_name, "a-b")
+
+    def test_can_find_field_name_index(self):
+        field_names = fields.FieldNameList(['a', 'b'])
+        self.assertEqual(fields.field_name_index('b', field_names, None), 1)
+        field_names.append('c')
+        self.assertEqual(fields.field_name_index('c', field_names, None), 2)
+        field_names[0] = 'd'
+        self.assertEqual(fields.field_name_index('d', field_names, None), 0)
+        self.assertRaises(errors.InterfaceError, fields.field_name_index, 'a', field_names, None)
+        self.assertEqual(field_names, ['d', 'b', 'c'])
+
 
 if __name__ == '__main__':  # pragma: no cover
     logging.basicConfig()
@@ -0,0 +1,160 @@
+"""
+Tests for generators of synthetic data.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import unittest
+
+from cutplace import errors
+from cutplace import generators
+from cutplace import interface
+from cutplace import validio
+
+_DELIMITED_CID_TEXT = '\n'.join([
+    'd,format,delimited',
+    'd,header,1',
+    'f,id,,,,Integer,1...',
+    'f,name,,,3...10,Text',
+    'f,code,,,,Pattern,A??-*',
+    'f,zip_code,,X,,RegEx,[0-9]{4}(-[A-Z]{2})?$',
+    'f,date_of_birth,,,,DateTime,YYYY-MM-DD',
+    'f,price,,,,Decimal,0.00...999.99',
+    'f,color,,,,Choice,"red,green,blue"',
+    'f,kind,,,,Constant,x',
+    'c,id must be unique,IsUnique,id',
+])
+
+_FIXED_CID_TEXT = '\n'.join([
+    'd,format,fixed',
+    'd,line delimiter,lf',
+    'd,header,1',
+    'f,id,,,6,Integer',
+    'f,name,,,10,Text',
+    'f,price,,,8,Decimal,0...9999.99',
+    'f,color,,,5,Choice,"red,green,blue"',
+    'f,date_of_birth,,,10,DateTime,YYYY-MM-DD',
+    'c,id must be unique,IsUnique,id',
+])
+
+
+def _error_count(cid, data_stream):
+    with validio.Reader(cid, data_stream, on_error='yield') as reader:
+        result = sum(len(column_batch.errors) for column_batch in reader.column_batches())
+    return result
+
+
+class RowGeneratorTest(unittest.TestCase):
+    def test_can_generate_valid_rows(self):
+        cid = interface.create_cid_from_string(_DELIMITED_CID_TEXT)
+        row_generator = generators.RowGenerator(cid, seed=0)
+        rows = list(row_generator.rows(1000, batch_size=300))
+        self.assertEqual(len(rows), 1000)
+        self.assertEqual(row_generator.broken_row_count, 0)
+        for row in rows:
+            self.assertEqual(len(row), len(cid.field_names))
+            for field_format, value in zip(cid.field_formats, row):
+                field_format.validated(value)
+
+    def test_can_generate_ascending_unique_values(self):
+        cid = interface.create_cid_from_string(_DELIMITED_CID_TEXT)
+        row_generator = generators.RowGenerator(cid, seed=0)
+        ids = [row[0] for row in row_generator.row_batch(3)]
+        self.assertEqual(ids, ['1', '2', '3'])
+        create_row_writer = generators._create_row_writer_function(cid)
+        text_ids = [line.split(',')[0] for line in row_generator.text_batch(2, create_row_writer).splitlines()]
+        self.assertEqual(text_ids, ['4', '5'])
+        self.assertEqual([row[0] for row in row_generator.row_batch(1)], ['6'])
+
+    def test_can_generate_same_rows_for_same_seed(self):
+        cid = interface.create_cid_from_string(_DELIMITED_CID_TEXT)
+        self.assertEqual(
+            generators.RowGenerator(cid, seed=1).row_batch(10), generators.RowGenerator(cid, seed=1).row_batch(10))
+
+    def test_can_generate_header_rows(self):
+        cid = interface.create_cid_from_string(_FIXED_CID_TEXT)
+        header_rows = generators.RowGenerator(cid).header_rows()
+        self.assertEqual(header_rows, [['id    ', 'name      ', 'price   ', 'color', 'date_of_bi']])
+
+    def test_can_generate_broken_rows(self):
+        cid = interface.create_cid_from_string(_DELIMITED_CID_TEXT)
+        row_generator = generators.RowGenerator(cid, error_rate=0.2, seed=0)
+        rows = row_generator.row_batch(500)
+        broken_row_count = 0
+        for row in rows:
+            for field_format, value in zip(cid.field_formats, row):
+                try:
+                    field_format.validated(value)
+                except errors.FieldValueError:
+                    broken_row_count += 1
+                    break
+        self.assertEqual(broken_row_count, row_generator.broken_row_count)
+        self.assertTrue(50 <= broken_row_count <= 150, 'broken_row_count=%d' % broken_row_count)
+
+    def test_fails_on_regex_without_example(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'f,code,,,,RegEx,(?=x)y',
+        ]))
+        self.assertRaises(errors.InterfaceError, generators.RowGenerator, cid)
+
+
+class WriteTest(unittest.TestCase):
+    def test_can_write_delimited_data(self):
+        cid = interface.create_cid_from_string(_DELIMITED_CID_TEXT)
+        with io.StringIO() as target:
+            broken_row_count = generators.write(cid, target, 1000, error_rate=0.1, seed=2, batch_size=300)
+            data_text = target.getvalue()
+        self.assertEqual(len(data_text.splitlines()), 1001)
+        self.assertTrue(broken_row_count > 0)
+        with io.StringIO(data_text) as data_stream:
+            self.assertEqual(_error_count(cid, data_stream), broken_row_count)
+
+    def test_can_write_valid_fixed_data(self):
+        cid = interface.create_cid_from_string(_FIXED_CID_TEXT)
+        with io.StringIO() as target:
+            broken_row_count = generators.write(cid, target, 500, seed=3)
+            data_text = target.getvalue()
+        self.assertEqual(broken_row_count, 0)
+        data_lines = data_text.splitlines()
+        self.assertEqual(len(data_lines), 501)
+        self.assertEqual(set(len(line) for line in data_lines), set([39]))
+        with io.StringIO(data_text) as data_stream:
+            self.assertEqual(_error_count(cid, data_stream), 0)
+
+    def test_can_write_broken_fixed_data(self):
+        cid = interface.create_cid_from_string(_FIXED_CID_TEXT)
+        with io.StringIO() as target:
+            broken_row_count = generators.write(cid, target, 500, error_rate=0.05, seed=3)
+            data_text = target.getvalue()
+        with io.StringIO(data_text) as data_stream:
+            self.assertEqual(_error_count(cid, data_stream), broken_row_count)
+
+    def test_fails_on_ods(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,ods',
+            'f,id,,,,Integer',
+        ]))
+        with io.StringIO() as target:
+            self.assertRaises(errors.InterfaceError, generators.write, cid, target, 1)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
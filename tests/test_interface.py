@@ -22,7 +22,10 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import fnmatch
+import gc
+import io
 import os.path
+import pickle
 import unittest
 
 import six
@@ -34,6 +37,7 @@ from cutplace import errors
 from cutplace import fields
 from cutplace import ranges
 from cutplace import rowio
+from cutplace import validio
 from tests import dev_test
 
 
@@ -226,6 +230,27 @@ class CidTest(unittest.TestCase):
         self.assertEqual('173', cid.field_value_for('height', ['hugo', '173', '1963-02-05']))
         self.assertEqual('height', cid.field_format_for('height').field_name)
 
+    def test_can_declare_value_cache_size(self):
+        cid_text = '\n'.join([
+            'D,Format,%s' % data.FORMAT_DELIMITED,
+            'D,Value cache size,100',
+            'F,currency,,,,Choice,"EUR", "USD"',
+        ])
+        cid = interface.create_cid_from_string(cid_text)
+        self.assertEqual(100, cid.field_format_for('currency').validated_cache.max_size)
+        cid.set_validated_cache(0)
+        self.assertIsNone(cid.field_format_for('currency').validated_cache)
+
+    def test_can_get_fixed_field_names_and_lengths(self):
+        cid_text = '\n'.join([
+            'D,Format,%s' % data.FORMAT_FIXED,
+            'F,id,,,4,Integer',
+            'F,price,,,7,Decimal',
+        ])
+        field_names_and_lengths = interface.field_names_and_lengths(interface.create_cid_from_string(cid_text))
+        self.assertEqual(field_names_and_lengths, [('id', 4), ('price', 7)])
+        self.assertEqual(type(field_names_and_lengths[1][1]), int)
+
     def _test_fails_on_broken_cid_from_text(self, cid_text, anticipated_error_message_pattern=None):
         assert cid_text is not None
         try:
@@ -451,6 +476,160 @@ class CidTest(unittest.TestCase):
         self._test_fails_on_broken_cid_from_text(
             cid_text, "*check description must be used only once: 'duplicate_check' (see also: *: first declaration)")
 
+    def test_can_read_choices_relative_to_cid(self):
+        cid_folder = dev_test.path_to_test_result('test_can_read_choices_relative_to_cid')
+        if not os.path.exists(cid_folder):
+            os.makedirs(cid_folder)
+        with io.open(os.path.join(cid_folder, 'regions.txt'), 'w', encoding='utf-8') as choices_file:
+            choices_file.write('AT-9\nAT-3\n')
+        cid_path = os.path.join(cid_folder, 'cid_regions.csv')
+        with io.open(cid_path, 'w', encoding='utf-8') as cid_file:
+            cid_file.write('d,format,delimited\nf,region,,,,Choice,@regions.txt\n')
+        self.assertNotEqual(os.path.abspath(os.getcwd()), os.path.abspath(cid_folder))
+        cid = interface.Cid(cid_path)
+        region_format = cid.field_format_for('region')
+        self.assertEqual(region_format.choices, ['AT-9', 'AT-3'])
+        self.assertEqual(region_format.choices_path, os.path.join(os.path.abspath(cid_folder), 'regions.txt'))
+
+
+class FrozenCidTest(unittest.TestCase):
+    def test_can_freeze_cid(self):
+        cid = interface.Cid(dev_test.CID_CUSTOMERS_ODS_PATH)
+        frozen_cid = cid.freeze()
+        self.assertEqual(list(frozen_cid.field_names), cid.field_names)
+        self.assertEqual(list(frozen_cid.check_names), cid.check_names)
+        self.assertIs(frozen_cid.data_format, cid.data_format)
+        self.assertEqual(frozen_cid.field_index('surname'), cid.field_index('surname'))
+        self.assertIs(frozen_cid.freeze(), frozen_cid)
+        self.assertEqual(interface.cid_fingerprint(frozen_cid), interface.cid_fingerprint(cid))
+        self.assertRaises(AttributeError, setattr, frozen_cid, 'some', 1)
+
+    def test_can_pickle_frozen_cid_as_rows(self):
+        cid = interface.Cid(dev_test.CID_CUSTOMERS_ODS_PATH)
+        pickled_frozen_cid = pickle.dumps(cid.freeze(), 2)
+        self.assertIn(b'_frozen_cid_from_rows', pickled_frozen_cid)
+        self.assertTrue(len(pickled_frozen_cid) < len(pickle.dumps(cid.field_formats, 2)))
+        unpickled_frozen_cid = pickle.loads(pickled_frozen_cid)
+        self.assertEqual(unpickled_frozen_cid.field_names, tuple(cid.field_names))
+        self.assertEqual(interface.cid_fingerprint(unpickled_frozen_cid), interface.cid_fingerprint(cid))
+        self.assertIs(pickle.loads(pickled_frozen_cid), unpickled_frozen_cid)
+
+    def test_can_pickle_changed_frozen_cid(self):
+        cid = interface.Cid(dev_test.CID_CUSTOMERS_ODS_PATH)
+        cid.set_validated_cache(10)
+        unpickled_frozen_cid = pickle.loads(pickle.dumps(cid.freeze(), 2))
+        self.assertEqual(unpickled_frozen_cid.field_names, tuple(cid.field_names))
+        self.assertEqual(unpickled_frozen_cid.field_formats[0].validated_cache.max_size, 10)
+
+    def test_can_pickle_frozen_cid_with_changed_data_format(self):
+        cid = interface.Cid(dev_test.CID_CUSTOMERS_ODS_PATH)
+        cid.data_format.line_delimiter = '\r'
+        pickled_frozen_cid = pickle.dumps(cid.freeze(), 2)
+        self.assertNotIn(b'_frozen_cid_from_rows', pickled_frozen_cid)
+        self.assertEqual(pickle.loads(pickled_frozen_cid).data_format.line_delimiter, '\r')
+
+    def test_can_pickle_frozen_cid_with_choice_file(self):
+        cid_folder = dev_test.path_to_test_result('test_can_pickle_frozen_cid_with_choice_file')
+        if not os.path.exists(cid_folder):
+            os.makedirs(cid_folder)
+        with io.open(os.path.join(cid_folder, 'regions.txt'), 'w', encoding='utf-8') as choices_file:
+            choices_file.write('AT-9\nAT-3\n')
+        cid_path = os.path.join(cid_folder, 'cid_regions.csv')
+        with io.open(cid_path, 'w', encoding='utf-8') as cid_file:
+            cid_file.write('d,format,delimited\nf,region,,,,Choice,@regions.txt\n')
+        cid = interface.Cid(cid_path)
+        pickled_frozen_cid = pickle.dumps(cid.freeze(), 2)
+        self.assertNotIn(b'_frozen_cid_from_rows', pickled_frozen_cid)
+        self.assertEqual(pickle.loads(pickled_frozen_cid).field_format_for('region').choices, ['AT-9', 'AT-3'])
+
+    def test_can_validate_with_unpickled_frozen_cid(self):
+        cid = interface.Cid(dev_test.CID_CUSTOMERS_ODS_PATH)
+        frozen_cid = pickle.loads(pickle.dumps(cid.freeze(), 2))
+        data_path = dev_test.path_to_example('customers.csv')
+        with io.open(data_path, 'r', encoding=cid.data_format.encoding, newline='') as data_stream:
+            with validio.Reader(frozen_cid, data_stream) as reader:
+                self.assertTrue(sum(column_batch.row_count for column_batch in reader.column_batches()) > 0)
+
+
+class _FakeEntryPoint(object):
+    def __init__(self, name, load):
+        self.name = name
+        self.load = load
+
+
+class PluginTest(unittest.TestCase):
+    def setUp(self):
+        self._load_count = 0
+        self._original_plugin_entry_points = interface._plugin_entry_points
+        self._original_has_imported_entry_point_plugins = interface._has_imported_entry_point_plugins
+        interface._has_imported_entry_point_plugins = False
+
+    def tearDown(self):
+        interface._plugin_entry_points = self._original_plugin_entry_points
+        interface._has_imported_entry_point_plugins = self._original_has_imported_entry_point_plugins
+
+        # Remove the field formats declared by tests from the process wide registry so later tests do not see them.
+        self._lazy_field_format_class = None
+        with interface._plugin_lock:
+            interface._base_class_to_subclasses_and_class_map.clear()
+        gc.collect()
+        self.assertEqual(
+            [field_format_class.__name__ for field_format_class in fields.AbstractFieldFormat.__subclasses__()
+             if field_format_class.__name__.startswith(('_LazyTest', '_LateTest'))], [])
+
+    def _load_plugin(self):
+        self._load_count += 1
+
+        # Simulate importing a module that declares a field format.
+        class _LazyTestFieldFormat(fields.AbstractFieldFormat):
+            def validated_value(self, value):
+                return value
+
+        self._lazy_field_format_class = _LazyTestFieldFormat
+
+    def _fail_to_load_plugin(self):
+        self._load_count += 1
+        raise ImportError('test')
+
+    def test_can_reuse_class_map(self):
+        check_map = interface._name_to_class_map(checks.AbstractCheck)
+        self.assertIs(interface._name_to_class_map(checks.AbstractCheck), check_map)
+        field_format_map = interface._name_to_class_map(fields.AbstractFieldFormat)
+        self.assertIs(field_format_map['TextFieldFormat'], fields.TextFieldFormat)
+
+    def test_can_update_class_map_after_new_class_is_declared(self):
+        field_format_map = interface._name_to_class_map(fields.AbstractFieldFormat)
+
+        class _LateTestFieldFormat(fields.AbstractFieldFormat):
+            pass
+
+        updated_field_format_map = interface._name_to_class_map(fields.AbstractFieldFormat)
+        self.assertIsNot(updated_field_format_map, field_format_map)
+        self.assertIs(updated_field_format_map['_LateTestFieldFormat'], _LateTestFieldFormat)
+
+    def test_can_import_entry_point_plugins_lazily(self):
+        interface._plugin_entry_points = lambda: [_FakeEntryPoint('lazy', self._load_plugin)]
+        interface.create_cid_from_string('d,format,delimited\nf,some,,,,Text\n')
+        self.assertEqual(self._load_count, 0)
+        cid = interface.create_cid_from_string('d,format,delimited\nf,some,,,,_LazyTest\n')
+        self.assertEqual(self._load_count, 1)
+        self.assertIs(cid.field_formats[0].__class__, self._lazy_field_format_class)
+        interface.create_cid_from_string('d,format,delimited\nf,other,,,,_LazyTest\n')
+        self.assertEqual(self._load_count, 1)
+
+    def test_fails_on_unknown_field_type_after_importing_entry_point_plugins(self):
+        interface._plugin_entry_points = lambda: [_FakeEntryPoint('broken', self._fail_to_load_plugin)]
+        cid_text = 'd,format,delimited\nf,some,,,,NoSuchType\n'
+        self.assertRaises(errors.InterfaceError, interface.create_cid_from_string, cid_text)
+        self.assertRaises(errors.InterfaceError, interface.create_cid_from_string, cid_text)
+        self.assertEqual(self._load_count, 1)
+
+    def test_can_skip_unchanged_plugins(self):
+        interface.import_plugins(dev_test.path_to_test_plugins())
+        field_format_map = interface._name_to_class_map(fields.AbstractFieldFormat)
+        interface.import_plugins(dev_test.path_to_test_plugins())
+        self.assertIs(interface._name_to_class_map(fields.AbstractFieldFormat), field_format_map)
+
 
 if __name__ == '__main__':
     unittest.main()
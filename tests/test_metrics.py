@@ -0,0 +1,144 @@
+"""
+Tests for sinks exporting metrics about validation runs.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import socket
+import unittest
+
+from cutplace import interface
+from cutplace import metrics
+from cutplace import validio
+from tests import dev_test
+
+
+def _validation_metrics(data_name='customers.csv', rejected_row_count=1, field_error_counts=None):
+    return metrics.ValidationMetrics(
+        data_name, 9, rejected_row_count, 1234, 0.5, field_error_counts if field_error_counts is not None else {'id': 1},
+        rejected_row_count == 0, 1447372800.0)
+
+
+class CollectingMetricsSink(metrics.AbstractMetricsSink):
+    def __init__(self, batch_size=metrics.DEFAULT_METRICS_BATCH_SIZE):
+        super(CollectingMetricsSink, self).__init__(batch_size)
+        self.exported_metrics_list = []
+
+    def _export(self, metrics_list):
+        self.exported_metrics_list.extend(metrics_list)
+
+
+class AbstractMetricsSinkTest(unittest.TestCase):
+    def test_can_batch_metrics(self):
+        with CollectingMetricsSink(batch_size=2) as metrics_sink:
+            metrics_sink.record(_validation_metrics())
+            self.assertEqual(metrics_sink.exported_metrics_list, [])
+            metrics_sink.record(_validation_metrics())
+            self.assertEqual(len(metrics_sink.exported_metrics_list), 2)
+            metrics_sink.record(_validation_metrics())
+        self.assertEqual(len(metrics_sink.exported_metrics_list), 3)
+
+    def test_can_receive_metrics_from_reader(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'd,header,1',
+            'f,id,,,,Integer,0...9',
+            'f,name',
+        ]))
+        with CollectingMetricsSink() as metrics_sink:
+            with io.StringIO('id,name\n1,a\n12,b\n3,c\n') as data_stream:
+                with validio.Reader(cid, data_stream, on_error='continue') as reader:
+                    reader.add_metrics_sink(metrics_sink)
+                    list(reader.column_batches())
+        self.assertEqual(len(metrics_sink.exported_metrics_list), 1)
+        validation_metrics = metrics_sink.exported_metrics_list[0]
+        self.assertEqual(validation_metrics.data_name, '<io>')
+        self.assertEqual(validation_metrics.accepted_row_count, 2)
+        self.assertEqual(validation_metrics.rejected_row_count, 1)
+        self.assertEqual(validation_metrics.field_error_counts, {'id': 1})
+        self.assertIsNone(validation_metrics.data_byte_count)
+        self.assertFalse(validation_metrics.is_ok)
+        self.assertAlmostEqual(validation_metrics.error_rate, 1 / 3)
+
+
+class PrometheusTextfileSinkTest(unittest.TestCase):
+    def test_can_write_textfile(self):
+        metrics_path = dev_test.path_to_test_result('test_can_write_textfile.prom')
+        with metrics.PrometheusTextfileSink(metrics_path) as metrics_sink:
+            metrics_sink.record(_validation_metrics())
+            metrics_sink.record(_validation_metrics('say "hello".csv', 0, {}))
+            metrics_sink.record(_validation_metrics(rejected_row_count=2, field_error_counts={'id': 2}))
+        with io.open(metrics_path, encoding='utf-8') as metrics_file:
+            metrics_lines = metrics_file.read().splitlines()
+        self.assertIn('# TYPE cutplace_rows_accepted gauge', metrics_lines)
+        self.assertIn('cutplace_rows_rejected{data="customers.csv"} 2', metrics_lines)
+        self.assertIn('cutplace_rows_rejected{data="say \\"hello\\".csv"} 0', metrics_lines)
+        self.assertIn('cutplace_validation_ok{data="customers.csv"} 0', metrics_lines)
+        self.assertIn('cutplace_data_bytes{data="customers.csv"} 1234', metrics_lines)
+        self.assertIn('cutplace_field_errors{data="customers.csv",field="id"} 2', metrics_lines)
+
+
+class StatsdSinkTest(unittest.TestCase):
+    def setUp(self):
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._listener.bind(('127.0.0.1', 0))
+        self._listener.settimeout(5)
+        self._port = self._listener.getsockname()[1]
+
+    def tearDown(self):
+        self._listener.close()
+
+    def _received_lines(self, packet_count):
+        result = []
+        for _ in range(packet_count):
+            packet, _ = self._listener.recvfrom(65536)
+            result.append(packet.decode('utf-8').split('\n'))
+        return result
+
+    def test_can_send_metrics(self):
+        with metrics.StatsdSink('127.0.0.1', self._port) as metrics_sink:
+            metrics_sink.record(_validation_metrics(field_error_counts={'date of birth': 1}))
+        packets = self._received_lines(1)
+        self.assertEqual(packets[0], [
+            'cutplace.customers_csv.validations:1|c',
+            'cutplace.customers_csv.rows_accepted:9|c',
+            'cutplace.customers_csv.rows_rejected:1|c',
+            'cutplace.customers_csv.duration:500|ms',
+            'cutplace.customers_csv.validations_failed:1|c',
+            'cutplace.customers_csv.data_bytes:1234|c',
+            'cutplace.customers_csv.field_errors.date_of_birth:1|c',
+        ])
+
+    def test_can_split_metrics_into_packets(self):
+        with metrics.StatsdSink('127.0.0.1', self._port, packet_size=100) as metrics_sink:
+            metrics_sink.record(_validation_metrics())
+        received_lines = []
+        while len(received_lines) < 7:
+            packet, _ = self._listener.recvfrom(65536)
+            self.assertTrue(len(packet) <= 100, 'packet=%r' % packet)
+            received_lines.extend(packet.decode('utf-8').split('\n'))
+        self.assertEqual(len(received_lines), 7)
+
+    def test_can_parse_host_and_port(self):
+        self.assertEqual(metrics.statsd_host_and_port('localhost'), ('localhost', metrics.DEFAULT_STATSD_PORT))
+        self.assertEqual(metrics.statsd_host_and_port('example.com:1234'), ('example.com', 1234))
+        self.assertRaises(ValueError, metrics.statsd_host_and_port, 'localhost:x')
+        self.assertRaises(ValueError, metrics.statsd_host_and_port, 'localhost:0')
+        self.assertRaises(ValueError, metrics.statsd_host_and_port, ':1234')
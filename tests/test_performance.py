@@ -29,11 +29,13 @@ import unittest
 
 import six
 
+from cutplace import data
 from cutplace import interface
 from cutplace import validio
 from cutplace import _compat
 from cutplace import applications
 from cutplace import _tools
+from tests import dev_bench
 from tests import dev_test
 
 _log = logging.getLogger("cutplace.dev_reports")
@@ -74,6 +76,14 @@ def _build_and_validate_many_customers():
         raise ValueError("exit code of performance test must be 0 but is %d" % exit_code)
 
 
+def setUpModule():
+    dev_test.use_temp_cache_home()
+
+
+def tearDownModule():
+    dev_test.restore_cache_home()
+
+
 class PerformanceTest(unittest.TestCase):
     """
     Test case for performance profiling.
@@ -94,6 +104,50 @@ class PerformanceTest(unittest.TestCase):
                 stats.sort_stats("cumulative").print_stats("cutplace", 20)
 
 
+class BenchmarkTest(unittest.TestCase):
+    """
+    Test case for the benchmark suite.
+    """
+    def test_can_run_benchmarks(self):
+        benchmark_folder = dev_test.path_to_test_result('test_can_run_benchmarks')
+        benchmark_results = dev_bench.run_benchmarks(
+            benchmark_folder, ['20'], [data.FORMAT_DELIMITED, data.FORMAT_FIXED, data.FORMAT_ODS], ['narrow'])
+        self.assertEqual(
+            [item['name'] for item in benchmark_results['results']],
+            ['narrow-delimited-20', 'narrow-fixed-20', 'narrow-ods-20'])
+        for item in benchmark_results['results']:
+            self.assertEqual(item['row_count'], 20)
+            self.assertEqual(item['field_count'], 5)
+            self.assertTrue(item['rows_per_second'] > 0)
+            self.assertTrue(item['startup_seconds'] > 0)
+        results_path = os.path.join(benchmark_folder, 'results.json')
+        dev_bench.write_results(results_path, benchmark_results)
+        self.assertEqual(dev_bench.read_results(results_path), benchmark_results)
+
+    def test_can_detect_regressions(self):
+        baseline_results = {'results': [
+            {'name': 'a', 'rows_per_second': 1000.0, 'peak_memory_bytes': 1000, 'startup_seconds': 0.5},
+            {'name': 'b', 'rows_per_second': 1000.0, 'peak_memory_bytes': None, 'startup_seconds': 0.5},
+        ]}
+        current_results = {'results': [
+            {'name': 'a', 'rows_per_second': 950.0, 'peak_memory_bytes': 2000, 'startup_seconds': 0.5},
+            {'name': 'b', 'rows_per_second': 500.0, 'peak_memory_bytes': 1000, 'startup_seconds': 0.4},
+            {'name': 'c', 'rows_per_second': 1.0, 'peak_memory_bytes': 1000, 'startup_seconds': 9.0},
+        ]}
+        self.assertEqual(dev_bench.regressions(baseline_results, current_results), [
+            'a: peak_memory_bytes is 100% worse (2000 instead of 1000)',
+            'b: rows_per_second is 50% worse (500 instead of 1000)',
+        ])
+        self.assertEqual(dev_bench.regressions(baseline_results, current_results, 1.0), [])
+
+    def test_can_compute_row_count(self):
+        self.assertEqual(dev_bench.row_count_for('10k'), 10000)
+        self.assertEqual(dev_bench.row_count_for('1M'), 1000000)
+        self.assertEqual(dev_bench.row_count_for('17'), 17)
+        self.assertRaises(ValueError, dev_bench.row_count_for, '0')
+        self.assertRaises(ValueError, dev_bench.row_count_for, 'x')
+
+
 if __name__ == '__main__':  # pragma: no cover
     logging.basicConfig(level=logging.INFO)
     unittest.main()
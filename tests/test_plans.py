@@ -0,0 +1,194 @@
+"""
+Tests for plans deciding in which order to perform row checks.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import time
+import unittest
+
+from cutplace import checks
+from cutplace import errors
+from cutplace import interface
+from cutplace import plans
+from cutplace import stats
+from cutplace import validio
+
+_FIELD_NAMES = ['id', 'name']
+
+
+class _SlowCheck(checks.AbstractCheck):
+    """
+    Check that takes some time but accepts all rows.
+    """
+    def __init__(self, description):
+        super(_SlowCheck, self).__init__(description, '', _FIELD_NAMES)
+        self.checked_count = 0
+
+    @property
+    def is_stateless(self):
+        return True
+
+    def check_row(self, field_name_to_value_map, location):
+        self.checked_count += 1
+        time.sleep(0.001)
+
+
+class _CheapCheck(_SlowCheck):
+    """
+    Check that declares to be cheap and accepts all rows.
+    """
+    @property
+    def cost(self):
+        return checks.LOW_CHECK_COST
+
+    def check_row(self, field_name_to_value_map, location):
+        pass
+
+
+class _OddIdCheck(checks.AbstractCheck):
+    """
+    Check that quickly rejects all rows with an odd id.
+    """
+    def __init__(self, description):
+        super(_OddIdCheck, self).__init__(description, '', _FIELD_NAMES)
+
+    @property
+    def is_stateless(self):
+        return True
+
+    def check_row(self, field_name_to_value_map, location):
+        if field_name_to_value_map['id'] % 2 == 1:
+            raise errors.CheckError('id must be even', location)
+
+
+def _rejected_count(validation_plan, row_count):
+    result = 0
+    location = errors.Location('test', has_cell=True)
+    for row_index in range(row_count):
+        try:
+            validation_plan.check_row({'id': row_index, 'name': 'x'}, location)
+        except errors.CheckError:
+            result += 1
+        location.advance_line()
+    return result
+
+
+class ValidationPlanTest(unittest.TestCase):
+    def test_can_order_checks_by_declared_cost(self):
+        check_map = {'slow': _SlowCheck('slow'), 'cheap': _CheapCheck('cheap')}
+        validation_plan = plans.ValidationPlan(['slow', 'cheap'], check_map)
+        self.assertEqual(validation_plan.check_names, ('cheap', 'slow'))
+
+    def test_can_keep_stateful_checks_in_place(self):
+        check_map = {
+            'slow': _SlowCheck('slow'),
+            'unique': checks.IsUniqueCheck('unique', 'id', _FIELD_NAMES),
+            'odd': _OddIdCheck('odd'),
+            'cheap': _CheapCheck('cheap'),
+        }
+        validation_plan = plans.ValidationPlan(
+            ['slow', 'unique', 'odd', 'cheap'], check_map, probe_row_count=10, replan_row_count=10)
+        self.assertEqual(validation_plan.check_names, ('slow', 'unique', 'cheap', 'odd'))
+        self.assertEqual(_rejected_count(validation_plan, 10), 5)
+        self.assertEqual(validation_plan.check_names, ('slow', 'unique', 'odd', 'cheap'))
+
+    def test_can_order_selective_check_first(self):
+        slow_check = _SlowCheck('slow')
+        check_map = {'slow': slow_check, 'odd': _OddIdCheck('odd')}
+        validation_plan = plans.ValidationPlan(['slow', 'odd'], check_map, probe_row_count=10, replan_row_count=10)
+        self.assertEqual(validation_plan.check_names, ('slow', 'odd'))
+        self.assertEqual(_rejected_count(validation_plan, 10), 5)
+        self.assertEqual(validation_plan.check_names, ('odd', 'slow'))
+        self.assertEqual(slow_check.checked_count, 10)
+
+        # Rows rejected by the cheap check skip the slow check.
+        self.assertEqual(_rejected_count(validation_plan, 20), 10)
+        self.assertEqual(slow_check.checked_count, 20)
+
+    def test_can_add_check_times_to_stats(self):
+        check_map = {'slow': _SlowCheck('slow'), 'odd': _OddIdCheck('odd')}
+        validation_plan = plans.ValidationPlan(['slow', 'odd'], check_map, probe_row_count=1, replan_row_count=1)
+        validation_stats = stats.ValidationStats()
+        location = errors.Location('test', has_cell=True)
+        for row_index in range(4):
+            try:
+                validation_plan.check_row({'id': row_index, 'name': 'x'}, location, validation_stats)
+            except errors.CheckError:
+                pass
+        self.assertTrue(validation_stats.check_timings['slow'].seconds > 0)
+        self.assertEqual(validation_stats.check_timings['odd'].count, 4)
+
+
+def _rejected_lines_in_cid_order(cid, rows):
+    """
+    Lines of the rows that performing the checks of ``cid`` in the order
+    of the CID rejects.
+    """
+    result = []
+    check_runs = [cid.check_map[check_name].new_run() for check_name in cid.check_names]
+    location = errors.Location('test', has_cell=True)
+    for row in rows:
+        try:
+            for check_run in check_runs:
+                check_run.check_row(dict(zip(cid.field_names, row)), location)
+        except errors.CheckError:
+            result.append(location.line)
+        location.advance_line()
+    return result
+
+
+class ValidatorPlanTest(unittest.TestCase):
+    def test_can_reject_same_rows_as_cid_order(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'f,a',
+            'f,b',
+            'c,a must be unique,IsUnique,a',
+            'c,b must be unique,IsUnique,b',
+        ]))
+        rows = [[str(a), '0'] for a in range(1, 101)] + [['1', '1000'], ['2000', '1000']]
+        expected_rejected_lines = _rejected_lines_in_cid_order(cid, rows)
+        self.assertEqual(len(expected_rejected_lines), 100)
+        data_text = ''.join('%s,%s\n' % tuple(row) for row in rows)
+        with io.StringIO(data_text) as data_stream:
+            with validio.Reader(cid, data_stream, on_error='yield') as reader:
+                rejected_lines = [error.location.line for error in reader.rows() if isinstance(error, errors.DataError)]
+                self.assertEqual(reader.validation_plan.check_names, tuple(cid.check_names))
+        self.assertEqual(rejected_lines, expected_rejected_lines)
+
+    def test_can_validate_with_planned_checks(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'f,id,,,,Integer',
+            'f,name',
+            'c,id must be unique,IsUnique,id',
+        ]))
+        with io.StringIO('1,a\n2,b\n1,c\n3,d\n') as data_stream:
+            with validio.Reader(cid, data_stream, on_error='yield') as reader:
+                column_batches = list(reader.column_batches())
+                self.assertEqual(reader.validation_plan.check_names, ('id must be unique',))
+        self.assertEqual(len(column_batches[0].errors), 1)
+        self.assertEqual(reader.accepted_rows_count, 3)
+        self.assertEqual(reader.rejected_rows_count, 1)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
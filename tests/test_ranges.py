@@ -22,6 +22,7 @@ from __future__ import unicode_literals
 
 import unittest
 import decimal
+import token
 import six
 
 from cutplace import errors
@@ -150,6 +151,29 @@ class RangeTest(unittest.TestCase):
     def test_fails_on_missing_numbers(self):
         self.assertRaises(errors.InterfaceError, ranges.Range, "...")
 
+    def test_fails_on_unclosed_bracket(self):
+        self._test_fails_with_interface_error(
+            '(1', "range must be specified using integer numbers, text, symbols and ellipsis (...) but found: '('*")
+
+    def test_can_split_range_into_tokens(self):
+        self.assertEqual(list(ranges._range_tokens(' -0x1\u2026 "a" ,Tab $')), [
+            (token.OP, '-'),
+            (token.NUMBER, '0x1'),
+            (token.ERRORTOKEN, ranges.ELLIPSIS),
+            (token.STRING, '"a"'),
+            (token.OP, ','),
+            (token.NAME, 'Tab'),
+            (token.ERRORTOKEN, '$'),
+            (token.ENDMARKER, ''),
+        ])
+
+    def test_can_reuse_parsed_range(self):
+        some_range = ranges.Range("1...5, 7")
+        some_range.items.append((9, 9))
+        self.assertEqual(ranges.Range("1...5, 7").items, [(1, 5), (7, 7)])
+        self.assertEqual(ranges.DecimalRange("1...5, 7").items, [
+            (decimal.Decimal(1), decimal.Decimal(5)), (decimal.Decimal(7), decimal.Decimal(7))])
+
     def test_can_validate_with_lower_and_upper_limit(self):
         lower_and_upper_range = ranges.Range("-1...1")
         lower_and_upper_range.validate("x", - 1)
@@ -172,6 +196,13 @@ class RangeTest(unittest.TestCase):
         upper_range.validate("x", - (2 ** 32) - 1)
         self.assertRaises(errors.RangeValueError, upper_range.validate, "x", 2)
 
+    def test_can_find_out_of_range_indices(self):
+        self.assertEqual(ranges.Range("-1...1").out_of_range_indices([-2, 0, None, 1, 2]), [0, 4])
+        self.assertEqual(ranges.Range("1...").out_of_range_indices([0, 1, 2 ** 32]), [0])
+        self.assertEqual(ranges.Range("...1").out_of_range_indices([0, 2]), [1])
+        self.assertEqual(ranges.Range("1...2, 5...").out_of_range_indices([1, 3, 4, 5]), [1, 2])
+        self.assertEqual(ranges.Range("").out_of_range_indices([1, 2]), [])
+
     def test_can_validate_with_multi_range(self):
         multi_range = ranges.Range("1...4, 7...9")
         multi_range.validate("x", 1)
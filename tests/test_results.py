@@ -0,0 +1,159 @@
+"""
+Tests for the cache of validation results.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import os
+import unittest
+
+from cutplace import errors
+from cutplace import interface
+from cutplace import results
+from tests import dev_test
+
+_DIGIT_CID = interface.create_cid_from_string('\n'.join([
+    'd,format,delimited',
+    'f,digit,,,1,Integer',
+]))
+
+
+def _write_data(data_path, data_text):
+    with io.open(data_path, 'w', encoding='utf-8') as data_file:
+        data_file.write(data_text)
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._result_cache = results.ResultCache(dev_test.path_to_test_result('test_results'))
+        self._result_cache.clear()
+        self._data_path = dev_test.path_to_test_result('test_results.csv')
+        _write_data(self._data_path, '1\n2\n')
+
+    def test_can_put_and_get_result(self):
+        key = self._result_cache.key(self._data_path, _DIGIT_CID)
+        self.assertIsNone(self._result_cache.get(key))
+        self._result_cache.put(key, {'is_ok': True}, self._data_path)
+        self.assertEqual(self._result_cache.get(key), {'is_ok': True})
+        self.assertEqual(results.ResultCache(self._result_cache.folder).get(key), {'is_ok': True})
+        self._result_cache.clear()
+        self.assertIsNone(self._result_cache.get(key))
+
+    def test_can_detect_changes_in_key(self):
+        key = self._result_cache.key(self._data_path, _DIGIT_CID)
+        self.assertEqual(self._result_cache.key(self._data_path, _DIGIT_CID), key)
+        self.assertNotEqual(self._result_cache.key(self._data_path, _DIGIT_CID, {'validate_until': 1}), key)
+        other_cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'f,digit,,,1,Integer,0...5',
+        ]))
+        self.assertNotEqual(self._result_cache.key(self._data_path, other_cid), key)
+        _write_data(self._data_path, '1\n3\n')
+        self.assertNotEqual(self._result_cache.key(self._data_path, _DIGIT_CID), key)
+
+    def test_can_use_same_key_for_copy_of_data(self):
+        copy_path = dev_test.path_to_test_result('test_results_copy.csv')
+        _write_data(copy_path, '1\n2\n')
+        self.assertEqual(
+            self._result_cache.key(copy_path, _DIGIT_CID), self._result_cache.key(self._data_path, _DIGIT_CID))
+
+    def test_can_remove_least_recently_used_results(self):
+        result_cache = results.ResultCache(self._result_cache.folder, max_size=400)
+        keys = []
+        for result_number in range(3):
+            key = result_cache.key(self._data_path, _DIGIT_CID, {'number': result_number})
+            result_cache.put(key, {'text': 'x' * 50}, self._data_path)
+            keys.append(key)
+            if result_number == 1:
+                result_cache.get(keys[0])
+        self.assertIsNotNone(result_cache.get(keys[0]))
+        self.assertIsNone(result_cache.get(keys[1]))
+        self.assertIsNotNone(result_cache.get(keys[2]))
+
+    def test_can_ignore_broken_cache(self):
+        key = self._result_cache.key(self._data_path, _DIGIT_CID)
+        self._result_cache.put(key, {'is_ok': True})
+        for entry_path in self._result_cache._entry_paths():
+            _write_data(entry_path, '{broken')
+        self.assertIsNone(self._result_cache.get(key))
+        self.assertEqual(self._result_cache.key(self._data_path, _DIGIT_CID), key)
+        self._result_cache.put(key, {'is_ok': False})
+        self.assertEqual(self._result_cache.get(key), {'is_ok': False})
+
+    def test_can_get_result_without_rewriting_it(self):
+        key = self._result_cache.key(self._data_path, _DIGIT_CID)
+        self._result_cache.put(key, {'is_ok': True})
+        result_path = self._result_cache._result_path(key)
+        with io.open(result_path, 'rb') as result_file:
+            result_data = result_file.read()
+        os.utime(result_path, (0, 0))
+        self.assertEqual(self._result_cache.get(key), {'is_ok': True})
+        with io.open(result_path, 'rb') as result_file:
+            self.assertEqual(result_file.read(), result_data)
+        self.assertTrue(os.path.getmtime(result_path) > 0)
+
+    def test_can_keep_results_of_other_caches_using_same_folder(self):
+        other_result_cache = results.ResultCache(self._result_cache.folder)
+        key = self._result_cache.key(self._data_path, _DIGIT_CID, {'number': 1})
+        other_key = other_result_cache.key(self._data_path, _DIGIT_CID, {'number': 2})
+        self._result_cache.put(key, {'is_ok': True})
+        other_result_cache.put(other_key, {'is_ok': False})
+        self.assertEqual(other_result_cache.get(key), {'is_ok': True})
+        self.assertEqual(self._result_cache.get(other_key), {'is_ok': False})
+
+    def test_can_detect_changes_in_choice_file(self):
+        choices_path = dev_test.path_to_test_result('test_results_choices.txt')
+        _write_data(choices_path, 'red\ngreen\n')
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'f,color,,,,Choice,@' + choices_path,
+        ]))
+        self.assertEqual(interface.cid_dependency_paths(cid), [os.path.abspath(choices_path)])
+        key = self._result_cache.key(self._data_path, cid)
+        _write_data(choices_path, 'red\ngreen\nblue\n')
+        self.assertNotEqual(self._result_cache.key(self._data_path, cid), key)
+
+    def test_can_detect_plugins(self):
+        interface.import_plugins(dev_test.path_to_test_plugins())
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'f,color,,,,Color',
+        ]))
+        plugin_path = os.path.abspath(os.path.join(dev_test.path_to_test_plugins(), 'plugins.py'))
+        self.assertEqual(interface.cid_dependency_paths(cid), [plugin_path])
+        self.assertEqual(interface.cid_dependency_paths(_DIGIT_CID), [])
+
+
+class DataErrorDetailsTest(unittest.TestCase):
+    def test_can_create_data_error_from_details(self):
+        location = errors.Location('data.csv', has_cell=True)
+        error = errors.FieldValueError(
+            'value must be a digit', location, code=errors.CODE_RANGE, field_name='digit', value='a')
+        cached_error = results.data_error_from_details(results.data_error_details(error))
+        self.assertEqual(type(cached_error), errors.FieldValueError)
+        self.assertEqual(str(cached_error), str(error))
+        self.assertEqual(cached_error.code, errors.CODE_RANGE)
+        self.assertEqual(cached_error.field_name, 'digit')
+        self.assertEqual(cached_error.value, 'a')
+
+    def test_can_create_data_error_from_unknown_type(self):
+        cached_error = results.data_error_from_details({
+            'type': 'NoSuchError', 'text': 'broken', 'code': None, 'field_name': None, 'value': None})
+        self.assertEqual(type(cached_error), errors.DataError)
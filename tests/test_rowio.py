@@ -283,6 +283,33 @@ class FixedRowsTest(_BaseRowsTest):
         excel_path = dev_test.path_to_test_data('valid_customers.xls')
         self._assert_rows_contain_data(rowio.auto_rows(excel_path))
 
+    def test_can_compute_fixed_record_size(self):
+        field_names_and_lengths = [('name', 2), ('size', 3)]
+        self.assertEqual(rowio.fixed_record_size('iso-8859-15', field_names_and_lengths, '\r\n'), 7)
+        self.assertEqual(rowio.fixed_record_size('cp1252', field_names_and_lengths, None), 5)
+        self.assertIsNone(rowio.fixed_record_size('utf-8', field_names_and_lengths, '\n'))
+        self.assertIsNone(rowio.fixed_record_size('iso-8859-15', field_names_and_lengths, 'any'))
+
+    def _write_fixed_test_data(self, data_text):
+        fixed_path = dev_test.path_to_test_result('test_can_read_fixed_rows_at.txt')
+        with io.open(fixed_path, 'w', encoding='iso-8859-15', newline='') as fixed_file:
+            fixed_file.write(data_text)
+        return fixed_path
+
+    def test_can_read_fixed_rows_at(self):
+        fixed_path = self._write_fixed_test_data('ab1\n\u00e42\u20ac\nef3')
+        field_names_and_lengths = [('name', 2), ('size', 1)]
+        self.assertEqual(rowio.fixed_row_count(fixed_path, 'iso-8859-15', field_names_and_lengths, '\n'), 3)
+        self.assertEqual(
+            list(rowio.fixed_rows_at(fixed_path, 'iso-8859-15', field_names_and_lengths, '\n', [1, 2])),
+            [(1, ['\u00e42', '\u20ac']), (2, ['ef', '3'])])
+
+    def test_fails_on_fixed_row_count_with_broken_file_size(self):
+        fixed_path = self._write_fixed_test_data('ab1\ncd')
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.DataFormatError, '*: file size is 6 bytes but must be a multiple of the record size of 4 bytes',
+            rowio.fixed_row_count, fixed_path, 'iso-8859-15', [('name', 2), ('size', 1)], '\n')
+
 
 class AutoRowsTest(_BaseRowsTest):
     def test_can_auto_read_ods_rows(self):
@@ -333,6 +360,31 @@ class DelimitedRowWriterTest(unittest.TestCase):
                     dev_test.assert_fnmatches(
                         self, anticipated_error_message, "*.csv (R2C1): cannot write data row: *; row=*'b', *")
 
+    def test_can_write_delimited_rows(self):
+        delimited_data_format = data.DataFormat(data.FORMAT_DELIMITED)
+        delimited_data_format.validate()
+        with io.StringIO() as target:
+            with rowio.DelimitedRowWriter(target, delimited_data_format) as delimited_writer:
+                delimited_writer.write_rows([['a', 'b'], ['c', 'd,e']])
+                self.assertEqual(delimited_writer.location.line, 2)
+            data_written = dev_test.unified_newlines(target.getvalue())
+        self.assertEqual(data_written, 'a,b\nc,"d,e"\n')
+
+    def test_fails_on_unicode_error_during_delimited_write_rows(self):
+        delimited_data_format = data.DataFormat(data.FORMAT_DELIMITED)
+        delimited_data_format.set_property(data.KEY_ENCODING, 'ascii')
+        delimited_data_format.validate()
+        delimited_path = dev_test.path_to_test_result('test_fails_on_unicode_error_during_delimited_write_rows.csv')
+        with io.open(delimited_path, 'w', newline='', encoding=delimited_data_format.encoding) as delimited_target_stream:
+            with rowio.DelimitedRowWriter(delimited_target_stream, delimited_data_format) as delimited_writer:
+                try:
+                    delimited_writer.write_rows([['a'], ['b', _EURO_SIGN]])
+                    self.fail()
+                except errors.DataError as anticipated_error:
+                    anticipated_error_message = str(anticipated_error)
+                    dev_test.assert_fnmatches(
+                        self, anticipated_error_message, "*.csv (R2C1): cannot write data row: *; row=*'b', *")
+
 
 class FixedRowWriterTest(unittest.TestCase):
     def test_can_write_fixed_data_to_string(self):
@@ -0,0 +1,213 @@
+"""
+Tests for the server validating data sent using HTTP.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import socket
+import threading
+import unittest
+
+from six.moves import http_client
+
+from cutplace import server
+from tests import dev_test
+
+_CUSTOMERS_CID_PATH = dev_test.CID_CUSTOMERS_ODS_PATH
+_VALID_CUSTOMERS_CSV_PATH = dev_test.path_to_example('customers.csv')
+_BROKEN_CUSTOMERS_CSV_PATH = dev_test.path_to_test_data('broken_customers.csv')
+
+
+def _read_binary(path):
+    with io.open(path, 'rb') as binary_file:
+        return binary_file.read()
+
+
+def _write_cid(cid_path, id_rule):
+    with io.open(cid_path, 'w', encoding='utf-8') as cid_file:
+        cid_file.write('\n'.join([
+            'd,format,delimited',
+            'f,id,,,,Integer,%s' % id_rule,
+            'f,name',
+            '',
+        ]))
+
+
+class _BaseServerTest(unittest.TestCase):
+    def _start(self, validation_server):
+        self._server = validation_server
+        self._server_thread = threading.Thread(target=self._server.serve_forever)
+        self._server_thread.daemon = True
+        self._server_thread.start()
+
+    def tearDown(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._server_thread.join()
+
+
+class HttpServerTest(_BaseServerTest):
+    def setUp(self):
+        self._cid_registry = server.CidRegistry()
+        self._cid_registry.add(_CUSTOMERS_CID_PATH)
+        self._start(server.create_server(self._cid_registry, ('localhost', 0), worker_count=2))
+        self._connection = http_client.HTTPConnection('localhost', self._server.server_address[1], timeout=10)
+
+    def tearDown(self):
+        self._connection.close()
+        super(HttpServerTest, self).tearDown()
+
+    def _response(self, method, path, body=None):
+        self._connection.request(method, path, body)
+        response = self._connection.getresponse()
+        return response.status, json.loads(response.read().decode('utf-8'))
+
+    def test_can_list_cids(self):
+        self.assertEqual(self._response('GET', '/cids'), (200, {'cids': ['cid_customers']}))
+
+    def test_can_validate_valid_data(self):
+        status, result = self._response('POST', '/validate/cid_customers', _read_binary(_VALID_CUSTOMERS_CSV_PATH))
+        self.assertEqual(status, 200)
+        self.assertEqual(result['cid'], 'cid_customers')
+        self.assertTrue(result['is_ok'])
+        self.assertTrue(result['accepted'] > 0)
+        self.assertEqual(result['errors'], [])
+
+    def test_can_validate_broken_data(self):
+        for _ in range(2):
+            # Validate twice to make sure the connection can be reused.
+            status, result = self._response('POST', '/validate/cid_customers', _read_binary(_BROKEN_CUSTOMERS_CSV_PATH))
+            self.assertEqual(status, 200)
+            self.assertFalse(result['is_ok'])
+            self.assertEqual(result['rejected'], len(result['errors']))
+            self.assertTrue(result['rejected'] > 0)
+            self.assertEqual(set(result['errors'][0].keys()), set(['cell', 'code', 'field', 'file', 'reason', 'row', 'value']))
+
+    def test_can_validate_concurrently(self):
+        results = []
+
+        def validate():
+            connection = http_client.HTTPConnection('localhost', self._server.server_address[1], timeout=10)
+            try:
+                connection.request('POST', '/validate/cid_customers', _read_binary(_VALID_CUSTOMERS_CSV_PATH))
+                results.append(json.loads(connection.getresponse().read().decode('utf-8')))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=validate) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all(result['is_ok'] for result in results))
+
+    def test_fails_on_unknown_cid(self):
+        status, result = self._response('POST', '/validate/no_such_cid', b'x')
+        self.assertEqual(status, 404)
+        dev_test.assert_fnmatches(self, result['error'], "CID must be one of * but is: no_such_cid")
+
+    def test_fails_on_unknown_path(self):
+        status, _ = self._response('GET', '/no_such_path')
+        self.assertEqual(status, 404)
+
+
+class CidRegistryTest(unittest.TestCase):
+    def test_can_reload_changed_cid(self):
+        cid_path = dev_test.path_to_test_result('test_can_reload_changed_cid.csv')
+        _write_cid(cid_path, '1...9')
+        cid_registry = server.CidRegistry()
+        cid_registry.add(cid_path, 'ids')
+        with io.StringIO('12,a\n') as data_stream:
+            self.assertEqual(server.validation_result(cid_registry.cid('ids'), data_stream)['rejected'], 1)
+        _write_cid(cid_path, '1...99')
+        modified_time = os.path.getmtime(cid_path) + 10
+        os.utime(cid_path, (modified_time, modified_time))
+        with io.StringIO('12,a\n') as data_stream:
+            self.assertEqual(server.validation_result(cid_registry.cid('ids'), data_stream)['accepted'], 1)
+
+    def test_can_keep_cid_if_changed_cid_is_broken(self):
+        cid_path = dev_test.path_to_test_result('test_can_keep_cid_if_changed_cid_is_broken.csv')
+        _write_cid(cid_path, '1...9')
+        cid_registry = server.CidRegistry()
+        cid_registry.add(cid_path, 'ids')
+        cid = cid_registry.cid('ids')
+        _write_cid(cid_path, 'broken')
+        modified_time = os.path.getmtime(cid_path) + 10
+        os.utime(cid_path, (modified_time, modified_time))
+        self.assertIs(cid_registry.cid('ids'), cid)
+
+        # The broken CID is not read again until it changes.
+        _write_cid(cid_path, '1...99')
+        os.utime(cid_path, (modified_time, modified_time))
+        self.assertIs(cid_registry.cid('ids'), cid)
+        modified_time += 10
+        os.utime(cid_path, (modified_time, modified_time))
+        self.assertIsNot(cid_registry.cid('ids'), cid)
+
+    def test_fails_on_duplicate_cid_name(self):
+        cid_registry = server.CidRegistry()
+        cid_registry.add(_CUSTOMERS_CID_PATH)
+        self.assertRaises(ValueError, cid_registry.add, _CUSTOMERS_CID_PATH)
+
+
+@unittest.skipUnless(server.has_unix_sockets, 'Unix domain sockets are not supported')
+class UnixServerTest(_BaseServerTest):
+    def test_can_validate_using_unix_socket(self):
+        socket_path = dev_test.path_to_test_result('test_can_validate_using_unix_socket.sock')
+        cid_registry = server.CidRegistry()
+        cid_registry.add(_CUSTOMERS_CID_PATH)
+        self._start(server.create_server(cid_registry, socket_path, worker_count=1))
+        data = _read_binary(_VALID_CUSTOMERS_CSV_PATH)
+        client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client_socket.connect(socket_path)
+            client_socket.sendall(
+                b'POST /validate/cid_customers HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n' % len(data)
+                + data)
+            response = b''
+            while True:
+                chunk = client_socket.recv(65536)
+                if not chunk:
+                    break
+                response += chunk
+        finally:
+            client_socket.close()
+        header, _, body = response.partition(b'\r\n\r\n')
+        self.assertTrue(header.startswith(b'HTTP/1.1 200 '), 'header=%r' % header)
+        self.assertTrue(json.loads(body.decode('utf-8'))['is_ok'])
+
+
+class ServerAddressTest(unittest.TestCase):
+    def test_can_parse_server_address(self):
+        self.assertEqual(server.server_address('8000'), ('localhost', 8000))
+        self.assertEqual(server.server_address(':8000'), ('localhost', 8000))
+        self.assertEqual(server.server_address('0.0.0.0:8000'), ('0.0.0.0', 8000))
+        if server.has_unix_sockets:
+            self.assertEqual(server.server_address('unix:/tmp/cutplace.sock'), '/tmp/cutplace.sock')
+            self.assertRaises(ValueError, server.server_address, 'unix:')
+        self.assertRaises(ValueError, server.server_address, 'localhost:x')
+        self.assertRaises(ValueError, server.server_address, 'localhost:70000')
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
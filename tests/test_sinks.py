@@ -0,0 +1,100 @@
+"""
+Tests for sinks for rejected rows.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+import unittest
+
+from cutplace import errors
+from cutplace import interface
+from cutplace import sinks
+from cutplace import validio
+
+
+def _field_value_error(message, field_name, value, row):
+    location = errors.Location('data.csv', has_cell=True)
+    location.advance_line(row)
+    location.set_cell(1)
+    return errors.FieldValueError(message, location, code=errors.CODE_RANGE, field_name=field_name, value=value)
+
+
+class JsonLinesErrorSinkTest(unittest.TestCase):
+    def test_can_write_error_details(self):
+        with io.StringIO() as target:
+            with sinks.JsonLinesErrorSink(target) as error_sink:
+                error_sink.write(_field_value_error('value must be at most 9', 'digit', '12', 2), ['x', '12'])
+                error_sink.write(errors.CheckError('duplicate id'), ['x', '12'])
+            records = [json.loads(line) for line in target.getvalue().splitlines()]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0], {
+            'file': 'data.csv', 'row': 3, 'cell': 'R3C2', 'field': 'digit', 'value': '12', 'code': 'range',
+            'reason': 'value must be at most 9'})
+        self.assertEqual(records[1]['reason'], 'duplicate id')
+        self.assertIsNone(records[1]['row'])
+
+    def test_can_buffer_writes(self):
+        with io.StringIO() as target:
+            error_sink = sinks.JsonLinesErrorSink(target, buffer_size=2)
+            error_sink.write(errors.CheckError('1'), [])
+            self.assertEqual(target.getvalue(), '')
+            error_sink.write(errors.CheckError('2'), [])
+            self.assertEqual(len(target.getvalue().splitlines()), 2)
+            error_sink.write(errors.CheckError('3'), [])
+            error_sink.close()
+            self.assertEqual(len(target.getvalue().splitlines()), 3)
+            self.assertEqual(error_sink.written_count, 3)
+
+
+class QuarantineSinkTest(unittest.TestCase):
+    def test_can_quarantine_delimited_rows(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'd,header,1',
+            'f,id,,,,Integer,0...9',
+            'f,name',
+        ]))
+        data_text = 'id,name\n1,a\n12,b\n3,c\nx,d\n'
+        with io.StringIO() as quarantine_stream:
+            with sinks.QuarantineSink(quarantine_stream, cid) as quarantine_sink:
+                with io.StringIO() as error_stream:
+                    with sinks.JsonLinesErrorSink(error_stream) as error_sink:
+                        with io.StringIO(data_text) as data_stream:
+                            with validio.Reader(cid, data_stream, on_error='continue') as reader:
+                                reader.add_error_sink(quarantine_sink)
+                                reader.add_error_sink(error_sink)
+                                column_batches = list(reader.column_batches())
+                    records = [json.loads(line) for line in error_stream.getvalue().splitlines()]
+            self.assertEqual(quarantine_stream.getvalue().splitlines(), ['12,b', 'x,d'])
+        self.assertEqual([(record['row'], record['field']) for record in records], [(3, 'id'), (5, 'id')])
+        self.assertEqual(len(column_batches[0]), 2)
+
+    def test_can_quarantine_padded_fixed_rows(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,fixed',
+            'd,line delimiter,lf',
+            'f,id,,,2,Integer',
+            'f,name,,,3',
+        ]))
+        with io.StringIO() as quarantine_stream:
+            with sinks.QuarantineSink(quarantine_stream, cid) as quarantine_sink:
+                quarantine_sink.write(errors.CheckError('broken'), ['1', 'ab'])
+            self.assertEqual(quarantine_stream.getvalue(), '1 ab \n')
@@ -0,0 +1,66 @@
+"""
+Tests for statistics on where validation spends its time.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import unittest
+
+from cutplace import stats
+from tests import dev_test
+
+
+class ValidationStatsTest(unittest.TestCase):
+    def test_can_add_time(self):
+        validation_stats = stats.ValidationStats()
+        validation_stats.add_time(stats.STAGE_FIELDS, 0.5, 10, 'id')
+        validation_stats.add_time(stats.STAGE_FIELDS, 1.5, 10, 'name')
+        validation_stats.add_time(stats.STAGE_FIELDS, 0.25, 5, 'id')
+        validation_stats.add_time(stats.STAGE_CHECKS, 0.125, name='id must be unique')
+        self.assertEqual(validation_stats.stage_timings[stats.STAGE_FIELDS].seconds, 2.25)
+        self.assertEqual(validation_stats.stage_timings[stats.STAGE_FIELDS].count, 25)
+        self.assertEqual(validation_stats.field_timings['id'].seconds, 0.75)
+        self.assertEqual(validation_stats.field_timings['id'].count, 15)
+        self.assertEqual(validation_stats.check_timings['id must be unique'].count, 1)
+        self.assertEqual(validation_stats.stage_timings[stats.STAGE_READ].count, 0)
+        stats_lines = validation_stats.lines()
+        self.assertEqual(stats_lines[1:], [
+            'fields: 2.250s for 25',
+            "  'name': 1.500s for 10",
+            "  'id': 0.750s for 15",
+            'checks: 0.125s for 1',
+            "  'id must be unique': 0.125s for 1",
+        ])
+
+    def test_can_time_rows(self):
+        validation_stats = stats.ValidationStats(byte_count=100)
+        self.assertEqual(list(validation_stats.timed_rows([['a'], ['b']])), [['a'], ['b']])
+        validation_stats.stop()
+        self.assertEqual(validation_stats.row_count, 2)
+        self.assertEqual(validation_stats.stage_timings[stats.STAGE_READ].count, 2)
+        self.assertTrue(validation_stats.rows_per_second > 0)
+        self.assertTrue(validation_stats.bytes_per_second > 0)
+        elapsed_seconds = validation_stats.elapsed_seconds
+        self.assertEqual(validation_stats.elapsed_seconds, elapsed_seconds)
+        dev_test.assert_fnmatches(self, validation_stats.lines()[0], '2 rows in *s (* rows/s, * bytes/s)')
+
+    def test_can_omit_unknown_bytes_per_second(self):
+        validation_stats = stats.ValidationStats()
+        self.assertIsNone(validation_stats.bytes_per_second)
+        dev_test.assert_fnmatches(self, str(validation_stats), '0 rows in *s (* rows/s)')
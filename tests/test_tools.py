@@ -62,6 +62,8 @@ class ToolsTest(unittest.TestCase):
         self.assertEqual(_tools.human_readable_list(['a']), "'a'")
         self.assertEqual(_tools.human_readable_list(['a', 'b']), "'a' or 'b'")
         self.assertEqual(_tools.human_readable_list(['a', 'b', 'c']), "'a', 'b' or 'c'")
+        self.assertEqual(_tools.human_readable_list(['a', 'b', 'c'], max_items=3), "'a', 'b' or 'c'")
+        self.assertEqual(_tools.human_readable_list(['a', 'b', 'c'], max_items=1), "'a' or 2 more")
 
     def _test_can_derive_suffix(self, expected_path, path_to_test, suffix_to_test):
         actualPath = _tools.with_suffix(path_to_test, suffix_to_test)
@@ -20,11 +20,17 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import decimal
 import io
+import json
+import os
 import unittest
 
 from cutplace import interface
 from cutplace import errors
+from cutplace import fields
+from cutplace import results
+from cutplace import stats
 from cutplace import validio
 from tests import dev_test
 
@@ -88,6 +94,25 @@ class ReaderTest(unittest.TestCase):
         with validio.Reader(cid, dev_test.path_to_test_data("broken_customers_with_duplicates.csv")) as reader:
             self.assertRaises(errors.CheckError, reader.validate_rows)
 
+    def test_can_use_same_cid_for_interleaved_readers(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'f,id,,,,Integer',
+            'c,id must be unique,IsUnique,id',
+        ]))
+        with io.StringIO('1\n2\n') as data_stream, io.StringIO('2\n1\n1\n') as other_data_stream:
+            with validio.Reader(cid, data_stream, on_error='yield') as reader:
+                with validio.Reader(cid, other_data_stream, on_error='yield') as other_reader:
+                    batches = reader.column_batches(1)
+                    other_batches = other_reader.column_batches(1)
+                    error_counts = [0, 0]
+                    for _ in range(2):
+                        error_counts[0] += len(next(batches).errors)
+                        error_counts[1] += len(next(other_batches).errors)
+                    error_counts[1] += len(next(other_batches).errors)
+        self.assertEqual(error_counts, [0, 1])
+        self.assertEqual(cid.check_map['id must be unique'].get_state(), [])
+
     def test_can_process_escape_character(self):
         """
         Regression test for #49: Fails when last char of field is escaped.
@@ -137,6 +162,18 @@ class ReaderTest(unittest.TestCase):
         self.assertEqual(expected_row_count, len(rows), 'expected %d rows but got: %s' % (expected_row_count, rows))
         self.assertEqual([['1'], ['3']], rows)
 
+    def test_fails_on_exceeding_max_errors(self):
+        cid = interface.Cid(dev_test.CID_CUSTOMERS_XLS_PATH)
+        data_path = dev_test.path_to_test_data('broken_customers_with_duplicates.csv')
+        with validio.Reader(cid, data_path, 'continue', max_errors=1) as reader:
+            reader.validate_rows()
+        self.assertEqual(reader.rejected_rows_count, 1)
+        with validio.Reader(cid, data_path, 'continue', max_errors=0) as reader:
+            dev_test.assert_raises_and_fnmatches(
+                self, errors.ErrorBudgetError,
+                '* (R4C1): stopped reading after 3 rows because 1 of them were rejected but at most 0 are allowed',
+                reader.validate_rows)
+
     def test_can_skip_header(self):
         cid_text = '\n'.join([
             'd,format,delimited',
@@ -180,6 +217,17 @@ class ReaderTest(unittest.TestCase):
                 rows = list(reader.rows())
         self.assertEqual([['1'], ['2'], ['a']], rows)
 
+    def test_can_yield_errors_before_skipping_validation(self):
+        data_with_rows_2_and_4_broken = '1\nb\n3\nd\n'
+        with io.StringIO(data_with_rows_2_and_4_broken) as partially_broken_data:
+            with validio.Reader(_DIGIT_CID, partially_broken_data, on_error='yield', validate_until=3) as reader:
+                rows = list(reader.rows())
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0], ['1'])
+        dev_test.assert_error_fnmatches(self, rows[1], "* (R2C1): cannot accept field 'digit': *")
+        self.assertEqual(rows[2:], [['3'], ['d']])
+        self.assertEqual((reader.accepted_rows_count, reader.rejected_rows_count), (3, 1))
+
     def test_fails_on_broken_data_before_skipping_validation(self):
         data_with_row_3_broken = '1\n2\na\n'
         with io.StringIO(data_with_row_3_broken) as partially_broken_data:
@@ -192,6 +240,563 @@ class ReaderTest(unittest.TestCase):
                         self, str(anticipated_error),
                         "* (R3C1): cannot accept field 'digit': value must be an integer number: 'a'")
 
+    def test_can_validate_field_columns(self):
+        with io.StringIO('1\n2\na\n') as partially_broken_data:
+            with validio.Reader(_DIGIT_CID, partially_broken_data) as reader:
+                field_errors = reader.validated_field_columns([['1'], ['x'], ['2'], [], ['33']])
+                self.assertEqual(len(field_errors), 2)
+                dev_test.assert_fnmatches(
+                    self, str(field_errors[0]),
+                    "* (R2C1): cannot accept field 'digit': value must be an integer number: 'x'")
+                dev_test.assert_fnmatches(self, str(field_errors[1]), "* (R5C1): cannot accept field 'digit': *")
+
+
+class ColumnBatchTest(unittest.TestCase):
+    """
+    Tests for :py:meth:`cutplace.validio.Reader.column_batches()`.
+    """
+    def setUp(self):
+        cid_text = '\n'.join([
+            'd,format,delimited',
+            'd,header,1',
+            ' ,name   ,,empty,length,type,rule',
+            'f,id     ,,     ,      ,Integer',
+            'f,price  ,,     ,      ,Decimal,0...1000.99',
+            'f,color  ,,     ,      ,Choice,"red, green"',
+            'f,remark ,,X',
+        ])
+        self._cid = interface.create_cid_from_string(cid_text)
+        self._data_text = 'id,price,color,remark\n1,2.5,red,a\n2,3,red,b\n3,4.75,green,c\n4,0.01,red,d\n'
+
+    def test_can_read_column_batches(self):
+        with io.StringIO(self._data_text) as data_stream:
+            with validio.Reader(self._cid, data_stream) as reader:
+                column_batches = list(reader.column_batches(3))
+        self.assertEqual([len(column_batch) for column_batch in column_batches], [3, 1])
+        column_batch = column_batches[0]
+        self.assertEqual(column_batch.field_names, ['id', 'price', 'color', 'remark'])
+        self.assertEqual(column_batch.column('id').typecode, 'q')
+        self.assertEqual(list(column_batch.column('id')), [1, 2, 3])
+        self.assertTrue(isinstance(column_batch.column('price'), validio.ScaledDecimalColumn))
+        self.assertEqual(
+            list(column_batch.column('price')), [decimal.Decimal('2.5'), decimal.Decimal(3), decimal.Decimal('4.75')])
+        self.assertEqual(list(column_batch.column('price').scaled_values), [250, 300, 475])
+        self.assertEqual(column_batch.column('price')[1], decimal.Decimal(3))
+        self.assertEqual(column_batch.column('remark'), ['a', 'b', 'c'])
+        self.assertEqual(reader.accepted_rows_count, 4)
+
+    def test_can_dictionary_encode_repeated_texts(self):
+        with io.StringIO(self._data_text) as data_stream:
+            column_batch = list(validio.column_batches(self._cid, data_stream))[0]
+        color_column = column_batch.column('color')
+        self.assertTrue(isinstance(color_column, validio.DictionaryEncodedColumn))
+        self.assertEqual(color_column.dictionary, ['red', 'green'])
+        self.assertEqual(list(color_column.codes), [0, 0, 1, 0])
+        self.assertEqual(list(color_column), ['red', 'red', 'green', 'red'])
+
+    def test_can_keep_integers_with_empty_values_as_list(self):
+        cid = interface.create_cid_from_string('d,format,delimited\nf,number,,X,,Integer\nf,name')
+        with io.StringIO('1,a\n,b\n3,c\n') as data_stream:
+            column_batch = list(validio.column_batches(cid, data_stream))[0]
+        self.assertEqual(column_batch.column('number'), [1, None, 3])
+
+    def test_can_yield_errors_of_rejected_rows(self):
+        with io.StringIO(self._data_text + 'x,1,red,e\n5,1,blue,f\n6,1\n') as data_stream:
+            with validio.Reader(self._cid, data_stream, on_error='yield') as reader:
+                column_batches = list(reader.column_batches())
+        self.assertEqual(len(column_batches), 1)
+        column_batch = column_batches[0]
+        self.assertEqual(list(column_batch.column('id')), [1, 2, 3, 4])
+        self.assertEqual(len(column_batch.errors), 3)
+        dev_test.assert_fnmatches(self, str(column_batch.errors[0]), "* (R6C1): cannot accept field 'id': *")
+        dev_test.assert_fnmatches(self, str(column_batch.errors[1]), "* (R7C3): cannot accept field 'color': *")
+        dev_test.assert_fnmatches(self, str(column_batch.errors[2]), "* (R8C1): row must contain 4 fields *")
+        self.assertEqual(reader.accepted_rows_count, 4)
+        self.assertEqual(reader.rejected_rows_count, 3)
+
+    def test_fails_on_broken_row_in_column_batch(self):
+        with io.StringIO(self._data_text + '5,1,blue,f\n') as data_stream:
+            with validio.Reader(self._cid, data_stream) as reader:
+                self.assertRaises(errors.FieldValueError, list, reader.column_batches())
+
+    def test_fails_on_exceeding_max_error_rate(self):
+        data_text = 'id,price,color,remark\n' + ''.join('%d,1,%s,x\n' % (row_number, 'red' if row_number % 5 else 'blue') for row_number in range(1, 301))
+        with io.StringIO(data_text) as data_stream:
+            with validio.Reader(self._cid, data_stream, 'continue', max_error_rate=0.25) as reader:
+                self.assertEqual(sum(len(column_batch) for column_batch in reader.column_batches(50)), 240)
+        with io.StringIO(data_text) as data_stream:
+            with validio.Reader(self._cid, data_stream, 'continue', max_error_rate=0.1) as reader:
+                dev_test.assert_raises_and_fnmatches(
+                    self, errors.ErrorBudgetError,
+                    '* (R101C1): stopped reading after 100 rows because 20 of them were rejected '
+                    'but the error rate must be at most 10%', list, reader.column_batches(50))
+
+    def test_can_yield_column_batch_before_exceeding_max_errors(self):
+        data_text = 'id,price,color,remark\n' + ''.join(
+            '%d,1,%s,x\n' % (row_number, 'red' if row_number % 5 else 'blue') for row_number in range(1, 21))
+        column_batches = []
+        with io.StringIO(data_text) as data_stream:
+            with validio.Reader(self._cid, data_stream, 'yield', max_errors=1) as reader:
+                try:
+                    for column_batch in reader.column_batches(100):
+                        column_batches.append(column_batch)
+                    self.fail('exceeding max_errors must cause ErrorBudgetError')
+                except errors.ErrorBudgetError as error:
+                    dev_test.assert_error_fnmatches(self, error, '* (R11C1): stopped reading after 10 rows *')
+        self.assertEqual(len(column_batches), 1)
+        self.assertEqual(len(column_batches[0]), 8)
+        self.assertEqual(len(column_batches[0].errors), 2)
+
+    @unittest.skipUnless(fields.has_numpy, 'NumPy must be installed')
+    def test_can_read_column_batches_as_numpy_arrays(self):
+        with io.StringIO(self._data_text) as data_stream:
+            with validio.Reader(self._cid, data_stream) as reader:
+                column_batch = list(reader.column_batches(use_numpy=True))[0]
+        self.assertEqual(column_batch.column('id').dtype.name, 'int64')
+        self.assertEqual(column_batch.column('id').sum(), 10)
+        self.assertEqual(column_batch.column('price').scaled_values.sum(), 1026)
+
+
+class SampleTest(unittest.TestCase):
+    """
+    Tests for :py:meth:`cutplace.validio.Reader.sample()`.
+    """
+    def setUp(self):
+        self._data_text = 'id,name\n' + ''.join('%d,x\n' % row_number for row_number in range(1, 1001))
+
+    def _sample(self, cid_text, data, **keywords):
+        cid = interface.create_cid_from_string(cid_text)
+        with validio.Reader(cid, data) as reader:
+            result = reader.sample(**keywords)
+        self.assertEqual(reader.accepted_rows_count + reader.rejected_rows_count, result.sampled_row_count)
+        return result
+
+    def _delimited_sample(self, **keywords):
+        with io.StringIO(self._data_text) as data_stream:
+            result = self._sample('\n'.join([
+                'd,format,delimited',
+                'd,header,1',
+                'f,id,,,,Integer,1...900',
+                'f,name',
+            ]), data_stream, **keywords)
+        return result
+
+    def test_can_validate_every_nth_row(self):
+        sample_report = self._delimited_sample(every=10)
+        self.assertEqual(sample_report.row_count, 1000)
+        self.assertEqual(sample_report.sampled_row_count, 100)
+        self.assertEqual(sample_report.coverage, 0.1)
+        self.assertEqual(sample_report.rejected_row_count, 10)
+        dev_test.assert_fnmatches(self, str(sample_report.errors[0]), "* (R902C1): cannot accept field 'id': *")
+        lower_error_rate, upper_error_rate = sample_report.error_rate_interval()
+        self.assertTrue(lower_error_rate < 0.1 < upper_error_rate)
+        dev_test.assert_fnmatches(
+            self, str(sample_report), 'validated 100 of 1000 rows (10.0%) and rejected 10; estimated error rate: 10.0% (*)')
+
+    def test_can_validate_random_sample(self):
+        sample_report = self._delimited_sample(sample_size=50, seed=1)
+        self.assertEqual(sample_report.sampled_row_count, 50)
+        self.assertEqual(
+            [str(error) for error in sample_report.errors],
+            [str(error) for error in self._delimited_sample(sample_size=50, seed=1).errors])
+
+    def test_can_validate_random_sample_larger_than_data(self):
+        sample_report = self._delimited_sample(sample_size=2000)
+        self.assertEqual(sample_report.sampled_row_count, 1000)
+        self.assertEqual(sample_report.error_rate_interval(), (0.1, 0.1))
+
+    def test_can_seek_sample_of_fixed_rows(self):
+        fixed_path = dev_test.path_to_test_result('test_can_seek_sample_of_fixed_rows.txt')
+        cid_text = '\n'.join([
+            'd,format,fixed',
+            'd,encoding,iso-8859-15',
+            'd,line delimiter,lf',
+            'd,header,1',
+            'f,id,,,4,Integer,1...900',
+            'f,name,,,1',
+        ])
+        with io.open(fixed_path, 'w', encoding='iso-8859-15', newline='') as fixed_file:
+            fixed_file.write('id  n\n' + ''.join('%-4dx\n' % row_number for row_number in range(1, 1001)))
+        sample_report = self._sample(cid_text, fixed_path, every=10)
+        self.assertEqual(sample_report.row_count, 1000)
+        self.assertEqual(sample_report.rejected_row_count, 10)
+        dev_test.assert_fnmatches(self, str(sample_report.errors[0]), "* (R902C1): cannot accept field 'id': *")
+        sample_report = self._sample(cid_text, fixed_path, sample_size=20, seed=1)
+        self.assertEqual(sample_report.sampled_row_count, 20)
+
+
+class CheckpointTest(unittest.TestCase):
+    """
+    Tests for :py:meth:`cutplace.validio.Reader.set_checkpoint()`.
+    """
+    def _write_data(self, data_path, data_text, mode='w', encoding='iso-8859-15'):
+        with io.open(data_path, mode, encoding=encoding, newline='') as data_file:
+            data_file.write(data_text)
+
+    def _read_rows(self, cid, data_path, **keywords):
+        with validio.Reader(cid, data_path, on_error='yield') as reader:
+            reader.set_checkpoint(**keywords)
+            rows = list(reader.rows())
+        return reader, rows
+
+    def _test_can_resume(self, cid_text, first_data_text, appended_data_text, encoding='iso-8859-15'):
+        cid = interface.create_cid_from_string(cid_text)
+        data_path = dev_test.path_to_test_result('test_can_resume_from_checkpoint.txt')
+        self._write_data(data_path, first_data_text, encoding=encoding)
+        checkpoint_path = data_path + validio.CHECKPOINT_SUFFIX
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        reader, rows = self._read_rows(cid, data_path, row_count=1)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(reader.resumed_rows_count, 0)
+        self.assertTrue(os.path.exists(checkpoint_path))
+
+        self._write_data(data_path, appended_data_text, 'a', encoding)
+        reader, rows = self._read_rows(cid, data_path)
+        self.assertEqual(reader.resumed_rows_count, 3)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual([item.rstrip() for item in rows[0]], ['3'])
+        dev_test.assert_error_fnmatches(self, rows[1], '* (R5C1): values for * must be unique: *')
+        self.assertEqual((reader.accepted_rows_count, reader.rejected_rows_count), (3, 1))
+
+        # Changed data cause the checkpoint to be ignored.
+        self._write_data(data_path, first_data_text.replace('1', '4', 1) + appended_data_text, encoding=encoding)
+        reader, rows = self._read_rows(cid, data_path)
+        self.assertEqual(reader.resumed_rows_count, 0)
+        self.assertEqual(len(rows), 4)
+
+    def test_can_resume_delimited_data(self):
+        self._test_can_resume(
+            '\n'.join([
+                'd,format,delimited', 'd,line delimiter,lf', 'd,header,1', 'f,id', 'c,id must be unique,IsUnique,id']),
+            'id\n1\n2\n', '3\n1\n')
+
+    def test_can_resume_delimited_data_with_any_line_delimiter(self):
+        self._test_can_resume(
+            '\n'.join(['d,format,delimited', 'd,header,1', 'f,id', 'c,id must be unique,IsUnique,id']),
+            'id\r\n1\r\n2\r\n', '3\r\n1\r\n')
+
+    def test_can_resume_delimited_data_with_carriage_returns(self):
+        self._test_can_resume(
+            '\n'.join([
+                'd,format,delimited', 'd,line delimiter,cr', 'd,header,1', 'f,id', 'c,id must be unique,IsUnique,id']),
+            'id\r1\r2\r', '3\r1\r')
+
+    def test_can_resume_delimited_data_without_byte_offsets(self):
+        self._test_can_resume(
+            '\n'.join([
+                'd,format,delimited', 'd,encoding,utf-16-le', 'd,header,1', 'f,id', 'c,id must be unique,IsUnique,id']),
+            'id\n1\n2\n', '3\n1\n', encoding='utf-16-le')
+
+    def test_can_resume_fixed_data(self):
+        self._test_can_resume(
+            '\n'.join([
+                'd,format,fixed', 'd,encoding,iso-8859-15', 'd,line delimiter,lf', 'd,header,1', 'f,id,,,2',
+                'c,id must be unique,IsUnique,id']),
+            'id\n1 \n2 \n', '3 \n1 \n')
+
+    def test_can_detect_changed_rows_without_byte_offsets(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited', 'd,encoding,utf-16-le', 'd,header,1', 'f,id', 'c,id must be unique,IsUnique,id']))
+        data_path = dev_test.path_to_test_result('test_can_detect_changed_rows_without_byte_offsets.txt')
+        checkpoint_path = data_path + validio.CHECKPOINT_SUFFIX
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        data_text = 'id\n' + ''.join('%d\n' % row_number for row_number in range(1, 2001))
+        self._write_data(data_path, data_text, encoding='utf-16-le')
+        self._read_rows(cid, data_path)
+
+        # Change a row after the part of the data the head digest covers.
+        self._write_data(data_path, data_text.replace('\n1500\n', '\n1\n') + '2001\n', encoding='utf-16-le')
+        reader, rows = self._read_rows(cid, data_path)
+        self.assertEqual(reader.resumed_rows_count, 0)
+        self.assertEqual(reader.rejected_rows_count, 1)
+
+        self._write_data(data_path, '2002\n', 'a', encoding='utf-16-le')
+        reader, rows = self._read_rows(cid, data_path)
+        self.assertEqual(reader.resumed_rows_count, 2002)
+        self.assertEqual((reader.accepted_rows_count, reader.rejected_rows_count), (2001, 1))
+
+    def test_can_resume_with_many_unique_keys(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited', 'd,line delimiter,lf', 'f,id', 'c,id must be unique,IsUnique,id']))
+        data_path = dev_test.path_to_test_result('test_can_resume_with_many_unique_keys.txt')
+        checkpoint_path = data_path + validio.CHECKPOINT_SUFFIX
+        checkpoint_folder = os.path.dirname(checkpoint_path)
+        state_log_prefix = os.path.basename(checkpoint_path) + '.'
+
+        def state_log_names():
+            return [
+                name for name in os.listdir(checkpoint_folder)
+                if name.startswith(state_log_prefix) and name.endswith('.state')]
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        for state_log_name in state_log_names():
+            os.remove(os.path.join(checkpoint_folder, state_log_name))
+        row_count = 20000
+        self._write_data(data_path, ''.join('%d\n' % row_number for row_number in range(1, row_count + 1)))
+        reader, rows = self._read_rows(cid, data_path, row_count=100)
+        self.assertEqual(reader.accepted_rows_count, row_count)
+
+        # Each checkpoint appends only the keys added since the previous one, and compacting the state
+        # log limits it to twice the size of the whole state.
+        self.assertEqual(len(state_log_names()), 1)
+        state_log_path = os.path.join(checkpoint_folder, state_log_names()[0])
+        whole_state_size = len(json.dumps(reader.check_map['id must be unique'].get_state(), sort_keys=True))
+        self.assertLess(os.path.getsize(state_log_path), 2 * whole_state_size + 1000)
+
+        # Changes appended by an interrupted validation after the checkpoint are ignored.
+        with io.open(state_log_path, 'ab') as state_log_file:
+            state_log_file.write(b'{"broken')
+        self._write_data(data_path, '%d\n1\n' % (row_count + 1), 'a')
+        reader, rows = self._read_rows(cid, data_path, row_count=100)
+        self.assertEqual(reader.resumed_rows_count, row_count)
+        self.assertEqual(len(rows), 2)
+        dev_test.assert_error_fnmatches(self, rows[1], '* (R20002C1): values for * must be unique: *')
+
+        os.remove(os.path.join(checkpoint_folder, state_log_names()[0]))
+        with validio.Reader(cid, data_path) as reader:
+            reader.set_checkpoint()
+            try:
+                list(reader.rows())
+                self.fail('missing state log must cause DataError')
+            except errors.DataError as error:
+                dev_test.assert_error_fnmatches(self, error, '*state of checks*; remove the checkpoint*')
+
+    def test_fails_on_broken_checkpoint(self):
+        cid = interface.create_cid_from_string('\n'.join(['d,format,delimited', 'f,id']))
+        data_path = dev_test.path_to_test_result('test_fails_on_broken_checkpoint.txt')
+        self._write_data(data_path, '1\n')
+        checkpoint_path = data_path + validio.CHECKPOINT_SUFFIX
+        for checkpoint_text in ('broken', '[]', '{"identity": {"checkpoint_version": 3}, "row_count": -1}'):
+            self._write_data(checkpoint_path, checkpoint_text, encoding='utf-8')
+            with validio.Reader(cid, data_path) as reader:
+                reader.set_checkpoint()
+                try:
+                    list(reader.rows())
+                    self.fail('broken checkpoint must cause DataError')
+                except errors.DataError as error:
+                    dev_test.assert_error_fnmatches(self, error, '*checkpoint*; remove the checkpoint*')
+
+
+class ChangeTest(unittest.TestCase):
+    """
+    Tests for :py:meth:`cutplace.validio.Reader.validate_changes()`.
+    """
+    def setUp(self):
+        self._cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'd,header,1',
+            'f,id,,,,Integer,1...20',
+            'f,name',
+            'c,id must be unique,IsUnique,id',
+        ]))
+        # Row 25 is out of range but is part of the previous data, so it is not validated again.
+        self._previous_data_text = 'id,name\n' + ''.join('%d,x\n' % row_number for row_number in range(1, 11)) + '25,x\n'
+
+    def _validate_changes(self, data_text, batch_size=validio.DEFAULT_COLUMN_BATCH_SIZE):
+        with io.StringIO(self._previous_data_text) as previous_data_stream:
+            with io.StringIO(data_text) as data_stream:
+                with validio.Reader(self._cid, data_stream) as reader:
+                    result = reader.validate_changes(previous_data_stream, batch_size)
+        self.assertEqual((reader.accepted_rows_count, reader.rejected_rows_count),
+                         (result.row_count - result.rejected_row_count, result.rejected_row_count))
+        return result
+
+    def test_can_validate_changed_rows(self):
+        data_text = 'id,name\n' + ''.join('%d,x\n' % row_number for row_number in range(1, 10)) \
+            + '10,y\n25,x\n30,z\n5,w\n'
+        for batch_size in (2, validio.DEFAULT_COLUMN_BATCH_SIZE):
+            change_report = self._validate_changes(data_text, batch_size)
+            self.assertEqual(change_report.row_count, 13)
+            self.assertEqual(change_report.changed_row_count, 3)
+            self.assertEqual(change_report.unchanged_row_count, 10)
+            self.assertEqual(change_report.rejected_row_count, 2)
+            dev_test.assert_fnmatches(self, str(change_report.errors[0]), "* (R13C1): cannot accept field 'id': *")
+            dev_test.assert_fnmatches(self, str(change_report.errors[1]), '* (R14C1): values for * must be unique: *')
+            self.assertEqual(
+                str(change_report), 'validated fields of 3 new or changed rows of 13 rows (23.1%) and rejected 2')
+
+    def test_can_validate_unchanged_data(self):
+        change_report = self._validate_changes(self._previous_data_text)
+        self.assertEqual(change_report.changed_row_count, 0)
+        self.assertEqual(change_report.rejected_row_count, 0)
+
+    def test_fails_on_too_many_changed_errors(self):
+        with io.StringIO(self._previous_data_text) as previous_data_stream:
+            with io.StringIO('id,name\n31,x\n32,x\n') as data_stream:
+                with validio.Reader(self._cid, data_stream, max_errors=1) as reader:
+                    try:
+                        reader.validate_changes(previous_data_stream, 10)
+                        self.fail('exceeding max_errors must cause ErrorBudgetError')
+                    except errors.ErrorBudgetError as error:
+                        change_report = error.change_report
+        self.assertEqual(change_report.row_count, 2)
+        self.assertEqual(change_report.changed_row_count, 2)
+        self.assertEqual(len(change_report.errors), 2)
+
+
+class RejectionTest(unittest.TestCase):
+    """
+    Tests that all modes of :py:class:`cutplace.validio.Reader` reject the
+    same rows.
+    """
+    def setUp(self):
+        self._cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'd,header,1',
+            'f,id,,,,Integer,0...100',
+            'c,id must be unique,IsUnique,id',
+        ]))
+        self._data_text = 'id\n1\nabc\n500\n2\n1\n'
+
+    def _rejected_rows_count(self, read):
+        with io.StringIO(self._data_text) as data_stream:
+            with validio.Reader(self._cid, data_stream, on_error='continue') as reader:
+                read(reader)
+        return reader.rejected_rows_count
+
+    def test_can_reject_same_rows_in_all_modes(self):
+        def read_rows(reader):
+            return list(reader.rows())
+
+        def read_column_batches(reader):
+            return list(reader.column_batches())
+
+        def read_sample(reader):
+            return reader.sample(every=1)
+
+        def read_changes(reader):
+            with io.StringIO('id\n') as previous_data_stream:
+                return reader.validate_changes(previous_data_stream)
+
+        for read in (read_rows, read_column_batches, read_sample, read_changes):
+            self.assertEqual(self._rejected_rows_count(read), 3, read.__name__)
+
+    def test_fails_on_broken_field_with_rows(self):
+        with io.StringIO(self._data_text) as data_stream:
+            with validio.Reader(self._cid, data_stream) as reader:
+                dev_test.assert_raises_and_fnmatches(
+                    self, errors.FieldValueError, "* (R3C1): cannot accept field 'id': *", reader.validate_rows)
+
+
+class ProgressTest(unittest.TestCase):
+    """
+    Tests for :py:meth:`cutplace.validio.Reader.set_progress_callback()`.
+    """
+    def setUp(self):
+        self._cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'd,encoding,utf-8',
+            'd,line delimiter,lf',
+            'd,header,1',
+            'f,id,,,,Integer',
+            'f,name',
+        ]))
+        self._data_text = 'id,name\n' + ''.join('%d,x\n' % row_number for row_number in range(1, 1001))
+        self._data_path = dev_test.path_to_test_result('test_can_report_progress.csv')
+        with io.open(self._data_path, 'w', encoding='utf-8', newline='') as data_file:
+            data_file.write(self._data_text)
+
+    def _progresses(self, data_stream_or_path, read):
+        result = []
+        with validio.Reader(self._cid, data_stream_or_path) as reader:
+            reader.set_progress_callback(result.append, 0)
+            read(reader)
+        return result
+
+    def test_can_report_progress_of_rows(self):
+        progresses = self._progresses(self._data_path, lambda reader: reader.validate_rows())
+        data_size = os.path.getsize(self._data_path)
+        self.assertEqual([progress.row_count for progress in progresses], [256, 512, 768, 1001])
+        self.assertEqual([progress.is_done for progress in progresses], [False, False, False, True])
+        self.assertTrue(0 < progresses[0].byte_count < progresses[1].byte_count < data_size)
+        self.assertTrue(0 < progresses[0].fraction < 1)
+        self.assertIsNotNone(progresses[0].eta_seconds)
+        self.assertEqual(progresses[-1].byte_count, data_size)
+        self.assertEqual(progresses[-1].total_byte_count, data_size)
+        self.assertEqual(progresses[-1].fraction, 1.0)
+        self.assertEqual(progresses[-1].eta_seconds, 0.0)
+
+    def test_can_report_progress_of_column_batches(self):
+        progresses = self._progresses(self._data_path, lambda reader: list(reader.column_batches(100)))
+        self.assertEqual(progresses[-1].row_count, 1001)
+        self.assertEqual(progresses[-1].byte_count, os.path.getsize(self._data_path))
+
+    def test_can_report_progress_of_stream(self):
+        with io.StringIO(self._data_text) as data_stream:
+            progresses = self._progresses(data_stream, lambda reader: reader.validate_rows())
+        self.assertEqual(len(progresses), 4)
+        self.assertIsNone(progresses[0].byte_count)
+        self.assertIsNone(progresses[0].fraction)
+        self.assertIsNone(progresses[0].eta_seconds)
+        self.assertIsNotNone(progresses[0].rows_per_second)
+
+    def test_can_report_progress_of_data_with_carriage_returns(self):
+        self._cid.data_format.line_delimiter = '\r'
+        with io.open(self._data_path, 'w', encoding='utf-8', newline='') as data_file:
+            data_file.write(self._data_text.replace('\n', '\r'))
+        progresses = self._progresses(self._data_path, lambda reader: reader.validate_rows())
+        self.assertEqual(progresses[-1].row_count, 1001)
+        self.assertIsNone(progresses[-1].byte_count)
+
+    def test_can_limit_progress_rate(self):
+        with validio.Reader(self._cid, self._data_path) as reader:
+            progresses = []
+            reader.set_progress_callback(progresses.append, 3600)
+            reader.validate_rows()
+        self.assertEqual([progress.is_done for progress in progresses], [True])
+
+    def test_can_describe_progress(self):
+        self.assertEqual(
+            str(validio.Progress(500, 2000000, 4000000, 10.0, False)), '50.0%, 500 rows, 50 rows/s, 0.2 MB/s, ETA 0:00:10')
+        self.assertEqual(str(validio.Progress(1000, None, None, 3725.0, True)), '100.0%, 1000 rows, 0 rows/s, done in 1:02:05')
+
+
+class StatsTest(unittest.TestCase):
+    """
+    Tests for :py:meth:`cutplace.validio.BaseValidator.enable_stats()`.
+    """
+    def setUp(self):
+        self._cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'd,header,1',
+            'f,id,,,,Integer',
+            'f,name',
+            'c,id must be unique,IsUnique,id',
+        ]))
+
+    def test_can_measure_reading(self):
+        data_path = dev_test.path_to_test_result('test_can_measure_reading.csv')
+        with io.open(data_path, 'w', encoding='utf-8', newline='') as data_file:
+            data_file.write('id,name\n1,a\n2,b\n3,c\n')
+        with validio.Reader(self._cid, data_path) as reader:
+            self.assertIsNone(reader.stats)
+            validation_stats = reader.enable_stats()
+            self.assertIs(reader.stats, validation_stats)
+            column_batches = list(reader.column_batches())
+        self.assertEqual(len(column_batches[0]), 3)
+        self.assertEqual(validation_stats.row_count, 4)
+        self.assertEqual(validation_stats.byte_count, os.path.getsize(data_path))
+        self.assertEqual(validation_stats.stage_timings[stats.STAGE_READ].count, 4)
+        self.assertEqual(validation_stats.stage_timings[stats.STAGE_FIELDS].count, 6)
+        self.assertEqual(sorted(validation_stats.field_timings.keys()), ['id', 'name'])
+        self.assertEqual(validation_stats.field_timings['id'].count, 3)
+        # 3 rows and the end of the data.
+        self.assertEqual(validation_stats.check_timings['id must be unique'].count, 4)
+        self.assertTrue(validation_stats.elapsed_seconds > 0)
+
+    def test_can_measure_writing(self):
+        with io.StringIO() as data_stream:
+            with validio.Writer(self._cid, data_stream) as writer:
+                validation_stats = writer.enable_stats()
+                writer.write_rows([['id', 'name'], ['1', 'a'], ['2', 'b']])
+        self.assertEqual(validation_stats.row_count, 3)
+        self.assertIsNone(validation_stats.byte_count)
+        self.assertEqual(validation_stats.stage_timings[stats.STAGE_WRITE].count, 3)
+
 
 class WriterTest(unittest.TestCase):
     def setUp(self):
@@ -359,3 +964,45 @@ class ValidationFunctionsTest(unittest.TestCase):
             validio.validate(_DIGIT_CID, partially_broken_data, 2)
         with io.StringIO(data_with_row_3_broken) as partially_broken_data:
             self.assertRaises(errors.FieldValueError, validio.validate, _DIGIT_CID, partially_broken_data, 3)
+
+    def test_can_validate_using_result_cache(self):
+        result_cache = results.ResultCache(dev_test.path_to_test_result('test_can_validate_using_result_cache'))
+        result_cache.clear()
+        cid = interface.create_cid_from_string('\n'.join([
+            _DIGIT_CID_TEXT,
+            'c,digit must be unique,IsUnique,digit',
+        ]))
+        data_path = dev_test.path_to_test_result('test_can_validate_using_result_cache.txt')
+        with io.open(data_path, 'w', encoding='utf-8') as data_file:
+            data_file.write('1\n2\n1\n')
+        validio.validate(cid, data_path, 2, result_cache)
+        validio.validate(cid, data_path, 2, result_cache)
+        try:
+            validio.validate(cid, data_path, result_cache=result_cache)
+            self.fail('expected CheckError')
+        except errors.CheckError as error:
+            validated_error_text = str(error)
+        try:
+            validio.validate(cid, data_path, result_cache=result_cache)
+            self.fail('expected CheckError')
+        except errors.CheckError as error:
+            self.assertEqual(str(error), validated_error_text)
+            self.assertEqual(type(error), errors.CheckError)
+
+    def test_can_validate_using_result_cache_with_failing_check_at_end(self):
+        result_cache = results.ResultCache(
+            dev_test.path_to_test_result('test_can_validate_using_result_cache_with_failing_check_at_end'))
+        result_cache.clear()
+        cid = interface.create_cid_from_string('\n'.join([
+            _DIGIT_CID_TEXT,
+            'c,at most 1 distinct digit,DistinctCount,digit < 2',
+        ]))
+        data_path = dev_test.path_to_test_result('test_can_validate_using_result_cache_with_failing_check_at_end.txt')
+        with io.open(data_path, 'w', encoding='utf-8') as data_file:
+            data_file.write('1\n2\n3\n')
+        for _ in range(2):
+            try:
+                validio.validate(cid, data_path, result_cache=result_cache)
+                self.fail('expected CheckError')
+            except errors.CheckError as error:
+                dev_test.assert_fnmatches(self, str(error), '*distinct count is 3 but check requires: *')